@@ -1,23 +1,45 @@
 import win32com.client as win32
 import sys
 import os
+import time
+import logging
 import win32clipboard
-from PIL import Image
-import io
+
+from hwp_placeholders import PlaceholderEngine
+from image_cache import DibCache
+from hwp_tables import TableFiller
+
+# 커서 이동, 글자 삽입처럼 자주 부르는 호출은 디버그 로그로만 남긴다.
+logger = logging.getLogger(__name__)
+# 그림 크기(픽셀, 96 DPI 화면 기준) -> InsertPicture 의 mm
+PIXEL_MM = 25.4 / 96
+
+class HwpError(Exception):
+    # 한글 작업 실패. 예전처럼 sys.exit 로 프로세스를 끝내지 않고 호출한 쪽(문서 서비스 등)이 처리한다.
+    pass
 
 class HWPyControl:
-    def __init__(self):
+    def __init__(self, image_cache_dir=None):
         self.hwp = None
+        self.images = DibCache(image_cache_dir)
+
+    def prepare_images(self, images):
+        # images: (경로, 크기) 목록. 한글을 열기 전에 붙여넣을 DIB 를 프로세스 풀에서 한꺼번에 만든다.
+        failed = self.images.prefetch(images)
+        print(f"Prepared {len(self.images.payloads)} image(s) for insertion")
+        return failed
 
     def open_hwp(self, file_path):
+        # 이미 띄운 한글이 있으면 그 인스턴스에서 다음 문서를 연다.
         try:
-            self.hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
-            self.hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
+            if self.hwp is None:
+                self.hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
+                self.hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
             self.hwp.Open(file_path)
             print(f"HWP file opened successfully: {file_path}")
         except Exception as e:
             print(f"Failed to open HWP file: {e}")
-            sys.exit(1)
+            raise HwpError(f"Failed to open HWP file {file_path}: {e}") from e
 
     def save_hwp(self, file_path):
         try:
@@ -25,7 +47,7 @@ class HWPyControl:
             print(f"HWP file saved successfully: {file_path}")
         except Exception as e:
             print(f"Failed to save HWP file: {e}")
-            sys.exit(1)
+            raise HwpError(f"Failed to save HWP file {file_path}: {e}") from e
 
     def save_pdf(self, file_path):
         try:
@@ -33,7 +55,15 @@ class HWPyControl:
             print(f"PDF file saved successfully: {file_path}")
         except Exception as e:
             print(f"Failed to save PDF file: {e}")
-            sys.exit(1)
+            raise HwpError(f"Failed to save PDF file {file_path}: {e}") from e
+
+    def export(self, exports, outputs):
+        # 저장을 ExportQueue 에 넘기고 Future 를 돌려준다. 이 문서는 더 고치지 말고 다음 문서를 열면 된다.
+        try:
+            return exports.submit_document(self.hwp, outputs)
+        except Exception as e:
+            print(f"Failed to hand over document for export: {e}")
+            raise HwpError(f"Failed to hand over document for export: {e}") from e
 
     def close_hwp(self):
         if self.hwp:
@@ -55,7 +85,7 @@ class HWPyControl:
             for _ in range(instance):
                 self.hwp.HAction.Execute("RepeatFind", find_replace_set.HSet)
             self.hwp.HAction.Run("MoveDown")
-            print(f"Found text: '{text}' (instance: {instance})")
+            logger.debug("Found text: '%s' (instance: %d)", text, instance)
             return True
         except Exception as e:
             print(f"Failed to find text: {e}")
@@ -69,28 +99,49 @@ class HWPyControl:
             find_replace_set.ReplaceString = replace_text
             find_replace_set.IgnoreMessage = 1
             self.hwp.HAction.Execute("AllReplace", find_replace_set.HSet)
-            print(f"Replaced '{search_text}' with '{replace_text}'")
+            logger.debug("Replaced '%s' with '%s'", search_text, replace_text)
         except Exception as e:
             print(f"Failed to replace text: {e}")
 
     def insert_text(self, text):
+        # 클립보드 없이 InsertText 동작으로 커서 위치에 바로 쓴다.
         if text.strip():
-            self._copy_to_clipboard(text.strip())
-            self.hwp.HAction.Run("Paste")
-            print(f"Inserted text: {text.strip()}")
+            insert_text_set = self.hwp.HParameterSet.HInsertText
+            self.hwp.HAction.GetDefault("InsertText", insert_text_set.HSet)
+            insert_text_set.Text = text.strip()
+            self.hwp.HAction.Execute("InsertText", insert_text_set.HSet)
+            logger.debug("Inserted text: %s", text.strip())
+
+    def fill_text(self, values):
+        # {자리표시자: 글자} 를 한 번에 채운다. 누름틀 필드는 PutFieldText, 본문 자리표시자는 InsertText.
+        counts = PlaceholderEngine(self.hwp).fill({key: (str(value), "text") for key, value in values.items()})
+        for key, count in counts.items():
+            if count:
+                logger.debug("Filled '%s' (%d place(s))", key, count)
+            else:
+                print(f"Placeholder not found: '{key}'")
+        return counts
 
-    def insert_image(self, img_path, size=None):
+    def insert_image(self, img_path, size=None, embed=True, mode="file"):
+        # mode="file": InsertPicture 로 파일을 바로 넣는다 (size 는 픽셀, embed 면 문서에 포함).
+        # 안 되거나 mode="clipboard" 면 DIB 를 클립보드에 넣어 붙여넣는다.
         if not os.path.exists(img_path):
             print(f"Image not found: {img_path}")
-            return
-        self._copy_image_to_clipboard(img_path, size)
-        self.hwp.HAction.Run("Paste")
-        print(f"Inserted image from {img_path}")
+            return None
+        started = time.perf_counter()
+        used = "clipboard"
+        if mode == "file":
+            used = "file" if self._insert_picture(img_path, size, embed) else "clipboard (fallback)"
+        if used != "file":
+            self._copy_image_to_clipboard(img_path, size)
+            self.hwp.HAction.Run("Paste")
+        logger.info("Inserted image %s by %s in %.1f ms", img_path, used, (time.perf_counter() - started) * 1000)
+        return used
 
-    def find_and_insert_image(self, search_text, img_path, size=None, instance=1):
+    def find_and_insert_image(self, search_text, img_path, size=None, instance=1, embed=True, mode="file"):
         if self.find_text(search_text, instance):
-            self.insert_image(img_path, size)
-            print(f"Inserted image after finding '{search_text}' (instance: {instance})")
+            self.insert_image(img_path, size, embed, mode)
+            logger.debug("Inserted image after finding '%s' (instance: %d)", search_text, instance)
         else:
             print(f"Failed to insert image: Text '{search_text}' not found")
 
@@ -99,49 +150,52 @@ class HWPyControl:
         self.hwp.HParameterSet.HTableInsertLine.Side = 3
         self.hwp.HParameterSet.HTableInsertLine.Count = rows
         self.hwp.HAction.Execute("TableInsertRowColumn", self.hwp.HParameterSet.HTableInsertLine.HSet)
-        print(f"Added {rows} row(s) to the table")
+        logger.debug("Added %d row(s) to the table", rows)
+
+    def fill_table(self, anchor, dataframe, header=False):
+        # anchor 자리표시자가 있는 셀부터 DataFrame(또는 행 목록)의 값을 채운다.
+        # 표는 한 번에 필요한 행 수로 늘리고, 행을 넣은 뒤 읽어 둔 셀 목록 번호로 SetPos 해서 쓴다.
+        written = TableFiller(self.hwp).fill(anchor, dataframe, header)
+        if written is not None:
+            print(f"Filled {written} cell(s) at '{anchor}'")
+        return written
 
     def move_to_top(self):
         self.hwp.HAction.Run("MoveDocBegin")
-        print("Moved to the top of the document")
+        logger.debug("Moved to the top of the document")
 
     def move_up(self):
         self.hwp.HAction.Run("MoveUp")
-        print("Moved cursor up")
+        logger.debug("Moved cursor up")
 
     def move_down(self):
         self.hwp.HAction.Run("MoveDown")
-        print("Moved cursor down")
+        logger.debug("Moved cursor down")
 
     def move_left(self):
         self.hwp.HAction.Run("MoveLeft")
-        print("Moved cursor left")
+        logger.debug("Moved cursor left")
 
     def move_right(self):
         self.hwp.HAction.Run("MoveRight")
-        print("Moved cursor right")
+        logger.debug("Moved cursor right")
 
     def press_esc(self):
         self.hwp.HAction.Run("Cancel")
-        print("Pressed ESC key")
+        logger.debug("Pressed ESC key")
 
-    def _copy_to_clipboard(self, text):
+    def _insert_picture(self, image_path, size=None, embed=True):
+        # sizeoption 1: Width/Height(mm) 로 지정, 0: 그림 원래 크기
+        width, height = (value * PIXEL_MM for value in size) if size else (0, 0)
         try:
-            win32clipboard.OpenClipboard()
-            win32clipboard.EmptyClipboard()
-            win32clipboard.SetClipboardText(text, win32clipboard.CF_UNICODETEXT)
-            win32clipboard.CloseClipboard()
+            control = self.hwp.InsertPicture(os.path.abspath(image_path), embed, 1 if size else 0, False, False, 0, width, height)
         except Exception as e:
-            print(f"Failed to copy text to clipboard: {e}")
+            print(f"InsertPicture failed for {image_path}: {e}")
+            return False
+        return control is not None
 
     def _copy_image_to_clipboard(self, image_path, size=None):
-        img = Image.open(image_path)
-        if size:
-            img = img.resize(size, Image.Resampling.LANCZOS)
-        output = io.BytesIO()
-        img.convert("RGB").save(output, format="BMP")
-        data = output.getvalue()[14:]
-        output.close()
+        data = self.images.get(image_path, size)
         win32clipboard.OpenClipboard()
         win32clipboard.EmptyClipboard()
         win32clipboard.SetClipboardData(win32clipboard.CF_DIB, data)
@@ -152,6 +206,10 @@ def main():
     
     current_dir = os.getcwd()
     print(f"현재 작업 디렉토리: {current_dir}")
+    image_file = os.path.join(current_dir, "StructFlow-Automator-Private", "References", "image.png")
+
+    # 클립보드로 넣을 그림은 한글을 열기 전에 미리 준비 (InsertPicture 로 넣지 못했을 때 쓴다)
+    hwp_control.prepare_images([(image_file, (100, 100))])
 
     # 한글 파일 열기
     input_file = os.path.join(current_dir, "StructFlow-Automator-Private", "References", "default.hwp")
@@ -169,18 +227,23 @@ def main():
     # ESC 키 테스트
     hwp_control.press_esc()
     
-    # 텍스트 찾기 후 이미지 삽입
-    image_file = os.path.join(current_dir, "StructFlow-Automator-Private", "References", "image.png")
-    hwp_control.find_and_insert_image(r"{{이미지}}", image_file, (100, 100))
+    # 텍스트 찾기 후 이미지 삽입 (파일 경로로, 100x100 픽셀 크기, 문서에 포함)
+    hwp_control.find_and_insert_image(r"{{이미지}}", image_file, (100, 100), embed=True, mode="file")
     
     # 텍스트 교체
     hwp_control.replace_text("원본 텍스트", "교체할 텍스트")
     
     # 텍스트 삽입
     hwp_control.insert_text("삽입할 텍스트")
+
+    # 자리표시자 한 번에 채우기
+    hwp_control.fill_text({"{{날짜}}": "2024.05", "{{회사}}": "회사 이름"})
     
     # 표에 행 추가
     hwp_control.add_table_row(2)
+
+    # 표 채우기: {{표}} 가 있는 셀부터 행 단위로
+    hwp_control.fill_table("{{표}}", [["C1", "H-400x200x8x13", "0.82", "OK"], ["C2", "H-350x175x7x11", "0.91", "OK"]])
     
     # 파일 저장 (HWP)
     output_hwp = os.path.join(current_dir, "StructFlow-Automator-Private", "References", "output.hwp")
@@ -196,4 +259,9 @@ def main():
     print(f"모든 작업이 완료되었습니다. 파일이 {current_dir}에 저장되었습니다.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # HWP_LOG_LEVEL=DEBUG 로 실행하면 커서 이동과 셀 쓰기도 하나씩 보인다.
+    logging.basicConfig(level=os.getenv("HWP_LOG_LEVEL", "INFO"), format="%(levelname)s %(message)s")
+    try:
+        main()
+    except HwpError:
+        sys.exit(1)
\ No newline at end of file
@@ -763,8 +763,10 @@ class AutoMouseTracker:
             logging.error(f"Failed to unblock keyboard inputs: {e}")
 
     def send_keyboard_input(self, text, hwnd):
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        current_dir = os.path.join(current_dir, "temp")
+        # 저장 위치는 SolarPipeline 이 MIDAS_OUTPUT_DIR 로 넘긴다 (일괄 처리에서는 프로젝트별 작업 공간).
+        current_dir = os.getenv("MIDAS_OUTPUT_DIR") or os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "temp"
+        )
         if not os.path.exists(current_dir):
             os.makedirs(current_dir)
 
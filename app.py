@@ -1,281 +1,130 @@
 import os
-import subprocess
-import time
-import psutil
-import win32gui
-import win32con
-import win32process
 import customtkinter as ctk
-import pyperclip
 from tkinter import filedialog, Listbox, TclError
 from dotenv import load_dotenv
-import pandas as pd
 import sys
-import requests
-import re
-
+import time
+from midas_window import MidasWindowManager
+from solar_pipeline import SolarPipeline
+from batch_queue import BatchQueue, collect_projects
+from pipeline_worker import PipelineWorker, PipelineCancelled
+from log_sink import LogSink
+from purlin_girth_extractor import extract_purlin_girth_data
+
+
+class RunProgressPanel(ctk.CTkFrame):
+    POLL_INTERVAL = 100
+
+    def __init__(self, parent, on_done=None):
+        super().__init__(parent, fg_color="transparent")
+        self.on_done = on_done
+        self.worker = None
+        self.current = None
+        self.create_widgets()
 
-class RedirectText:
-    def __init__(self, text_widget):
-        self.output = text_widget
+    def create_widgets(self):
+        self.status_label = ctk.CTkLabel(self, text="대기 중", font=("Roboto", 12))
+        self.status_label.pack(anchor="w", padx=20)
 
-    def write(self, string):
-        self.output.insert("end", string)
-        self.output.see("end")
+        self.timing_box = ctk.CTkTextbox(self, height=120)
+        self.timing_box.pack(fill="x", padx=20, pady=5)
 
-    def flush(self):
-        pass
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.pack(fill="x")
+
+        self.pause_button = ctk.CTkButton(
+            button_frame,
+            text="일시정지",
+            command=self.toggle_pause,
+            width=100,
+            state="disabled",
+        )
+        self.pause_button.pack(side="left", padx=20)
+
+        self.cancel_button = ctk.CTkButton(
+            button_frame,
+            text="취소",
+            command=self.cancel,
+            width=100,
+            state="disabled",
+            fg_color="#a51f1f",
+        )
+        self.cancel_button.pack(side="left")
+
+    @property
+    def running(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    def start(self, worker):
+        self.worker = worker
+        self.pause_button.configure(state="normal")
+        self.cancel_button.configure(state="normal")
+        self.status_label.configure(text="실행 중")
+        worker.start()
+        self.after(self.POLL_INTERVAL, self.poll)
+
+    def toggle_pause(self):
+        control = self.worker.control
+        if control.paused:
+            control.resume()
+            self.pause_button.configure(text="일시정지")
+        else:
+            control.pause()
+            self.pause_button.configure(text="재개")
+            self.status_label.configure(text="현재 단계가 끝나면 일시정지합니다.")
+
+    def cancel(self):
+        self.worker.control.cancel()
+        self.pause_button.configure(state="disabled")
+        self.cancel_button.configure(state="disabled")
+        self.status_label.configure(text="현재 단계가 끝나면 취소합니다.")
+
+    def append_timing(self, line):
+        self.timing_box.insert("end", line + "\n")
+        self.timing_box.see("end")
+
+    def poll(self):
+        for kind, data in self.worker.drain():
+            if self.handle_event(kind, data):
+                return
+        if self.current and not self.worker.control.paused:
+            name, started = self.current
+            self.status_label.configure(text=f"{name} ({time.time() - started:.0f}s)")
+        self.after(self.POLL_INTERVAL, self.poll)
+
+    def handle_event(self, kind, data):
+        if kind in ("task_started", "step_started"):
+            self.current = (data["name"], data["time"])
+        elif kind == "step_finished":
+            cached = " (캐시)" if data.get("cached") else ""
+            missing = f" (출력 없음: {', '.join(data['missing'])})" if data.get("missing") else ""
+            self.append_timing(f"  {data['name']}: {data['elapsed']:.1f}s{cached}{missing}")
+        elif kind == "task_finished":
+            self.append_timing(f"[{data['name']}] {data['elapsed']:.1f}s")
+        elif kind == "task_failed":
+            self.append_timing(f"[{data['name']}] 실패: {data['error']}")
+        elif kind == "project_started":
+            self.append_timing(f"{os.path.basename(data['project'])}")
+        elif kind == "project_finished":
+            result = "실패" if data["error"] else "완료"
+            self.append_timing(f"  -> {result} ({data['elapsed'] / 60:.1f} min)")
+        elif kind in ("done", "cancelled"):
+            self.current = None
+            self.pause_button.configure(state="disabled")
+            self.cancel_button.configure(state="disabled")
+            text = "완료" if kind == "done" else "취소됨"
+            self.status_label.configure(text=f"{text} ({data['elapsed']:.1f}s)")
+            if self.on_done:
+                self.on_done(kind, data)
+            return True
+        return False
 
 
 class FileHandler:
     @staticmethod
     def extract_purlin_girth_data(file_path):
-        try:
-            df = pd.read_excel(file_path, sheet_name="Purlin _ Girth")
-            df = df.iloc[2:].reset_index(drop=True)
-            df.columns = [
-                "CHK",
-                "CHK.1",
-                "Apply Member To",
-                "Material",
-                "Member Type",
-                "Section",
-                "Unnamed: 6",
-                "Unnamed: 7",
-                "Unnamed: 8",
-                "Unnamed: 9",
-                "Unnamed: 10",
-                "Unnamed: 11",
-                "Unnamed: 12",
-                "Unnamed: 13",
-                "Span",
-                "Unnamed: 15",
-                "Unnamed: 16",
-                "Unbraced Length",
-                "Unnamed: 18",
-                "Factor",
-                "Unnamed: 20",
-                "Design Load",
-                "Unnamed: 22",
-                "Unnamed: 23",
-                "Unnamed: 24",
-                "Unnamed: 25",
-                "Unnamed: 26",
-                "Unnamed: 27",
-                "Unnamed: 28",
-                "Unnamed: 29",
-                "Unnamed: 30",
-                "Unnamed: 31",
-                "Unnamed: 32",
-                "Unnamed: 33",
-                "Unnamed: 34",
-                "Unnamed: 35",
-                "Defl. Criteria",
-                "Width-Thick Ratio",
-                "Unnamed: 38",
-                "Unnamed: 39",
-                "Moment Strength",
-                "Unnamed: 41",
-                "Unnamed: 42",
-                "Unnamed: 43",
-                "Unnamed: 44",
-                "Unnamed: 45",
-                "Unnamed: 46",
-                "Shear Strength",
-                "Unnamed: 48",
-                "Unnamed: 49",
-                "Unnamed: 50",
-                "Unnamed: 51",
-                "Unnamed: 52",
-                "Deflection",
-                "Unnamed: 54",
-            ]
-
-            df["Deflection"] = (
-                df["Deflection"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
-            )
-            df["Ratio"] = (
-                df["Unnamed: 54"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
-            )
-            df["Calculated Span/300"] = (df["Span"] * 1000 / 300).round(2)
-            output_df = df[["Deflection", "Calculated Span/300", "Ratio"]].dropna()
-            result = output_df.to_string(index=False, header=False)
-            pyperclip.copy(result)
-            print("Data successfully extracted and copied to clipboard.")
-            print("Extracted data:")
-            print(result)
-        except Exception as e:
-            print(f"An error occurred while extracting data: {str(e)}")
-
-
-class MidasWindowManager:
-    def __init__(self):
-        self.original_position = None
-        self.original_size = None
-        self.midas_hwnd = None
-
-    def is_midas_gen_open(self, file_path):
-        hwnds = self._get_hwnds_by_filepath(file_path)
-        if hwnds:
-            self.midas_hwnd = hwnds[0]
-        return bool(hwnds)
-
-    def _get_hwnds_by_filepath(self, file_path):
-        hwnds = []
-
-        def callback(hwnd, hwnds):
-            if win32gui.IsWindowVisible(hwnd) and win32gui.IsWindowEnabled(hwnd):
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                try:
-                    process = psutil.Process(pid)
-                    if any(
-                        file_path.lower() in cmd.lower() for cmd in process.cmdline()
-                    ):
-                        hwnds.append(hwnd)
-                except (psutil.AccessDenied, psutil.NoSuchProcess):
-                    pass
-            return True
-
-        win32gui.EnumWindows(callback, hwnds)
-        return hwnds
-
-    def open_midas_gen_file(self, file_path):
-        midas_gen_executable = "C:\\Program Files\\MIDAS\\MODS\\Midas Gen\\MidasGen.exe"
-        if not os.path.exists(midas_gen_executable):
-            print("Midas Gen executable not found.")
-            return False
-
-        if self.is_midas_gen_open(file_path):
-            print("Midas Gen is already open.")
-            return True
-
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        startupinfo.wShowWindow = win32con.SW_HIDE
-        subprocess.Popen([midas_gen_executable, file_path], startupinfo=startupinfo)
-
-        while not self.is_midas_gen_open(file_path):
-            print("Waiting for Midas Gen to open...")
-            time.sleep(5)
-
-        print("Midas Gen opened successfully.")
-        time.sleep(15)
-        return True
-
-    def save_original_position_and_size(self, solar_file):
-        # self.midas_hwnd 다시 갖고오기
-        self.midas_hwnd = self._get_hwnds_by_filepath(solar_file)[0]
-        
-        if self.midas_hwnd:
-            rect = win32gui.GetWindowRect(self.midas_hwnd)
-            self.original_position = (rect[0], rect[1])
-            self.original_size = (rect[2] - rect[0], rect[3] - rect[1])
-
-            print(f"Original position: {self.original_position}")
-
-    def set_ui_position_and_size(self, hwnd, ini_file):
-        try:
-            window_title = win32gui.GetWindowText(hwnd)
-            exe_path = os.path.join(
-                os.path.dirname(__file__), "WindowLayoutManager.exe"
-            )
-            ini_file = os.path.join(os.path.dirname(__file__), ini_file)
-
-            success, _ = self.run_window_layout_manager(
-                exe_path, window_title, ini_file
-            )
-            if success:
-                print("Window layout restoration process completed successfully.")
-            else:
-                print("Window layout restoration failed or timed out.")
-        except Exception as e:
-            print(f"Failed to set UI position and size: {e}")
-
-    def run_window_layout_manager(self, exe_path, window_title, ini_file, timeout=300):
-        command = [exe_path, window_title, ini_file]
-        try:
-            process = subprocess.Popen(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
-
-            start_time = time.time()
-            output_lines = []
-            while True:
-                output = process.stdout.readline()
-                if output == "" and process.poll() is not None:
-                    break
-                if output:
-                    output_lines.append(output.strip())
-                    print(output_lines[-1])
-
-                if time.time() - start_time > timeout:
-                    print(f"Timeout after {timeout} seconds. Terminating process.")
-                    process.terminate()
-                    return False, output_lines
-
-            if process.poll() == 0:
-                print("Process completed successfully.")
-                return True, output_lines
-            else:
-                print(f"Error occurred: {process.stderr.read()}")
-                return False, output_lines
-        except Exception as e:
-            print(f"Subprocess failed: {e}")
-            return False, []
-
-    def restore_original_position_and_size(self):
-        if self.midas_hwnd and self.original_position and self.original_size:
-            try:
-                top_hwnd = self.get_top_level_parent(self.midas_hwnd)
-                if self.original_position == "maximized":
-                    win32gui.ShowWindow(top_hwnd, win32con.SW_MAXIMIZE)
-                else:
-                    self.set_window_position_and_size(
-                        top_hwnd,
-                        self.original_position[0],
-                        self.original_position[1],
-                        self.original_size[0],
-                        self.original_size[1],
-                    )
-            except win32gui.error as e:
-                pass
-
-    def minimize_window(self):
-        if self.midas_hwnd:
-            win32gui.ShowWindow(self.midas_hwnd, win32con.SW_MINIMIZE)
-
-    def restore_window(self):
-        if self.midas_hwnd:
-            win32gui.ShowWindow(self.midas_hwnd, win32con.SW_RESTORE)
-
-    def set_window_position_and_size(self, hwnd, x, y, width, height):
-        win32gui.SetWindowPos(
-            hwnd,
-            win32con.HWND_TOP,
-            x,
-            y,
-            width,
-            height,
-            win32con.SWP_SHOWWINDOW,
-        )
-
-    def close_midas_gen(self):
-        if self.midas_hwnd:
-            win32gui.PostMessage(self.midas_hwnd, win32con.WM_CLOSE, 0, 0)
-            self.midas_hwnd = None
-
-    def get_top_level_parent(self, hwnd):
-        parent = hwnd
-        while True:
-            new_parent = win32gui.GetParent(parent)
-            if new_parent == 0:
-                return parent
-            parent = new_parent
+        # 추출 로직은 purlin_girth_extractor 에 하나로 모여 있다 (여러 파일은 extract_batch).
+        extract_purlin_girth_data(file_path)
 
 
 class OrderSelectionWidget(ctk.CTkToplevel):
@@ -288,9 +137,10 @@ class OrderSelectionWidget(ctk.CTkToplevel):
 
     def configure_ui(self):
         self.title("순서 선택")
-        self.geometry("500x600")
+        self.geometry("500x820")
         self.configure(fg_color="#2b2b2b")
         self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         self.grab_set()
         self.focus_set()
 
@@ -352,6 +202,9 @@ class OrderSelectionWidget(ctk.CTkToplevel):
             )
             file_label.pack(anchor="w", padx=20, pady=2)
 
+        self.progress_panel = RunProgressPanel(self, on_done=self.on_run_done)
+        self.progress_panel.pack(pady=10, fill="x")
+
     def move_up(self):
         try:
             selected = self.listbox.curselection()[0]
@@ -375,18 +228,153 @@ class OrderSelectionWidget(ctk.CTkToplevel):
             pass
 
     def start_program(self):
+        ordered_items = self.listbox.get(0, "end")
+        tasks = [
+            (item, self.parent.checkbox_functions[item])
+            for item in ordered_items
+            if item in self.parent.checkbox_functions
+        ]
+        for button in (self.up_button, self.down_button, self.start_button):
+            button.configure(state="disabled")
+
         self.parent.window_manager.minimize_window()
+        self.progress_panel.start(PipelineWorker(tasks, self.parent.pipeline))
 
-        ordered_items = self.listbox.get(0, "end")
-        for item in ordered_items:
-            if item in self.parent.checkbox_functions:
-                try:
-                    self.parent.checkbox_functions[item]()
-                except Exception as e:
-                    print(f"Error in {item}: {str(e)}")
+    def on_run_done(self, status, data):
+        self.parent.window_manager.restore_window()
+        print(f"전체 작업 시간: {data['elapsed']:.1f}s")
+        self.grab_release()
+        self.destroy()
+
+    def on_close(self):
+        if self.progress_panel.running:
+            self.progress_panel.cancel()
+            return
+        self.grab_release()
+        self.destroy()
+
+
+class BatchQueueWidget(ctk.CTkToplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.step_checkboxes = {}
+        self.configure_ui()
+
+    def configure_ui(self):
+        self.title("일괄 처리")
+        self.geometry("600x900")
+        self.configure(fg_color="#2b2b2b")
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.grab_set()
+        self.focus_set()
+
+    def create_widgets(self):
+        title_label = ctk.CTkLabel(
+            self, text="프로젝트 파일 목록", font=("Roboto Medium", 20)
+        )
+        title_label.pack(pady=(20, 10))
+
+        list_frame = ctk.CTkFrame(self)
+        list_frame.pack(pady=10, padx=20, fill="both", expand=True)
+
+        self.listbox = Listbox(
+            list_frame,
+            width=70,
+            height=12,
+            bg="#3a3a3a",
+            fg="white",
+            selectbackground="#1f6aa5",
+        )
+        self.listbox.pack(side="left", fill="both", expand=True)
+
+        scrollbar = ctk.CTkScrollbar(list_frame, command=self.listbox.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+
+        button_frame = ctk.CTkFrame(self, fg_color="transparent")
+        button_frame.pack(pady=10, fill="x")
+
+        ctk.CTkButton(
+            button_frame, text="파일 추가", command=self.add_files, width=100
+        ).pack(side="left", padx=10)
+        ctk.CTkButton(
+            button_frame, text="폴더 추가", command=self.add_folder, width=100
+        ).pack(side="left", padx=10)
+        ctk.CTkButton(
+            button_frame, text="삭제", command=self.remove_selected, width=100
+        ).pack(side="left", padx=10)
+
+        steps_label = ctk.CTkLabel(self, text="실행 단계", font=("Roboto Medium", 16))
+        steps_label.pack(pady=(10, 5))
+
+        steps_frame = ctk.CTkScrollableFrame(self, height=180)
+        steps_frame.pack(padx=20, fill="x")
+        for name, _, _, _ in self.parent.pipeline.SOLAR_STEPS:
+            checkbox = ctk.CTkCheckBox(steps_frame, text=name)
+            checkbox.select()
+            checkbox.pack(anchor="w", pady=2)
+            self.step_checkboxes[name] = checkbox
+
+        self.start_button = ctk.CTkButton(
+            self, text="시작", command=self.start_batch, width=100
+        )
+        self.start_button.pack(pady=10)
+
+        self.progress_panel = RunProgressPanel(self, on_done=self.on_run_done)
+        self.progress_panel.pack(pady=10, fill="x")
+
+    def add_projects(self, paths):
+        existing = set(self.listbox.get(0, "end"))
+        for project in collect_projects(paths):
+            if project not in existing:
+                self.listbox.insert("end", project)
+
+    def add_files(self):
+        paths = filedialog.askopenfilenames(
+            filetypes=[("MGB Files", "*.mgb"), ("MDPB Files", "*.mdpb")]
+        )
+        if paths:
+            self.add_projects(paths)
+
+    def add_folder(self):
+        folder = filedialog.askdirectory()
+        if folder:
+            self.add_projects([folder])
+
+    def remove_selected(self):
+        for index in reversed(self.listbox.curselection()):
+            self.listbox.delete(index)
+
+    def start_batch(self):
+        projects = list(self.listbox.get(0, "end"))
+        if not projects:
+            print("처리할 프로젝트 파일이 없습니다.")
+            return
+
+        step_names = [
+            name for name, checkbox in self.step_checkboxes.items() if checkbox.get()
+        ]
+        if len(step_names) == len(self.step_checkboxes):
+            step_names = None
+
+        queue = BatchQueue(self.parent.pipeline, step_names)
+        self.start_button.configure(state="disabled")
+        self.parent.window_manager.minimize_window()
+        self.progress_panel.start(
+            PipelineWorker([("일괄 처리", lambda: queue.run(projects))], self.parent.pipeline)
+        )
 
+    def on_run_done(self, status, data):
+        # 결과를 확인할 수 있도록 창은 닫지 않는다.
         self.parent.window_manager.restore_window()
+        self.start_button.configure(state="normal")
 
+    def on_close(self):
+        if self.progress_panel.running:
+            self.progress_panel.cancel()
+            return
         self.grab_release()
         self.destroy()
 
@@ -398,7 +386,6 @@ class App(ctk.CTk):
     TABS_DATA = [("신규", 1)]
     BASIC_INFO_LABELS = ["태양광 명칭", "풍속 (m/s)", "설하중 (kN/m²)", "노풍도"]
     FILE_LOCATIONS = ["태양광", "건물", "디자인"]
-
     def __init__(self):
         super().__init__()
         load_dotenv()
@@ -414,7 +401,8 @@ class App(ctk.CTk):
         self.json_directory = os.path.join(os.path.dirname(__name__), "json_scripts")
         self.ensure_json_directory()
         self.window_manager = MidasWindowManager()
-        self.log_redirector = RedirectText(self.log_box)
+        self.pipeline = SolarPipeline(self.window_manager, self.json_directory)
+        self.log_redirector = LogSink(self.log_box)
         sys.stdout = self.log_redirector
         sys.stderr = self.log_redirector
 
@@ -465,6 +453,15 @@ class App(ctk.CTk):
             )
             button.pack(pady=(20, 0) if index == 1 else 0, fill="x")
             self.tab_buttons[index] = button
+        batch_button = ctk.CTkButton(
+            side_frame,
+            text="일괄 처리",
+            height=50,
+            corner_radius=0,
+            command=self.open_batch_queue,
+            fg_color="#2b2b2b",
+        )
+        batch_button.pack(side="bottom", pady=(0, 20), fill="x")
         self.update_button_styles(1)
 
     def create_main_frame(self):
@@ -614,6 +611,9 @@ class App(ctk.CTk):
         else:
             print("체크된 항목이 없습니다.")
 
+    def open_batch_queue(self):
+        BatchQueueWidget(self)
+
     def ensure_json_directory(self):
         if not os.path.exists(self.json_directory):
             os.makedirs(self.json_directory)
@@ -626,169 +626,17 @@ class App(ctk.CTk):
                 except Exception as e:
                     print(f"Error in {item}: {str(e)}")
 
-    def open_solar_file(self):
+    def run_type_division_solar(self):
         solar_file = self.file_entries["태양광"].get()
         if not solar_file:
             print("태양광 파일이 없습니다.")
             return
-
-        if not self.window_manager.open_midas_gen_file(solar_file):
-            print("Midas Gen 파일이 열리지 않았습니다.")
-            return
-
-        print("Midas Gen 파일이 열렸습니다.")
-
-        self.window_manager.save_original_position_and_size(solar_file)
-
-        print("save_original_position_and_size")
-
-        self.window_manager.set_ui_position_and_size(
-            self.window_manager.midas_hwnd, "midas_gen.ini"
-        )
-
-        print("set_ui_position_and_size")
-
-        self.window_manager.set_window_position_and_size(
-            self.window_manager.midas_hwnd, 50, 50, 1800, 930
-        )
-
-        print("set_window_position_and_size")
-
-    def get_satellite_image_info(self):
-        dotenv_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "StructFlow-Automator-Private",
-            ".env",
-        )
-        load_dotenv(dotenv_path)
-
-        api_key = os.getenv("GOOGLE_MAPS_API_KEY")
-        if not api_key:
-            raise ValueError("GOOGLE_MAPS_API_KEY not found in environment variables")
-
-        return api_key
-
-    def get_coordinates(self, address, api_key):
-        base_url = "https://maps.googleapis.com/maps/api/geocode/json"
-        params = {"address": address, "key": api_key}
-        response = requests.get(base_url, params=params)
-        data = response.json()
-
-        if data["status"] == "OK":
-            location = data["results"][0]["geometry"]["location"]
-            return location["lat"], location["lng"]
-        else:
-            raise ValueError(
-                f"Could not find coordinates for the given address. Status: {data['status']}"
-            )
-
-    def download_satellite_image(self, address, api_key, zoom="18", size="608x325"):
-        lat, lng = self.get_coordinates(address, api_key)
-        offset = 0.001 * (21 - int(zoom))
-        box = f"{lat-offset},{lng-offset}|{lat-offset},{lng+offset}|{lat+offset},{lng+offset}|{lat+offset},{lng-offset}|{lat-offset},{lng-offset}"
-
-        base_url = "https://maps.googleapis.com/maps/api/staticmap?"
-        params = {
-            "center": f"{lat},{lng}",
-            "zoom": zoom,
-            "size": size,
-            "maptype": "satellite",
-            "key": api_key,
-            "markers": f"color:red|label:A|{lat},{lng}",
-            "path": f"color:0xFFFF00FF|weight:5|{box}",
-        }
-
-        url = base_url + "&".join(f"{k}={v}" for k, v in params.items())
-        response = requests.get(url)
-        if response.status_code != 200:
-            raise Exception(
-                f"Failed to download image. Status code: {response.status_code}"
-            )
-
-        temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp")
-        os.makedirs(temp_dir, exist_ok=True)
-        filename = os.path.join(temp_dir, "satellite_image.jpg")
-        with open(filename, "wb") as f:
-            f.write(response.content)
-
-        print(f"Satellite image saved to: {filename}")
-
-    def get_satellite_image(self, address=None):
-        if not address:
-            return
-        while True:
-            api_key = self.get_satellite_image_info()
-            self.download_satellite_image(address, api_key)
-
-            if not os.path.exists(self.get_temp_file_path("satellite_image.jpg")):
-                continue
-            break
-
-    def get_address(self, key):
-        if key == "sollar":
-            file_path = self.file_entries["태양광"].get()
-        elif key == "building":
-            file_path = self.file_entries["건물"].get()
-        else:
-            return None
-
-        match = re.search(
-            r"([가-힣]+\s[가-힣]+\s[가-힣]+\s[가-힣]+\s[0-9-]+)", file_path
-        )
-        if match:
-            address = match.group(1)
-            address = re.sub(r"\s*[0-9-]+호.*$", "", address)
-            return address
-        else:
-            print(f"주소를 찾을 수 없습니다: {file_path}")
-            return None
-
-    def clear_temp_dir(self):
-        # clear temp dir
-        temp_dir = os.path.join(os.path.dirname(__file__), "temp")
-        for file in os.listdir(temp_dir):
-            file_path = os.path.join(temp_dir, file)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-
-    def run_type_division_solar(self):
         try:
-            self.clear_temp_dir()
-
-            # 마이다스 프로그램 실행
-            self.open_solar_file()
-
-            # 위치도 이미지 생성
-            self.get_satellite_image(address=self.get_address("sollar"))
-
-            # 마이다스 내부 자료 생성 자동화 시작
-
-            self.run_close_notice()
-            self.run_set_display()
-            self.run_calculate()
-            self.run_steel_code_check()
-            self.run_cold_formed_steel_check()
-            self.generate_table()
-            self.generate_dummy_image()
-            self.generate_boundaries_type()
-            self.generate_load_case1()
-            self.generate_load_case2()
-            self.generate_load_case3()
-            self.generate_load_case4()
-            self.generate_load_case5()
-            self.generate_load_case6()
-            self.generate_load_case7()
-            self.generate_load_case8()
-            self.generate_load_case9()
-            self.generate_load_case10()
-            self.generate_reaction_cball_stl_env_ser()
-            return
-            self.set_reaction_force_moments()
-        finally:
-            return
-            self.window_manager.restore_original_position_and_size()
-            self.window_manager.close_midas_gen()
-            print("타입분할(태양광) 작업 완료")
+            self.pipeline.run(solar_file)
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            print(f"타입분할(태양광) 작업 실패: {e}")
 
     def run_type_division_building(self):
         print("타입분할(건물) 작업 시작")
@@ -902,200 +750,6 @@ class App(ctk.CTk):
         finally:
             print("안전로프 작업 완료")
 
-    def run_close_notice(self):
-        self.run_json_file("close_notice.json")
-
-    def run_set_display(self):
-        self.run_json_file("display.json")
-
-    def run_calculate(self):
-        self.run_json_file("calculate.json")
-
-    def run_steel_code_check(self):
-        while True:
-            try:
-                # Open and copy steel code check
-                self.run_json_file("open_widget_steel_code_check.json")
-                self.clear_clipboard()
-                self.run_json_file("copy_txt_steel_code_check.json")
-
-                if not self.save_clipboard_to_file("solar_steel_code_check.txt"):
-                    continue
-
-                self.run_json_file("create_img_steel_code_check.json")
-                if not os.path.exists(self.get_temp_file_path("100.emf")):
-                    continue
-            finally:
-                self.run_json_file("close_steel_code_check.json")
-            break
-
-    def run_cold_formed_steel_check(self):
-        while True:
-            try:
-                self.run_json_file("open_widget_cold_formed_steel_code_check.json")
-                self.clear_clipboard()
-                self.run_json_file("copy_txt_cold_formed_steel_code_check.json")
-
-                if not self.save_clipboard_to_file(
-                    "solar_cold_formed_steel_code_check.txt"
-                ):
-                    continue
-
-                self.run_json_file("create_img_cold_formed_steel_code_check.json")
-                if not os.path.exists(self.get_temp_file_path("201.emf")):
-                    continue
-            finally:
-                self.run_json_file("close_cold_formed_steel_code_check.json")
-            break
-
-    def generate_table(self):
-        while True:
-            try:
-                self.clear_clipboard()
-                self.run_json_file("create_table.json")
-
-                if not self.save_clipboard_to_file("solar_table.txt"):
-                    continue
-            finally:
-                self.run_json_file("close_table.json")
-            break
-
-    def generate_dummy_image(self):
-        while True:
-            self.clear_clipboard()
-            self.run_json_file("unactive_dummy.json")
-            if not os.path.exists(self.get_temp_file_path("unactive_dummy.jpg")):
-                continue
-            break
-
-    def generate_boundaries_type(self):
-        while True:
-            self.run_json_file("boundaries_type.json")
-            if not os.path.exists(self.get_temp_file_path("boundaries_type.jpg")):
-                continue
-            break
-
-    def generate_load_case1(self):
-        while True:
-            self.run_json_file("create_img_load1.json")
-            if not os.path.exists(self.get_temp_file_path("load_case1.jpg")):
-                continue
-            break
-
-    def generate_load_case2(self):
-        while True:
-            self.run_json_file("create_img_load2.json")
-            if not os.path.exists(self.get_temp_file_path("load_case2.jpg")):
-                continue
-            break
-
-    def generate_load_case3(self):
-        while True:
-            self.run_json_file("create_img_load3.json")
-            if not os.path.exists(self.get_temp_file_path("load_case3.jpg")):
-                continue
-            break
-
-    def generate_load_case4(self):
-        while True:
-            self.run_json_file("create_img_load4.json")
-            if not os.path.exists(self.get_temp_file_path("load_case4.jpg")):
-                continue
-            break
-
-    def generate_load_case5(self):
-        while True:
-            self.run_json_file("create_img_load5.json")
-            if not os.path.exists(self.get_temp_file_path("load_case5.jpg")):
-                continue
-            break
-
-    def generate_load_case6(self):
-        while True:
-            self.run_json_file("create_img_load6.json")
-            if not os.path.exists(self.get_temp_file_path("load_case6.jpg")):
-                continue
-            break
-
-    def generate_load_case7(self):
-        while True:
-            self.run_json_file("create_img_load7.json")
-            if not os.path.exists(self.get_temp_file_path("load_case7.jpg")):
-                continue
-            break
-
-    def generate_load_case8(self):
-        while True:
-            self.run_json_file("create_img_load8.json")
-            if not os.path.exists(self.get_temp_file_path("load_case8.jpg")):
-                continue
-            break
-
-    def generate_load_case9(self):
-        while True:
-            self.run_json_file("create_img_load9.json")
-            if not os.path.exists(self.get_temp_file_path("load_case9.jpg")):
-                continue
-            break
-
-    def generate_load_case10(self):
-        while True:
-            self.run_json_file("create_img_load10.json")
-            if not os.path.exists(self.get_temp_file_path("load_case10.jpg")):
-                continue
-            break
-
-    def generate_reaction_cball_stl_env_ser(self):
-        while True:
-            self.run_json_file("create_img_reaction_cball_stl_env_ser.json")
-            if not os.path.exists(self.get_temp_file_path("reaction_cball_stl_env_ser.jpg")):
-                continue
-            break
-
-    def set_reaction_force_moments(self):
-        while True:
-            self.run_json_file("set_reaction_force_moments.json")
-            self.run_json_file("create_img_reaction_force_moments.json")
-            if not os.path.exists(
-                self.get_temp_file_path("reaction_force_moments.jpg")
-            ):
-                continue
-            break
-
-    def run_json_file(self, json_file):
-        json_path = os.path.join(self.json_directory, json_file)
-        midas_hwnd = self.window_manager.midas_hwnd
-        print(f"midas_hwnd: {midas_hwnd}")
-        if os.path.exists(json_path):
-            subprocess.run(
-                ["python", "SimpleMouseTracker.py", json_path, str(midas_hwnd)]
-            )
-        else:
-            print(f"Warning: JSON file {json_file} not found.")
-
-    def clear_clipboard(self):
-        pyperclip.copy("")
-
-    def save_clipboard_to_file(self, file_name):
-        try:
-            content = pyperclip.paste()
-            if not content.strip():
-                return False
-            file_path = self.get_temp_file_path(file_name)
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            return True
-        except Exception as e:
-            print(f"Error saving clipboard content: {e}")
-            return False
-
-    def get_temp_file_path(self, file_name):
-        temp_directory = os.path.join(os.path.dirname(__file__), "temp")
-        if not os.path.exists(temp_directory):
-            os.makedirs(temp_directory)
-        return os.path.join(temp_directory, file_name)
-
-
 if __name__ == "__main__":
     sys.stdout.reconfigure(encoding="utf-8")
     app = App()
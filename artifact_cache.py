@@ -0,0 +1,153 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+
+from run_journal import file_checksum
+
+TOOL_VERSION = "1.0"
+INDEX_FILE = "index.json"
+
+
+class ArtifactCache:
+    # (모델 파일 해시, 단계 스크립트/템플릿 해시, 도구 버전)을 키로 단계 출력물을 보관한다.
+    def __init__(self, cache_dir, max_bytes=2 * 1024**3, verify=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.verify = verify
+        self.index_path = os.path.join(cache_dir, INDEX_FILE)
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._input_checksums = {}
+        self.load_index()
+
+    def load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to read artifact cache index: {e}")
+            self.entries = {}
+
+    def save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def begin_run(self):
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, model_checksum, input_paths):
+        digest = hashlib.sha256()
+        digest.update(TOOL_VERSION.encode("utf-8"))
+        digest.update(model_checksum.encode("utf-8"))
+        for path in input_paths:
+            digest.update(os.path.basename(path).encode("utf-8"))
+            digest.update(self._input_checksum(path).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _input_checksum(self, path):
+        # 같은 스크립트가 여러 단계/프로젝트에서 쓰이므로 파일이 바뀌지 않았다면 해시를 재사용한다.
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return "missing"
+        signature = (stat.st_size, stat.st_mtime_ns)
+        cached = self._input_checksums.get(path)
+        if cached is None or cached[0] != signature:
+            cached = (signature, file_checksum(path))
+            self._input_checksums[path] = cached
+        return cached[1]
+
+    def restore(self, key, dest_dir, file_names):
+        entry = self.entries.get(key)
+        if entry is None or set(file_names) - set(entry["files"]):
+            self.misses += 1
+            return None
+
+        entry_dir = os.path.join(self.cache_dir, key)
+        for file_name, meta in entry["files"].items():
+            cached_path = os.path.join(entry_dir, file_name)
+            if not self._is_intact(cached_path, meta):
+                print(f"Artifact cache entry is corrupt, evicting: {key[:12]}")
+                self.evict(key)
+                self.misses += 1
+                return None
+
+        restored = []
+        for file_name in entry["files"]:
+            dest_path = os.path.join(dest_dir, file_name)
+            shutil.copy2(os.path.join(entry_dir, file_name), dest_path)
+            restored.append(dest_path)
+
+        entry["last_used"] = time.time()
+        self.save_index()
+        self.hits += 1
+        return restored
+
+    def _is_intact(self, path, meta):
+        try:
+            if os.path.getsize(path) != meta["size"]:
+                return False
+        except OSError:
+            return False
+        if self.verify:
+            return file_checksum(path) == meta["sha256"]
+        return True
+
+    def store(self, key, paths):
+        entry_dir = os.path.join(self.cache_dir, key)
+        tmp_dir = entry_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        files = {}
+        for path in paths:
+            file_name = os.path.basename(path)
+            shutil.copy2(path, os.path.join(tmp_dir, file_name))
+            files[file_name] = {
+                "size": os.path.getsize(path),
+                "sha256": file_checksum(path),
+            }
+
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(tmp_dir, entry_dir)
+        self.entries[key] = {
+            "files": files,
+            "size": sum(meta["size"] for meta in files.values()),
+            "last_used": time.time(),
+        }
+        self.evict_to_limit()
+        self.save_index()
+
+    def evict(self, key):
+        self.entries.pop(key, None)
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+        self.save_index()
+
+    def evict_to_limit(self):
+        total = self.total_size()
+        # 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+        for key in sorted(self.entries, key=lambda k: self.entries[k]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[key]["size"]
+            self.entries.pop(key)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    def total_size(self):
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def report(self):
+        total = self.hits + self.misses
+        print(
+            f"Artifact cache: {self.hits} hit(s), {self.misses} miss(es) of {total} step(s), "
+            f"{self.total_size() / 1024**2:.1f} MB / {self.max_bytes / 1024**2:.0f} MB used"
+        )
@@ -0,0 +1,232 @@
+import os
+import io
+import json
+import pickle
+import threading
+from collections import OrderedDict, defaultdict
+
+from hwp_placeholders import decode_text
+
+SPILL_EXTENSIONS = {
+    "text": ".txt",
+    "bytes": ".bin",
+    "table": ".json",
+    "image": ".png",
+    "object": ".pkl",
+}
+# 종합 시트에서 읽은 행 목록 (ExcelProcessor 가 넣고 한글 단계가 표로 채운다)
+SUMMARY_TABLE = "summary_table"
+
+
+def create_artifact_store(spill_dir):
+    max_mb = int(os.getenv("ARTIFACT_STORE_MAX_MB", "512"))
+    return ArtifactStore(spill_dir, memory_limit=max_mb * 1024**2)
+
+
+def table_name(name):
+    # "solar_table.txt" 의 글자를 읽은 MidasTable 이름
+    return name + ":table"
+
+
+def format_bytes(amount):
+    for unit in ("B", "KB", "MB"):
+        if amount < 1024:
+            return f"{amount:.0f} {unit}"
+        amount /= 1024
+    return f"{amount:.1f} GB"
+
+
+def detect_kind(payload):
+    if isinstance(payload, str):
+        return "text"
+    if isinstance(payload, (bytes, bytearray)):
+        return "bytes"
+    if isinstance(payload, list) and all(isinstance(row, (list, tuple)) for row in payload):
+        return "table"
+    if hasattr(payload, "save") and hasattr(payload, "mode"):
+        return "image"
+    return "object"
+
+
+def encode_payload(payload, kind):
+    if kind == "text":
+        return payload.encode("utf-8")
+    if kind == "bytes":
+        return bytes(payload)
+    if kind == "table":
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    if kind == "image":
+        output = io.BytesIO()
+        payload.save(output, "PNG")
+        return output.getvalue()
+    return pickle.dumps(payload)
+
+
+def decode_payload(data, kind):
+    if kind == "text":
+        # 외부 프로그램이 쓴 텍스트 파일일 수 있으므로 한글 단계와 같은 기준으로 인코딩을 고른다.
+        return decode_text(data)[0]
+    if kind == "bytes":
+        return data
+    if kind == "table":
+        return json.loads(data.decode("utf-8"))
+    if kind == "image":
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+    return pickle.loads(data)
+
+
+def estimate_size(payload, kind):
+    if kind == "text":
+        return len(payload) * 2
+    if kind == "bytes":
+        return len(payload)
+    if kind == "table":
+        return sum(len(str(value)) + 8 for row in payload for value in row)
+    if kind == "image":
+        return payload.width * payload.height * len(payload.getbands())
+    # MidasTable 처럼 크기를 아는 객체는 pickle 하지 않는다.
+    nbytes = getattr(payload, "nbytes", None)
+    if nbytes is not None:
+        return int(nbytes)
+    return len(pickle.dumps(payload))
+
+
+class Artifact:
+    def __init__(self, name, kind, payload=None, path=None, size=0):
+        self.name = name
+        self.kind = kind
+        self.payload = payload
+        self.path = path
+        self.size = size
+
+    @property
+    def in_memory(self):
+        return self.payload is not None
+
+
+class ArtifactStore:
+    # 단계 사이의 중간 결과를 논리 이름으로 메모리에 보관한다.
+    # 메모리 한도를 넘으면 오래 쓰지 않은 항목부터 디스크로 내린다. put(..., path=...) 은 그 파일에도 바로 써서
+    # (run_journal, artifact_cache 가 보는 temp 파일) 중간에 죽어도 이어서 실행할 수 있게 한다.
+    # 단계별로 메모리에 넣고(put) 꺼내고(get) 디스크에서 읽고(read) 쓰고(written) 내린(spilled) 바이트를 센다.
+    def __init__(self, spill_dir, memory_limit=512 * 1024**2):
+        self.spill_dir = spill_dir
+        self.memory_limit = memory_limit
+        self.entries = OrderedDict()
+        self.memory_used = 0
+        self.lock = threading.RLock()
+        self.stats = defaultdict(lambda: defaultdict(int))
+
+    def put(self, name, payload, kind=None, stage=None, path=None):
+        kind = kind or detect_kind(payload)
+        size = estimate_size(payload, kind)
+        with self.lock:
+            self._remove(name)
+            artifact = Artifact(name, kind, payload=payload, size=size)
+            self.entries[name] = artifact
+            self.memory_used += size
+            self._count(stage, "put", size)
+            if path is not None:
+                self._write(artifact, stage, path)
+            self._spill_to_limit(stage, keep=name)
+        return artifact
+
+    def put_file(self, name, path, kind="bytes", stage=None):
+        # 이미 디스크에 있는 결과물(마이다스가 저장한 그림, 캐시에서 복원한 파일)을 읽지 않고 등록한다.
+        # get 하면 그때 한 번 읽는다.
+        with self.lock:
+            self._remove(name)
+            self.entries[name] = Artifact(name, kind, path=path, size=os.path.getsize(path))
+            self._count(stage, "registered", 0)
+
+    def get(self, name, stage=None, default=None):
+        with self.lock:
+            artifact = self.entries.get(name)
+            if artifact is None:
+                return default
+            self.entries.move_to_end(name)
+            if not artifact.in_memory:
+                self._load(artifact, stage)
+                self._spill_to_limit(stage, keep=name)
+            self._count(stage, "get", artifact.size)
+            return artifact.payload
+
+    def get_path(self, name, stage=None):
+        # COM 등 파일 경로가 필요한 소비자를 위한 경로 (필요할 때만 디스크에 쓴다)
+        with self.lock:
+            artifact = self.entries.get(name)
+            if artifact is None:
+                return None
+            if artifact.path is None:
+                self._write(artifact, stage)
+            return artifact.path
+
+    def kind(self, name):
+        artifact = self.entries.get(name)
+        return artifact.kind if artifact is not None else None
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def discard(self, name):
+        with self.lock:
+            self._remove(name)
+
+    def _remove(self, name):
+        artifact = self.entries.pop(name, None)
+        if artifact is not None and artifact.in_memory:
+            self.memory_used -= artifact.size
+
+    def _spill_path(self, artifact):
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in artifact.name)
+        return os.path.join(self.spill_dir, safe_name + SPILL_EXTENSIONS[artifact.kind])
+
+    def _write(self, artifact, stage, path=None):
+        path = path or self._spill_path(artifact)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = encode_payload(artifact.payload, artifact.kind)
+        with open(path, "wb") as f:
+            f.write(data)
+        artifact.path = path
+        self._count(stage, "written", len(data))
+
+    def _load(self, artifact, stage):
+        with open(artifact.path, "rb") as f:
+            data = f.read()
+        artifact.payload = decode_payload(data, artifact.kind)
+        artifact.size = estimate_size(artifact.payload, artifact.kind)
+        self.memory_used += artifact.size
+        self._count(stage, "read", len(data))
+
+    def _spill_to_limit(self, stage, keep=None):
+        for name in list(self.entries):
+            if self.memory_used <= self.memory_limit:
+                break
+            artifact = self.entries[name]
+            if name == keep or not artifact.in_memory:
+                continue
+            # 바로 쓴 파일이 있으면 다시 쓰지 않고 메모리에서만 내린다.
+            if artifact.path is None:
+                self._write(artifact, stage)
+            artifact.payload = None
+            self.memory_used -= artifact.size
+            self._count(stage, "spilled", artifact.size)
+
+    def _count(self, stage, key, amount):
+        stage_stats = self.stats[stage or "-"]
+        stage_stats[key + "_bytes"] += amount
+        stage_stats[key + "_count"] += 1
+
+    def report(self):
+        print(f"Artifact store: {len(self.entries)} item(s), {self.memory_used / 1024**2:.1f} MB in memory")
+        for stage, stage_stats in self.stats.items():
+            moved = ", ".join(
+                f"{key[:-6]} {format_bytes(stage_stats[key])}"
+                for key in sorted(stage_stats)
+                if key.endswith("_bytes") and stage_stats[key]
+            )
+            print(f"  {stage}: {moved or 'no data moved'}")
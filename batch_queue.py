@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+import traceback
+
+from solar_pipeline import BASE_DIR
+from pipeline_worker import PipelineCancelled
+
+PROJECT_EXTENSIONS = (".mgb", ".mdpb")
+WORKSPACE_ROOT = os.path.join(BASE_DIR, "workspaces")
+
+
+def collect_projects(paths):
+    projects = []
+    for path in paths:
+        path = path.strip('"')
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.lower().endswith(PROJECT_EXTENSIONS):
+                    projects.append(os.path.join(path, file_name))
+        elif os.path.isfile(path):
+            projects.append(path)
+        else:
+            print(f"Project file not found: {path}")
+    # 같은 파일이 여러 번 지정되어도 한 번만 처리
+    return list(dict.fromkeys(os.path.abspath(p) for p in projects))
+
+
+def workspace_name(project_path):
+    stem = os.path.splitext(os.path.basename(project_path))[0]
+    digest = hashlib.sha1(os.path.abspath(project_path).encode("utf-8")).hexdigest()
+    return f"{stem[:60]}-{digest[:8]}"
+
+
+class BatchQueue:
+    # 여러 프로젝트 파일을 순서대로 처리한다. 파이프라인(마이다스 창 관리자, 아티팩트 캐시,
+    # 스크립트 해시)은 프로젝트 사이에 그대로 재사용된다.
+    # 각 프로젝트는 자기 작업 공간을 temp 폴더로 써서 출력물이 섞이지 않고, 중단된 프로젝트는
+    # 그 작업 공간의 실행 기록으로 이어서 실행한다. 마이다스는 실패했을 때와 일괄 처리가 끝날 때만 닫는다.
+    def __init__(self, pipeline, step_names=None, workspace_root=WORKSPACE_ROOT):
+        self.pipeline = pipeline
+        self.step_names = step_names
+        self.workspace_root = workspace_root
+        self.results = []
+
+    def get_workspace(self, project_path):
+        return os.path.join(self.workspace_root, workspace_name(project_path))
+
+    def run_project(self, project_path):
+        workspace = self.get_workspace(project_path)
+        started = time.time()
+        error = None
+        os.makedirs(workspace, exist_ok=True)
+        self.pipeline.temp_dir = workspace
+        self.pipeline.emit("project_started", project=project_path)
+        try:
+            self.pipeline.run(project_path, self.step_names)
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"Project failed: {project_path}")
+            print(traceback.format_exc())
+            # 마이다스가 어떤 상태인지 모르므로 다음 프로젝트는 새로 연다.
+            self.close_midas()
+
+        result = {
+            "project": project_path,
+            "workspace": workspace,
+            "elapsed": time.time() - started,
+            "error": error,
+        }
+        self.results.append(result)
+        self.pipeline.emit("project_finished", **result)
+        return result
+
+    def close_midas(self):
+        try:
+            self.pipeline.close()
+        except Exception as e:
+            print(f"Failed to close Midas Gen: {e}")
+
+    def run(self, projects, on_project_done=None):
+        self.results = []
+        started = time.time()
+        temp_dir = self.pipeline.temp_dir
+        try:
+            for index, project_path in enumerate(projects, start=1):
+                print(f"[{index}/{len(projects)}] {project_path}")
+                result = self.run_project(project_path)
+                if on_project_done:
+                    on_project_done(result)
+        finally:
+            self.close_midas()
+            self.pipeline.temp_dir = temp_dir
+            self.report(time.time() - started)
+        return self.results
+
+    def report(self, elapsed):
+        succeeded = [r for r in self.results if r["error"] is None]
+        failed = [r for r in self.results if r["error"] is not None]
+        per_hour = len(self.results) / elapsed * 3600 if elapsed > 0 else 0.0
+        print(
+            f"Batch finished: {len(succeeded)} succeeded, {len(failed)} failed "
+            f"in {elapsed / 60:.1f} min ({per_hour:.1f} projects/hour)"
+        )
+        for result in failed:
+            print(f"  FAILED {result['project']}: {result['error']}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Process many MIDAS project files unattended.")
+    parser.add_argument("paths", nargs="+", help="Project files (.mgb/.mdpb) or folders containing them")
+    parser.add_argument("--steps", help="Comma separated step names (default: all steps)")
+    parser.add_argument("--json-dir", default="json_scripts", help="Directory with the step json scripts")
+    parser.add_argument("--workspace-root", default=WORKSPACE_ROOT, help="Directory for per-project outputs")
+    return parser.parse_args()
+
+
+def main():
+    from dotenv import load_dotenv
+    from midas_window import MidasWindowManager
+    from solar_pipeline import SolarPipeline
+
+    args = parse_arguments()
+    load_dotenv()
+
+    projects = collect_projects(args.paths)
+    if not projects:
+        print("No project files found.")
+        return 1
+
+    step_names = [s.strip() for s in args.steps.split(",")] if args.steps else None
+    pipeline = SolarPipeline(MidasWindowManager(), args.json_dir)
+    pipeline.select_steps(step_names)  # 잘못된 단계 이름은 시작 전에 확인
+
+    queue = BatchQueue(pipeline, step_names, args.workspace_root)
+    results = queue.run(projects)
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    sys.exit(main())
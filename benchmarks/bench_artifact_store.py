@@ -0,0 +1,173 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+
+from artifact_store import SUMMARY_TABLE, ArtifactStore, table_name
+from bench_streaming_inputs import sheet_cells, write_export
+from excel import ExcelProcessor
+from fake_hwp import FakeTableHwp, fake_clipboard
+from hwp_service import HwpDocumentService
+from midas_table import parse_text
+
+# SolarPipeline.EXCEL_INPUTS 와 같은 이름
+INPUTS = ["solar_steel_code_check.txt", "solar_cold_formed_steel_code_check.txt", "solar_table.txt"]
+
+
+def capture(store, path, stage):
+    # SolarPipeline.store_text 와 같다: 복사한 글자를 temp 파일에 바로 쓰고 MidasTable 로 읽어 둔다.
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8")
+    store.put(os.path.basename(path), text, stage=stage, path=path)
+    store.put(table_name(os.path.basename(path)), parse_text(text, header_rows=0), stage=stage)
+
+
+def fill_workbook(processor, paths):
+    wb = openpyxl.Workbook()
+    code_sheet = wb.active
+    code_sheet.title = "code"
+    section_sheet = wb.create_sheet("section")
+    processor.process_data1_and_data2(paths[0], processor.modify_data2(paths[1]), code_sheet)
+    processor.process_data3(paths[2], section_sheet)
+    return wb
+
+
+def check_store(directory):
+    store = ArtifactStore(os.path.join(directory, "spill"), memory_limit=64 * 1024)
+    text_path = os.path.join(directory, "copied.txt")
+    store.put("copied.txt", "부재\tPu\r\nC1\t12.5\r\n", stage="copy", path=text_path)
+    with open(text_path, "rb") as f:
+        assert f.read() == "부재\tPu\r\nC1\t12.5\r\n".encode("utf-8")
+    assert store.get("copied.txt", stage="excel") == "부재\tPu\r\nC1\t12.5\r\n"
+    assert store.stats["excel"]["read_bytes"] == 0
+    print("  ok: put writes through to the temp file, get is served from memory")
+
+    blobs = {f"blob{i}": bytes([i]) * 30000 for i in range(4)}
+    for name, blob in blobs.items():
+        store.put(name, blob, stage="images")
+    assert store.memory_used <= store.memory_limit
+    assert not store.entries["blob0"].in_memory and store.entries["blob3"].in_memory
+    assert store.get("blob0", stage="hwp") == blobs["blob0"] and store.stats["hwp"]["read_bytes"] == 30000
+    assert store.stats["images"]["spilled_bytes"] >= 60000 and store.memory_used <= store.memory_limit
+
+    store = ArtifactStore(os.path.join(directory, "spill"), memory_limit=50000)
+    store.put("big.txt", "가" * 20000, stage="copy", path=os.path.join(directory, "big.txt"))
+    store.put("blob", bytes(30000), stage="images")
+    assert not store.entries["big.txt"].in_memory and store.stats["images"]["spilled_bytes"] == 40000
+    assert store.stats["copy"]["written_bytes"] == 60000 and store.stats["images"]["written_bytes"] == 0
+    assert store.get("big.txt", stage="hwp") == "가" * 20000
+    print("  ok: least recently used entries spill under the memory limit and load back on get; written-through ones are not written again")
+
+    cp949 = os.path.join(directory, "cp949.txt")
+    with open(cp949, "wb") as f:
+        f.write("현장 주소".encode("cp949"))
+    store.put_file("cp949.txt", cp949, kind="text", stage="cache")
+    assert store.stats["cache"]["read_bytes"] == 0 and not store.entries["cp949.txt"].in_memory
+    assert store.get("cp949.txt", stage="hwp") == "현장 주소"
+    print("  ok: files restored from the cache are registered without reading, decoded like the HWP stage")
+
+
+def check_excel(directory, store):
+    # 저장소의 MidasTable 로 채운 시트가 파일을 읽어 채운 시트와 같아야 한다.
+    paths = [os.path.join(directory, name) for name in INPUTS]
+    for index, path in enumerate(paths):
+        write_export(path, 200000, seed=index + 1, edge_cases=True)
+    old = fill_workbook(ExcelProcessor("unused.xlsm", "unused.xlsx"), paths)
+    for path in paths:
+        capture(store, path, "copy")
+    moved = {name: os.path.join(directory, "moved_" + name) for name in INPUTS}
+    for path in paths:
+        os.replace(path, moved[os.path.basename(path)])
+    try:
+        new = fill_workbook(ExcelProcessor("unused.xlsm", "unused.xlsx", store=store), paths)
+    finally:
+        for path in paths:
+            os.replace(moved[os.path.basename(path)], path)
+    for name in ["code", "section"]:
+        assert sheet_cells(old[name]) == sheet_cells(new[name]), f"{name}: sheet cells differ"
+    assert store.stats["excel"]["read_bytes"] == 0 and store.stats["excel"]["get_count"] == 3
+    print(f"  ok: ExcelProcessor fills the same sheets from the store without the temp files ({len(new['code']._cells)} cells)")
+
+
+def check_report(directory, store):
+    # 한글 단계: 글자는 저장소에서, 종합 표는 SUMMARY_TABLE 에서 채운다.
+    template = os.path.join(directory, "report.hwp")
+    with open(template, "w", encoding="utf-8") as f:
+        f.write("검토 결과\n{{표}}")
+    summary = [["C1", "□-100x100x3.2", "OK"], ["C2", "□-125x125x3.2", "NG"], ["C3", "", "OK"]]
+    store.put(SUMMARY_TABLE, summary, stage="excel")
+    table_path = os.path.join(directory, "solar_table.txt")
+    expected = store.get("solar_table.txt").strip()[:40]
+    hwp = FakeTableHwp("", [["부재", "단면", "판정"], ["{{종합}}", "", ""]])
+    service = HwpDocumentService(dispatch=lambda: hwp, clipboard=fake_clipboard, store=store)
+    output = os.path.join(directory, "report_수정완료.hwp")
+    moved = os.path.join(directory, "moved_solar_table.txt")
+    os.replace(table_path, moved)
+    try:
+        result = service.run_job({
+            "template": template,
+            "replacements": {"{{표}}": table_path},
+            "outputs": [output],
+            "tables": {"{{종합}}": SUMMARY_TABLE},
+        })
+    finally:
+        os.replace(moved, table_path)
+    assert result["ok"] and not result["missing"], result
+    assert result["counts"] == {"{{표}}": 1, "{{종합}}": 8}, result["counts"]
+    with open(output, "r", encoding="utf-8") as f:
+        saved = f.read()
+    assert expected in saved and "{{" not in saved
+    assert saved.endswith("부재\t단면\t판정\nC1\t□-100x100x3.2\tOK\nC2\t□-125x125x3.2\tNG\nC3\t\tOK"), saved[-120:]
+    assert store.stats["hwp"]["read_bytes"] == 0 and store.stats["hwp"]["get_count"] == 2
+
+    missing = service.run_job({"template": template, "replacements": {}, "outputs": [output], "tables": {"{{종합}}": "없는 표"}})
+    assert missing["ok"] and missing["missing"] == ["없는 표"], missing
+    print("  ok: the HWP service fills texts and the summary table from the store without the temp files")
+
+
+def check(directory):
+    check_store(directory)
+    store = ArtifactStore(os.path.join(directory, "store"))
+    check_excel(directory, store)
+    check_report(directory, store)
+    store.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Artifact store benchmark (MIDAS copy -> Excel inputs)")
+    parser.add_argument("--size-mb", type=float, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check(directory)
+
+        paths = [os.path.join(directory, name) for name in INPUTS]
+        for index, path in enumerate(paths):
+            write_export(path, int(args.size_mb * 2**20 / len(paths)), seed=index + 1)
+        print(f"{args.size_mb:.0f} MB of MIDAS copies, Excel input sheets only")
+
+        started = time.perf_counter()
+        fill_workbook(ExcelProcessor("unused.xlsm", "unused.xlsx"), paths)
+        old = time.perf_counter() - started
+
+        store = ArtifactStore(os.path.join(directory, "store"))
+        started = time.perf_counter()
+        for path in paths:
+            capture(store, path, "copy")
+        copied = time.perf_counter() - started
+        started = time.perf_counter()
+        fill_workbook(ExcelProcessor("unused.xlsm", "unused.xlsx", store=store), paths)
+        new = time.perf_counter() - started
+        print(f"  temp files re-read by excel : {old:7.2f} s")
+        print(f"  MidasTable from the store   : {new:7.2f} s (+{copied:.2f} s parsing at copy time)")
+        store.report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+import hwp_placeholders
+from hwp_placeholders import load_contents, read_file_content
+from replacement_manifest import ManifestError, load_manifest
+
+OPENS = []
+LOCK = threading.Lock()
+
+
+def counting_open(latency):
+    # 파일을 열 때마다 세고, latency 초를 기다려 네트워크 드라이브를 흉내 낸다.
+    def slow_open(file, *args, **kwargs):
+        with LOCK:
+            OPENS.append(file)
+        time.sleep(latency)
+        return open(file, *args, **kwargs)
+    return slow_open
+
+
+def old_read_file_content(file_path, open=open):
+    # 기존 hangle.read_file_content (출력만 뺐다): UTF-8 로 실패하면 EUC-KR 로 한 번 더 연다.
+    file_path = file_path.strip('"')
+    if not os.path.exists(file_path):
+        return None, None
+    _, ext = os.path.splitext(file_path)
+    if ext.lower() == ".txt":
+        try:
+            with open(file_path, "r", encoding="utf-8") as file:
+                content = file.read().strip()
+                if "년월" in file_path:
+                    content = content.replace("년 ", ".").replace("월", "")
+                return content, "text"
+        except UnicodeDecodeError:
+            try:
+                with open(file_path, "r", encoding="euc-kr") as file:
+                    content = file.read().strip()
+                    if "년월" in file_path:
+                        content = content.replace("년 ", ".").replace("월", "")
+                    return content, "text"
+            except Exception:
+                return None, None
+    elif ext.lower() in [".png", ".jpg", ".jpeg", ".bmp", ".gif"]:
+        return file_path, "image"
+    elif ext.lower() == ".emf":
+        return file_path, "emf"
+    else:
+        return None, None
+
+
+def old_load_contents(replacements, open=open):
+    contents = {}
+    for search_text, file_path in replacements:
+        content, content_type = old_read_file_content(file_path, open)
+        if content is not None:
+            contents.setdefault(search_text.strip('"'), (content, content_type))
+    return contents
+
+
+def write(path, text, encoding="utf-8", newline=None):
+    with open(path, "w", encoding=encoding, newline=newline) as f:
+        f.write(text)
+    return path
+
+
+def make_replacements(directory, count, seed):
+    # 보고서 자리표시자: 대부분 짧은 글자 파일 (UTF-8 과 메모장 ANSI 저장이 섞임), 일부 그림
+    rng = random.Random(seed)
+    image = os.path.join(directory, "capture.png")
+    Image.new("RGB", (32, 32), "white").save(image)
+    replacements = []
+    for index in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            path = image
+        elif kind < 0.1:
+            path = write(os.path.join(directory, f"{index}_년월.txt"), f"2024년 {index % 12 + 1:02d}월")
+        elif kind < 0.4:
+            path = write(os.path.join(directory, f"{index}.txt"), f"부재 검토 {index}\r\n결과: 만족", "euc-kr", "")
+        else:
+            path = write(os.path.join(directory, f"{index}.txt"), f"값 {index} kN·m")
+        replacements.append((f"{{{{항목{index}}}}}", path))
+    return replacements
+
+
+def check(directory):
+    cases = {
+        "utf8": write(os.path.join(directory, "utf8.txt"), "  하중 조합 LCB1 \n"),
+        "euc-kr": write(os.path.join(directory, "euckr.txt"), "부재 검토\r\n결과: 만족", "euc-kr", ""),
+        "년월 utf-8": write(os.path.join(directory, "작성_년월.txt"), "2024년 05월"),
+        "년월 euc-kr": write(os.path.join(directory, "검토_년월.txt"), "2023년 11월", "euc-kr"),
+        "crlf": write(os.path.join(directory, "crlf.txt"), "첫 줄\r\n둘째 줄\r\n", newline=""),
+        "image": os.path.join(directory, "capture.png"),
+        "emf": write(os.path.join(directory, "check.emf"), "x"),
+        "missing": os.path.join(directory, "없음.txt"),
+        "unsupported": write(os.path.join(directory, "table.csv"), "a,b"),
+    }
+    Image.new("RGB", (8, 8)).save(cases["image"])
+    for name, path in cases.items():
+        assert read_file_content(path) == old_read_file_content(path), name
+    print(f"  ok: same results as the old reader ({', '.join(cases)})")
+
+    bom = write(os.path.join(directory, "bom.txt"), "﻿설계 기준", "utf-8")
+    cp949 = write(os.path.join(directory, "cp949.txt"), "똠방각하 검토", "cp949")
+    assert old_read_file_content(bom)[0] == "﻿설계 기준" and read_file_content(bom)[0] == "설계 기준"
+    assert old_read_file_content(cp949) == (None, None) and read_file_content(cp949)[0] == "똠방각하 검토"
+    print("  ok: a UTF-8 BOM is dropped, CP949-only Hangul no longer fails")
+
+    del OPENS[:]
+    hwp_placeholders.open = counting_open(0)
+    try:
+        contents, sources = load_contents([("{{a}}", cases["euc-kr"]), ("{{b}}", cases["euc-kr"]), ("{{a}}", cases["utf8"]), ('"{{c}}"', cases["missing"])])
+    finally:
+        del hwp_placeholders.open
+    assert sorted(OPENS) == sorted([cases["euc-kr"], cases["utf8"]]), OPENS
+    assert contents == {"{{a}}": ("부재 검토\n결과: 만족", "text"), "{{b}}": ("부재 검토\n결과: 만족", "text")}
+    assert sources == {"{{a}}": cases["euc-kr"], "{{b}}": cases["euc-kr"]}
+    print("  ok: a file used by several placeholders is opened once, the first entry for a placeholder wins")
+
+    json_path = os.path.join(directory, "job.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump({"template": "보고서.hwp", "replacements": {"{{날짜}}": "작성_년월.txt", "{{그림}}": cases["image"]}, "outputs": ["out/보고서.pdf"]}, f, ensure_ascii=False)
+    manifest = load_manifest(json_path)
+    assert manifest["template"] == os.path.join(directory, "보고서.hwp")
+    assert manifest["replacements"] == [("{{날짜}}", cases["년월 utf-8"]), ("{{그림}}", cases["image"])]
+    assert manifest["outputs"] == [os.path.join(directory, "out", "보고서.pdf")]
+    toml_path = write(os.path.join(directory, "job.toml"), '[[replacements]]\nplaceholder = "{{날짜}}"\nfile = "작성_년월.txt"\n\n[[replacements]]\nplaceholder = "{{날짜}}"\nfile = "utf8.txt"\n')
+    manifest = load_manifest(toml_path)
+    assert manifest["template"] is None and manifest["outputs"] == []
+    assert manifest["replacements"] == [("{{날짜}}", cases["년월 utf-8"]), ("{{날짜}}", cases["utf8"])]
+    pairs = write(os.path.join(directory, "pairs.json"), '{"replacements": [["{{a}}", "utf8.txt"]]}')
+    assert load_manifest(pairs)["replacements"] == [("{{a}}", cases["utf8"])]
+    for text in ['{"replacements": [{"file": "a.txt"}]}', "{not json"]:
+        try:
+            load_manifest(write(os.path.join(directory, "bad.json"), text))
+            raise AssertionError(f"accepted {text}")
+        except ManifestError:
+            pass
+    print("  ok: JSON and TOML manifests resolve paths against the manifest folder, bad ones raise ManifestError")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replacement content loading benchmark")
+    parser.add_argument("--replacements", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, nargs="+", default=[0, 5], help="delay per file open (network drive)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        replacements = make_replacements(directory, args.replacements, seed=1)
+        print(f"{args.replacements} replacements, {os.cpu_count()} CPU(s)")
+        for latency in args.latency_ms:
+            del OPENS[:]
+            started = time.perf_counter()
+            old = old_load_contents(replacements, counting_open(latency / 1000))
+            old_time = time.perf_counter() - started
+            old_opens = len(OPENS)
+
+            del OPENS[:]
+            hwp_placeholders.open = counting_open(latency / 1000)
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    started = time.perf_counter()
+                    new, _ = load_contents(replacements)
+                    new_time = time.perf_counter() - started
+            finally:
+                del hwp_placeholders.open
+            assert new == old
+            print(f"  {latency:4.1f} ms per open: sequential {old_time * 1000:8.1f} ms ({old_opens} opens), "
+                  f"concurrent {new_time * 1000:8.1f} ms ({len(OPENS)} opens)")
+
+
+if __name__ == "__main__":
+    main()
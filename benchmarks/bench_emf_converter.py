@@ -0,0 +1,184 @@
+import os
+import sys
+import time
+import random
+import shutil
+import struct
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageChops, ImageDraw, ImageFile, WmfImagePlugin
+
+from emf_converter import EmfConverter, collect_metafiles, parse_size
+
+EMR_HEADER = 1
+EMR_POLYLINE16 = 87
+EMR_EOF = 14
+
+
+def old_convert_emf_to_png(emf_path):
+    # 기존 hangle.convert_emf_to_png: 붙여넣을 때마다 옆에 PNG 를 새로 쓴다.
+    image = Image.open(emf_path)
+    png_path = emf_path.replace('.emf', '.png')
+    image.save(png_path)
+    return png_path
+
+
+class PolylineHandler(ImageFile.StubHandler):
+    # Windows 가 아니면 PIL 에 EMF 렌더러(GDI)가 없다. 이 벤치마크가 만드는 EMF 의 EMR_POLYLINE16
+    # 레코드만 그려서, 출력 크기(dpi)에 비례하는 렌더링 비용과 결과 그림을 흉내 낸다.
+    def open(self, im):
+        self.bbox = im.info["wmf_bbox"]
+
+    def load(self, im):
+        im.fp.seek(0)
+        data = im.fp.read()
+        x0, y0, x1, y1 = self.bbox
+        scale_x = im.size[0] / max(x1 - x0, 1)
+        scale_y = im.size[1] / max(y1 - y0, 1)
+        image = Image.new("RGB", im.size, "white")
+        draw = ImageDraw.Draw(image)
+        offset = struct.unpack_from("<I", data, 4)[0]
+        while offset + 8 <= len(data):
+            kind, size = struct.unpack_from("<II", data, offset)
+            if kind == EMR_POLYLINE16:
+                count = struct.unpack_from("<I", data, offset + 24)[0]
+                points = struct.unpack_from(f"<{count * 2}h", data, offset + 28)
+                draw.line([((x - x0) * scale_x, (y - y0) * scale_y) for x, y in zip(points[::2], points[1::2])], fill="black", width=2)
+            if kind == EMR_EOF or size == 0:
+                break
+            offset += size
+        return image
+
+
+def write_emf(path, width, height, lines, seed):
+    # 코드 체크 그림처럼 선이 많은 EMF: 헤더 + EMR_POLYLINE16 레코드 + EOF
+    rng = random.Random(seed)
+    records = []
+    for _ in range(lines):
+        count = rng.randint(2, 12)
+        points = [value for _ in range(count) for value in (rng.randint(0, width), rng.randint(0, height))]
+        body = struct.pack("<4iI", 0, 0, width, height, count) + struct.pack(f"<{count * 2}h", *points)
+        records.append(struct.pack("<II", EMR_POLYLINE16, 8 + len(body)) + body)
+    records.append(struct.pack("<IIIII", EMR_EOF, 20, 0, 16, 20))
+    # 96 DPI 화면 기준 frame (0.01 mm)
+    frame = (0, 0, width * 2540 // 96, height * 2540 // 96)
+    total = 88 + sum(len(record) for record in records)
+    header = struct.pack(
+        "<II4i4i4sIIIHHIIIiiii",
+        EMR_HEADER, 88, 0, 0, width, height, *frame, b" EMF", 0x10000, total, len(records) + 1, 1, 0,
+        0, 0, 0, 1920, 1080, 508, 286,
+    )
+    with open(path, "wb") as f:
+        f.write(header + b"".join(records))
+
+
+def make_run(directory, count, lines, seed):
+    # MIDAS 코드 체크 그림(100.emf, 201.emf ...)이 담긴 실행 폴더
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    for index in range(count):
+        width, height = rng.choice([(1200, 900), (1600, 1000), (1000, 1400)])
+        write_emf(os.path.join(directory, f"{100 + index}.emf"), width, height, lines, seed * 1000 + index)
+    return collect_metafiles([directory])
+
+
+def same_pixels(first, second):
+    with Image.open(first) as a, Image.open(second) as b:
+        return a.size == b.size and ImageChops.difference(a.convert("RGB"), b.convert("RGB")).getbbox() is None
+
+
+def check(directory):
+    paths = make_run(os.path.join(directory, "run"), 3, 50, seed=1)
+    cache_dir = os.path.join(directory, "cache")
+    converter = EmfConverter(cache_dir, workers=2)
+    results = converter.convert_all(paths)
+    assert all(results.values()) and converter.misses == 3
+    for path in paths:
+        copy = os.path.join(directory, "old_" + os.path.basename(path))
+        shutil.copy(path, copy)
+        assert same_pixels(results[path], old_convert_emf_to_png(copy)), path
+    print("  ok: default output matches the old per-paste conversion")
+
+    again = EmfConverter(cache_dir)
+    moved = os.path.join(directory, "moved.emf")
+    shutil.copy(paths[0], moved)
+    assert again.convert_all(paths + [moved])[moved] == results[paths[0]] and again.hits == 4 and again.misses == 0
+    print("  ok: reruns and identical content elsewhere hit the content-hash cache")
+
+    with Image.open(paths[0]) as image:
+        native = image.size
+    high = EmfConverter(cache_dir, dpi=192).convert(paths[0])
+    boxed = EmfConverter(cache_dir, dpi=192, size=(800, 800)).convert(paths[0])
+    with Image.open(high) as image:
+        # frame 이 0.01 mm 정수라 PIL 이 계산한 dpi 에 반올림 오차가 있다.
+        assert all(abs(got - 2 * want) <= 1 for got, want in zip(image.size, native)), (image.size, native)
+    with Image.open(boxed) as image:
+        assert max(image.size) == 800 and abs(image.size[0] / image.size[1] - native[0] / native[1]) < 0.01
+    print("  ok: dpi and maximum size give separate cache entries")
+
+    broken = os.path.join(directory, "broken.emf")
+    with open(broken, "wb") as f:
+        f.write(b"not a metafile")
+    write_emf(paths[1], 500, 400, 10, seed=99)
+    results = EmfConverter(cache_dir, workers=2).convert_all([broken, paths[1]])
+    assert results[broken] is None and results[paths[1]] and not os.path.exists(results[paths[1]] + ".tmp")
+    print("  ok: changed content is converted again, a broken file does not stop the batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EMF rasterisation benchmark")
+    parser.add_argument("--folder", help="Folder of real MIDAS EMF exports (default: generated)")
+    parser.add_argument("--files", type=int, default=12)
+    parser.add_argument("--lines", type=int, default=3000, help="polylines per generated EMF")
+    parser.add_argument("--runs", type=int, default=3, help="report runs that paste every EMF")
+    parser.add_argument("--dpi", type=float)
+    parser.add_argument("--size", type=parse_size)
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    renderer = "Windows GDI"
+    if not hasattr(Image.core, "drawwmf"):
+        WmfImagePlugin.register_handler(PolylineHandler())
+        renderer = "synthetic polyline renderer (no GDI on this platform)"
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check(os.path.join(directory, "check"))
+
+        if args.folder:
+            paths = collect_metafiles([args.folder])
+        else:
+            paths = make_run(os.path.join(directory, "exports"), args.files, args.lines, seed=2)
+        work = os.path.join(directory, "old")
+        os.makedirs(work)
+        copies = []
+        for path in paths:
+            copies.append(os.path.join(work, os.path.basename(path)))
+            shutil.copy(path, copies[-1])
+        size = sum(os.path.getsize(path) for path in paths) / 2**20
+        print(f"{len(paths)} EMF files ({size:.1f} MB), {args.runs} runs, {os.cpu_count()} CPU(s), {renderer}")
+
+        started = time.perf_counter()
+        for _ in range(args.runs):
+            for path in copies:
+                old_convert_emf_to_png(path)
+        old = time.perf_counter() - started
+
+        cache_dir = os.path.join(directory, "cache")
+        timings = []
+        for _ in range(args.runs):
+            converter = EmfConverter(cache_dir, args.dpi, args.size, args.workers)
+            started = time.perf_counter()
+            converter.convert_all(paths)
+            timings.append((time.perf_counter() - started, converter.hits, converter.misses))
+
+        print(f"  convert at every paste (sequential): {old:7.2f} s for {args.runs} runs")
+        for index, (elapsed, hits, misses) in enumerate(timings):
+            print(f"  EmfConverter run {index + 1}               : {elapsed:7.2f} s ({misses} converted, {hits} cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import functools
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_hwp import CRASH, FakeHwp, fake_clipboard, fake_dispatch
+from export_queue import ExportError, ExportQueue
+from hwp_placeholders import PlaceholderEngine
+from hwp_service import HwpDocumentService, serve, stop_service, submit_job
+
+AUTHKEY = b"bench"
+
+
+def make_templates(directory, count):
+    value = os.path.join(directory, "value.txt")
+    with open(value, "w", encoding="utf-8") as f:
+        f.write("2024.05")
+    templates = []
+    for index in range(count):
+        path = os.path.join(directory, f"report_{index}.hwp")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"보고서 {index} {{{{날짜}}}}")
+        templates.append(path)
+    return templates, {"{{날짜}}": value}
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def outputs_for(directory, name):
+    return [os.path.join(directory, name + ".hwp"), os.path.join(directory, name + ".pdf")]
+
+
+def old_save_as_hwp_and_pdf(hwp, outputs):
+    # 기존 hangle.save_as_hwp_and_pdf / HWPyControl.save_hwp + save_pdf: 호출한 쪽에서 차례로 저장
+    hwp.SaveAs(outputs[0], "HWP", "")
+    hwp.SaveAs(outputs[1], "PDF")
+
+
+def check(directory):
+    save_seconds = {"HWP": 0.02, "PDF": 0.2}
+    dispatches = []
+
+    def dispatch():
+        dispatches.append(threading.current_thread().name)
+        return fake_dispatch(save_seconds=save_seconds)
+
+    exports = ExportQueue(workers=2, dispatch=dispatch)
+    caller = FakeHwp("보고서 {{날짜}}")
+    PlaceholderEngine(caller).fill({"{{날짜}}": ("2024.05", "text")})
+    started = time.perf_counter()
+    future = exports.submit_document(caller, outputs_for(directory, "first"))
+    handed_over = time.perf_counter() - started
+    assert handed_over < 0.1 and not future.done(), handed_over
+    result = future.result(5)
+    assert read(result["outputs"][0]) == "HWP\n보고서 2024.05" and read(result["outputs"][1]) == "PDF\n보고서 2024.05"
+    assert os.listdir(exports.staging_dir) == []
+    print(f"  ok: the caller hands a document over in {handed_over * 1000:.0f} ms, the future reports both outputs")
+
+    try:
+        exports.submit_document(caller, [os.path.join(directory, "out.docx")])
+        raise AssertionError("unsupported format accepted")
+    except ValueError:
+        pass
+
+    crash = os.path.join(directory, f"{CRASH}.hwp")
+    with open(crash, "w", encoding="utf-8") as f:
+        f.write("x")
+    failed = exports.submit(crash, outputs_for(directory, "crash"))
+    try:
+        failed.result(5)
+        raise AssertionError("crash not reported")
+    except ExportError as e:
+        assert "RPC" in str(e)
+    started = time.perf_counter()
+    futures = [exports.submit_document(caller, outputs_for(directory, f"doc_{index}")) for index in range(6)]
+    depth = exports.metrics()["depth"]
+    for future in futures:
+        assert future.result(5)["outputs"]
+        # 끝난 Future 의 staging 사본은 이미 지워져 있다.
+        assert os.path.basename(future.result()["source"]) not in os.listdir(exports.staging_dir)
+    elapsed = time.perf_counter() - started
+    assert depth >= 3 and elapsed < 6 * 0.2, (depth, elapsed)
+    print(f"  ok: two workers export in parallel ({elapsed:.2f} s for 6 x 0.2 s), queue depth was {depth}")
+
+    exports.close()
+    metrics = exports.metrics()
+    assert metrics["submitted"] == 8 and metrics["completed"] == 7 and metrics["failed"] == 1, metrics
+    assert metrics["depth"] == 0 and metrics["active"] == 0 and metrics["export_mean"] >= 0.2
+    assert len(dispatches) == 3 and exports.staging_dir is None, dispatches
+    print("  ok: a failed export restarts that worker's HWP, metrics count every job, close() cleans up")
+
+    templates, replacements = make_templates(directory, 2)
+    exports = ExportQueue(workers=1, dispatch=functools.partial(fake_dispatch, save_seconds=save_seconds))
+    service = HwpDocumentService(fake_dispatch, fake_clipboard, exports=exports)
+    # 포트 0 은 Listener 가 고른 주소를 알 수 없으므로 빈 포트를 먼저 찾는다.
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        address = s.getsockname()
+    ready = threading.Event()
+    thread = threading.Thread(target=serve, args=(address, AUTHKEY, service, ready), daemon=True)
+    thread.start()
+    ready.wait(5)
+    try:
+        results = [submit_job({"template": path, "replacements": replacements, "outputs": outputs_for(directory, f"svc_{index}")}, address, AUTHKEY) for index, path in enumerate(templates)]
+    finally:
+        stop_service(address, AUTHKEY)
+        thread.join(10)
+    assert all(result["ok"] and len(result["outputs"]) == 2 for result in results), results
+    assert all("export" in result["timings"] for result in results)
+    assert read(results[1]["outputs"][1]) == "PDF\n보고서 1 2024.05"
+    print("  ok: the document service hands saving to the export queue and reports export timings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background HWP/PDF export benchmark (fake COM server)")
+    parser.add_argument("--documents", type=int, default=12)
+    parser.add_argument("--fill", type=float, default=0.3, help="seconds the caller spends filling each document")
+    parser.add_argument("--hwp-save", type=float, default=0.1)
+    parser.add_argument("--pdf-save", type=float, default=0.6)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2])
+    args = parser.parse_args()
+    save_seconds = {"HWP": args.hwp_save, "PDF": args.pdf_save}
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        templates, _ = make_templates(directory, args.documents)
+        print(f"{args.documents} documents, fill {args.fill:.2f} s, HWP save {args.hwp_save:.2f} s, PDF export {args.pdf_save:.2f} s")
+
+        caller = fake_dispatch(save_seconds=save_seconds)
+        started = time.perf_counter()
+        for index, path in enumerate(templates):
+            caller.Open(path)
+            time.sleep(args.fill)
+            old_save_as_hwp_and_pdf(caller, outputs_for(directory, f"old_{index}"))
+            caller.Clear(1)
+        old = time.perf_counter() - started
+        print(f"  save in the caller       : {old:6.2f} s total, caller busy {old / args.documents:.2f} s/doc")
+
+        for workers in args.workers:
+            exports = ExportQueue(workers, functools.partial(fake_dispatch, save_seconds=save_seconds))
+            exports.start()
+            started = time.perf_counter()
+            futures = []
+            depths = []
+            for index, path in enumerate(templates):
+                caller.Open(path)
+                time.sleep(args.fill)
+                futures.append(exports.submit_document(caller, outputs_for(directory, f"new_{workers}_{index}")))
+                caller.Clear(1)
+                depths.append(exports.metrics()["depth"])
+            busy = time.perf_counter() - started
+            for future in futures:
+                future.result()
+            total = time.perf_counter() - started
+            metrics = exports.metrics()
+            exports.close()
+            print(
+                f"  ExportQueue, {workers} worker(s) : {total:6.2f} s total, caller busy {busy / args.documents:.2f} s/doc, "
+                f"max depth {max(depths)}, wait {metrics['wait_mean']:.2f} s (max {metrics['wait_max']:.2f}), "
+                f"export {metrics['export_mean']:.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import os
+import sys
+import time
+import io
+import random
+import argparse
+import tempfile
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+
+from excel import ExcelProcessor
+from formula_engine import FormulaEngine, UnsupportedFormula
+
+SUMMARY_COLUMNS = (1, 2, 3, 8)
+
+# (수식, 기대값) - Excel 에서 확인한 결과
+FORMULA_CASES = [
+    ("=1+2*3", 7),
+    ("=-2^2", 4),
+    ("=2^3^2", 64),
+    ("=50%*4", 2),
+    ('="a"&1.5&TRUE', "a1.5TRUE"),
+    ("=ROUND(2.675,2)", 2.68),
+    ("=ROUND(-2.5,0)", -3),
+    ("=ROUNDUP(1.21,1)", 1.3),
+    ("=ROUNDDOWN(-1.29,1)", -1.2),
+    ("=MOD(-7,3)", 2),
+    ("=INT(-1.5)", -2),
+    ("=1/0", "#DIV/0!"),
+    ('=IFERROR(1/0,"x")', "x"),
+    ('=IFNA(NA(),"na")', "na"),
+    ('=IF(A2>1,"big","small")', "big"),
+    ("=IF(FALSE,1)", False),
+    ('=IF(A5="","blank","full")', "blank"),
+    ("=A5", 0),
+    ("=SUM(A1:A4)", 10),
+    ("=SUM(A1:B4)", 10),
+    ("=AVERAGE(A1:A4)", 2.5),
+    ("=MAX(A1:A4,7)", 7),
+    ("=COUNT(A1:B4)", 4),
+    ("=COUNTA(A1:B4)", 7),
+    ('=COUNTIF(B1:B4,"x")', 2),
+    ('=COUNTIF(A1:A4,">2")', 2),
+    ('=COUNTIF(B1:B4,"y*")', 1),
+    ('=SUMIF(B1:B4,"x",A1:A4)', 4),
+    ('=SUMIFS(A1:A4,B1:B4,"x",A1:A4,">1")', 3),
+    ('=MAXIFS(A1:A4,B1:B4,"x")', 3),
+    ("=VLOOKUP(3,A1:B4,2,FALSE)", "x"),
+    ("=VLOOKUP(2.5,A1:B4,2)", "Y1"),
+    ("=VLOOKUP(9,A1:B4,2,FALSE)", "#N/A"),
+    ("=VLOOKUP(4,A1:B4,2,FALSE)", 0),
+    ('=MATCH("X",B1:B4,0)', 1),
+    ("=MATCH(3.5,A1:A4,1)", 3),
+    ("=INDEX(A1:B4,2,2)", "Y1"),
+    ("=INDEX(A1:A4,MATCH(3,A1:A4,0))", 3),
+    ('=LEFT("abcdef",2)&MID("abcdef",3,2)&RIGHT("abcdef")', "abcdf"),
+    ('=TRIM("  a   b ")', "a b"),
+    ('=SUBSTITUTE("a-b-c","-","+",2)', "a-b+c"),
+    ('=TEXT(1234.567,"#,##0.00")', "1,234.57"),
+    ('=TEXT(0.256,"0.0%")', "25.6%"),
+    ("=ISNUMBER(A1)", True),
+    ("=ISBLANK(A5)", True),
+    ("=ISERROR(1/0)", True),
+    ('=AND(A1>0,B1="x")', True),
+    ("=SUMPRODUCT(A1:A4,A1:A4)", 30),
+    ("=ROW(A7)+COLUMN(C2)+COLUMN()", 14),
+    ("=ABS(-3)+SQRT(16)+POWER(2,3)", 15),
+    ('=CHOOSE(2,"a","b","c")', "b"),
+    ("=Sheet!A2*2", 4),
+    ("='Sheet'!$A$3", 3),
+]
+
+
+def check_formulas():
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = "Sheet"
+    for row, (a, b) in enumerate([(1, "x"), (2, "Y1"), (3, "x"), (4, None)], start=1):
+        sheet.cell(row=row, column=1, value=a)
+        sheet.cell(row=row, column=2, value=b)
+    for row, (formula, _) in enumerate(FORMULA_CASES, start=10):
+        sheet.cell(row=row, column=4, value=formula)
+    engine = FormulaEngine(wb, {"Sheet": (4,)})
+    engine.update(wb)
+    failures = []
+    for row, (formula, expected) in enumerate(FORMULA_CASES, start=10):
+        value = engine.cell_value("Sheet", row, 4)
+        same = value == expected and type(value) is type(expected)
+        if isinstance(expected, float):
+            same = isinstance(value, float) and abs(value - expected) < 1e-12
+        if not same:
+            failures.append(f"{formula}: {value!r} != {expected!r}")
+    assert not failures, "\n".join(failures)
+    print(f"  ok: {len(FORMULA_CASES)} formula cases")
+
+
+def make_template(code_rows, summary_rows, sections):
+    # calcurate.xlsm 과 같은 구조의 합성 템플릿: code/section 입력과 이를 요약하는 종합 시트
+    wb = openpyxl.Workbook()
+    code = wb.active
+    code.title = "code"
+    wb.create_sheet("section")
+    summary = wb.create_sheet("종합")
+    code["A1"] = "Elem"
+    for r in range(1, summary_rows + 1):
+        source = r + 2
+        summary.cell(row=r, column=1, value=f'=IF(code!A{source}="","",code!A{source})')
+        summary.cell(row=r, column=2, value=f'=IF(A{r}="","",VLOOKUP(A{r},code!$A:$G,3,FALSE))')
+        summary.cell(
+            row=r,
+            column=3,
+            value=f'=IF(B{r}="","",ROUND(SUMIF(code!$C:$C,B{r},code!$D:$D)/COUNTIF(code!$C:$C,B{r}),2))',
+        )
+        summary.cell(row=r, column=5, value=f"=IFERROR(INDEX(section!$B:$B,MATCH(B{r},section!$A:$A,0)),0)")
+        summary.cell(row=r, column=6, value=f'=IF(A{r}="","",MAX(code!F{source},0))')
+        summary.cell(row=r, column=8, value=f'=IF(A{r}="","",IF(ABS(C{r})/MAX(E{r},1)*F{r}>1,"NG","OK"))')
+    return wb
+
+
+def fill_inputs(wb, code_rows, sections, seed):
+    rng = random.Random(seed)
+    code, section = wb["code"], wb["section"]
+    names = [f"□-{100 + i}x{100 + i}x3.2" for i in range(sections)]
+    for r in range(3, code_rows + 3):
+        code.cell(row=r, column=1, value=r - 2)
+        code.cell(row=r, column=2, value=f"sLCB{rng.randint(1, 20)}")
+        code.cell(row=r, column=3, value=rng.choice(names))
+        pu = round(rng.uniform(-300, 300), 4)
+        code.cell(row=r, column=4, value=pu)
+        code.cell(row=r, column=5, value=pu)
+        code.cell(row=r, column=6, value=round(rng.uniform(0, 1.5), 4))
+        code.cell(row=r, column=7, value=rng.choice(["OK", "NG"]))
+    for r, name in enumerate(names, start=1):
+        section.cell(row=r, column=1, value=name)
+        section.cell(row=r, column=2, value=round(rng.uniform(5, 50), 3))
+
+
+def expected_summary(wb, summary_rows):
+    code, section = wb["code"], wb["section"]
+    rows = {r: [code.cell(row=r, column=c).value for c in range(1, 8)] for r in range(3, code.max_row + 1)}
+    areas = {}
+    for r in range(section.max_row, 0, -1):
+        areas[section.cell(row=r, column=1).value] = section.cell(row=r, column=2).value
+    by_section = {}
+    for values in rows.values():
+        if values[0] is not None:
+            by_section.setdefault(values[2], []).append(values[3])
+    result = []
+    for r in range(1, summary_rows + 1):
+        values = rows.get(r + 2)
+        if values is None or values[0] is None:
+            result.append([None, None, None, None])
+            continue
+        name = values[2]
+        pu = by_section[name]
+        average = float(round(__import__("decimal").Decimal(repr(sum(pu) / len(pu))), 2))
+        area = areas.get(name, 0)
+        ratio = max(values[5], 0)
+        flag = "NG" if abs(average) / max(area, 1) * ratio > 1 else "OK"
+        average = int(average) if float(average).is_integer() else average
+        result.append([values[0], name, average, flag])
+    return result
+
+
+def assert_matches_fresh(engine, wb):
+    fresh = FormulaEngine(wb, {"종합": SUMMARY_COLUMNS})
+    fresh.update(wb)
+    incremental = list(engine.sheet_rows("종합", SUMMARY_COLUMNS))
+    assert incremental == list(fresh.sheet_rows("종합", SUMMARY_COLUMNS)), "incremental result is stale"
+
+
+def close_enough(a, b):
+    if isinstance(a, float) or isinstance(b, float):
+        return isinstance(a, (int, float)) and isinstance(b, (int, float)) and abs(a - b) < 1e-9
+    return a == b
+
+
+def saved_template(wb, rows, path):
+    # Excel 이 계산해 저장한 템플릿을 data_only=True 로 읽은 모양: 수식 자리에 값만 있다.
+    # 값은 엔진과 따로 expected_summary 와 같은 방식으로 계산한다 (E: 단면적, F: MAX(비, 0)).
+    saved = openpyxl.Workbook()
+    saved.active.title = "code"
+    saved.create_sheet("section")
+    summary = saved.create_sheet("종합")
+    for name in ("code", "section"):
+        for row in wb[name].iter_rows():
+            for cell in row:
+                saved[name].cell(row=cell.row, column=cell.column, value=cell.value)
+    code, section = wb["code"], wb["section"]
+    areas = {}
+    for r in range(section.max_row, 0, -1):
+        areas[section.cell(row=r, column=1).value] = section.cell(row=r, column=2).value
+    for r, values in enumerate(expected_summary(wb, rows), start=1):
+        for column, value in zip(SUMMARY_COLUMNS, values):
+            summary.cell(row=r, column=column, value=value)
+        summary.cell(row=r, column=5, value=areas.get(values[1], 0))
+        summary.cell(row=r, column=6, value=max(code.cell(row=r + 2, column=6).value, 0))
+    saved.save(path)
+    return summary
+
+
+def check_saved_values(directory):
+    wb = make_template(30, 30, 5)
+    fill_inputs(wb, 30, 5, seed=3)
+    path = os.path.join(directory, "calcurate_saved.xlsx")
+    summary = saved_template(wb, 30, path)
+    processor = ExcelProcessor(path, os.path.join(directory, "unused.xlsx"))
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        engine = processor.prepare_engine(wb)
+    assert engine is not None, output.getvalue()
+
+    summary["C7"] = summary["C7"].value + 0.01
+    summary.parent.save(path)
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        assert processor.prepare_engine(wb) is None
+    assert "종합!C7" in output.getvalue() and "using Excel" in output.getvalue(), output.getvalue()
+    print("  ok: the template check passes on Excel's saved values and falls back to Excel on one differing cell")
+
+    excel_rows = list(engine.sheet_rows("종합", SUMMARY_COLUMNS))
+    excel_rows[3] = excel_rows[3][:3] + ["NG" if excel_rows[3][3] == "OK" else "OK"]
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        processor.verify_summary(engine, wb, excel_rows)
+    assert "differs from Excel in 1 summary row(s)" in output.getvalue() and "row 4:" in output.getvalue(), output.getvalue()
+    print("  ok: verify mode reports summary rows where the engine and Excel disagree")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-process formula evaluation benchmark")
+    parser.add_argument("--code-rows", type=int, default=5000)
+    parser.add_argument("--summary-rows", type=int, default=5200)
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--changes", type=int, default=20)
+    args = parser.parse_args()
+
+    print("self-check")
+    check_formulas()
+    with tempfile.TemporaryDirectory() as directory:
+        check_saved_values(directory)
+
+    wb = make_template(args.code_rows, args.summary_rows, args.sections)
+    fill_inputs(wb, args.code_rows, args.sections, seed=1)
+
+    started = time.perf_counter()
+    engine = FormulaEngine(wb, {"종합": SUMMARY_COLUMNS})
+    compile_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    full = engine.update(wb)
+    full_time = time.perf_counter() - started
+
+    rows = list(engine.sheet_rows("종합", SUMMARY_COLUMNS))
+    expected = expected_summary(wb, args.summary_rows)
+    mismatches = [
+        (r + 1, got, want)
+        for r, (got, want) in enumerate(zip(rows, expected))
+        if not all(close_enough(g, w) for g, w in zip(got, want))
+    ]
+    assert not mismatches, f"summary differs: {mismatches[:3]}"
+    print(f"  ok: {args.summary_rows} summary rows match a direct computation")
+
+    # 입력 일부만 바꾼 두 번째 실행: 바뀐 셀에 닿는 수식만 다시 계산한다.
+    rng = random.Random(2)
+    code = wb["code"]
+    for _ in range(args.changes):
+        code.cell(row=rng.randint(3, args.code_rows + 2), column=6, value=round(rng.uniform(0, 1.5), 4))
+    started = time.perf_counter()
+    partial = engine.update(wb)
+    partial_time = time.perf_counter() - started
+
+    assert_matches_fresh(engine, wb)
+
+    # 단면 이름과 단면 시트, 행 수가 바뀌는 경우도 전체 재계산과 같아야 한다.
+    section = wb["section"]
+    section.cell(row=1, column=2, value=999.0)
+    for _ in range(5):
+        code.cell(row=rng.randint(3, args.code_rows + 2), column=3, value=section.cell(row=2, column=1).value)
+    code.cell(row=args.code_rows + 3, column=1, value=args.code_rows + 1)
+    code.cell(row=args.code_rows + 3, column=3, value="new section")
+    code.cell(row=args.code_rows + 3, column=6, value=0.5)
+    engine.update(wb)
+    assert_matches_fresh(engine, wb)
+    print("  ok: incremental updates match a full recalculation")
+
+    unsupported = openpyxl.Workbook()
+    unsupported.active.title = "종합"
+    unsupported.active["A1"] = "=INDIRECT(\"B1\")"
+    try:
+        FormulaEngine(unsupported, {"종합": (1,)})
+        raise AssertionError("INDIRECT should not be compiled")
+    except UnsupportedFormula:
+        print("  ok: unsupported formulas are reported for the Excel fallback")
+
+    formulas = len(engine.functions)
+    print(f"{args.code_rows} code rows, {args.summary_rows} summary rows, {formulas} compiled formulas")
+    print(f"  compile            : {compile_time:8.3f} s")
+    print(f"  full evaluation    : {full_time:8.3f} s ({full} formulas)")
+    print(f"  {args.changes:3d} input changes  : {partial_time:8.3f} s ({partial} formulas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from fake_hwp import FakeClipboard, FakeHwp
+from hwp_placeholders import PlaceholderEngine
+from image_cache import DibCache
+
+
+class DibClipboard(FakeClipboard):
+    # hangle.HangleClipboard 처럼 그림을 DIB 로 만들어(캐시에 없으면 인코딩) 클립보드에 넣는다.
+    def __init__(self, images):
+        super().__init__()
+        self.images = images
+
+    def load(self, content, content_type):
+        if content_type in ["image", "base64_image"]:
+            self.images.get(content)
+        return super().load(content, content_type)
+
+
+def make_images(directory, count, seed):
+    # MIDAS/Design+ 캡처 크기의 PNG
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        width, height = rng.choice([(1920, 1080), (1600, 1200)])
+        image = Image.effect_noise((width // 8, height // 8), 40).resize((width, height)).convert("RGB")
+        path = os.path.join(directory, f"capture_{index + 1}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def document(paths):
+    replacements = {f"{{{{그림{index + 1}}}}}": (path, "image") for index, path in enumerate(paths)}
+    return " / ".join(replacements), replacements
+
+
+def run(mode, paths, images, **options):
+    text, replacements = document(paths)
+    clipboard = DibClipboard(images)
+    hwp = FakeHwp(text, clipboard)
+    engine = PlaceholderEngine(hwp, clipboard, picture_mode=mode, **options)
+    counts = engine.fill(replacements)
+    return hwp, clipboard, engine, counts
+
+
+def check(directory):
+    paths = make_images(directory, 3, seed=1)
+    images = DibCache()
+    hwp, clipboard, engine, counts = run("file", paths, images)
+    assert all(counts.values()) and clipboard.writes == 0 and images.misses == 0 and images.hits == 0
+    assert hwp.text == " / ".join(f"[picture:{os.path.basename(path)}]" for path in paths), hwp.text
+    assert [picture[1:] for picture in hwp.pictures] == [(True, 0, 0, 0)] * 3
+    assert [timing["mode"] for timing in engine.image_timings] == ["file"] * 3
+    print("  ok: file mode inserts every picture by path, no clipboard write and no DIB encoding")
+
+    hwp, clipboard, engine, counts = run("file", paths[:1], images, picture_size=(80, 45), embed=False)
+    assert hwp.pictures == [(os.path.abspath(paths[0]), False, 1, 80, 45)]
+    print("  ok: an explicit size (mm) and the embed flag reach InsertPicture")
+
+    webp = os.path.join(directory, "capture.webp")
+    Image.new("RGB", (16, 16)).save(webp)
+    text = "{{A}} {{B}} {{C}}"
+    replacements = {"{{A}}": (webp, "image"), "{{B}}": ("data:image/png;base64,AAAA", "base64_image"), "{{C}}": (paths[0], "image")}
+    clipboard = FakeClipboard()
+    hwp = FakeHwp(text, clipboard)
+    engine = PlaceholderEngine(hwp, clipboard, picture_mode="file")
+    assert all(engine.fill(replacements).values())
+    assert hwp.text == f"[image:{webp}] [base64_image:data:image/png;base64,AAAA] [picture:{os.path.basename(paths[0])}]", hwp.text
+    assert [timing["mode"] for timing in engine.image_timings] == ["clipboard (fallback)", "clipboard", "file"]
+    print("  ok: a format HWP cannot open falls back to the clipboard, base64 images always use it")
+
+    class BrokenHwp(FakeHwp):
+        def InsertPicture(self, *args):
+            raise RuntimeError("FilePathCheckDLL not registered")
+
+    hwp = BrokenHwp("{{A}}")
+    assert PlaceholderEngine(hwp, hwp.clipboard, picture_mode="file").fill({"{{A}}": (paths[1], "image")}) == {"{{A}}": 1}
+    assert hwp.text == f"[image:{paths[1]}]"
+    hwp, clipboard, engine, counts = run("clipboard", paths, DibCache())
+    assert clipboard.writes == 3 and hwp.pictures == [] and "[image:" in hwp.text
+    try:
+        PlaceholderEngine(hwp, picture_mode="inline")
+        raise AssertionError("unknown mode accepted")
+    except ValueError:
+        pass
+    print("  ok: an InsertPicture error falls back too; clipboard mode behaves as before")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Picture insertion by file reference vs clipboard (fake COM server)")
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--call-ms", type=float, default=2.0, help="modelled cost of one COM round trip")
+    parser.add_argument("--clipboard-ms", type=float, default=20.0, help="modelled wait for a clipboard update")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        paths = make_images(directory, args.images, seed=2)
+        print(f"{args.images} captures (1600x1200 to 1920x1080 PNG), per-image latency in the HWP loop")
+        print("  (measured on the Python side; HWP's own decoding of the file or the DIB is not modelled)")
+
+        prefetched = DibCache()
+        started = time.perf_counter()
+        prefetched.prefetch((path, None) for path in paths)
+        prefetch = time.perf_counter() - started
+
+        for name, mode, images in [
+            ("clipboard, encode on paste", "clipboard", DibCache()),
+            ("clipboard, prefetched DIB", "clipboard", prefetched),
+            ("file (InsertPicture)", "file", DibCache()),
+        ]:
+            hwp, clipboard, engine, counts = run(mode, paths, images)
+            assert all(counts.values())
+            seconds = [timing["seconds"] for timing in engine.image_timings]
+            calls = hwp.com_calls / len(paths)
+            modelled = calls * args.call_ms + clipboard.writes / len(paths) * args.clipboard_ms
+            print(
+                f"  {name:27}: mean {sum(seconds) / len(seconds) * 1000:7.2f} ms, max {max(seconds) * 1000:7.2f} ms, "
+                f"{calls:4.1f} COM calls + {clipboard.writes / len(paths):.0f} clipboard write(s) per image "
+                f"(modelled {modelled:5.1f} ms)"
+            )
+        print(f"  DIB prefetch before HWP starts (clipboard mode only): {prefetch:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
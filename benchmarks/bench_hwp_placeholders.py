@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_hwp import FakeClipboard, FakeHwp
+from hwp_placeholders import PlaceholderEngine, field_name
+
+# 기존 paste_clipboard_content 는 붙여넣기마다 1초를 기다렸다.
+OLD_PASTE_SLEEP = 1.0
+
+
+class ClipboardTextEngine(PlaceholderEngine):
+    # user-041 방식: 글자도 클립보드에 넣고 붙여넣는다 (비교용).
+    def write(self, content):
+        return self.paste(content)
+
+    def fill_fields(self, values):
+        return {}
+
+
+def old_paste_clipboard_content(hwp, sleeps):
+    sleeps.append(OLD_PASTE_SLEEP)
+    hwp.HAction.GetDefault("Paste", hwp.HParameterSet.HSelectionOpt.HSet)
+    hwp.HAction.Execute("Paste", hwp.HParameterSet.HSelectionOpt.HSet)
+
+
+def old_replace_text_with_clipboard(hwp, search_text, sleeps):
+    # 기존 hangle.replace_text_with_clipboard (time.sleep 대신 기다린 시간을 기록한다)
+    occurrences = 0
+    while True:
+        hwp.MovePos(2)
+        hwp.HAction.GetDefault("RepeatFind", hwp.HParameterSet.HFindReplace.HSet)
+        findReplace = hwp.HParameterSet.HFindReplace
+        findReplace.ReplaceString = ""
+        findReplace.FindString = search_text
+        findReplace.IgnoreReplaceString = 0
+        findReplace.IgnoreFindString = 0
+        findReplace.Direction = 0
+        findReplace.WholeWordOnly = 0
+        findReplace.UseWildCards = 0
+        findReplace.SeveralWords = 0
+        findReplace.AllWordForms = 0
+        findReplace.MatchCase = 0
+        findReplace.ReplaceMode = 0
+        findReplace.ReplaceStyle = ""
+        findReplace.FindStyle = ""
+        findReplace.FindTextInPicture = 0
+        findReplace.FindRegExp = 0
+        findReplace.FindJaso = 0
+        findReplace.HanjaFromHangul = 0
+        findReplace.IgnoreMessage = 1
+        findReplace.FindType = 1
+
+        result = hwp.HAction.Execute("RepeatFind", hwp.HParameterSet.HFindReplace.HSet)
+        if not result:
+            break
+        old_paste_clipboard_content(hwp, sleeps)
+        occurrences += 1
+    return occurrences
+
+
+def old_fill(hwp, replacements, sleeps):
+    # 기존 main: (자리표시자, 파일) 쌍마다 클립보드를 채우고 문서 처음부터 다시 찾는다.
+    counts = {}
+    for placeholder, (content, content_type) in replacements.items():
+        hwp.clipboard.set(content, content_type)
+        counts[placeholder] = old_replace_text_with_clipboard(hwp, placeholder, sleeps)
+    return counts
+
+
+def make_document(placeholders, repeats, seed):
+    rng = random.Random(seed)
+    slots = [name for name in placeholders for _ in range(rng.randint(1, repeats))]
+    rng.shuffle(slots)
+    parts = []
+    for slot in slots:
+        parts.append(f"본문 문단 {rng.randint(1, 999)} 입니다. ")
+        parts.append(slot)
+    parts.append(" 끝.")
+    return "".join(parts)
+
+
+def make_replacements(count, seed):
+    rng = random.Random(seed)
+    replacements = {}
+    for index in range(count):
+        name = f"{{{{항목{index + 1}}}}}"
+        if index % 5 == 4:
+            replacements[name] = (f"C:\\results\\figure{index + 1}.png", "image")
+        elif index % 11 == 10:
+            replacements[name] = (f"C:\\results\\diagram{index + 1}.emf", "emf")
+        else:
+            replacements[name] = (f"값 {rng.uniform(0, 1000):.3f} kN·m", "text")
+    return replacements
+
+
+def make_field_template(text, replacements):
+    # 같은 보고서를 누름틀 필드로 만든 양식: 글자 자리표시자는 필드가 되고 그림 자리표시자만 본문에 남는다.
+    fields = []
+    for placeholder, (_, content_type) in replacements.items():
+        if content_type == "text":
+            fields.extend([field_name(placeholder)] * text.count(placeholder))
+            text = text.replace(placeholder, "")
+    return text, fields
+
+
+def run(fill, text, replacements, fields=()):
+    clipboard = FakeClipboard()
+    hwp = FakeHwp(text, clipboard, fields)
+    sleeps = []
+    started = time.perf_counter()
+    if fill == "old":
+        counts = old_fill(hwp, replacements, sleeps)
+    elif fill == "clipboard":
+        counts = ClipboardTextEngine(hwp, clipboard).fill(replacements)
+    else:
+        counts = PlaceholderEngine(hwp, clipboard).fill(replacements)
+    elapsed = time.perf_counter() - started
+    return hwp, clipboard, counts, sum(sleeps), elapsed
+
+
+def check():
+    cases = [
+        ("repeated placeholders", "{{A}} x {{B}} y {{A}} z {{A}}", {"{{A}}": ("1", "text"), "{{B}}": ("2", "text")}),
+        ("prefix-overlapping names", "<날짜> <날짜2> <날짜> <날짜22>",
+         {"<날짜>": ("D", "text"), "<날짜2>": ("D2", "text"), "<날짜22>": ("D22", "text")}),
+        ("missing placeholder", "{{A}} only", {"{{A}}": ("a", "text"), "{{없음}}": ("n", "text")}),
+        ("image and emf content", "[그림1] / [그림2] / [그림1]",
+         {"[그림1]": ("fig1.png", "image"), "[그림2]": ("fig2.emf", "emf")}),
+        ("empty document", "", {"{{A}}": ("a", "text")}),
+    ]
+    for name, text, replacements in cases:
+        old_hwp, _, old_counts, _, _ = run("old", text, replacements)
+        new_hwp, _, new_counts, _, _ = run("new", text, replacements)
+        assert new_hwp.text == old_hwp.text, f"{name}: {new_hwp.text!r} != {old_hwp.text!r}"
+        assert new_counts == old_counts, f"{name}: {new_counts} != {old_counts}"
+        print(f"  ok: {name}")
+
+    # 붙여넣은 내용은 다시 찾지 않는다 (기존 방식은 내용에 자기 이름이 있으면 끝나지 않았다).
+    hwp = FakeHwp("{{A}} {{B}}")
+    counts = PlaceholderEngine(hwp, hwp.clipboard).fill({"{{A}}": ("{{A}}{{B}}", "text"), "{{B}}": ("b", "text")})
+    assert hwp.text == "{{A}}{{B}} b" and counts == {"{{A}}": 1, "{{B}}": 1}, hwp.text
+    print("  ok: pasted content is not searched again")
+
+    # 글상자처럼 찾기 순서가 글자 순서와 다른 곳은 남은 자리표시자만 처음부터 다시 찾는다.
+    replacements = {"{{A}}": ("1", "text"), "{{B}}": ("2", "text")}
+    hwp = FakeHwp("{{B}} {{A}}")
+    engine = PlaceholderEngine(hwp, hwp.clipboard)
+    engine.plan = lambda placeholders: ["{{A}}", "{{B}}"]
+    assert engine.fill(replacements) == {"{{A}}": 1, "{{B}}": 1} and hwp.text == "2 1", hwp.text
+    print("  ok: out-of-order occurrences are filled by the fallback pass")
+
+    class SlowClipboard(FakeClipboard):
+        def load(self, content, content_type):
+            self.set(content, content_type)
+            return content != "not ready.png"
+
+    clipboard = SlowClipboard()
+    hwp = FakeHwp("{{A}} {{B}}", clipboard)
+    counts = PlaceholderEngine(hwp, clipboard).fill({"{{A}}": ("not ready.png", "image"), "{{B}}": ("b.png", "image")})
+    assert counts == {"{{A}}": 0, "{{B}}": 1} and hwp.calls["Execute(Paste)"] == 1, counts
+    print("  ok: no paste while the clipboard is not ready")
+
+    # 글자는 클립보드를 쓰지 않는다: 필드는 PutFieldText 한 번, 본문은 InsertText.
+    replacements = {"{{날짜}}": ("2024.05", "text"), "{{이름}}": ("", "text"), "{{그림}}": ("a.png", "image")}
+    hwp = FakeHwp("{{이름}}님 {{날짜}} {{그림}}", fields=["날짜", "회사", "날짜"])
+    counts = PlaceholderEngine(hwp, hwp.clipboard).fill(replacements)
+    assert hwp.text == "님 2024.05 [image:a.png]", hwp.text
+    assert hwp.field_text() == {"날짜": "2024.05", "회사": ""}, hwp.fields
+    assert counts == {"{{날짜}}": 3, "{{이름}}": 1, "{{그림}}": 1}, counts
+    assert hwp.calls["PutFieldText"] == 1 and hwp.clipboard.writes == 1, hwp.calls
+    print("  ok: text goes through fields and InsertText, only the image uses the clipboard")
+
+    hwp = FakeHwp("{{A}}")
+    assert PlaceholderEngine(hwp).fill({"{{A}}": ("a.png", "image")}) == {"{{A}}": 0} and hwp.text == "{{A}}"
+    print("  ok: images are skipped without a clipboard")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HWP placeholder fill benchmark (fake automation object)")
+    parser.add_argument("--placeholders", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3, help="maximum occurrences per placeholder")
+    parser.add_argument("--call-ms", type=float, default=2.0, help="modelled cost of one COM round trip")
+    parser.add_argument("--clipboard-ms", type=float, default=20.0, help="modelled cost of one confirmed clipboard write")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print("self-check")
+    check()
+
+    replacements = make_replacements(args.placeholders, args.seed)
+    text = make_document(list(replacements), args.repeats, args.seed)
+    field_text, fields = make_field_template(text, replacements)
+    results = {mode: run(mode, text, replacements) for mode in ("old", "clipboard", "direct")}
+    results["fields"] = run("fields", field_text, replacements, fields)
+    for mode in ("clipboard", "direct"):
+        assert results[mode][0].text == results["old"][0].text, f"{mode}: filled document differs"
+    texts = {field_name(p): content for p, (content, content_type) in replacements.items() if content_type == "text"}
+    assert results["fields"][0].field_text() == texts, "fields: filled values differ"
+    images = {p: content for p, content in replacements.items() if content[1] != "text"}
+    assert results["fields"][0].text == run("old", field_text, images)[0].text, "fields: document body differs"
+
+    occurrences = sum(results["direct"][2].values())
+    scale = 100 / args.placeholders
+    print(
+        f"{args.placeholders} placeholders ({occurrences} occurrences, {len(texts)} text), "
+        f"{args.call_ms:g} ms per COM call, {args.clipboard_ms:g} ms per clipboard write; per 100 placeholders:"
+    )
+    labels = (
+        ("old", "MovePos(2) loop + sleep(1)"),
+        ("clipboard", "one pass, text pasted"),
+        ("direct", "one pass, InsertText"),
+        ("fields", "PutFieldText + images"),
+    )
+    for mode, label in labels:
+        hwp, clipboard, _, slept, elapsed = results[mode]
+        modelled = slept + hwp.com_calls * args.call_ms / 1000 + clipboard.writes * args.clipboard_ms / 1000
+        print(
+            f"  {label:26s}: {hwp.com_calls * scale:7.0f} COM calls, {clipboard.writes * scale:4.0f} clipboard writes, "
+            f"fake {elapsed * scale * 1000:6.1f} ms, modelled {modelled * scale:7.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import functools
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from fake_hwp import CRASH, fake_clipboard, fake_dispatch
+from hwp_placeholders import PlaceholderEngine, load_contents
+from hwp_service import HwpDocumentService, ServiceKeyError, serve, service_authkey, stop_service, submit_job
+
+AUTHKEY = b"bench"
+
+
+def free_address():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()
+
+
+def run_service(address, startup, ready):
+    service = HwpDocumentService(functools.partial(fake_dispatch, startup), fake_clipboard)
+    serve(address, AUTHKEY, service, ready)
+
+
+def start_service(startup):
+    address = free_address()
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=run_service, args=(address, startup, ready))
+    process.start()
+    ready.wait(10)
+    return address, process
+
+
+def old_invocation(job, startup):
+    # 기존 hangle.py 한 번 실행: 한글을 띄우고, 열고, 채우고, HWP/PDF 로 저장하고, 닫는다.
+    hwp = fake_dispatch(startup)
+    hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
+    try:
+        hwp.Open(job["template"])
+        contents, _ = load_contents(job["replacements"].items())
+        PlaceholderEngine(hwp, hwp.clipboard).fill(contents)
+        for output_path in job["outputs"]:
+            hwp.SaveAs(output_path, "PDF" if output_path.endswith(".pdf") else "HWP", "")
+    finally:
+        hwp.Quit()
+
+
+def make_jobs(directory, count, placeholders=20):
+    image = os.path.join(directory, "capture.png")
+    Image.new("RGB", (64, 48), "white").save(image)
+    replacements = {"{{그림}}": image}
+    for index in range(placeholders):
+        path = os.path.join(directory, f"value_{index}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"값 {index}")
+        replacements[f"{{{{항목{index}}}}}"] = path
+    jobs = []
+    for number in range(count):
+        template = os.path.join(directory, f"report_{number}.hwp")
+        with open(template, "w", encoding="utf-8") as f:
+            f.write(f"보고서 {number}\n" + "\n".join(f"{placeholder} 확인" for placeholder in replacements))
+        stem = os.path.join(directory, f"report_{number}_수정완료")
+        jobs.append({"id": number, "template": template, "replacements": replacements, "outputs": [stem + ".hwp", stem + ".pdf"]})
+    return jobs
+
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def check_key(directory):
+    key_file = os.path.join(directory, "keys", "service_key")
+    saved = {name: os.environ.pop(name, None) for name in ["HWP_SERVICE_KEY", "HWP_SERVICE_KEY_FILE"]}
+    os.environ["HWP_SERVICE_KEY_FILE"] = key_file
+    try:
+        try:
+            service_authkey()
+            raise AssertionError("a client accepted a missing key")
+        except ServiceKeyError:
+            pass
+        key = service_authkey(create=True)
+        assert len(key) == 64 and service_authkey(create=True) == key == service_authkey()
+        if os.name == "posix":
+            assert os.stat(key_file).st_mode & 0o777 == 0o600
+            os.chmod(key_file, 0o644)
+            try:
+                service_authkey()
+                raise AssertionError("a key readable by other users was accepted")
+            except ServiceKeyError:
+                pass
+        os.environ["HWP_SERVICE_KEY"] = "from-env"
+        assert service_authkey() == b"from-env"
+    finally:
+        for name, value in saved.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+    print("  ok: no built-in key; serve creates a random user-only key file, clients without it are refused")
+
+
+def check(directory):
+    check_key(directory)
+    jobs = make_jobs(directory, 4, placeholders=3)
+    address, process = start_service(0.0)
+    try:
+        results = [submit_job(job, address, AUTHKEY) for job in jobs[:2]]
+        assert all(result["ok"] for result in results), results
+        assert [result["instance"] for result in results] == [1, 1]
+        assert "start" in results[0]["timings"] and "start" not in results[1]["timings"]
+        assert all(stage in results[1]["timings"] for stage in ["queued", "read", "open", "fill", "save", "close", "total"])
+        saved = read(jobs[0]["outputs"][0])
+        assert saved.startswith("HWP\n보고서 0\n") and "값 2 확인" in saved and "[image:" in saved and "{{" not in saved
+        assert read(jobs[0]["outputs"][1]).startswith("PDF\n")
+        print("  ok: jobs share one warm instance, outputs are filled and saved, every stage is timed")
+
+        crash = dict(jobs[2], id="crash", template=os.path.join(directory, f"{CRASH}.hwp"))
+        with open(crash["template"], "w", encoding="utf-8") as f:
+            f.write("{{항목0}}")
+        failed = submit_job(crash, address, AUTHKEY)
+        assert not failed["ok"] and failed["stage"] == "open" and "RPC" in failed["error"], failed
+        after = submit_job(jobs[2], address, AUTHKEY)
+        assert after["ok"] and after["instance"] == 2 and "start" in after["timings"], after
+        print("  ok: an HWP failure recycles the instance, the next job gets a fresh one")
+
+        missing = submit_job(dict(jobs[3], id="missing", template=os.path.join(directory, "nope.hwp")), address, AUTHKEY)
+        bad_output = submit_job(dict(jobs[3], id="bad", outputs=[os.path.join(directory, "out.docx")]), address, AUTHKEY)
+        gone = dict(jobs[3]["replacements"], **{"{{없음}}": os.path.join(directory, "gone.txt")})
+        partial = submit_job(dict(jobs[3], replacements=gone), address, AUTHKEY)
+        assert not missing["ok"] and missing["stage"] == "read" and not bad_output["ok"], (missing, bad_output)
+        assert partial["ok"] and partial["instance"] == 2 and partial["missing"] == [gone["{{없음}}"]], partial
+        print("  ok: bad jobs are reported without restarting HWP, unreadable contents are listed")
+
+        results = {}
+
+        def client(job):
+            results[job["id"]] = submit_job(job, address, AUTHKEY)
+
+        threads = [threading.Thread(target=client, args=(dict(job, id=f"client-{index}"),)) for index, job in enumerate(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == [f"client-{index}" for index in range(len(jobs))]
+        assert all(result["id"] == key and result["ok"] for key, result in results.items())
+        print("  ok: concurrent clients are queued and each gets its own result")
+    finally:
+        stop_service(address, AUTHKEY)
+        process.join(10)
+    assert process.exitcode == 0
+    print("  ok: shutdown stops the service process")
+
+    service = HwpDocumentService(fake_dispatch, fake_clipboard, max_jobs=2)
+    instances = [service.run_job(job)["instance"] for job in jobs[:3]]
+    assert instances == [1, 1, 2] and service.hwp is not None
+    service.stop()
+    assert service.hwp is None
+    print("  ok: max_jobs restarts HWP after that many jobs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm HWP document service benchmark (fake COM server)")
+    parser.add_argument("--jobs", type=int, default=10)
+    parser.add_argument("--placeholders", type=int, default=40)
+    parser.add_argument("--startup", type=float, default=0.5, help="seconds to launch HWP (EnsureDispatch + RegisterModule)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        jobs = make_jobs(directory, args.jobs, args.placeholders)
+        started = time.perf_counter()
+        for job in jobs:
+            old_invocation(job, args.startup)
+        old = time.perf_counter() - started
+
+        started = time.perf_counter()
+        address, process = start_service(args.startup)
+        try:
+            results = [submit_job(job, address, AUTHKEY) for job in jobs]
+        finally:
+            stop_service(address, AUTHKEY)
+            process.join(10)
+        warm = time.perf_counter() - started
+        assert all(result["ok"] for result in results)
+
+        print(f"{args.jobs} documents, {args.placeholders} placeholders each, HWP launch modelled at {args.startup:.2f} s")
+        print(f"  launch HWP per invocation : {old:6.2f} s ({old / args.jobs:.3f} s/doc)")
+        print(f"  warm document service     : {warm:6.2f} s ({warm / args.jobs:.3f} s/doc, incl. service start)")
+        for stage in ["queued", "start", "read", "open", "fill", "save", "close", "total"]:
+            values = [result["timings"][stage] for result in results if stage in result["timings"]]
+            print(f"    {stage:6}: mean {sum(values) / len(values) * 1000:7.2f} ms over {len(values)} job(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from fake_hwp import FakeTableHwp
+from hwp_tables import TableFiller, cell_position, table_rows
+
+ANCHOR = "{{강재검토}}"
+COLUMNS = ["부재", "단면", "재질", "하중조합", "축력비", "휨비(강축)", "휨비(약축)", "전단비", "조합비", "판정"]
+
+
+def steel_check_summary(count, seed):
+    # 강재 부재 검토 요약표 (MIDAS 설계 결과를 정리한 것과 같은 모양)
+    rng = random.Random(seed)
+    sections = ["H-400x200x8x13", "H-350x175x7x11", "H-300x150x6.5x9", "□-150x150x6", "P-114.3x4.5"]
+    rows = []
+    for index in range(count):
+        ratios = [rng.uniform(0.05, 0.6) for _ in range(4)]
+        combined = min(sum(ratios[:3]), 1.2)
+        rows.append([
+            f"C{index + 1}", rng.choice(sections), rng.choice(["SS275", "SM355"]), f"LCB{rng.randint(1, 24)}",
+            round(ratios[0], 3), round(ratios[1], 3), round(ratios[2], 3), round(ratios[3], 3), round(combined, 3),
+            "OK" if combined <= 1.0 else "NG",
+        ])
+    frame = pd.DataFrame(rows, columns=COLUMNS)
+    frame.loc[::17, "휨비(약축)"] = float("nan")
+    return frame
+
+
+def template(columns, header=True, rows=1):
+    # 머리글 행 + anchor 가 첫 셀에 있는 양식 행
+    cells = [COLUMNS[:columns]] if header else []
+    cells.append([ANCHOR] + [""] * (columns - 1))
+    cells.extend([""] * columns for _ in range(rows - 1))
+    return FakeTableHwp("강재 검토 결과는 다음 표와 같다.", cells)
+
+
+def old_fill(hwp, rows):
+    # 기존 HWPyControl 로 채우던 방식: anchor 를 찾아 지우고, add_table_row 로 행을 늘린 뒤
+    # 셀마다 insert_text + move_right (호출마다 print)
+    hwp.MovePos(2)
+    find_replace = hwp.HParameterSet.HFindReplace
+    hwp.HAction.GetDefault("RepeatFind", find_replace.HSet)
+    find_replace.FindString = ANCHOR
+    find_replace.IgnoreMessage = 1
+    hwp.HAction.Execute("RepeatFind", hwp.HParameterSet.HFindReplace.HSet)
+    hwp.HAction.Run("Delete")
+    hwp.HAction.GetDefault("TableInsertRowColumn", hwp.HParameterSet.HTableInsertLine.HSet)
+    hwp.HParameterSet.HTableInsertLine.Side = 3
+    hwp.HParameterSet.HTableInsertLine.Count = len(rows) - 1
+    hwp.HAction.Execute("TableInsertRowColumn", hwp.HParameterSet.HTableInsertLine.HSet)
+    print(f"Added {len(rows) - 1} row(s) to the table")
+    for values in rows:
+        for text in values:
+            if text.strip():
+                insert_text_set = hwp.HParameterSet.HInsertText
+                hwp.HAction.GetDefault("InsertText", insert_text_set.HSet)
+                insert_text_set.Text = text.strip()
+                hwp.HAction.Execute("InsertText", insert_text_set.HSet)
+                print(f"Inserted text: {text.strip()}")
+            hwp.HAction.Run("MoveRight")
+            print("Moved cursor right")
+
+
+def check():
+    assert cell_position("(A1): 문자 입력") == (0, 0) and cell_position("(AB12)") == (11, 27) and cell_position("") is None
+    frame = steel_check_summary(5, seed=1)
+    rows = table_rows(frame)
+    assert rows[0][4] == str(frame.iloc[0, 4]) and rows[0][6] == "" and len(rows) == 5
+    print("  ok: cell addresses and DataFrame cells (NaN -> empty) convert as expected")
+
+    hwp = template(len(COLUMNS))
+    assert TableFiller(hwp).fill(ANCHOR, frame) == sum(1 for values in rows for text in values if text)
+    assert hwp.cells[0] == COLUMNS and hwp.cells[1:] == rows and hwp.body.startswith("강재 검토")
+    assert hwp.calls["Execute(TableInsertRowColumn)"] == 1 and "Run(MoveRight)" not in hwp.calls
+    old = template(len(COLUMNS))
+    with contextlib.redirect_stdout(io.StringIO()):
+        old_fill(old, rows)
+    assert old.cells == hwp.cells
+    print("  ok: same cells as the old move_right loop, rows added with one TableInsertRowColumn")
+
+    hwp = template(len(COLUMNS), rows=8)
+    TableFiller(hwp).fill(ANCHOR, frame)
+    assert "Execute(TableInsertRowColumn)" not in hwp.calls and len(hwp.cells) == 9 and hwp.cells[6:] == [[""] * 10] * 3
+    print("  ok: a table that is already large enough is not resized")
+
+    # 양식에 예시 값이 들어 있는 표: 넣은 행의 목록 번호는 행 순서로 이어지지 않고,
+    # 채우는 행의 원래 글자는 덧붙지 않고 한 번의 셀 블록 지우기로 바뀌어야 한다.
+    hwp = FakeTableHwp("", [["부재", "판정"], [ANCHOR + " 예시", "OK"], ["C0", "NG"]])
+    assert TableFiller(hwp).fill(ANCHOR, [["C1", "OK"], ["C2", ""], ["C3", "NG"], ["C4", "OK"]]) == 7
+    assert hwp.cells == [["부재", "판정"], ["C1", "OK"], ["C2", ""], ["C3", "NG"], ["C4", "OK"]], hwp.cells
+    assert hwp.ids[3:] == [[7, 9], [8, 10]]
+    assert hwp.calls["Execute(TableInsertRowColumn)"] == 1 and hwp.calls["Run(Delete)"] == 1
+    assert "Run(MoveRight)" not in hwp.calls and hwp.calls["Run(TableRightCell)"] == 7
+    hwp = FakeTableHwp("", [["부재", "판정"], [ANCHOR, "예시"], ["C0", "NG"], ["합계", "-"]])
+    TableFiller(hwp).fill(ANCHOR, [["C1", ""], ["C2", "OK"]])
+    assert hwp.cells == [["부재", "판정"], ["C1", ""], ["C2", "OK"], ["합계", "-"]], hwp.cells
+    print("  ok: cells are written by the list ids read after inserting rows; old text in the filled rows is cleared")
+
+    hwp = FakeTableHwp("", [["번호", "부재", "판정"], ["1", ANCHOR, ""]])
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        TableFiller(hwp).fill(ANCHOR, [["C1", "OK", "extra"], ["C2", "NG"]])
+    assert hwp.cells == [["번호", "부재", "판정"], ["1", "C1", "OK"], ["", "C2", "NG"]], hwp.cells
+    assert "extra values are not written" in output.getvalue()
+    hwp = template(3, header=False)
+    TableFiller(hwp).fill(ANCHOR, frame.iloc[:2, :3], header=True)
+    assert hwp.cells == [COLUMNS[:3], rows[0][:3], rows[1][:3]]
+    print("  ok: an anchor in a later column fills from there; header=True writes the column names first")
+
+    hwp = template(3)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert TableFiller(hwp).fill("{{없음}}", rows) is None
+        assert TableFiller(FakeTableHwp("본문 {{표}}", [[""]])).fill("{{표}}", rows) is None
+    assert hwp.cells[1][0] == ANCHOR
+    print("  ok: a missing anchor or one outside a table leaves the document alone")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HWP table fill benchmark (fake COM server)")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--call-ms", type=float, default=2.0, help="modelled cost of one COM round trip")
+    parser.add_argument("--print-ms", type=float, default=0.5, help="modelled cost of one console line on Windows")
+    args = parser.parse_args()
+
+    print("self-check")
+    check()
+
+    frame = steel_check_summary(args.rows, seed=2)
+    rows = table_rows(frame)
+    print(f"{args.rows}-row steel check summary table, {len(COLUMNS)} columns")
+
+    old = template(len(COLUMNS))
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        old_fill(old, rows)
+    old_time = time.perf_counter() - started
+    old_prints = output.getvalue().count("\n")
+
+    new = template(len(COLUMNS))
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        TableFiller(new).fill(ANCHOR, frame)
+    new_time = time.perf_counter() - started
+    new_prints = output.getvalue().count("\n")
+    assert new.cells == old.cells
+
+    for name, hwp, elapsed, prints in [("insert_text + move_right", old, old_time, old_prints), ("TableFiller.fill", new, new_time, new_prints)]:
+        modelled = hwp.com_calls * args.call_ms / 1000 + prints * args.print_ms / 1000
+        print(f"  {name:24}: {hwp.com_calls:6} COM calls, {prints:5} printed lines, fake {elapsed * 1000:6.1f} ms, modelled {modelled:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+import io
+import os
+import sys
+import time
+import random
+import zipfile
+import argparse
+import contextlib
+import tempfile
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, WmfImagePlugin
+
+from fake_hwp import FakeClipboard, FakeHwp
+from hwp_placeholders import PlaceholderEngine
+from hwpx_writer import HP, HC, OPF, HwpxTemplate, read_replacements
+from emf_converter import EmfConverter
+from bench_emf_converter import PolylineHandler, write_emf
+
+NAMESPACES = (
+    'xmlns:ha="http://www.hancom.co.kr/hwpml/2011/app" '
+    'xmlns:hp="http://www.hancom.co.kr/hwpml/2011/paragraph" '
+    'xmlns:hs="http://www.hancom.co.kr/hwpml/2011/section" '
+    'xmlns:hc="http://www.hancom.co.kr/hwpml/2011/core" '
+    'xmlns:hh="http://www.hancom.co.kr/hwpml/2011/head"'
+)
+CONTAINER = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<ocf:container xmlns:ocf="urn:oasis:names:tc:opendocument:xmlns:container" xmlns:hpf="http://www.hancom.co.kr/schema/2011/hpf">
+<ocf:rootfiles><ocf:rootfile full-path="Contents/content.hpf" media-type="application/hwpml-package+xml"/></ocf:rootfiles>
+</ocf:container>"""
+VERSION = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<hv:HCFVersion xmlns:hv="http://www.hancom.co.kr/hwpml/2011/version" tagetApplication="WORDPROCESSOR" major="5" minor="1" micro="0" buildNumber="1" os="1" xmlVersion="1.4" application="Hancom Office Hangul" appVersion="12, 0, 0, 1"/>"""
+CONTENT = """<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<opf:package xmlns:opf="http://www.idpf.org/2007/opf/" xmlns:dc="http://purl.org/dc/elements/1.1/" version="" unique-identifier="" id="">
+<opf:metadata><opf:title>구조계산서</opf:title><opf:language>ko</opf:language></opf:metadata>
+<opf:manifest>
+<opf:item id="header" href="Contents/header.xml" media-type="application/xml"/>
+<opf:item id="image1" href="BinData/image1.png" media-type="image/png" isEmbeded="1"/>
+<opf:item id="section0" href="Contents/section0.xml" media-type="application/xml"/>
+<opf:item id="settings" href="settings.xml" media-type="application/xml"/>
+</opf:manifest>
+<opf:spine><opf:itemref idref="header" linear="yes"/><opf:itemref idref="section0" linear="yes"/></opf:spine>
+</opf:package>"""
+HEADER = f"""<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>
+<hh:head {NAMESPACES} version="1.4" secCnt="1"><hh:beginNum page="1" footnote="1" endnote="1" pic="1" tbl="1" equation="1"/></hh:head>"""
+
+
+def paragraph(*runs):
+    # runs: 글자 또는 (charPrIDRef, 글자)
+    parts = []
+    for run in runs:
+        style, text = run if isinstance(run, tuple) else (0, run)
+        parts.append(f'<hp:run charPrIDRef="{style}"><hp:t>{text}</hp:t></hp:run>')
+    return f'<hp:p id="0" paraPrIDRef="0" styleIDRef="0" pageBreak="0" columnBreak="0" merged="0">{"".join(parts)}</hp:p>'
+
+
+def cell(row, column, text):
+    return (
+        f'<hp:tc name="" header="0" hasMargin="0" protect="0" editable="0" dirty="0" borderFillIDRef="3">'
+        f'<hp:subList id="" textDirection="HORIZONTAL" lineWrap="BREAK" vertAlign="CENTER">{paragraph(text)}</hp:subList>'
+        f'<hp:cellAddr colAddr="{column}" rowAddr="{row}"/><hp:cellSpan colSpan="1" rowSpan="1"/>'
+        f'<hp:cellSz width="8000" height="1500"/><hp:cellMargin left="510" right="510" top="141" bottom="141"/></hp:tc>'
+    )
+
+
+def table(rows):
+    body = "".join(
+        "<hp:tr>" + "".join(cell(r, c, text) for c, text in enumerate(values)) + "</hp:tr>"
+        for r, values in enumerate(rows)
+    )
+    return (
+        f'<hp:run charPrIDRef="0"><hp:tbl id="1000" zOrder="0" numberingType="TABLE" textWrap="TOP_AND_BOTTOM" '
+        f'textFlow="BOTH_SIDES" lock="0" dropcapstyle="None" pageBreak="CELL" repeatHeader="1" '
+        f'rowCnt="{len(rows)}" colCnt="{len(rows[0])}" cellSpacing="0" borderFillIDRef="3" noAdjust="0">'
+        f'<hp:sz width="40000" widthRelTo="ABSOLUTE" height="{1500 * len(rows)}" heightRelTo="ABSOLUTE" protect="0"/>'
+        f'<hp:pos treatAsChar="1" affectLSpacing="0" flowWithText="1" allowOverlap="0" holdAnchorAndSO="0" '
+        f'vertRelTo="PARA" horzRelTo="COLUMN" vertAlign="TOP" horzAlign="LEFT" vertOffset="0" horzOffset="0"/>'
+        f'<hp:outMargin left="0" right="0" top="0" bottom="0"/><hp:inMargin left="0" right="0" top="0" bottom="0"/>'
+        f"{body}</hp:tbl></hp:run>"
+    )
+
+
+def make_section(text_names, image_names, filler):
+    # 보고서 양식: 제목(자리표시자가 run 두 개에 걸침), 글자/그림 자리표시자 문단, 부재표, 본문 채움 문단
+    paragraphs = [
+        paragraph("구조계산서 - ", (1, "{{현장"), (2, "명}}")),
+        paragraph("작성일: {{날짜}} / 검토: {{날짜}}"),
+    ]
+    for index, name in enumerate(text_names):
+        paragraphs.append(paragraph(f"{index + 1}. 항목 ", name, " 를 확인한다."))
+    for name in image_names:
+        paragraphs.append(paragraph(f"그림 {name} 끝"))
+    member_table = [["부재", "단면", "검토"], ["{{부재표}}", "", ""], ["합계", "", ""]]
+    paragraphs.append(f'<hp:p id="0" paraPrIDRef="0" styleIDRef="0" pageBreak="0" columnBreak="0" merged="0">{table(member_table)}</hp:p>')
+    for index in range(filler):
+        paragraphs.append(paragraph(f"본문 {index}: 하중 조합과 단면 검토 결과는 다음과 같다. ", (1, "(단위: kN, m)")))
+    return f'<?xml version="1.0" encoding="UTF-8" standalone="yes" ?>\n<hs:sec {NAMESPACES}>{"".join(paragraphs)}</hs:sec>'
+
+
+def png_bytes(size, color):
+    output = io.BytesIO()
+    Image.new("RGB", size, color).save(output, "PNG")
+    return output.getvalue()
+
+
+def make_template(path, text_names, image_names, filler=200):
+    parts = [
+        ("mimetype", "application/hwp+zip", zipfile.ZIP_STORED),
+        ("version.xml", VERSION, zipfile.ZIP_DEFLATED),
+        ("META-INF/container.xml", CONTAINER, zipfile.ZIP_DEFLATED),
+        ("Contents/content.hpf", CONTENT, zipfile.ZIP_DEFLATED),
+        ("Contents/header.xml", HEADER, zipfile.ZIP_DEFLATED),
+        ("Contents/section0.xml", make_section(text_names, image_names, filler), zipfile.ZIP_DEFLATED),
+        ("BinData/image1.png", png_bytes((320, 80), "navy"), zipfile.ZIP_STORED),
+        ("settings.xml", '<?xml version="1.0" encoding="UTF-8"?><ha:HWPApplicationSetting xmlns:ha="http://www.hancom.co.kr/hwpml/2011/app"/>', zipfile.ZIP_DEFLATED),
+        ("Preview/PrvImage.png", png_bytes((724, 1024), "white"), zipfile.ZIP_STORED),
+    ]
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data, compression in parts:
+            archive.writestr(name, data, compress_type=compression)
+
+
+def make_inputs(directory, text_count, image_count, rows, seed):
+    rng = random.Random(seed)
+    texts = {"{{현장명}}": "OO 물류센터 증축공사", "{{날짜}}": "2024.05"}
+    texts.update({f"{{{{값{index + 1}}}}}": f"{rng.uniform(0, 500):.2f} kN & <{index}>" for index in range(text_count)})
+    images = {}
+    for index in range(image_count):
+        path = os.path.join(directory, f"figure{index + 1}.png")
+        if not os.path.exists(path):
+            Image.new("RGB", (rng.randint(200, 800), rng.randint(150, 600)), "gray").save(path)
+        images[f"{{{{그림{index + 1}}}}}"] = path
+    table_rows = [[f"C{r + 1}", f"□-{rng.choice([100, 125, 150])}x3.2", rng.choice(["OK", "NG"])] for r in range(rows)]
+    return texts, images, {"{{부재표}}": table_rows}
+
+
+def section_root(path):
+    with zipfile.ZipFile(path) as archive:
+        return ET.fromstring(archive.read("Contents/section0.xml"))
+
+
+def check(directory):
+    template_path = os.path.join(directory, "check.hwpx")
+    texts, images, tables = make_inputs(directory, 5, 2, 4, seed=1)
+    # 한글이 바로 읽지 못하는 형식은 PNG 로 바꿔 넣고, 같은 그림 파일은 한 번만 넣는다.
+    tiff_path = os.path.join(directory, "drawing.tiff")
+    Image.new("RGB", (60, 40), "red").save(tiff_path)
+    images["{{그림3}}"] = (tiff_path, (120, 80))
+    images["{{그림4}}"] = images["{{그림1}}"]
+    make_template(template_path, [name for name in texts if name.startswith("{{값")], list(images), filler=3)
+    template = HwpxTemplate(template_path)
+
+    output = os.path.join(directory, "check_output.hwpx")
+    counts = template.render(output, texts, images, tables)
+    expected_counts = {"{{현장명}}": 1, "{{날짜}}": 2, "{{부재표}}": 4}
+    expected_counts.update({name: 1 for name in texts if name.startswith("{{값")})
+    expected_counts.update({name: 1 for name in images})
+    assert counts == expected_counts, counts
+    print("  ok: placeholder counts (split runs, repeats, images, table rows)")
+
+    with zipfile.ZipFile(output) as archive:
+        infos = archive.infolist()
+        assert infos[0].filename == "mimetype" and infos[0].compress_type == zipfile.ZIP_STORED
+        assert archive.read("mimetype") == b"application/hwp+zip"
+        raw = archive.read("Contents/section0.xml")
+        root = ET.fromstring(raw)
+        manifest = ET.fromstring(archive.read("Contents/content.hpf")).find(f"{{{OPF}}}manifest")
+        items = {item.get("id"): item.get("href") for item in manifest}
+        names = set(archive.namelist())
+        converted = archive.read(items[root.findall(f".//{{{HC}}}img")[2].get("binaryItemIDRef")])
+    assert b"<hp:p " in raw and b"<hs:sec " in raw, "namespace prefixes changed"
+    text = "".join(node.text or "" for node in root.iter(f"{{{HP}}}t"))
+    assert "{{" not in text, text
+    assert "구조계산서 - OO 물류센터 증축공사" in text and "kN & <0>" in text
+    print("  ok: text placeholders replaced, prefixes and escaping preserved")
+
+    pictures = root.findall(f".//{{{HP}}}pic")
+    references = [picture.find(f"{{{HC}}}img").get("binaryItemIDRef") for picture in pictures]
+    assert len(pictures) == 4 and references[0] == references[3] and len(set(references)) == 3, references
+    assert "image1" not in references and all(items[ref] in names for ref in references), items
+    assert converted.startswith(b"\x89PNG"), "tiff was not converted"
+    width = int(pictures[2].find(f"{{{HP}}}sz").get("width"))
+    assert width == 120 * 75, width
+    print("  ok: images embedded once each in BinData and listed in content.hpf")
+
+    member_table = root.find(f".//{{{HP}}}tbl")
+    rows = member_table.findall(f"{{{HP}}}tr")
+    row_text = ["|".join("".join(cell.itertext()) for cell in row) for row in rows]
+    assert member_table.get("rowCnt") == "6" and len(rows) == 6, row_text
+    assert row_text[0] == "부재|단면|검토" and row_text[-1] == "합계||"
+    assert row_text[1:5] == ["|".join(values) for values in tables["{{부재표}}"]], row_text
+    addresses = [{cell.find(f"{{{HP}}}cellAddr").get("rowAddr") for cell in row} for row in rows]
+    assert addresses == [{str(index)} for index in range(6)], addresses
+    assert member_table.find(f"{{{HP}}}sz").get("height") == str(1500 * 6)
+    print("  ok: table rows appended with rowAddr/rowCnt/height updated")
+
+    empty_output = os.path.join(directory, "check_empty.hwpx")
+    assert template.render(empty_output, {}, {}, {"{{부재표}}": []}) == {"{{부재표}}": 0}
+    root = section_root(empty_output)
+    member_table = root.find(f".//{{{HP}}}tbl")
+    assert member_table.get("rowCnt") == "2" and "{{값1}}" in "".join(root.itertext())
+    print("  ok: template is reused unchanged between documents")
+
+    # MIDAS 가 내보내는 EMF: 변환기 없이, 또는 변환할 수 없으면 아무것도 쓰기 전에 거절하고,
+    # 변환되면 내용 해시 캐시의 PNG 를 넣는다.
+    emf_path = os.path.join(directory, "100.emf")
+    write_emf(emf_path, 400, 300, 20, seed=3)
+    emf_images = {"{{그림1}}": emf_path, "{{그림2}}": (emf_path, (200, 150))}
+    converter = EmfConverter(os.path.join(directory, "emf_cache"), workers=1)
+    emf_output = os.path.join(directory, "check_emf.hwpx")
+    for emf in (None, converter):
+        if emf is not None and hasattr(Image.core, "drawwmf"):
+            continue
+        try:
+            template.render(emf_output, {}, emf_images, {}, emf=emf)
+        except ValueError as e:
+            assert "100.emf" in str(e), e
+        else:
+            raise AssertionError("EMF was not rejected")
+        assert not os.path.exists(emf_output)
+    if not hasattr(Image.core, "drawwmf"):
+        WmfImagePlugin.register_handler(PolylineHandler())
+    counts = template.render(emf_output, {}, emf_images, {}, emf=converter)
+    assert counts["{{그림1}}"] == 1 and counts["{{그림2}}"] == 1, counts
+    with zipfile.ZipFile(emf_output) as archive:
+        root = ET.fromstring(archive.read("Contents/section0.xml"))
+        pictures = root.findall(f".//{{{HP}}}pic")
+        parts = [name for name in archive.namelist() if name.startswith("BinData/") and name != "BinData/image1.png"]
+        assert len(parts) == 1 and archive.read(parts[0]).startswith(b"\x89PNG"), parts
+    assert [int(picture.find(f"{{{HP}}}sz").get("width")) for picture in pictures] == [400 * 75, 200 * 75]
+    print("  ok: EMF is converted through the EMF cache, or rejected before writing when it cannot be")
+
+    # 글자 파일은 COM 경로(hwp_placeholders.read_file_content)와 같게 읽는다: BOM, CP949, "년월"
+    files = {
+        "{{BOM}}": ("bom.txt", "\ufeff첫 줄\r\n둘째 줄\n".encode("utf-8")),
+        "{{CP949}}": ("cp949.txt", "현장 주소 ".encode("cp949")),
+        "{{년월}}": ("년월.txt", "2024년 05월".encode("utf-8")),
+    }
+    pairs = []
+    for name, (file_name, data) in files.items():
+        with open(os.path.join(directory, file_name), "wb") as file:
+            file.write(data)
+        pairs.append((name, os.path.join(directory, file_name)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        texts, _, _ = read_replacements(pairs)
+    assert texts == {"{{BOM}}": "첫 줄\n둘째 줄", "{{CP949}}": "현장 주소", "{{년월}}": "2024.05"}, texts
+    print("  ok: text files are decoded and normalised like the COM path")
+
+
+def com_table_rows(hwp, rows):
+    # COM 경로의 표 채우기: HWPyControl.add_table_row 로 한 행씩 늘리고 칸마다 InsertText + MoveRight
+    for values in rows:
+        hwp.HAction.GetDefault("TableInsertRowColumn", hwp.HParameterSet.HTableInsertLine.HSet)
+        hwp.HParameterSet.HTableInsertLine.Side = 3
+        hwp.HParameterSet.HTableInsertLine.Count = 1
+        hwp.HAction.Execute("TableInsertRowColumn", hwp.HParameterSet.HTableInsertLine.HSet)
+        for value in values:
+            insert_text_set = hwp.HParameterSet.HInsertText
+            hwp.HAction.GetDefault("InsertText", insert_text_set.HSet)
+            insert_text_set.Text = str(value)
+            hwp.HAction.Execute("InsertText", insert_text_set.HSet)
+            hwp.HAction.Run("MoveRight")
+
+
+def com_document(texts, images, tables, filler):
+    # 같은 보고서를 한글 COM 으로 채울 때의 호출 수 (user-042 PlaceholderEngine + 표 행)
+    body = [f"구조계산서 - {{{{현장명}}}}", "작성일: {{날짜}} / 검토: {{날짜}}"]
+    body += [f"항목 {name} 를 확인한다." for name in texts if name.startswith("{{값")]
+    body += [f"그림 {name} 끝" for name in images]
+    body += ["본문 하중 조합" for _ in range(filler)]
+    clipboard = FakeClipboard()
+    hwp = FakeHwp("\n".join(body), clipboard)
+    replacements = {name: (value, "text") for name, value in texts.items()}
+    replacements.update({name: (path, "image") for name, path in images.items()})
+    PlaceholderEngine(hwp, clipboard).fill(replacements)
+    for rows in tables.values():
+        com_table_rows(hwp, rows)
+    return hwp.com_calls, clipboard.writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HWPX writer benchmark (documents per minute)")
+    parser.add_argument("--documents", type=int, default=30)
+    parser.add_argument("--texts", type=int, default=30)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--filler", type=int, default=300, help="body paragraphs in the template")
+    parser.add_argument("--call-ms", type=float, default=2.0, help="modelled cost of one COM round trip")
+    parser.add_argument("--clipboard-ms", type=float, default=20.0, help="modelled cost of one confirmed clipboard write")
+    parser.add_argument("--open-save-s", type=float, default=6.0, help="modelled HWP Open + SaveAs HWP + SaveAs PDF")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check(directory)
+
+        texts, images, tables = make_inputs(directory, args.texts, args.images, args.rows, seed=2)
+        template_path = os.path.join(directory, "template.hwpx")
+        make_template(template_path, [name for name in texts if name.startswith("{{값")], list(images), args.filler)
+        started = time.perf_counter()
+        template = HwpxTemplate(template_path)
+        for index in range(args.documents):
+            template.render(os.path.join(directory, f"report_{index}.hwpx"), texts, images, tables)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(os.path.join(directory, "report_0.hwpx")) / 2**10
+
+        calls, writes = com_document(texts, images, tables, args.filler)
+        com_seconds = args.open_save_s + calls * args.call_ms / 1000 + writes * args.clipboard_ms / 1000
+        print(
+            f"{args.documents} documents: {len(texts)} text placeholders, {args.images} images, "
+            f"{args.rows} table rows, {args.filler} body paragraphs ({size:.0f} KB each)"
+        )
+        print(f"  HWPX writer (measured)     : {elapsed / args.documents * 1000:8.1f} ms/doc, {args.documents * 60 / elapsed:8.0f} docs/min")
+        print(
+            f"  HWP COM (modelled)         : {com_seconds * 1000:8.1f} ms/doc, {60 / com_seconds:8.1f} docs/min "
+            f"({calls} COM calls, {writes} clipboard writes, {args.open_save_s:g} s open/save)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import io
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from image_cache import DibCache, encode_dib
+
+
+def old_copy_image(image_path, size=None):
+    # 기존 HWPyControl._copy_image_to_clipboard 에서 클립보드에 넣기 전까지
+    img = Image.open(image_path)
+    if size:
+        img = img.resize(size, Image.Resampling.LANCZOS)
+    output = io.BytesIO()
+    img.convert("RGB").save(output, format="BMP")
+    data = output.getvalue()[14:]
+    output.close()
+    return data
+
+
+def make_images(directory, count, seed):
+    # MIDAS/Design+ 캡처처럼 큰 PNG. 흰 배경 위에 무작위 선과 글자 영역
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        width, height = rng.choice([(1920, 1080), (1600, 1200), (2400, 1600)])
+        image = Image.effect_noise((width // 8, height // 8), 40).resize((width, height)).convert("RGB")
+        if index % 3 == 0:
+            image = image.convert("RGBA")
+        path = os.path.join(directory, f"capture_{index + 1}.png")
+        image.save(path)
+        paths.append(path)
+    return paths
+
+
+def check(directory):
+    paths = make_images(directory, 3, seed=1)
+    palette = os.path.join(directory, "palette.gif")
+    Image.open(paths[0]).convert("P").save(palette)
+    paths.append(palette)
+    for path in paths:
+        for size in (None, (640, 360)):
+            assert encode_dib(path, size) == old_copy_image(path, size), f"{path} {size}: DIB differs"
+    print(f"  ok: DIB bytes match the old encoder ({len(paths)} images, with and without resize)")
+
+    cache_dir = os.path.join(directory, "dib")
+    cache = DibCache(cache_dir, workers=2)
+    assert cache.prefetch([(path, (320, 240)) for path in paths] + [(paths[0], [320, 240])]) == []
+    assert len(cache.payloads) == len(paths)
+    assert cache.get(paths[1], (320, 240)) == old_copy_image(paths[1], (320, 240)) and cache.misses == 0
+    print("  ok: prefetch fills the cache, get() only hands over bytes")
+
+    reused = DibCache(cache_dir)
+    assert reused.prefetch([(path, (320, 240)) for path in paths]) == [] and reused.get(paths[2], (320, 240))
+    assert reused.hits == 1 and reused.misses == 0
+    print("  ok: a new run reuses payloads stored in cache_dir")
+
+    Image.new("RGB", (50, 50), "red").save(paths[1])
+    os.utime(paths[1], ns=(0, 10**9))
+    assert cache.get(paths[1], (320, 240)) == old_copy_image(paths[1], (320, 240)) and cache.misses == 1
+    print("  ok: a modified file is encoded again")
+
+    broken = os.path.join(directory, "broken.png")
+    with open(broken, "wb") as f:
+        f.write(b"not an image")
+    failed = DibCache(workers=2).prefetch([(broken, None), (paths[0], None)])
+    assert [path for path, _ in failed] == [broken], failed
+    print("  ok: one broken image does not stop the others")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prepared DIB cache benchmark")
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--documents", type=int, default=3, help="documents inserting every image")
+    parser.add_argument("--width", type=int, default=800)
+    parser.add_argument("--height", type=int, default=450)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        paths = make_images(directory, args.images, seed=2)
+        size = (args.width, args.height)
+        insertions = [(path, size) for _ in range(args.documents) for path in paths]
+
+        started = time.perf_counter()
+        for path, target in insertions:
+            old_copy_image(path, target)
+        old_total = time.perf_counter() - started
+
+        cache = DibCache(workers=args.workers)
+        started = time.perf_counter()
+        cache.prefetch(insertions)
+        prefetch = time.perf_counter() - started
+        started = time.perf_counter()
+        for path, target in insertions:
+            cache.get(path, target)
+        loop = time.perf_counter() - started
+
+        print(
+            f"{args.images} captures x {args.documents} documents, resized to {args.width}x{args.height}, "
+            f"{os.cpu_count()} CPU(s)"
+        )
+        print(f"  encode at every insertion        : {old_total:7.2f} s in the HWP loop ({old_total / len(insertions) * 1000:6.1f} ms/image)")
+        print(f"  DibCache prefetch (before HWP)   : {prefetch:7.2f} s")
+        print(f"  DibCache insertion loop          : {loop * 1000:7.2f} ms in the HWP loop ({loop / len(insertions) * 1e6:6.1f} us/image)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import customtkinter as ctk
+
+from log_sink import LogSink
+
+
+class DirectRedirect:
+    # 기존 RedirectText 방식: print 조각마다 insert + see("end")
+    def __init__(self, text_widget):
+        self.output = text_widget
+
+    def write(self, string):
+        self.output.insert("end", string)
+        self.output.see("end")
+
+    def flush(self):
+        pass
+
+
+def run(root, sink, total_lines, line):
+    original_stdout = sys.stdout
+    sys.stdout = sink
+    started = time.perf_counter()
+    try:
+        for i in range(total_lines):
+            print(f"{i:08d} {line}")
+            if i % 1000 == 0:
+                root.update()
+        if isinstance(sink, LogSink):
+            sink.flush_to_widget()
+        root.update()
+    finally:
+        sys.stdout = original_stdout
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log output throughput with the GUI attached")
+    parser.add_argument("--lines", type=int, default=100000)
+    parser.add_argument("--line-length", type=int, default=80)
+    args = parser.parse_args()
+
+    line = "x" * args.line_length
+    root = ctk.CTk()
+
+    for name in ("RedirectText", "LogSink"):
+        text_box = ctk.CTkTextbox(root, width=850, height=90)
+        text_box.pack()
+        if name == "LogSink":
+            sink = LogSink(text_box, log_path=os.path.join(tempfile.mkdtemp(), "bench.log"))
+        else:
+            sink = DirectRedirect(text_box)
+        elapsed = run(root, sink, args.lines, line)
+        if isinstance(sink, LogSink):
+            sink.close()
+        text_box.destroy()
+        print(f"{name:>12}: {args.lines} lines in {elapsed:.2f}s ({args.lines / elapsed:,.0f} lines/s)")
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
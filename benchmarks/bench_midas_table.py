@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from excel import ExcelProcessor
+from midas_table import parse_file
+
+HEADER = ["Elem", "Load", "Part", "Section", "Material", "Pu", "Mu", "Vu", "Ratio", "CHK"]
+# clean_decimal 이 따로 다루는 값: 대시, 빈 칸, 지수 표기, 정수가 되는 소수, 반올림 경계, nan/inf
+SPECIAL_VALUES = ["-", "", " ", "1e-05", "-2.5E+03", "1.23456e2", "3.0", "-0.0", "0.00005", "0.12345", "nan", "inf", "1,234"]
+
+clean_decimal = ExcelProcessor("unused.xlsm", "unused.xlsx").clean_decimal
+
+
+def number(rng, text):
+    # 대부분은 보통 숫자, 가끔 특수한 값
+    return rng.choice(SPECIAL_VALUES) if rng.random() < 0.05 else text
+
+
+def make_export(path, rows, encoding):
+    rng = random.Random(0)
+    with open(path, "w", encoding=encoding) as f:
+        f.write("\t".join(HEADER) + "\n")
+        for i in range(rows):
+            values = [
+                str(i + 1),
+                f"sLCB{rng.randint(1, 40)}",
+                rng.choice(["I", "J", "1/4", "2/4"]),
+                f"□-{rng.randint(50, 200)}x{rng.randint(50, 200)}x2.3",
+                rng.choice(["SS275", "일반구조용"]),
+                number(rng, f"{rng.uniform(-500, 500):.5f}"),
+                number(rng, repr(rng.uniform(-1e4, 1e4))),
+                number(rng, str(rng.randint(-200, 200))),
+                number(rng, f"{rng.random():.4f}"),
+                rng.choice(["OK", "NG", "만족", "-", ""]),
+            ]
+            f.write("\t".join(values) + "\n")
+
+
+def old_parse(path, encoding):
+    with open(path, "r", encoding=encoding) as f:
+        lines = f.readlines()
+    return [[clean_decimal(value) for value in line.strip().split("\t")] for line in lines[1:]]
+
+
+def new_parse(path):
+    return list(parse_file(path, header_rows=1).rows())
+
+
+def measure(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def assert_same(expected, result):
+    assert len(expected) == len(result), "row count differs"
+    for old_row, new_row in zip(expected, result):
+        assert repr(old_row) == repr(new_row), f"{old_row} != {new_row}"
+
+
+def check(temp_dir):
+    # 특수한 값만 모은 표: 각 값이 여러 열 위치에 오고, 끝이 빈 칸인 짧은 행과 빈 줄도 섞는다.
+    lines = ["\t".join(HEADER)]
+    for index, value in enumerate(SPECIAL_VALUES):
+        lines.append("\t".join([str(index), value, "만족", value, "", value]))
+        lines.append("\t".join([value, "-", value]))
+        lines.append(value)
+    lines.extend(["", "1\t\t\t", "\t2.50000\t-"])
+    for encoding in ("utf-8", "euc-kr"):
+        path = os.path.join(temp_dir, f"special_{encoding}.txt")
+        with open(path, "w", encoding=encoding) as f:
+            f.write("\n".join(lines) + "\n")
+        assert_same(old_parse(path, encoding), new_parse(path))
+    print(f"  ok: {len(SPECIAL_VALUES)} special values (dash, blank, exponent, rounding edge, nan/inf) match clean_decimal in utf-8 and euc-kr")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDAS table export parser benchmark")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        print("self-check")
+        check(temp_dir)
+        for encoding in ("utf-8", "euc-kr"):
+            path = os.path.join(temp_dir, f"export_{encoding}.txt")
+            make_export(path, args.rows, encoding)
+            size_mb = os.path.getsize(path) / 1024**2
+
+            expected, old_time = measure(old_parse, path, encoding)
+            result, new_time = measure(new_parse, path)
+            assert_same(expected, result)
+
+            print(f"{encoding}: {args.rows} rows, {size_mb:.1f} MB, same values as readlines + clean_decimal")
+            print(f"  readlines + clean_decimal: {old_time:8.3f} s")
+            print(f"  midas_table.parse_file   : {new_time:8.3f} s")
+            print(f"  speedup                  : {old_time / new_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
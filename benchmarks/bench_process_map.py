@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_map import build_process_map, find_pids_by_filepath
+
+MODEL_FILE = r"C:\Users\user\Desktop\프로젝트\태양광\[태양광]도성기1~5.mgb"
+
+
+class FakeProcess:
+    # psutil.Process 대역. cmdline() 한 번에 드는 시스템 호출 비용을 delay로 흉내낸다.
+    calls = 0
+
+    def __init__(self, pid, name, cmdline, delay):
+        self.info = {"pid": pid, "name": name}
+        self._cmdline = cmdline
+        self.delay = delay
+
+    def cmdline(self):
+        FakeProcess.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return self._cmdline
+
+    def exe(self):
+        return self._cmdline[0]
+
+
+def make_system(process_count, windows_per_process, delay):
+    processes = []
+    for pid in range(1000, 1000 + process_count):
+        processes.append(
+            FakeProcess(pid, f"proc{pid}.exe", [f"C:\\apps\\proc{pid}.exe", "--flag"], delay)
+        )
+    midas_pid = 1000 + process_count
+    processes.append(
+        FakeProcess(
+            midas_pid,
+            "MidasGen.exe",
+            ["C:\\Program Files\\MIDAS\\MODS\\Midas Gen\\MidasGen.exe", MODEL_FILE],
+            delay,
+        )
+    )
+    windows = []
+    hwnd = 0x10000
+    for process in processes:
+        for _ in range(windows_per_process):
+            windows.append((hwnd, process.info["pid"]))
+            hwnd += 1
+    random.shuffle(windows)
+    return processes, windows, midas_pid
+
+
+def per_window_lookup(processes, windows, file_path):
+    # 기존 방식: EnumWindows 콜백에서 창마다 psutil.Process(pid).cmdline()
+    by_pid = {p.info["pid"]: p for p in processes}
+    hwnds = []
+    for hwnd, pid in windows:
+        process = by_pid[pid]
+        if any(file_path.lower() in cmd.lower() for cmd in process.cmdline()):
+            hwnds.append(hwnd)
+    return hwnds
+
+
+def process_map_lookup(processes, windows, file_path):
+    pids = find_pids_by_filepath(build_process_map(processes=processes), file_path)
+    if not pids:
+        return []
+    return [hwnd for hwnd, pid in windows if pid in pids]
+
+
+def measure(func, processes, windows, repeat):
+    FakeProcess.calls = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(processes, windows, MODEL_FILE)
+    elapsed = (time.perf_counter() - started) / repeat
+    return result, elapsed, FakeProcess.calls / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MIDAS window lookup microbenchmark")
+    parser.add_argument("--processes", type=int, default=300)
+    parser.add_argument("--windows-per-process", type=int, default=3)
+    parser.add_argument("--cmdline-cost-us", type=float, default=50.0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    processes, windows, midas_pid = make_system(
+        args.processes, args.windows_per_process, args.cmdline_cost_us / 1e6
+    )
+    print(f"{len(processes)} processes, {len(windows)} windows")
+
+    baseline, old_time, old_calls = measure(per_window_lookup, processes, windows, args.repeat)
+    mapped, new_time, new_calls = measure(process_map_lookup, processes, windows, args.repeat)
+    assert sorted(baseline) == sorted(mapped), "lookup results differ"
+
+    print(f"  per-window cmdline: {old_time * 1000:8.2f} ms/probe, {old_calls:6.0f} cmdline calls")
+    print(f"  process map       : {new_time * 1000:8.2f} ms/probe, {new_calls:6.0f} cmdline calls")
+    print(f"  speedup           : {old_time / new_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
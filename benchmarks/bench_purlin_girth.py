@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from purlin_girth_extractor import SHEET_NAME, extract_batch, extract_decimals, extract_file
+
+COLUMN_COUNT = 55
+
+
+def old_extract(file_path):
+    # 기존 FileHandler.extract_purlin_girth_data: 시트 전체를 읽고 55개 열 이름을 붙인 뒤 셀마다 정규식
+    df = pd.read_excel(file_path, sheet_name=SHEET_NAME)
+    df = df.iloc[2:].reset_index(drop=True)
+    columns = [f"Unnamed: {i}" for i in range(COLUMN_COUNT)]
+    columns[14], columns[53] = "Span", "Deflection"
+    df.columns = columns
+    df["Deflection"] = df["Deflection"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
+    df["Ratio"] = df["Unnamed: 54"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
+    df["Calculated Span/300"] = (df["Span"] * 1000 / 300).round(2)
+    return df[["Deflection", "Calculated Span/300", "Ratio"]].dropna()
+
+
+def odd_value(rng):
+    return rng.choice([None, "N/A", "-", 12, -2.5, 1.5e-05, 5e-05, 3.0, "L/300=20.000", "0.9 / 1.0", True, "#DIV/0!"])
+
+
+def make_export(path, rows, seed, odd=0.05):
+    # Design+ "Purlin _ Girth" 시트: 제목 한 줄, 부제목 두 줄, 이후 55열짜리 부재 행
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = SHEET_NAME
+    wb.create_sheet("Summary").append(["other sheet"])
+    header = ["CHK", "CHK", "Apply Member To", "Material", "Member Type", "Section"] + [None] * (COLUMN_COUNT - 6)
+    header[14], header[17], header[53] = "Span", "Unbraced Length", "Deflection"
+    sheet.append(header)
+    sheet.append(["", "", "", "", "", ""] + [None] * 8 + [None, "(m)"] + [None] * (COLUMN_COUNT - 16))
+    sheet.append([None] * 20 + ["kN/m"] + [None] * (COLUMN_COUNT - 21))
+    sections = [f"C-{100 + 25 * i}x50x20x2.3" for i in range(8)]
+    for r in range(rows):
+        values = [None] * COLUMN_COUNT
+        values[0], values[1] = "OK", "□"
+        values[2] = f"P{r + 1}"
+        values[3] = "SS275"
+        values[4] = rng.choice(["Purlin", "Girth"])
+        values[5] = rng.choice(sections)
+        for column in range(6, 53):
+            if column % 4 == 0:
+                values[column] = round(rng.uniform(0, 100), 3)
+            elif column % 7 == 0:
+                values[column] = rng.choice(["OK", "NG", "-"])
+        values[14] = rng.choice([6.0, 7.5, 8.0, 9.25, 4.125])
+        deflection = round(rng.uniform(1, 40), 3)
+        values[53] = rng.choice([f"{deflection:.3f}", f"{deflection:.3f} < 30.000", deflection])
+        ratio = round(rng.uniform(0.05, 1.2), 3)
+        values[54] = rng.choice([f"{ratio:.3f}", f"{ratio:.3f}(OK)", ratio])
+        if rng.random() < odd:
+            column = rng.choice([14, 53, 54])
+            # 기존 코드는 Span 에 글자가 하나라도 있으면 전체 추출이 실패하므로 비교용으로는 숫자/빈칸만 넣는다.
+            values[column] = rng.choice([None, 12, 3.0, 7.25]) if column == 14 else odd_value(rng)
+        sheet.append(values)
+    wb.save(path)
+
+
+def check(directory):
+    rng = random.Random(5)
+    cases = [odd_value(rng) for _ in range(200)] + [round(rng.uniform(-1e3, 1e3), rng.randint(0, 6)) for _ in range(300)]
+    cases += [1e16 + 0.5, 1.5e17, -0.0001, 0.00012, 123456789012.5, float("nan"), "", " 7.25 mm", "x-3.75"]
+    expected = pd.Series(cases, dtype=object).astype(str).str.extract(r"(\d+\.\d+)")[0].astype(float).to_numpy()
+    assert np.array_equal(extract_decimals(cases), expected, equal_nan=True), "extract_decimals differs"
+    print(f"  ok: decimal extraction ({len(cases)} values)")
+
+    for seed, odd in ((1, 0.0), (2, 0.2), (3, 0.6)):
+        path = os.path.join(directory, f"check_{seed}.xlsx")
+        make_export(path, 300, seed, odd)
+        old = old_extract(path).to_string(index=False, header=False)
+        new = extract_file(path).to_string(index=False, header=False)
+        assert old == new, f"seed {seed}: extracted data differs"
+        print(f"  ok: export seed {seed} ({len(new.splitlines())} members)")
+
+    path = os.path.join(directory, "check_text_span.xlsx")
+    make_export(path, 50, 4)
+    wb = openpyxl.load_workbook(path)
+    wb[SHEET_NAME]["O10"] = "-"
+    wb.save(path)
+    assert len(extract_file(path)) == 49, "a text Span should only drop that member"
+    print("  ok: text Span drops one member instead of failing the file")
+
+    output = os.path.join(directory, "batch.xlsx")
+    results = extract_batch([directory], output, workers=2)
+    rows = list(openpyxl.load_workbook(output).active.iter_rows(values_only=True))
+    expected_rows = sum(len(df) for _, df, error in results)
+    assert len(rows) - 1 == expected_rows and all(error is None for _, _, error in results)
+    assert rows[0] == ("File", "Deflection", "Calculated Span/300", "Ratio")
+    print(f"  ok: consolidated batch output ({expected_rows} members)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purlin/girth extraction benchmark")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check_dir = os.path.join(directory, "check")
+        os.makedirs(check_dir)
+        check(check_dir)
+
+        export_dir = os.path.join(directory, "exports")
+        os.makedirs(export_dir)
+        paths = []
+        for index in range(args.files):
+            path = os.path.join(export_dir, f"design_{index + 1}.xlsx")
+            make_export(path, args.rows, seed=100 + index)
+            paths.append(path)
+        print(f"{args.files} Design+ exports x {args.rows} members x {COLUMN_COUNT} columns")
+
+        started = time.perf_counter()
+        old = old_extract(paths[0])
+        old_single = time.perf_counter() - started
+        started = time.perf_counter()
+        new = extract_file(paths[0])
+        new_single = time.perf_counter() - started
+        assert old.to_string(index=False, header=False) == new.to_string(index=False, header=False)
+
+        started = time.perf_counter()
+        for path in paths:
+            old_extract(path)
+        old_batch = time.perf_counter() - started
+        started = time.perf_counter()
+        extract_batch([export_dir], os.path.join(directory, "result.xlsx"), args.workers)
+        new_batch = time.perf_counter() - started
+
+        print(f"  one file   read_excel + str.extract : {old_single:7.2f} s")
+        print(f"  one file   extract_file             : {new_single:7.2f} s")
+        print(f"  {args.files} files    sequential read_excel    : {old_batch:7.2f} s")
+        print(f"  {args.files} files    extract_batch (pool)     : {new_batch:7.2f} s (one consolidated file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from openpyxl.styles import Border, Font, Side
+
+from sheet_extent import SheetExtent, last_data_row
+
+
+def scan_last_row(sheet):
+    # 기존 ExcelProcessor.get_last_row. 빈 행마다 sheet.max_column 이 전체 셀을 다시 훑는다.
+    last_row = sheet.max_row
+    while last_row > 0 and all(
+        sheet.cell(row=last_row, column=col).value is None
+        for col in range(1, sheet.max_column + 1)
+    ):
+        last_row -= 1
+    return last_row
+
+
+def make_template(data_rows, formatted_rows, columns, data_gap=0):
+    # data_rows 행에 값이 있고, 그 아래 formatted_rows 행은 서식만 있는 빈 셀인 템플릿
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    thin = Side(style="thin")
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    font = Font(name="맑은 고딕", size=9)
+    for row in range(1, data_rows + formatted_rows + 1):
+        for col in range(1, columns + 1):
+            cell = sheet.cell(row=row, column=col)
+            cell.border = border
+            cell.font = font
+            if row <= data_rows and (data_gap == 0 or row % data_gap):
+                cell.value = row * col
+    return wb, sheet
+
+
+CASES = [
+    ("empty sheet", 0, 0, 1, 0),
+    ("formatted only", 0, 2000, 10, 0),
+    ("data, no formatted tail", 500, 0, 10, 0),
+    ("data + formatted tail", 500, 2000, 10, 0),
+    ("sparse data + tail", 500, 2000, 10, 7),
+]
+
+
+def check():
+    for name, data_rows, formatted_rows, columns, gap in CASES:
+        _, expected_sheet = make_template(data_rows, formatted_rows, columns, gap)
+        _, sheet = make_template(data_rows, formatted_rows, columns, gap)
+        expected = scan_last_row(expected_sheet)
+        assert last_data_row(sheet) == expected, f"{name}: {last_data_row(sheet)} != {expected}"
+
+        extent = SheetExtent(sheet)
+        sheet.cell(row=extent.next_row, column=2, value="added")
+        extent.include(extent.next_row, 2)
+        assert extent.last_row == scan_last_row(sheet), f"{name}: tracked extent is stale"
+        print(f"  ok: {name} (last row {expected})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sheet last-row lookup benchmark")
+    parser.add_argument("--data-rows", type=int, default=1000)
+    parser.add_argument("--formatted-rows", type=int, default=3000)
+    parser.add_argument("--columns", type=int, default=15)
+    args = parser.parse_args()
+
+    print("self-check")
+    check()
+
+    _, old_sheet = make_template(args.data_rows, args.formatted_rows, args.columns)
+    _, new_sheet = make_template(args.data_rows, args.formatted_rows, args.columns)
+    print(f"{args.data_rows} data rows + {args.formatted_rows} formatted empty rows x {args.columns} columns")
+
+    started = time.perf_counter()
+    expected = scan_last_row(old_sheet)
+    old_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = last_data_row(new_sheet)
+    new_time = time.perf_counter() - started
+
+    extent = SheetExtent(new_sheet)
+    started = time.perf_counter()
+    for _ in range(1000):
+        tracked = extent.last_row
+    tracked_time = (time.perf_counter() - started) / 1000
+
+    assert expected == result == tracked
+    print(f"  get_last_row scan  : {old_time * 1000:10.2f} ms")
+    print(f"  last_data_row pass : {new_time * 1000:10.2f} ms")
+    print(f"  SheetExtent lookup : {tracked_time * 1e6:10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from openpyxl.styles import Font
+
+from midas_table import parse_lines
+from sheet_writer import write_table
+
+COLUMNS = 10
+
+
+def clean_decimal(value):
+    # ExcelProcessor.clean_decimal 과 같은 규칙
+    try:
+        value = str(value)
+        float_value = float(value)
+        if float_value.is_integer():
+            return int(float_value)
+        return float(f"{float_value:.4f}".rstrip("0").rstrip("."))
+    except ValueError:
+        return value
+
+
+def make_lines(cells):
+    random.seed(0)
+    lines = []
+    for i in range(cells // COLUMNS):
+        values = [
+            str(i + 1),
+            f"sLCB{random.randint(1, 40)}",
+            random.choice(["I", "J", "#N/A", "=1+1"]),
+            f"□-{random.randint(50, 200)}x{random.randint(50, 200)}x2.3",
+            f"{random.uniform(-500, 500):.5f}",
+            repr(random.uniform(-1e4, 1e4)),
+            str(random.randint(-200, 200)),
+            f"{random.random():.4f}",
+            random.choice(["", "nan", "1e3"]),
+            random.choice(["OK", "NG"]),
+        ]
+        lines.append("\t".join(values) + "\n")
+    return lines
+
+
+def make_template(rows):
+    # 서식만 있는 셀이 있는 템플릿. 값을 쓸 때 서식이 남아야 한다.
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    bold = Font(bold=True)
+    for row in range(1, rows + 1, 7):
+        sheet.cell(row=row, column=3).font = bold
+    return wb, sheet
+
+
+def old_write(sheet, lines, start_row):
+    for row_idx, line in enumerate(lines, start=start_row):
+        values = line.strip().split("\t")
+        for col_idx, value in enumerate(values, start=1):
+            sheet.cell(row=row_idx, column=col_idx, value=clean_decimal(value))
+
+
+def new_write(sheet, lines, start_row):
+    write_table(sheet, parse_lines(lines, header_rows=0), start_row)
+
+
+def snapshot(sheet):
+    return {
+        key: (repr(cell._value), cell.data_type, cell.style_id)
+        for key, cell in sheet._cells.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk sheet population benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000, 100000, 500000])
+    parser.add_argument("--start-row", type=int, default=3)
+    args = parser.parse_args()
+
+    for cells in args.sizes:
+        lines = make_lines(cells)
+        rows = len(lines) + args.start_row
+
+        _, old_sheet = make_template(rows)
+        started = time.perf_counter()
+        old_write(old_sheet, lines, args.start_row)
+        old_time = time.perf_counter() - started
+
+        _, new_sheet = make_template(rows)
+        started = time.perf_counter()
+        new_write(new_sheet, lines, args.start_row)
+        new_time = time.perf_counter() - started
+
+        assert snapshot(old_sheet) == snapshot(new_sheet), "written cells differ"
+        assert old_sheet.max_row == new_sheet.max_row
+
+        written = len(lines) * COLUMNS
+        print(f"{written} cells")
+        print(f"  clean_decimal + sheet.cell: {written / old_time:12,.0f} cells/s ({old_time:.3f} s)")
+        print(f"  parse_lines + write_table : {written / new_time:12,.0f} cells/s ({new_time:.3f} s)")
+        print(f"  speedup                   : {old_time / new_time:12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
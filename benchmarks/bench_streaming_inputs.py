@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import random
+import argparse
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+
+import sheet_writer
+
+from excel import ExcelProcessor
+from midas_table import iter_line_tables, parse_lines
+from sheet_writer import write_table
+
+HEADER = ["Elem", "Load", "Part", "Pu", "Mc", "Vu", "Ratio", "Check", "Section", "Material"]
+
+
+def write_export(path, size_bytes, seed=1, edge_cases=False):
+    # MIDAS data_2.txt 와 같은 모양(Pu 열 포함)의 탭 구분 파일을 size_bytes 만큼 만든다.
+    rng = random.Random(seed)
+    loads = [f"sLCB{i}" for i in range(1, 30)]
+    sections = [f"□-{100 + i}x{100 + i}x3.2" for i in range(40)]
+    written = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("\t".join(HEADER) + "\n")
+        elem = 0
+        while written < size_bytes:
+            elem += 1
+            values = [
+                str(elem),
+                rng.choice(loads),
+                rng.choice(["I", "J"]),
+                f"{rng.uniform(-300, 300):.4f}",
+                f"{rng.uniform(-80, 80):.5f}",
+                f"{rng.uniform(-40, 40):.3f}",
+                f"{rng.uniform(0, 1.2):.6f}",
+                rng.choice(["OK", "NG"]),
+                rng.choice(sections),
+                "SS275",
+            ]
+            if edge_cases and elem % 97 == 0:
+                values = values[: rng.randint(1, 5)]
+            line = "\t".join(values) + ("\r\n" if edge_cases and elem % 13 == 0 else "\n")
+            if edge_cases and elem % 101 == 0:
+                line = "\n"
+            f.write(line)
+            written += len(line)
+
+
+def old_modify_data2(path):
+    # 기존 ExcelProcessor.modify_data2: 파일 전체를 readlines() 하고 이어붙인 줄 목록을 새로 만든다.
+    with open(path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+    if not lines:
+        return []
+    header = lines[0].strip().split("\t")
+    if "Pu" not in header:
+        return lines
+    pu_index = header.index("Pu")
+    header.insert(pu_index + 1, header[pu_index])
+    modified_data = ["\t".join(header)]
+    for line in lines[1:]:
+        values = line.strip().split("\t")
+        if len(values) > pu_index:
+            values.insert(pu_index + 1, values[pu_index])
+        modified_data.append("\t".join(values))
+    return modified_data
+
+
+def old_process(path, sheet, start_row):
+    # 기존 process_data_list: 전체 목록을 한 번에 변환해서 쓴다.
+    table = parse_lines(old_modify_data2(path), header_rows=0)
+    return write_table(sheet, table, start_row)
+
+
+def new_process(path, sheet, start_row):
+    processor = ExcelProcessor("unused.xlsm", "unused.xlsx")
+    return processor.write_tables(processor.modify_data2(path), sheet, start_row)
+
+
+class DiscardingCells(dict):
+    # 셀을 보관하지 않는 셀 저장소. 시트 셀이 차지하는 메모리를 빼고 읽기/변환 경로만 잰다.
+    def __setitem__(self, key, value):
+        pass
+
+
+class DiscardingSheet:
+    title = "code"
+
+    def __init__(self):
+        self._cells = DiscardingCells()
+        self._current_row = 0
+
+
+def peak_rss_mb():
+    # ru_maxrss 는 리눅스에서 exec 뒤에도 부모 프로세스 값을 이어받으므로 VmHWM 을 읽는다.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    import psutil
+
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 2**20
+
+
+def run_child(mode, path):
+    # 200 MB 는 시트 한 장(1,048,576 행)보다 많다. 셀을 버리는 측정용 시트이므로 행 한도만 푼다.
+    sheet_writer.MAX_ROW = sys.maxsize
+    sheet = DiscardingSheet()
+    started = time.perf_counter()
+    last_row = (old_process if mode == "old" else new_process)(path, sheet, 3)
+    elapsed = time.perf_counter() - started
+    print(f"{last_row} {elapsed:.3f} {peak_rss_mb():.1f}")
+
+
+def measure(mode, path):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--path", path],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return int(output[0]), float(output[1]), float(output[2])
+
+
+def sheet_cells(sheet):
+    return {key: (cell._value, cell.data_type) for key, cell in sheet._cells.items()}
+
+
+def check(directory):
+    cases = [
+        ("edge cases", lambda path: write_export(path, 300_000, seed=3, edge_cases=True)),
+        ("no Pu column", lambda path: open(path, "w", encoding="utf-8").write("A\tB\n1\t2\n\n3\n")),
+        ("empty file", lambda path: open(path, "w", encoding="utf-8").close()),
+    ]
+    for name, make in cases:
+        path = os.path.join(directory, "check.txt")
+        make(path)
+        old_sheet = openpyxl.Workbook().active
+        new_sheet = openpyxl.Workbook().active
+        old_last = old_process(path, old_sheet, 3)
+        processor = ExcelProcessor("unused.xlsm", "unused.xlsx")
+        new_last = processor.write_tables(processor.modify_data2(path), new_sheet, 3)
+        assert old_last == new_last, f"{name}: last row {new_last} != {old_last}"
+        assert sheet_cells(old_sheet) == sheet_cells(new_sheet), f"{name}: sheet cells differ"
+        print(f"  ok: {name} ({len(new_sheet._cells)} cells)")
+
+    # 조각 경계가 행 중간에 오지 않는지: 아주 작은 조각으로 나눠도 결과가 같아야 한다.
+    path = os.path.join(directory, "check.txt")
+    write_export(path, 50_000, seed=4, edge_cases=True)
+    old_sheet = openpyxl.Workbook().active
+    new_sheet = openpyxl.Workbook().active
+    old_process(path, old_sheet, 3)
+    processor = ExcelProcessor("unused.xlsm", "unused.xlsx")
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    header = lines[0].strip().split("\t")
+    tables = (table.duplicate_column(header.index("Pu")) for table in iter_line_tables(lines, chunk_rows=7))
+    processor.write_tables(tables, new_sheet, 3)
+    assert sheet_cells(old_sheet) == sheet_cells(new_sheet), "small chunks: sheet cells differ"
+    print("  ok: chunk boundaries")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming MIDAS input benchmark (peak RSS)")
+    parser.add_argument("--size-mb", type=float, default=200)
+    parser.add_argument("--child", choices=["old", "new"])
+    parser.add_argument("--path")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check(directory)
+
+        path = os.path.join(directory, "data_2.txt")
+        write_export(path, int(args.size_mb * 2**20))
+        size = os.path.getsize(path) / 2**20
+        print(f"{size:.0f} MB export, measured in separate processes (sheet cells are discarded)")
+        results = {mode: measure(mode, path) for mode in ("old", "new")}
+        assert results["old"][0] == results["new"][0], "row counts differ"
+        for mode, label in (("old", "readlines + list"), ("new", "streaming chunks")):
+            rows, elapsed, peak = results[mode]
+            print(f"  {label:17s}: {elapsed:7.2f} s, peak RSS {peak:8.1f} MB ({rows - 2} rows)")
+
+
+if __name__ == "__main__":
+    main()
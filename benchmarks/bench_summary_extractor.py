@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import random
+import zipfile
+import argparse
+import datetime
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import openpyxl
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+from summary_extractor import EMPTY_ROWS_TO_STOP, read_columns, write_summary
+
+SUMMARY_SHEET = "종합"
+SUMMARY_COLUMNS = (1, 2, 3, 8)
+
+# Excel 이 다시 계산해서 저장한 종합 시트처럼 수식과 캐시된 값이 함께 있는 시트 XML
+FORMULA_SHEET = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:J9"/>
+<sheetData>
+<row r="1"><c r="A1"><f>code!A3</f><v>1</v></c><c r="B1" t="str"><f>VLOOKUP(A1,code!A:G,3,FALSE)</f><v>H-100x100</v></c><c r="C1"><f>ROUND(1/3,4)</f><v>0.3333</v></c><c r="H1" t="str"><f>IF(C1&gt;1,"NG","OK")</f><v>OK</v></c></row>
+<row r="2"><c r="A2" t="str"><f>IF(code!A4="","",code!A4)</f><v></v></c><c r="B2" t="str"><f>""</f><v/></c><c r="H2" t="e"><f>NA()</f><v>#N/A</v></c></row>
+<row r="3"><c r="A3" t="b"><f>TRUE</f><v>1</v></c><c r="B3" t="inlineStr"><is><t>inline</t></is></c><c r="C3"><v>1.5E-3</v></c><c r="J3"><v>9</v></c></row>
+<row r="5"><c r="D5"><v>4</v></c></row>
+<row r="6"><c t="s"><v>0</v></c><c><v>7</v></c><c t="s"><v>1</v></c></row>
+<row r="7"><c r="A7" s="1"><v>45000.5</v></c><c r="H7" t="d"><v>2024-01-02T03:04:05</v></c></row>
+<row r="9"><c r="A9" t="e"><v>#DIV/0!</v></c></row>
+</sheetData>
+<mergeCells count="1"><mergeCell ref="D1:E1"/></mergeCells>
+</worksheet>
+"""
+
+
+# Excel 이 쓰는 공유 문자열 (openpyxl 은 inlineStr 로 쓰므로 직접 넣는다)
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="3" uniqueCount="3">
+<si><t>□-150x150x4.5</t></si>
+<si><r><t>N</t></r><r><rPr><b/></rPr><t>G</t></r><rPh sb="0" eb="1"><t>ignored</t></rPh></si>
+<si><t xml:space="preserve"> unused </t></si>
+</sst>
+"""
+STRINGS_REL = (
+    '<Relationship Id="rIdStrings" Target="sharedStrings.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>'
+)
+STRINGS_TYPE = (
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+)
+
+
+def old_extract(path):
+    # 기존 recalculate_with_excel: 통합 문서 전체를 data_only 로 다시 불러와 종합 시트의 모든 행을 읽는다.
+    wb = openpyxl.load_workbook(path, data_only=True)
+    summary_sheet = wb[SUMMARY_SHEET]
+    columns = [column - 1 for column in SUMMARY_COLUMNS]
+    return [[row[index] for index in columns] for row in summary_sheet.iter_rows(values_only=True)]
+
+
+def table_rows(summary_rows):
+    # process_data 가 임시 엑셀로 넘기는 행
+    return [[v if v is not None else "" for v in row] for row in summary_rows if row[0] is not None]
+
+
+def old_process(path, output):
+    import pandas as pd
+
+    pd.DataFrame(table_rows(old_extract(path))).to_excel(output, index=False, header=False)
+
+
+def new_process(path, output):
+    write_summary(output, table_rows(read_columns(path, SUMMARY_SHEET, SUMMARY_COLUMNS)))
+
+
+def make_workbook(path, code_rows, summary_rows, formatted_rows, seed=1, epoch=None):
+    rng = random.Random(seed)
+    wb = openpyxl.Workbook()
+    if epoch is not None:
+        wb.epoch = epoch
+    code = wb.active
+    code.title = "code"
+    for r in range(1, code_rows + 1):
+        code.append([r, f"sLCB{rng.randint(1, 20)}", f"□-{rng.randint(100, 140)}", round(rng.uniform(-300, 300), 4),
+                     round(rng.uniform(-300, 300), 4), round(rng.uniform(0, 1.5), 4), rng.choice(["OK", "NG"]),
+                     "SS275", rng.random(), f"note {r}"])
+    summary = wb.create_sheet(SUMMARY_SHEET)
+    for r in range(1, summary_rows + 1):
+        if r % 53 == 0:
+            summary.cell(row=r, column=2, value="only B")
+            continue
+        summary.cell(row=r, column=1, value=r)
+        summary.cell(row=r, column=2, value=f"□-{rng.randint(100, 140)}x3.2")
+        summary.cell(row=r, column=3, value=round(rng.uniform(-300, 300), 2) if r % 7 else r * 10)
+        for column in range(4, 8):
+            summary.cell(row=r, column=column, value=rng.random())
+        summary.cell(row=r, column=8, value=rng.choice(["OK", "NG", True, None]))
+        if r % 97 == 0:
+            summary.cell(row=r, column=3, value=datetime.datetime(2024, 1, r % 28 + 1, 12, 30))
+        if r % 89 == 0:
+            summary.cell(row=r, column=8, value="#N/A")
+        summary.cell(row=r, column=12, value="outside")
+    for r in range(summary_rows + 1, summary_rows + formatted_rows + 1):
+        for column in SUMMARY_COLUMNS:
+            summary.cell(row=r, column=column).number_format = "0.00"
+    wb.save(path)
+
+
+def replace_parts(path, parts):
+    # parts: {zip 경로: 새 내용}. 없는 경로는 새로 넣는다.
+    with zipfile.ZipFile(path) as source:
+        items = [(info.filename, source.read(info.filename)) for info in source.infolist()]
+    names = [name for name, _ in items]
+    items = [(name, parts.get(name, content)) for name, content in items]
+    items += [(name, content) for name, content in parts.items() if name not in names]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as target:
+        for name, content in items:
+            target.writestr(name, content)
+
+
+def sheet_part(path):
+    wb = openpyxl.load_workbook(path, read_only=True)
+    index = wb.sheetnames.index(SUMMARY_SHEET) + 1
+    wb.close()
+    return f"xl/worksheets/sheet{index}.xml"
+
+
+def filled(rows):
+    return [row for row in rows if any(value is not None for value in row)]
+
+
+def check(directory):
+    path = os.path.join(directory, "check.xlsx")
+    cases = [
+        ("values written by openpyxl", {}),
+        ("1904 date system", {"epoch": CALENDAR_MAC_1904}),
+    ]
+    for name, options in cases:
+        make_workbook(path, 200, 1000, 300, **options)
+        expected = filled(old_extract(path))
+        assert read_columns(path, SUMMARY_SHEET, SUMMARY_COLUMNS) == expected, f"{name}: rows differ"
+        print(f"  ok: {name} ({len(expected)} rows)")
+
+    # 데이터 사이의 짧은 빈 구간은 건너뛰어 계속 읽고, 양식 아래 서식만 있는 행이 길게 이어지면 멈춘다.
+    make_workbook(path, 10, 100, 5000)
+    wb = openpyxl.load_workbook(path)
+    wb[SUMMARY_SHEET].cell(row=250, column=1, value="after gap")
+    wb[SUMMARY_SHEET].cell(row=5100, column=1, value="after formatted rows")
+    wb.save(path)
+    result = read_columns(path, SUMMARY_SHEET, SUMMARY_COLUMNS)
+    expected = filled(old_extract(path))
+    assert result == expected[:-1] and result[-1][0] == "after gap" and expected[-1][0] == "after formatted rows"
+    print(f"  ok: stops after {EMPTY_ROWS_TO_STOP} empty rows, reads past a shorter gap")
+
+    # 수식 + 캐시 값, 공유 문자열, inlineStr, 오류, 좌표(r) 없는 셀, 날짜 서식
+    make_workbook(path, 10, 10, 0)
+    wb = openpyxl.load_workbook(path)
+    wb["code"]["B1"].number_format = "yyyy-mm-dd hh:mm"
+    wb.save(path)
+    with zipfile.ZipFile(path) as archive:
+        rels = archive.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+        types = archive.read("[Content_Types].xml").decode("utf-8")
+    replace_parts(path, {
+        sheet_part(path): FORMULA_SHEET.encode("utf-8"),
+        "xl/sharedStrings.xml": SHARED_STRINGS.encode("utf-8"),
+        "xl/_rels/workbook.xml.rels": rels.replace("</Relationships>", STRINGS_REL + "</Relationships>").encode(),
+        "[Content_Types].xml": types.replace("</Types>", STRINGS_TYPE + "</Types>").encode(),
+    })
+    expected = filled(old_extract(path))
+    result = read_columns(path, SUMMARY_SHEET, SUMMARY_COLUMNS)
+    assert result == expected, f"formula cache rows differ:\n{result}\n{expected}"
+    assert result[3] == ["□-150x150x4.5", 7, "NG", None], result[3]
+    assert isinstance(result[4][0], datetime.datetime), result[4]
+    print(f"  ok: cached formula values ({len(expected)} rows)")
+
+    # 임시 엑셀: pandas to_excel 로 쓴 파일과 같은 셀 값이어야 한다.
+    make_workbook(path, 10, 500, 0)
+    old_output = os.path.join(directory, "old.xlsx")
+    new_output = os.path.join(directory, "new.xlsx")
+    old_process(path, old_output)
+    new_process(path, new_output)
+    old_values = list(openpyxl.load_workbook(old_output).active.iter_rows(values_only=True))
+    new_values = list(openpyxl.load_workbook(new_output).active.iter_rows(values_only=True))
+    assert old_values == new_values, "temporary Excel output differs"
+    print(f"  ok: temporary Excel output ({len(new_values)} rows)")
+
+
+def peak_rss_mb():
+    # ru_maxrss 는 리눅스에서 exec 뒤에도 부모 프로세스 값을 이어받으므로 VmHWM 을 읽는다.
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 2**10
+    except OSError:
+        pass
+    import psutil
+
+    info = psutil.Process().memory_info()
+    return getattr(info, "peak_wset", info.rss) / 2**20
+
+
+def run_child(mode, path, output):
+    started = time.perf_counter()
+    (old_process if mode == "old" else new_process)(path, output)
+    elapsed = time.perf_counter() - started
+    print(f"{elapsed:.3f} {peak_rss_mb():.1f}")
+
+
+def measure(mode, path, output):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", mode, "--path", path, "--output", output],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    return float(result[0]), float(result[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="종합 summary extraction benchmark")
+    parser.add_argument("--code-rows", type=int, default=50000)
+    parser.add_argument("--summary-rows", type=int, default=5200)
+    parser.add_argument("--formatted-rows", type=int, default=20000)
+    parser.add_argument("--child", choices=["old", "new"])
+    parser.add_argument("--path")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path, args.output)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("self-check")
+        check(directory)
+
+        path = os.path.join(directory, "calcurate_updated.xlsx")
+        make_workbook(path, args.code_rows, args.summary_rows, args.formatted_rows)
+        size = os.path.getsize(path) / 2**20
+        print(
+            f"{size:.1f} MB workbook: code {args.code_rows} rows, 종합 {args.summary_rows} rows"
+            f" + {args.formatted_rows} formatted rows (separate processes)"
+        )
+        for mode, label in (("old", "load_workbook + pandas"), ("new", "read_columns + write")):
+            elapsed, peak = measure(mode, path, os.path.join(directory, f"{mode}.xlsx"))
+            print(f"  {label:22s}: {elapsed:7.2f} s, peak RSS {peak:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
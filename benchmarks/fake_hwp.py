@@ -0,0 +1,448 @@
+import os
+import time
+from collections import Counter
+
+# 한글(HWPFrame.HwpObject) 자동화 객체 대역. 실제 한글 없이 문서 처리 코드를 돌려 보고
+# COM 왕복 횟수(속성 읽기/쓰기, 메서드 호출)를 센다. 문서는 본문 글자 하나와
+# 누름틀 필드 목록([이름, 글자], 문서 순서)으로 단순화한다.
+# 파일은 UTF-8 글자 파일로 열고 저장한다. 경로에 CRASH 가 들어간 파일을 열면 한글이 죽은 것처럼
+# 그 뒤의 모든 호출이 실패한다.
+CRASH = "crash"
+# InsertPicture 가 읽을 수 있는 그림 파일
+PICTURE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".emf", ".wmf")
+
+
+class FakeParameterSet:
+    # hwp.HParameterSet.HFindReplace 같은 매개변수 집합. 속성을 쓸 때마다 COM 호출 한 번이다.
+    def __init__(self, hwp, name):
+        object.__setattr__(self, "_hwp", hwp)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_values", {})
+
+    @property
+    def HSet(self):
+        self._hwp.count(f"{self._name}.HSet")
+        return self
+
+    def __setattr__(self, name, value):
+        self._hwp.count(f"{self._name}.{name}=")
+        self._values[name] = value
+
+    def __getattr__(self, name):
+        # 쓴 적 있는 속성을 읽을 때만 불린다 (_hwp 등 내부 속성은 __dict__ 에서 바로 찾는다).
+        if name in self._values:
+            self._hwp.count(f"{self._name}.{name}")
+            return self._values[name]
+        raise AttributeError(name)
+
+    def value(self, name, default=None):
+        return self._values.get(name, default)
+
+
+class FakeParameterSets:
+    def __init__(self, hwp):
+        self._hwp = hwp
+        self._sets = {}
+
+    def __getattr__(self, name):
+        if not name.startswith("H"):
+            raise AttributeError(name)
+        self._hwp.count(f"HParameterSet.{name}")
+        if name not in self._sets:
+            self._sets[name] = FakeParameterSet(self._hwp, name)
+        return self._sets[name]
+
+
+class FakeAction:
+    def __init__(self, hwp):
+        self._hwp = hwp
+
+    def GetDefault(self, action, parameter_set):
+        self._hwp.count(f"GetDefault({action})")
+
+    def Execute(self, action, parameter_set):
+        self._hwp.count(f"Execute({action})")
+        return self._hwp.run_action(action, parameter_set)
+
+    def Run(self, action):
+        self._hwp.count(f"Run({action})")
+        return self._hwp.run_action(action, None)
+
+
+class FakeClipboard:
+    # 시스템 클립보드 대역. 한글의 붙여넣기가 여기서 내용을 가져간다.
+    def __init__(self):
+        self.content = None
+        self.writes = 0
+
+    def set(self, content, content_type):
+        self.writes += 1
+        self.content = (content, content_type)
+
+    def load(self, content, content_type):
+        # PlaceholderEngine 이 쓰는 방식: 채운 뒤 준비됐는지 확인해서 돌려준다.
+        self.set(content, content_type)
+        return self.content == (content, content_type)
+
+
+class FakeHwp:
+    def __init__(self, text="", clipboard=None, fields=()):
+        self.text = text
+        self.fields = [[name, ""] for name in fields]
+        self.caret = 0
+        self.selection = None
+        self.clipboard = clipboard or FakeClipboard()
+        self.calls = Counter()
+        self.dead = False
+        self.quit = False
+        # SaveAs 형식별로 걸리는 시간(초). 한글의 PDF 내보내기는 HWP 저장보다 훨씬 느리다.
+        self.save_seconds = {}
+        # InsertPicture 로 넣은 그림: (경로, embedded, sizeoption, width, height)
+        self.pictures = []
+        self._action = FakeAction(self)
+        self._parameters = FakeParameterSets(self)
+
+    def count(self, name):
+        if self.dead or self.quit:
+            raise RuntimeError("The RPC server is unavailable.")
+        self.calls[name] += 1
+
+    @property
+    def com_calls(self):
+        return sum(self.calls.values())
+
+    @property
+    def HAction(self):
+        self.count("HAction")
+        return self._action
+
+    @property
+    def HParameterSet(self):
+        self.count("HParameterSet")
+        return self._parameters
+
+    def RegisterModule(self, name, module):
+        self.count("RegisterModule")
+        return True
+
+    def Open(self, path, file_format="", option=""):
+        self.count("Open")
+        if CRASH in path:
+            self.dead = True
+            raise RuntimeError("The RPC server is unavailable.")
+        with open(path, "r", encoding="utf-8") as f:
+            self.text = f.read()
+        # SaveAs 가 쓴 파일이면 첫 줄의 형식 이름을 뗀다.
+        first, _, rest = self.text.partition("\n")
+        if first in ["HWP", "HWPX"]:
+            self.text = rest
+        self.caret, self.selection = 0, None
+        return True
+
+    def SaveAs(self, path, file_format, option=""):
+        self.count("SaveAs")
+        time.sleep(self.save_seconds.get(file_format, 0))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"{file_format}\n{self.text}")
+        return True
+
+    def Clear(self, option):
+        self.count("Clear")
+        self.text, self.caret, self.selection = "", 0, None
+
+    def Quit(self):
+        self.count("Quit")
+        self.quit = True
+
+    def InsertPicture(self, path, embedded=True, sizeoption=0, reverse=False, watermark=False, effect=0, width=0, height=0):
+        # 한글처럼 없는 파일이나 읽을 수 없는 형식이면 None 을 돌려준다.
+        self.count("InsertPicture")
+        if not os.path.isfile(path) or not path.lower().endswith(PICTURE_EXTENSIONS):
+            return None
+        self.pictures.append((path, embedded, sizeoption, width, height))
+        self.insert(f"[picture:{os.path.basename(path)}]")
+        return object()
+
+    def MovePos(self, move_id, para=0, pos=0):
+        self.count(f"MovePos({move_id})")
+        if move_id == 2:
+            self.caret = 0
+        elif move_id == 3:
+            self.caret = len(self.text)
+        self.selection = None
+        return True
+
+    def GetTextFile(self, file_format, option):
+        self.count("GetTextFile")
+        return self.text
+
+    def GetFieldList(self, number, option):
+        self.count("GetFieldList")
+        seen = {}
+        names = []
+        for name, _ in self.fields:
+            index = seen[name] = seen.get(name, -1) + 1
+            names.append(f"{name}{{{{{index}}}}}" if number == 1 else name)
+        return "\x02".join(names)
+
+    def PutFieldText(self, names, values):
+        # 번호 없이 이름만 주면 그 이름의 필드를 모두 채운다.
+        self.count("PutFieldText")
+        values = dict(zip(names.split("\x02"), values.split("\x02")))
+        for field in self.fields:
+            if field[0] in values:
+                field[1] = values[field[0]]
+
+    def field_text(self):
+        return {name: text for name, text in self.fields}
+
+    def run_action(self, action, parameter_set):
+        if action == "RepeatFind":
+            return self.find(parameter_set.value("FindString", ""), parameter_set.value("Direction", 0))
+        if action == "MoveDocBegin":
+            self.caret, self.selection = 0, None
+            return True
+        if action == "InsertText":
+            return self.insert(parameter_set.value("Text", ""))
+        if action == "Delete":
+            return self.insert("")
+        if action == "Paste":
+            content, content_type = self.clipboard.content
+            return self.insert(content if content_type == "text" else f"[{content_type}:{content}]")
+        return True
+
+    def find(self, text, direction=0):
+        if not text:
+            return False
+        index = self.text.find(text, self.caret)
+        if index == -1:
+            return False
+        self.selection = (index, index + len(text))
+        self.caret = index + len(text)
+        return True
+
+    def insert(self, text):
+        start, end = self.selection or (self.caret, self.caret)
+        self.text = self.text[:start] + text + self.text[end:]
+        self.caret = start + len(text)
+        self.selection = None
+        return True
+
+
+def fake_dispatch(startup=0.0, save_seconds=None):
+    # hwp_service / export_queue 의 dispatch 대역. startup 초 동안 한글이 뜨는 시간을 흉내 낸다.
+    time.sleep(startup)
+    hwp = FakeHwp()
+    hwp.save_seconds = dict(save_seconds or {})
+    return hwp
+
+
+def fake_clipboard(hwp):
+    return hwp.clipboard
+
+
+def column_letters(index):
+    # 0 -> "A", 25 -> "Z", 26 -> "AA"
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+class FakeTableProperties:
+    def __init__(self, hwp):
+        self._hwp = hwp
+
+    def Item(self, name):
+        self._hwp.count(f"Properties.Item({name})")
+        return {"RowCount": len(self._hwp.cells), "ColCount": self._hwp.columns}[name]
+
+
+class FakeTableControl:
+    def __init__(self, hwp):
+        self._hwp = hwp
+
+    @property
+    def Properties(self):
+        self._hwp.count("ParentCtrl.Properties")
+        return FakeTableProperties(self._hwp)
+
+
+class FakeTableHwp(FakeHwp):
+    # 본문(목록 0) 뒤에 병합 없는 표 하나가 있는 문서. 처음 셀의 목록 번호는 왼쪽 위부터 행 순서로
+    # 1, 2, ... 이지만, 행을 넣으면 새 셀은 기존 번호 뒤의 새 번호를 열 순서로 받는다.
+    # 한글도 새 셀의 번호가 행 순서로 이어진다는 보장이 없으므로, 번호를 계산해서 SetPos 하면 틀린다.
+    # 찾기와 MoveRight 는 본문, 셀(문서 순서) 순서로 이어서 간다. 셀 블록(TableCellBlock)을 연장한 채
+    # 셀을 옮기면 블록이 시작 셀과 현재 셀이 이루는 사각형으로 늘고, Delete 는 그 셀들의 글자를 지운다.
+    def __init__(self, body, cells):
+        self.list = 0
+        self.body = ""
+        self.cells = [list(row) for row in cells]
+        self.columns = len(self.cells[0])
+        self.ids = [[row * self.columns + column + 1 for column in range(self.columns)] for row in range(len(self.cells))]
+        self.next_id = len(self.cells) * self.columns + 1
+        # 셀 블록의 시작 셀 (행, 열). 연장 중이면 셀 이동이 블록을 늘린다.
+        self.cell_block = None
+        self.extend_block = False
+        super().__init__(body)
+
+    @property
+    def text(self):
+        if self.list == 0:
+            return self.body
+        row, column = self.cell()
+        return self.cells[row][column]
+
+    @text.setter
+    def text(self, value):
+        if self.list == 0:
+            self.body = value
+        else:
+            row, column = self.cell()
+            self.cells[row][column] = value
+
+    def cell(self):
+        for row, ids in enumerate(self.ids):
+            if self.list in ids:
+                return row, ids.index(self.list)
+        raise ValueError(f"no cell has list id {self.list}")
+
+    def lists(self):
+        # 문서 순서의 목록 번호: 본문, 셀(행 순서)
+        return [0] + [list_id for ids in self.ids for list_id in ids]
+
+    def next_list(self):
+        # 문서 순서로 다음 목록. 마지막이면 None
+        lists = self.lists()
+        index = lists.index(self.list) + 1
+        return lists[index] if index < len(lists) else None
+
+    def move_to_cell(self, row, column):
+        self.list, self.caret, self.selection = self.ids[row][column], 0, None
+        return True
+
+    def MovePos(self, move_id, para=0, pos=0):
+        if move_id == 2:
+            self.list = 0
+        return super().MovePos(move_id, para, pos)
+
+    def GetPos(self):
+        self.count("GetPos")
+        return self.list, 0, self.caret
+
+    def SetPos(self, list_id, para, pos):
+        self.count("SetPos")
+        if list_id not in self.lists():
+            return False
+        self.list = list_id
+        self.caret = min(pos, len(self.text))
+        self.selection = None
+        self.cell_block, self.extend_block = None, False
+        return True
+
+    def KeyIndicator(self):
+        self.count("KeyIndicator")
+        address = ""
+        if self.list:
+            row, column = self.cell()
+            address = f"({column_letters(column)}{row + 1}): 문자 입력"
+        return True, 1, 1, 1, 1, 1, 1, 0, address
+
+    @property
+    def ParentCtrl(self):
+        self.count("ParentCtrl")
+        return FakeTableControl(self) if self.list else None
+
+    def GetTextFile(self, file_format, option):
+        self.count("GetTextFile")
+        return "\n".join([self.body] + ["\t".join(row) for row in self.cells])
+
+    def SaveAs(self, path, file_format, option=""):
+        # 현재 목록이 아니라 본문과 표 전체를 저장한다.
+        self.count("SaveAs")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join([file_format, self.body] + ["\t".join(row) for row in self.cells]))
+        return True
+
+    def run_action(self, action, parameter_set):
+        if action == "MoveDocBegin":
+            self.list = 0
+        if action == "MoveRight":
+            # 셀 끝에서 오른쪽으로 가면 다음 셀(행 끝이면 다음 행 첫 셀)로 간다.
+            following = self.next_list()
+            if self.caret < len(self.text):
+                self.caret += 1
+            elif self.list and following is not None:
+                self.list, self.caret = following, 0
+            self.selection = None
+            return True
+        if action in ("TableRightCell", "TableLowerCell", "TableColEnd", "TableRowEnd"):
+            # 셀 이동은 표 밖에서는 아무것도 하지 않고, 표 끝에서는 제자리에 있다.
+            if not self.list:
+                return False
+            row, column = self.cell()
+            if action == "TableRightCell":
+                row, column = (row, column + 1) if column + 1 < self.columns else (row + 1, 0)
+            elif action == "TableLowerCell":
+                row += 1
+            elif action == "TableColEnd":
+                row = len(self.cells) - 1
+            else:
+                column = self.columns - 1
+            if row >= len(self.cells):
+                return False
+            if self.cell_block is not None and not self.extend_block:
+                self.cell_block = None
+            return self.move_to_cell(row, column)
+        if action == "TableCellBlock":
+            self.cell_block = self.cell() if self.list else None
+            return self.cell_block is not None
+        if action == "TableCellBlockExtend":
+            self.extend_block = self.cell_block is not None
+            return self.extend_block
+        if action == "Delete" and self.cell_block is not None:
+            # 셀 블록에서 지우기: 블록(시작 셀과 현재 셀이 이루는 사각형)의 셀 글자를 모두 지운다.
+            (first_row, first_column), (last_row, last_column) = self.cell_block, self.cell()
+            for row in range(min(first_row, last_row), max(first_row, last_row) + 1):
+                for column in range(min(first_column, last_column), max(first_column, last_column) + 1):
+                    self.cells[row][column] = ""
+            self.caret, self.selection = 0, None
+            return True
+        if action == "Cancel":
+            self.cell_block, self.extend_block = None, False
+            return True
+        if action == "TableInsertRowColumn":
+            row, _ = self.cell()
+            count = parameter_set.value("Count", 1)
+            if parameter_set.value("Side") != 3:
+                raise NotImplementedError("only Side=3 (below) is modelled")
+            ids = [[0] * self.columns for _ in range(count)]
+            for column in range(self.columns):
+                for inserted in ids:
+                    inserted[column] = self.next_id
+                    self.next_id += 1
+            self.cells[row + 1:row + 1] = [[""] * self.columns for _ in range(count)]
+            self.ids[row + 1:row + 1] = ids
+            return True
+        return super().run_action(action, parameter_set)
+
+    def find(self, text, direction=0):
+        # 현재 목록의 커서 뒤부터, 다음 목록들 순서로 찾는다.
+        if not text:
+            return False
+        origin = self.list, self.caret
+        start = self.caret
+        while True:
+            index = self.text.find(text, start)
+            if index != -1:
+                self.selection = (index, index + len(text))
+                self.caret = index + len(text)
+                return True
+            following = self.next_list()
+            if following is None:
+                # 못 찾으면 커서는 그대로다.
+                self.list, self.caret = origin
+                return False
+            self.list, start = following, 0
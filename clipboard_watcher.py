@@ -0,0 +1,94 @@
+import time
+import ctypes
+import win32clipboard
+
+kernel32 = ctypes.windll.kernel32
+kernel32.GlobalLock.restype = ctypes.c_void_p
+kernel32.GlobalLock.argtypes = [ctypes.c_void_p]
+kernel32.GlobalUnlock.argtypes = [ctypes.c_void_p]
+kernel32.GlobalSize.restype = ctypes.c_size_t
+kernel32.GlobalSize.argtypes = [ctypes.c_void_p]
+
+
+class ClipboardWatcher:
+    # 클립보드를 비우고 다시 읽는 대신 시퀀스 번호가 바뀌기를 기다린다.
+    def __init__(self, timeout=10.0, poll_interval=0.05, open_timeout=2.0, chunk_chars=1024 * 1024):
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.open_timeout = open_timeout
+        self.chunk_chars = chunk_chars
+        self.sequence = None
+
+    def arm(self):
+        self.sequence = win32clipboard.GetClipboardSequenceNumber()
+        return self.sequence
+
+    def has_changed(self):
+        return win32clipboard.GetClipboardSequenceNumber() != self.sequence
+
+    def wait_for_change(self, timeout=None):
+        deadline = time.time() + (self.timeout if timeout is None else timeout)
+        while not self.has_changed():
+            if time.time() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        self.sequence = win32clipboard.GetClipboardSequenceNumber()
+        return True
+
+    def _open(self):
+        # 다른 프로그램이 클립보드를 잡고 있을 수 있으므로 잠시 재시도한다.
+        deadline = time.time() + self.open_timeout
+        while True:
+            try:
+                win32clipboard.OpenClipboard()
+                return
+            except Exception:
+                if time.time() >= deadline:
+                    raise
+                time.sleep(self.poll_interval)
+
+    def read_text(self):
+        self._open()
+        try:
+            if not win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
+                return ""
+            return win32clipboard.GetClipboardData(win32clipboard.CF_UNICODETEXT)
+        finally:
+            win32clipboard.CloseClipboard()
+
+    def save_text(self, file_path):
+        # 클립보드 메모리에서 바로 파일로 나눠 쓴다. 큰 표도 문자열 하나로 복사하지 않는다.
+        self._open()
+        try:
+            if not win32clipboard.IsClipboardFormatAvailable(win32clipboard.CF_UNICODETEXT):
+                return 0
+            handle = win32clipboard.GetClipboardDataHandle(win32clipboard.CF_UNICODETEXT)
+            pointer = kernel32.GlobalLock(handle)
+            if not pointer:
+                return 0
+            try:
+                total_chars = kernel32.GlobalSize(handle) // ctypes.sizeof(ctypes.c_wchar)
+                return self._stream(pointer, total_chars, file_path)
+            finally:
+                kernel32.GlobalUnlock(handle)
+        finally:
+            win32clipboard.CloseClipboard()
+
+    def _stream(self, pointer, total_chars, file_path):
+        written = 0
+        has_content = False
+        with open(file_path, "w", encoding="utf-8") as f:
+            offset = 0
+            while offset < total_chars:
+                count = min(self.chunk_chars, total_chars - offset)
+                chunk = ctypes.wstring_at(pointer + offset * ctypes.sizeof(ctypes.c_wchar), count)
+                end = chunk.find("\x00")
+                if end != -1:
+                    chunk = chunk[:end]
+                f.write(chunk)
+                written += len(chunk)
+                has_content = has_content or bool(chunk.strip())
+                if end != -1:
+                    break
+                offset += count
+        return written if has_content else 0
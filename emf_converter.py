@@ -0,0 +1,167 @@
+import os
+import sys
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from run_journal import file_checksum
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 변환 방식이 바뀌면 올려서 예전 캐시를 쓰지 않게 한다.
+RENDER_VERSION = "1"
+EMF_EXTENSIONS = (".emf", ".wmf")
+
+
+def parse_size(text):
+    # "1600x1200" -> (1600, 1200)
+    if not text:
+        return None
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def create_emf_converter():
+    # solar_pipeline 과 hangle 이 같은 설정(같은 캐시 키)을 쓰도록 환경 변수에서 만든다.
+    cache_dir = os.getenv("EMF_CACHE_DIR", os.path.join(BASE_DIR, "emf_cache"))
+    dpi = os.getenv("EMF_DPI")
+    size = parse_size(os.getenv("EMF_MAX_SIZE"))
+    workers = os.getenv("EMF_WORKERS")
+    return EmfConverter(
+        cache_dir,
+        dpi=float(dpi) if dpi else None,
+        size=size,
+        workers=int(workers) if workers else None,
+    )
+
+
+def rasterise(source, output_path, dpi=None, size=None):
+    # dpi 를 주면 메타파일을 그 해상도로 다시 그리고 (없으면 파일에 적힌 해상도),
+    # size 를 주면 비율을 유지한 채 그 안에 들어가도록 줄인다.
+    with Image.open(source) as image:
+        if dpi and image.format == "WMF":
+            image.load(dpi=dpi)
+        else:
+            image.load()
+        if size:
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+        tmp_path = output_path + ".tmp"
+        image.save(tmp_path, "PNG")
+    os.replace(tmp_path, output_path)
+
+
+def rasterise_job(job):
+    # 프로세스 풀에서 실행된다. 한 파일의 오류가 나머지 변환을 멈추지 않게 오류를 결과로 돌려준다.
+    source, output_path, dpi, size = job
+    try:
+        rasterise(source, output_path, dpi, size)
+        return None
+    except Exception as e:
+        if os.path.exists(output_path + ".tmp"):
+            os.remove(output_path + ".tmp")
+        return f"{type(e).__name__}: {e}"
+
+
+def collect_metafiles(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.lower().endswith(EMF_EXTENSIONS):
+                    files.append(os.path.join(path, file_name))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"File not found: {path}")
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+class EmfConverter:
+    # EMF 를 PNG 로 바꾼 결과를 (파일 내용 해시, dpi, 크기)로 cache_dir 에 보관한다.
+    # 다시 실행하거나 같은 그림이 다른 경로에 있어도 내용이 같으면 변환하지 않는다.
+    def __init__(self, cache_dir, dpi=None, size=None, workers=None):
+        self.cache_dir = cache_dir
+        self.dpi = dpi
+        self.size = tuple(size) if size else None
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, checksum):
+        key = f"{RENDER_VERSION}|{checksum}|{self.dpi}|{self.size}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".png")
+
+    def convert_all(self, paths):
+        # {EMF 경로: PNG 경로 (실패하면 None)}. 캐시에 없는 것만 프로세스 풀에서 동시에 변환한다.
+        os.makedirs(self.cache_dir, exist_ok=True)
+        results = {}
+        pending = {}
+        for path in paths:
+            try:
+                target = self.cache_path(file_checksum(path))
+            except OSError as e:
+                print(f"Failed to read EMF {path}: {e}")
+                results[path] = None
+                continue
+            results[path] = target
+            if target in pending:
+                continue
+            if os.path.exists(target):
+                self.hits += 1
+            else:
+                self.misses += 1
+                pending[target] = (path, target, self.dpi, self.size)
+        if not pending:
+            return results
+
+        jobs = list(pending.values())
+        workers = min(self.workers or os.cpu_count() or 1, len(jobs))
+        if workers == 1:
+            errors = [rasterise_job(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                errors = list(pool.map(rasterise_job, jobs))
+
+        failed = {target for (_, target, _, _), error in zip(jobs, errors) if error is not None}
+        for (source, _, _, _), error in zip(jobs, errors):
+            if error is not None:
+                print(f"Error converting EMF to PNG: {source}: {error}")
+        return {path: None if target in failed else target for path, target in results.items()}
+
+    def convert(self, path):
+        return self.convert_all([path])[path]
+
+    def report(self):
+        print(f"EMF 변환 캐시: {self.hits} hit, {self.misses} 변환")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Rasterise EMF/WMF exports to PNG in parallel, with a content-hash cache.")
+    parser.add_argument("paths", nargs="+", help="EMF files or folders containing them")
+    parser.add_argument("--cache-dir", default=os.path.join(BASE_DIR, "emf_cache"))
+    parser.add_argument("--dpi", type=float, help="Render resolution (default: the metafile's own)")
+    parser.add_argument("--size", type=parse_size, help="Maximum output size, e.g. 1600x1200")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    files = collect_metafiles(args.paths)
+    if not files:
+        print("No EMF files found.")
+        return 1
+    converter = EmfConverter(args.cache_dir, args.dpi, args.size, args.workers)
+    started = time.time()
+    results = converter.convert_all(files)
+    for path, png_path in results.items():
+        print(f"{path} -> {png_path or 'FAILED'}")
+    converter.report()
+    print(f"{len(files)} file(s) in {time.time() - started:.1f}s")
+    return 1 if any(png_path is None for png_path in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,33 @@
 import openpyxl
-import win32com.client as win32
-import pandas as pd
+from openpyxl.utils import get_column_letter
 import os
 import sys
+import time
+from itertools import chain
+
+try:
+    import win32com.client as win32
+except ImportError:
+    # Excel 이 없는 환경(리눅스 등)에서는 수식 엔진으로만 계산한다.
+    win32 = None
+
+from artifact_store import SUMMARY_TABLE, table_name
+from midas_table import iter_line_tables, parse_text
+from sheet_writer import write_table
+from sheet_extent import SheetExtent
+from summary_extractor import read_columns, write_summary
+from formula_engine import FormulaEngine, UnsupportedFormula, cached_mismatches, cached_value_matches
+
+SUMMARY_SHEET = "종합"
+# 종합 시트에서 읽는 열 (A, B, C, H)
+SUMMARY_COLUMNS = (1, 2, 3, 8)
+# 종합 시트 계산 방법 (FORMULA_ENGINE):
+#   "0"      Excel COM 으로 재계산 (기본)
+#   "verify" Excel COM 으로 재계산하고, 수식 엔진 결과를 템플릿과 이번 결과의 Excel 값에 비교해 출력만 한다
+#   "1"      템플릿에 Excel 이 저장해 둔 값과 엔진 결과가 모두 같을 때만 엔진으로 계산 (다르면 Excel)
+# 실제 템플릿(calcurate.xlsm)에서 "verify" 결과가 Excel 과 같다는 것을 확인하기 전까지는 엔진을 쓰지 않는다.
+# 즉 기본 설정에서는 Excel 없이 재계산하지 않는다. Excel 없이 돌리려면 FORMULA_ENGINE=1 로 켠다.
+FORMULA_ENGINE_MODES = ("0", "verify", "1")
 
 def get_desktop_path(filename):
     if filename in ["calcurate.xlsm", "default.hwp"]:
@@ -37,14 +62,42 @@ def check_file_exists(path):
         return False
     return True
 
+def read_file_lines(file):
+    with file:
+        yield from file
+
 class ExcelProcessor:
-    def __init__(self, excel_path, temp_excel_path):
+    # store(ArtifactStore)를 주면 입력은 파일 이름으로 저장소에서 (마이다스 복사 때 읽어 둔 MidasTable 로) 꺼내고,
+    # 종합 결과는 temp_excel.xlsx 대신 저장소의 SUMMARY_TABLE 로 넘긴다.
+    def __init__(self, excel_path, temp_excel_path, store=None):
         self.excel_path = excel_path
         self.temp_excel_path = temp_excel_path
+        self.store = store
+        # 시트별로 값이 있는 마지막 행을 쓰면서 기억한다 (get_last_row 참조)
+        self.extents = {}
+
+    def iter_lines(self, path):
+        # 입력을 한 줄씩 돌려준다. 파일은 여기서 열어 없으면 바로 FileNotFoundError 가 난다.
+        return read_file_lines(open(path, "r", encoding="utf-8"))
+
+    def stored_table(self, path):
+        # 저장소에 있는 입력의 MidasTable (header 없음). 없으면 None 이고 파일에서 읽는다.
+        if self.store is None:
+            return None
+        name = os.path.basename(path)
+        table = self.store.get(table_name(name), stage="excel")
+        if table is None and self.store.kind(name) == "text":
+            table = parse_text(self.store.get(name, stage="excel"), header_rows=0)
+        return table
+
+    def has_input(self, path):
+        if self.store is not None and (table_name(os.path.basename(path)) in self.store or os.path.basename(path) in self.store):
+            return True
+        return check_file_exists(path)
 
     def process_data(self, data1_path, data2_path, data3_path):
         # 파일 존재 여부 확인
-        if not all(map(check_file_exists, [data1_path, data2_path, data3_path, self.excel_path])):
+        if not all(map(self.has_input, [data1_path, data2_path, data3_path])) or not check_file_exists(self.excel_path):
             return
 
         modified_data2 = self.modify_data2(data2_path)
@@ -55,6 +108,13 @@ class ExcelProcessor:
             print(f"Failed to load workbook: {e}", flush=True)
             return
 
+        engine_mode = os.getenv("FORMULA_ENGINE", "0")
+        if engine_mode not in FORMULA_ENGINE_MODES:
+            print(f"Unknown FORMULA_ENGINE={engine_mode!r}; using Excel", flush=True)
+            engine_mode = "0"
+        engine = self.prepare_engine(wb) if engine_mode != "0" else None
+
+        self.extents = {}
         code_sheet = wb["code"]
         self.process_data1_and_data2(data1_path, modified_data2, code_sheet)
 
@@ -70,6 +130,101 @@ class ExcelProcessor:
         finally:
             wb.close()
 
+        summary_rows = None
+        if engine is not None and engine_mode == "1":
+            summary_rows = self.evaluate_summary(engine, wb)
+        if summary_rows is None:
+            summary_rows = self.recalculate_with_excel(updated_excel_path)
+            if summary_rows is None:
+                return
+            if engine is not None and engine_mode == "verify":
+                self.verify_summary(engine, wb, summary_rows)
+
+        table_data = []
+        for row in summary_rows:
+            if row[0] is not None:
+                filtered_row = [value if value is not None else "" for value in row]
+                table_data.append(filtered_row)
+
+        if self.store is not None:
+            self.store.put(SUMMARY_TABLE, table_data, stage="excel")
+            print(f"Summary table stored: {len(table_data)} row(s)")
+            return
+
+        ensure_directory_exists(self.temp_excel_path)
+        try:
+            write_summary(self.temp_excel_path, table_data)
+            print(f"Temporary Excel file created successfully: {self.temp_excel_path}")
+        except Exception as e:
+            print(f"Failed to save temporary Excel file: {e}", flush=True)
+            return
+
+    def prepare_engine(self, wb):
+        # 입력을 쓰기 전, 템플릿 그대로의 통합 문서로 종합 시트가 의존하는 수식을 컴파일해 계산하고
+        # Excel 이 템플릿에 저장해 둔 값과 비교한다. 지원하지 않는 수식이 있거나 한 셀이라도 다르면 None.
+        started = time.perf_counter()
+        try:
+            engine = FormulaEngine(wb, {SUMMARY_SHEET: SUMMARY_COLUMNS})
+            engine.update(wb)
+        except UnsupportedFormula as e:
+            print(f"Formula engine cannot evaluate the template ({e}); using Excel", flush=True)
+            return None
+        try:
+            cached = openpyxl.load_workbook(self.excel_path, data_only=True)
+        except Exception as e:
+            print(f"Failed to read the values Excel saved in the template: {e}", flush=True)
+            return None
+        mismatches = cached_mismatches(engine, cached)
+        cached.close()
+        if mismatches:
+            print(f"Formula engine differs from the template's saved values in {len(mismatches)} cell(s); using Excel", flush=True)
+            for sheet_name, row, column, expected, actual in mismatches[:10]:
+                print(f"  {sheet_name}!{get_column_letter(column)}{row}: Excel {expected!r}, engine {actual!r}", flush=True)
+            return None
+        elapsed = time.perf_counter() - started
+        print(f"Formula engine matches all {len(engine.values)} saved template value(s) ({elapsed:.2f}s)", flush=True)
+        return engine
+
+    def verify_summary(self, engine, wb, excel_rows):
+        # verify 모드: Excel 이 이번 입력으로 계산한 종합 값과 엔진 결과를 비교해 출력한다 (결과는 Excel 값을 쓴다).
+        rows = self.evaluate_summary(engine, wb)
+        if rows is None:
+            return
+        rows = [row for row in rows if any(value is not None for value in row)]
+        excel_rows = [row for row in excel_rows if any(value is not None for value in row)]
+        mismatches = [
+            (index, row, excel_row)
+            for index, (row, excel_row) in enumerate(zip(rows, excel_rows), start=1)
+            if not all(cached_value_matches(expected, actual) for actual, expected in zip(row, excel_row))
+        ]
+        if len(rows) != len(excel_rows):
+            print(f"Formula engine produced {len(rows)} summary row(s), Excel {len(excel_rows)}", flush=True)
+        if mismatches:
+            print(f"Formula engine differs from Excel in {len(mismatches)} summary row(s):", flush=True)
+            for index, row, excel_row in mismatches[:10]:
+                print(f"  row {index}: Excel {excel_row!r}, engine {row!r}", flush=True)
+        elif len(rows) == len(excel_rows):
+            print(f"Formula engine matches Excel on all {len(rows)} summary row(s)", flush=True)
+
+    def evaluate_summary(self, engine, wb):
+        # 입력을 쓴 뒤, code/section 에서 바뀐 셀에 닿는 수식만 다시 계산해 종합 시트 값을 돌려준다.
+        # 지원하지 않는 수식이 있으면 None 을 돌려 Excel 재계산으로 넘어간다.
+        started = time.perf_counter()
+        try:
+            recalculated = engine.update(wb)
+            rows = list(engine.sheet_rows(SUMMARY_SHEET, SUMMARY_COLUMNS))
+        except UnsupportedFormula as e:
+            print(f"Formula engine cannot evaluate the template ({e}); using Excel", flush=True)
+            return None
+        elapsed = time.perf_counter() - started
+        print(f"Recalculated {recalculated} formula(s) without Excel in {elapsed:.2f}s", flush=True)
+        return rows
+
+    def recalculate_with_excel(self, updated_excel_path):
+        if win32 is None:
+            print("Excel COM is not available to recalculate the workbook", flush=True)
+            return None
+
         try:
             excel = win32.gencache.EnsureDispatch("Excel.Application")
             wb = excel.Workbooks.Open(updated_excel_path)
@@ -81,59 +236,48 @@ class ExcelProcessor:
             print(f"Failed to open and save Excel file with Excel COM: {e}", flush=True)
             if "excel" in locals():
                 excel.Quit()
-            return
+            return None
 
+        # 통합 문서 전체를 다시 불러오지 않고 종합 시트의 필요한 열만 읽는다.
         try:
-            wb = openpyxl.load_workbook(updated_excel_path, data_only=True)
+            return read_columns(updated_excel_path, SUMMARY_SHEET, SUMMARY_COLUMNS)
         except Exception as e:
             print(f"Failed to load workbook for data extraction: {e}", flush=True)
-            return
-
-        summary_sheet = wb["종합"]
-
-        table_data = []
-        for row in summary_sheet.iter_rows(values_only=True):
-            if row[0] is not None:
-                filtered_row = [
-                    row[0],
-                    row[1],
-                    row[2],
-                    row[7],
-                ]
-                filtered_row = [
-                    value if value is not None else "" for value in filtered_row
-                ]
-                table_data.append(filtered_row)
-
-        df = pd.DataFrame(table_data)
-
-        ensure_directory_exists(self.temp_excel_path)
-        try:
-            df.to_excel(self.temp_excel_path, index=False, header=False)
-            print(f"Temporary Excel file created successfully: {self.temp_excel_path}")
-        except Exception as e:
-            print(f"Failed to save temporary Excel file: {e}", flush=True)
-            return
+            return None
 
     def modify_data2(self, data2_path):
-        with open(data2_path, "r", encoding="utf-8") as file:
-            lines = file.readlines()
-        if not lines:
+        # data2 를 조각(MidasTable) 단위로 읽으면서 Pu 열을 바로 뒤에 한 번 더 넣는다.
+        # 첫 줄(header)도 그대로 조각에 포함되어 시트에 쓰인다. 쓰는 쪽에서 소비할 때 읽는다.
+        table = self.stored_table(data2_path)
+        if table is not None:
+            yield from self.modify_table(table, data2_path)
+            return
+        lines = self.iter_lines(data2_path)
+        first = next(lines, None)
+        if first is None:
             print(f"Warning: {data2_path} is empty")
-            return []
-        header = lines[0].strip().split("\t")
+            return
+        header = first.strip().split("\t")
+        tables = iter_line_tables(chain([first], lines))
         if "Pu" not in header:
             print(f"Warning: Column 'Pu' not found in header of {data2_path}")
-            return lines
+            yield from tables
+            return
         pu_index = header.index("Pu")
-        header.insert(pu_index + 1, header[pu_index])
-        modified_data = ["\t".join(header)]
-        for line in lines[1:]:
-            values = line.strip().split("\t")
-            if len(values) > pu_index:
-                values.insert(pu_index + 1, values[pu_index])
-            modified_data.append("\t".join(values))
-        return modified_data
+        for table in tables:
+            yield table.duplicate_column(pu_index)
+
+    def modify_table(self, table, data2_path):
+        # 저장소에서 꺼낸 표 전체에 modify_data2 와 같은 Pu 열 복제를 한다.
+        if not len(table):
+            print(f"Warning: {data2_path} is empty")
+            return
+        header = [column.values[0] for column in table.columns[: int(table.row_lengths[0])]]
+        if "Pu" not in header:
+            print(f"Warning: Column 'Pu' not found in header of {data2_path}")
+            yield table
+            return
+        yield table.duplicate_column(header.index("Pu"))
 
     def clean_decimal(self, value):
         try:
@@ -147,15 +291,18 @@ class ExcelProcessor:
 
     def process_data1_and_data2(self, data1_path, modified_data2, code_sheet):
         self.process_data_file(data1_path, code_sheet, start_row=3)
-        self.process_data_list(modified_data2, code_sheet, start_row=self.get_last_row(code_sheet) + 1)
+        self.write_tables(modified_data2, code_sheet, start_row=self.get_last_row(code_sheet) + 1)
 
     def process_data3(self, data3_path, section_sheet):
         self.process_data_file(data3_path, section_sheet, start_row=1)
 
     def process_data_file(self, file_path, sheet, start_row):
+        table = self.stored_table(file_path)
+        if table is not None:
+            self.write_tables([table], sheet, start_row)
+            return
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                data = file.readlines()
+            data = self.iter_lines(file_path)
         except FileNotFoundError:
             print(f"File not found: {file_path}", flush=True)
             return
@@ -163,27 +310,33 @@ class ExcelProcessor:
             print(f"Failed to read file {file_path}: {e}", flush=True)
             return
 
-        for row_idx, line in enumerate(data, start=start_row):
-            values = line.strip().split("\t")
-            for col_idx, value in enumerate(values, start=1):
-                cleaned_value = self.clean_decimal(value)
-                sheet.cell(row=row_idx, column=col_idx, value=cleaned_value)
+        try:
+            self.process_data_list(data, sheet, start_row)
+        except UnicodeDecodeError as e:
+            # 스트리밍으로 읽으므로 잘못된 바이트 앞까지의 행은 이미 시트에 쓰여 있다.
+            print(f"Failed to read file {file_path}: {e}", flush=True)
 
     def process_data_list(self, data_list, sheet, start_row):
-        for row_idx, line in enumerate(data_list, start=start_row):
-            values = line.strip().split("\t")
-            for col_idx, value in enumerate(values, start=1):
-                cleaned_value = self.clean_decimal(value)
-                sheet.cell(row=row_idx, column=col_idx, value=cleaned_value)
+        # data_list 는 줄 목록이나 iterator. 값은 midas_table 에서 열 단위로 clean_decimal 과 같은 규칙으로 변환된다.
+        return self.write_tables(iter_line_tables(data_list), sheet, start_row)
+
+    def write_tables(self, tables, sheet, start_row):
+        # 조각마다 변환해서 바로 쓰므로 입력 전체를 메모리에 올리지 않는다. 마지막으로 쓴 행을 돌려준다.
+        last_row = start_row - 1
+        for table in tables:
+            last_row = write_table(sheet, table, last_row + 1)
+            if len(table):
+                self.get_extent(sheet).include(last_row, table.width)
+        return last_row
+
+    def get_extent(self, sheet):
+        extent = self.extents.get(sheet.title)
+        if extent is None or extent.sheet is not sheet:
+            extent = self.extents[sheet.title] = SheetExtent(sheet)
+        return extent
 
     def get_last_row(self, sheet):
-        last_row = sheet.max_row
-        while last_row > 0 and all(
-            sheet.cell(row=last_row, column=col).value is None
-            for col in range(1, sheet.max_column + 1)
-        ):
-            last_row -= 1
-        return last_row
+        return self.get_extent(sheet).last_row
 
     def set_clipboard_from_excel(self):
         if not check_file_exists(self.temp_excel_path):
@@ -0,0 +1,183 @@
+import os
+import time
+import queue
+import shutil
+import tempfile
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+# 출력 파일 확장자 -> SaveAs 형식
+EXPORT_FORMATS = {".hwp": "HWP", ".hwpx": "HWPX", ".pdf": "PDF"}
+# metrics() 의 지연 시간 통계에 쓰는 최근 작업 수
+LATENCY_WINDOW = 1000
+
+
+class ExportError(Exception):
+    pass
+
+
+def dispatch_hwp():
+    # 작업 스레드마다 COM 을 초기화하고 한글을 따로 띄운다.
+    import pythoncom
+    from hwp_service import dispatch_hwp as dispatch
+    pythoncom.CoInitialize()
+    return dispatch()
+
+
+def create_export_queue():
+    # HWP_EXPORT_WORKERS 개의 한글로 내보낸다 (기본 1).
+    workers = os.getenv("HWP_EXPORT_WORKERS")
+    return ExportQueue(int(workers) if workers else 1)
+
+
+class ExportQueue:
+    # 다 채운 문서를 받아 HWP/PDF 출력을 백그라운드에서 만든다.
+    # submit_document() 는 호출한 쪽 한글에서 문서를 임시 HWP 로 한 번 저장하고 바로 돌아온다.
+    # 작업 스레드마다 한글을 하나씩 띄워 그 파일을 열고 PDF 등으로 저장하며, 결과는 Future 로 알린다.
+    def __init__(self, workers=1, dispatch=dispatch_hwp, staging_dir=None):
+        self.workers = workers
+        self.dispatch = dispatch
+        self.staging_dir = staging_dir
+        self.own_staging = staging_dir is None
+        self.staging_ids = itertools.count(1)
+        self.jobs = queue.Queue()
+        self.threads = []
+        self.lock = threading.Lock()
+        self.active = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self):
+        if self.threads:
+            return
+        if self.staging_dir is None:
+            self.staging_dir = tempfile.mkdtemp(prefix="hwp_export_")
+        os.makedirs(self.staging_dir, exist_ok=True)
+        for index in range(self.workers):
+            thread = threading.Thread(target=self.work, args=(index + 1,), name=f"hwp-export-{index + 1}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, source_path, outputs, staged=False):
+        # source_path 를 열어 outputs 로 저장한다. staged 면 source_path 는 이 큐의 임시 파일이라
+        # .hwp 출력은 그 파일을 복사해 만들고 끝나면 지운다.
+        for output_path in outputs:
+            if os.path.splitext(output_path)[1].lower() not in EXPORT_FORMATS:
+                raise ValueError(f"Unsupported output format: {output_path}")
+        self.start()
+        future = Future()
+        with self.lock:
+            self.submitted += 1
+        self.jobs.put((future, os.path.abspath(source_path), [os.path.abspath(path) for path in outputs], staged, time.perf_counter()))
+        return future
+
+    def submit_document(self, hwp, outputs):
+        # 호출한 쪽 한글의 현재 문서를 넘긴다. 저장이 끝나면 그 한글은 바로 다음 문서를 다뤄도 된다.
+        # SaveAs 뒤에는 그 문서가 임시 파일을 가리키므로 호출한 쪽은 더 고치지 말고 닫아야 한다.
+        self.start()
+        staging_path = os.path.join(self.staging_dir, f"{next(self.staging_ids)}.hwp")
+        hwp.SaveAs(staging_path, "HWP", "")
+        return self.submit(staging_path, outputs, staged=True)
+
+    def work(self, worker):
+        hwp = None
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            future, source_path, outputs, staged, submitted = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self.lock:
+                self.active += 1
+            started = time.perf_counter()
+            result = error = None
+            try:
+                if hwp is None:
+                    hwp = self.dispatch()
+                    print(f"Export worker {worker}: HWP started")
+                copies = [path for path in outputs if staged and path.lower().endswith(".hwp")]
+                hwp.Open(source_path)
+                for output_path in outputs:
+                    if output_path not in copies:
+                        hwp.SaveAs(output_path, EXPORT_FORMATS[os.path.splitext(output_path)[1].lower()], "")
+                hwp.Clear(1)
+                for output_path in copies:
+                    shutil.copyfile(source_path, output_path)
+                finished = time.perf_counter()
+                result = {"source": source_path, "outputs": outputs, "waited": started - submitted, "elapsed": finished - started}
+                with self.lock:
+                    self.completed += 1
+                    self.latencies.append((started - submitted, finished - started))
+            except Exception as e:
+                print(f"Export worker {worker}: failed to export {source_path}: {e}")
+                # 한글 상태를 믿을 수 없으므로 닫고 다음 작업에서 새로 띄운다.
+                hwp = self.quit(hwp)
+                with self.lock:
+                    self.failed += 1
+                error = ExportError(f"Failed to export {source_path}: {type(e).__name__}: {e}")
+            # 끝난 Future 를 본 쪽이 staging 사본을 보지 않도록, 지운 다음에 결과를 알린다.
+            if staged:
+                try:
+                    os.remove(source_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Export worker {worker}: failed to remove {source_path}: {e}")
+            with self.lock:
+                self.active -= 1
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+        self.quit(hwp)
+
+    def quit(self, hwp):
+        if hwp is not None:
+            try:
+                hwp.Quit()
+            except Exception as e:
+                print(f"Failed to quit export HWP: {e}")
+        return None
+
+    def metrics(self):
+        # depth: 기다리는 작업 수, active: 내보내는 중인 작업 수,
+        # wait_*: 넣은 뒤 작업자가 잡을 때까지, export_*: 열고 저장하는 데 걸린 시간(초, 최근 작업 기준)
+        with self.lock:
+            latencies = list(self.latencies)
+            metrics = {
+                "depth": self.jobs.qsize(),
+                "active": self.active,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+        waits = [waited for waited, _ in latencies]
+        exports = [elapsed for _, elapsed in latencies]
+        metrics["wait_mean"] = sum(waits) / len(waits) if waits else 0.0
+        metrics["wait_max"] = max(waits, default=0.0)
+        metrics["export_mean"] = sum(exports) / len(exports) if exports else 0.0
+        metrics["export_max"] = max(exports, default=0.0)
+        return metrics
+
+    def report(self):
+        metrics = self.metrics()
+        print(
+            f"내보내기: {metrics['completed']} 완료, {metrics['failed']} 실패, 대기 {metrics['depth']}, 진행 {metrics['active']}, "
+            f"평균 대기 {metrics['wait_mean']:.2f}s, 평균 내보내기 {metrics['export_mean']:.2f}s (최대 {metrics['export_max']:.2f}s)"
+        )
+
+    def close(self):
+        # 넣은 작업을 모두 끝낸 뒤 작업자 한글을 닫는다.
+        for _ in self.threads:
+            self.jobs.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.own_staging and self.staging_dir:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            self.staging_dir = None
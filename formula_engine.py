@@ -0,0 +1,1770 @@
+import re
+import math
+import operator
+from bisect import bisect_left, bisect_right
+from collections import defaultdict, deque
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP, ROUND_UP
+
+import numpy as np
+from openpyxl.formula.tokenizer import Token, Tokenizer
+from openpyxl.utils.cell import column_index_from_string, range_boundaries
+from openpyxl.utils.datetime import to_excel
+
+from sheet_extent import data_extent
+
+MAX_ROW = 1048576
+MAX_COLUMN = 16384
+# 이보다 작은 범위는 셀마다 색인해서 입력이 바뀐 셀로 바로 찾는다.
+SMALL_RANGE_CELLS = 64
+
+
+class UnsupportedFormula(Exception):
+    # 이 엔진이 계산할 수 없는 수식. 호출하는 쪽은 Excel 재계산으로 돌아간다.
+    pass
+
+
+class FormulaError(Exception):
+    # 셀 값으로서의 Excel 오류(#N/A, #DIV/0! ...). 계산 중에는 예외로 전파된다.
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def __repr__(self):
+        return f"FormulaError({self.code!r})"
+
+
+MISSING = object()
+
+
+class RangeValue:
+    # 범위 참조의 값. rows 는 행 목록이며 빈 셀은 None 이다.
+    def __init__(self, rows, width):
+        self.rows = rows
+        self.height = len(rows)
+        self.width = width
+        self.indexes = {}
+
+    def values(self):
+        for row in self.rows:
+            yield from row
+
+    def column(self, index):
+        return [row[index] for row in self.rows]
+
+    def row(self, index):
+        return self.rows[index]
+
+    def vector(self):
+        # MATCH 등이 쓰는 1차원 값 목록
+        if self.width == 1:
+            return self.column(0)
+        if self.height == 1:
+            return self.rows[0]
+        raise FormulaError("#N/A")
+
+    def scalar(self):
+        if self.height == 1 and self.width == 1:
+            return self.rows[0][0]
+        raise FormulaError("#VALUE!")
+
+
+# ---------------------------------------------------------------- 값 변환
+
+
+def scalar(value):
+    if isinstance(value, RangeValue):
+        value = value.scalar()
+    if type(value) is FormulaError:
+        raise value
+    return value
+
+
+def to_number(value):
+    value = scalar(value)
+    kind = type(value)
+    if kind is int or kind is float:
+        return value
+    if value is None or value is MISSING:
+        return 0
+    if kind is bool:
+        return int(value)
+    if kind is str:
+        try:
+            return float(value.strip())
+        except ValueError:
+            raise FormulaError("#VALUE!")
+    raise FormulaError("#VALUE!")
+
+
+def to_int(value):
+    return int(math.floor(to_number(value)))
+
+
+def to_text(value):
+    value = scalar(value)
+    if value is None or value is MISSING:
+        return ""
+    if type(value) is bool:
+        return "TRUE" if value else "FALSE"
+    if type(value) is float:
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.15G}"
+    return str(value)
+
+
+def to_bool(value):
+    value = scalar(value)
+    if value is None or value is MISSING:
+        return False
+    kind = type(value)
+    if kind is bool:
+        return value
+    if kind is int or kind is float:
+        return value != 0
+    if kind is str:
+        upper = value.upper()
+        if upper in ("TRUE", "FALSE"):
+            return upper == "TRUE"
+    raise FormulaError("#VALUE!")
+
+
+def is_number(value):
+    kind = type(value)
+    return kind is int or kind is float
+
+
+def type_rank(value):
+    # Excel 비교 순서: 숫자 < 문자 < 논리값
+    kind = type(value)
+    if kind is bool:
+        return 2
+    if kind is str:
+        return 1
+    return 0
+
+
+def compare(a, b):
+    a = scalar(a)
+    b = scalar(b)
+    if a is None:
+        a = "" if type(b) is str else (False if type(b) is bool else 0)
+    if b is None:
+        b = "" if type(a) is str else (False if type(a) is bool else 0)
+    rank_a, rank_b = type_rank(a), type_rank(b)
+    if rank_a != rank_b:
+        return (rank_a > rank_b) - (rank_a < rank_b)
+    if rank_a == 1:
+        a, b = a.lower(), b.lower()
+    return (a > b) - (a < b)
+
+
+def lookup_key(value):
+    # 정확히 일치 찾기용 키: 문자는 대소문자 무시, 숫자는 int/float 구분 없음
+    kind = type(value)
+    if kind is str:
+        return ("s", value.lower())
+    if kind is bool:
+        return ("b", value)
+    if kind is int or kind is float:
+        return ("n", float(value))
+    return ("e", value)
+
+
+def wildcard_pattern(text):
+    # Excel 와일드카드(*, ?, ~)를 정규식으로 바꾼다.
+    pattern = []
+    escape = False
+    for char in text:
+        if escape:
+            pattern.append(re.escape(char))
+            escape = False
+        elif char == "~":
+            escape = True
+        elif char == "*":
+            pattern.append(".*")
+        elif char == "?":
+            pattern.append(".")
+        else:
+            pattern.append(re.escape(char))
+    return re.compile("".join(pattern), re.IGNORECASE | re.DOTALL)
+
+
+def has_wildcard(text):
+    return type(text) is str and ("*" in text or "?" in text)
+
+
+def excel_round(value, digits, mode):
+    # Excel 은 15자리 십진수로 본 값을 반올림한다 (ROUND(2.675, 2) = 2.68).
+    value = to_number(value)
+    digits = int(to_number(digits))
+    if not math.isfinite(value):
+        raise FormulaError("#NUM!")
+    quantum = Decimal(1).scaleb(-digits)
+    result = float(Decimal(f"{value:.15G}").quantize(quantum, rounding=mode))
+    return result
+
+
+def number_result(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        raise FormulaError("#NUM!")
+    return value
+
+
+# ---------------------------------------------------------------- 조건(COUNTIF 등)
+
+CRITERIA_RE = re.compile(r"^(<=|>=|<>|<|>|=)?(.*)$", re.DOTALL)
+CRITERIA_OPS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    ">": operator.gt,
+    "<=": operator.le,
+    ">=": operator.ge,
+}
+
+
+def make_criterion(criterion):
+    criterion = scalar(criterion)
+    if criterion is None or criterion is MISSING:
+        criterion = 0
+    if type(criterion) is not str:
+        key = lookup_key(criterion)
+        return lambda value: value is not None and lookup_key(value) == key
+
+    op, operand = CRITERIA_RE.match(criterion).groups()
+    op = op or "="
+    compare_op = CRITERIA_OPS[op]
+    if operand == "":
+        if op == "=":
+            return lambda value: value is None or value == ""
+        if op == "<>":
+            return lambda value: value is not None and value != ""
+    try:
+        number = float(operand)
+    except ValueError:
+        number = None
+    if number is not None:
+        if op == "<>":
+            return lambda value: not (is_number(value) and value == number)
+        return lambda value: is_number(value) and compare_op(value, number)
+    if operand.upper() in ("TRUE", "FALSE"):
+        flag = operand.upper() == "TRUE"
+        if op == "<>":
+            return lambda value: value is not flag
+        return lambda value: type(value) is bool and compare_op(value, flag)
+    if op in ("=", "<>"):
+        pattern = wildcard_pattern(operand)
+        if op == "=":
+            return lambda value: type(value) is str and pattern.fullmatch(value) is not None
+        return lambda value: not (type(value) is str and pattern.fullmatch(value) is not None)
+    lowered = operand.lower()
+    return lambda value: type(value) is str and compare_op(value.lower(), lowered)
+
+
+def criterion_key(criterion):
+    # 단순히 "같은 값" 조건이면 찾기 키를, 아니면 None 을 돌려준다.
+    criterion = scalar(criterion)
+    if criterion is None or criterion is MISSING:
+        return lookup_key(0)
+    if type(criterion) is not str:
+        return lookup_key(criterion)
+    op, operand = CRITERIA_RE.match(criterion).groups()
+    if op not in (None, "=") or operand == "" or has_wildcard(operand) or "~" in operand:
+        return None
+    try:
+        return lookup_key(float(operand))
+    except ValueError:
+        pass
+    if operand.upper() in ("TRUE", "FALSE"):
+        return lookup_key(operand.upper() == "TRUE")
+    return lookup_key(operand)
+
+
+def matching_positions(range_value, criterion):
+    key = criterion_key(criterion)
+    if key is not None:
+        # 같은 범위에 조건만 바꿔 여러 번 묻는 경우가 많아 값 -> 위치 목록 색인을 범위 값에 붙여 둔다.
+        index = range_value.indexes.get("positions")
+        if index is None:
+            index = defaultdict(list)
+            for position, value in enumerate(range_value.values()):
+                if value is not None:
+                    index[lookup_key(value)].append(position)
+            range_value.indexes["positions"] = index
+        return index.get(key, [])
+    test = make_criterion(criterion)
+    return [index for index, value in enumerate(range_value.values()) if test(value)]
+
+
+def values_at(range_value, positions):
+    # 조건 범위와 같은 크기로 본 합계 범위의 값 (Excel 처럼 왼쪽 위를 기준으로 맞춘다)
+    width = range_value.width
+    rows = range_value.rows
+    result = []
+    for position in positions:
+        row, column = divmod(position, width)
+        if row < range_value.height and column < width:
+            result.append(rows[row][column])
+    return result
+
+
+def positions_matching_all(pairs):
+    positions = None
+    for range_value, criterion in pairs:
+        if not isinstance(range_value, RangeValue):
+            raise FormulaError("#VALUE!")
+        found = set(matching_positions(range_value, criterion))
+        positions = found if positions is None else positions & found
+    return sorted(positions or ())
+
+
+def require_range(value):
+    if not isinstance(value, RangeValue):
+        raise FormulaError("#VALUE!")
+    return value
+
+
+# ---------------------------------------------------------------- 집계
+
+
+def numbers_in(args):
+    # SUM/MAX 등: 범위 안의 글자, 논리값, 빈 셀은 건너뛰고 직접 넣은 값은 숫자로 바꾼다.
+    for arg in args:
+        if arg is MISSING:
+            continue
+        if isinstance(arg, RangeValue):
+            for value in arg.values():
+                if type(value) is FormulaError:
+                    raise value
+                if is_number(value):
+                    yield value
+        else:
+            yield to_number(arg)
+
+
+def fn_sum(*args):
+    return math.fsum(numbers_in(args)) if args else 0
+
+
+def fn_product(*args):
+    result = 1
+    for value in numbers_in(args):
+        result *= value
+    return result
+
+
+def fn_average(*args):
+    values = list(numbers_in(args))
+    if not values:
+        raise FormulaError("#DIV/0!")
+    return math.fsum(values) / len(values)
+
+
+def fn_max(*args):
+    values = list(numbers_in(args))
+    return max(values) if values else 0
+
+
+def fn_min(*args):
+    values = list(numbers_in(args))
+    return min(values) if values else 0
+
+
+def fn_count(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            count += sum(1 for value in arg.values() if is_number(value))
+        elif arg is not MISSING:
+            try:
+                to_number(arg)
+                count += 1
+            except FormulaError:
+                pass
+    return count
+
+
+def fn_counta(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            count += sum(1 for value in arg.values() if value is not None)
+        elif arg is not MISSING:
+            count += 1
+    return count
+
+
+def fn_countblank(range_value):
+    return sum(1 for value in require_range(range_value).values() if value is None or value == "")
+
+
+def fn_sumproduct(*args):
+    ranges = [arg if isinstance(arg, RangeValue) else RangeValue([[scalar(arg)]], 1) for arg in args]
+    shape = (ranges[0].height, ranges[0].width)
+    if any((r.height, r.width) != shape for r in ranges):
+        raise FormulaError("#VALUE!")
+    total = []
+    for values in zip(*(r.values() for r in ranges)):
+        product = 1
+        for value in values:
+            if type(value) is FormulaError:
+                raise value
+            product *= value if is_number(value) else 0
+        total.append(product)
+    return math.fsum(total)
+
+
+def fn_sumif(range_value, criterion, sum_range=MISSING):
+    range_value = require_range(range_value)
+    source = range_value if sum_range is MISSING else require_range(sum_range)
+    return fn_sum(RangeValue([values_at(source, matching_positions(range_value, criterion))], 0))
+
+
+def fn_countif(range_value, criterion):
+    return len(matching_positions(require_range(range_value), criterion))
+
+
+def fn_averageif(range_value, criterion, average_range=MISSING):
+    range_value = require_range(range_value)
+    source = range_value if average_range is MISSING else require_range(average_range)
+    values = [v for v in values_at(source, matching_positions(range_value, criterion)) if is_number(v)]
+    if not values:
+        raise FormulaError("#DIV/0!")
+    return math.fsum(values) / len(values)
+
+
+def criteria_pairs(args):
+    if len(args) % 2:
+        raise FormulaError("#VALUE!")
+    return list(zip(args[0::2], args[1::2]))
+
+
+def fn_sumifs(sum_range, *args):
+    positions = positions_matching_all(criteria_pairs(args))
+    return fn_sum(RangeValue([values_at(require_range(sum_range), positions)], 0))
+
+
+def fn_countifs(*args):
+    return len(positions_matching_all(criteria_pairs(args)))
+
+
+def fn_maxifs(max_range, *args):
+    values = values_at(require_range(max_range), positions_matching_all(criteria_pairs(args)))
+    return fn_max(RangeValue([values], 0))
+
+
+def fn_minifs(min_range, *args):
+    values = values_at(require_range(min_range), positions_matching_all(criteria_pairs(args)))
+    return fn_min(RangeValue([values], 0))
+
+
+# ---------------------------------------------------------------- 찾기
+
+
+def exact_index(range_value, lookup, values_of, cache_key):
+    # 같은 범위를 여러 셀이 찾으므로 값 -> 첫 위치 사전을 범위 값에 붙여 재사용한다.
+    index = range_value.indexes.get(cache_key)
+    if index is None:
+        index = {}
+        for position, value in enumerate(values_of()):
+            if value is not None:
+                index.setdefault(lookup_key(value), position)
+        range_value.indexes[cache_key] = index
+    return index.get(lookup_key(lookup))
+
+
+def exact_position(range_value, lookup, values_of, cache_key):
+    if has_wildcard(lookup):
+        pattern = wildcard_pattern(lookup)
+        for position, value in enumerate(values_of()):
+            if type(value) is str and pattern.fullmatch(value):
+                return position
+        return None
+    return exact_index(range_value, lookup, values_of, cache_key)
+
+
+def approximate_position(range_value, lookup, values_of, cache_key, descending=False):
+    # 정렬된 범위에서 lookup 이하(내림차순이면 이상)인 마지막 위치. 같은 종류의 값만 비교한다.
+    rank = type_rank(lookup)
+    key = (cache_key, rank)
+    entries = range_value.indexes.get(key)
+    if entries is None:
+        positions = []
+        keys = []
+        for position, value in enumerate(values_of()):
+            if value is None or type(value) is FormulaError or type_rank(value) != rank:
+                continue
+            positions.append(position)
+            keys.append(value.lower() if rank == 1 else value)
+        entries = range_value.indexes[key] = (positions, keys, keys[::-1])
+    positions, keys, reversed_keys = entries
+    target = lookup.lower() if rank == 1 else lookup
+    if descending:
+        # 내림차순: lookup 이상인 값들 중 마지막(가장 작은 값)
+        found = len(keys) - bisect_left(reversed_keys, target)
+    else:
+        found = bisect_right(keys, target)
+    return positions[found - 1] if found else None
+
+
+def fn_vlookup(lookup, table, column, approximate=MISSING):
+    return table_lookup(lookup, table, column, approximate, vertical=True)
+
+
+def fn_hlookup(lookup, table, row, approximate=MISSING):
+    return table_lookup(lookup, table, row, approximate, vertical=False)
+
+
+def table_lookup(lookup, table, index, approximate, vertical):
+    lookup = scalar(lookup)
+    table = require_range(table)
+    index = to_int(index)
+    approximate = True if approximate is MISSING else to_bool(approximate)
+    size = table.width if vertical else table.height
+    if index < 1:
+        raise FormulaError("#VALUE!")
+    if index > size:
+        raise FormulaError("#REF!")
+    values_of = (lambda: table.column(0)) if vertical else (lambda: table.row(0))
+    if lookup is None:
+        lookup = 0
+    if approximate:
+        position = approximate_position(table, lookup, values_of, "first")
+    else:
+        position = exact_position(table, lookup, values_of, "first")
+    if position is None:
+        raise FormulaError("#N/A")
+    value = table.rows[position][index - 1] if vertical else table.rows[index - 1][position]
+    if type(value) is FormulaError:
+        raise value
+    return 0 if value is None else value
+
+
+def fn_match(lookup, array, match_type=MISSING):
+    lookup = scalar(lookup)
+    array = require_range(array)
+    match_type = 1 if match_type is MISSING else to_int(match_type)
+    values_of = array.vector
+    if match_type == 0:
+        position = exact_position(array, lookup, values_of, "vector")
+    else:
+        position = approximate_position(array, lookup, values_of, "vector", descending=match_type < 0)
+    if position is None:
+        raise FormulaError("#N/A")
+    return position + 1
+
+
+def fn_index(array, row, column=MISSING):
+    if not isinstance(array, RangeValue):
+        array = RangeValue([[scalar(array)]], 1)
+    row = 0 if row is MISSING else to_int(row)
+    column = 0 if column is MISSING else to_int(column)
+    if column == 0 and array.height == 1 and array.width > 1 and row:
+        row, column = 1, row
+    if row < 0 or column < 0 or row > array.height or column > array.width:
+        raise FormulaError("#REF!")
+    if row and column:
+        return array.rows[row - 1][column - 1]
+    if row:
+        if array.width == 1:
+            return array.rows[row - 1][0]
+        return RangeValue([array.rows[row - 1]], array.width)
+    if column:
+        if array.height == 1:
+            return array.rows[0][column - 1]
+        return RangeValue([[r[column - 1]] for r in array.rows], 1)
+    return array
+
+
+def fn_rows(array):
+    return array.height if isinstance(array, RangeValue) else 1
+
+
+def fn_columns(array):
+    return array.width if isinstance(array, RangeValue) else 1
+
+
+# ---------------------------------------------------------------- 숫자/글자/논리
+
+
+def fn_mod(number, divisor):
+    number, divisor = to_number(number), to_number(divisor)
+    if divisor == 0:
+        raise FormulaError("#DIV/0!")
+    return number - divisor * math.floor(number / divisor)
+
+
+def fn_sqrt(value):
+    value = to_number(value)
+    if value < 0:
+        raise FormulaError("#NUM!")
+    return math.sqrt(value)
+
+
+def fn_power(base, exponent):
+    return power(to_number(base), to_number(exponent))
+
+
+def power(base, exponent):
+    if base == 0 and exponent == 0:
+        raise FormulaError("#NUM!")
+    if base == 0 and exponent < 0:
+        raise FormulaError("#DIV/0!")
+    try:
+        result = base**exponent
+    except OverflowError:
+        raise FormulaError("#NUM!")
+    if isinstance(result, complex):
+        raise FormulaError("#NUM!")
+    return number_result(result)
+
+
+def fn_log(value, base=MISSING):
+    value = to_number(value)
+    base = 10 if base is MISSING else to_number(base)
+    if value <= 0 or base <= 0 or base == 1:
+        raise FormulaError("#NUM!")
+    return math.log(value, base)
+
+
+def fn_ln(value):
+    value = to_number(value)
+    if value <= 0:
+        raise FormulaError("#NUM!")
+    return math.log(value)
+
+
+def fn_ceiling(value, significance=MISSING):
+    value = to_number(value)
+    significance = 1 if significance is MISSING else to_number(significance)
+    if significance == 0:
+        return 0
+    if value > 0 and significance < 0:
+        raise FormulaError("#NUM!")
+    return math.ceil(value / significance) * significance
+
+
+def fn_floor(value, significance=MISSING):
+    value = to_number(value)
+    significance = 1 if significance is MISSING else to_number(significance)
+    if significance == 0:
+        raise FormulaError("#DIV/0!")
+    if value > 0 and significance < 0:
+        raise FormulaError("#NUM!")
+    return math.floor(value / significance) * significance
+
+
+def fn_trunc(value, digits=MISSING):
+    digits = 0 if digits is MISSING else digits
+    return excel_round(value, digits, ROUND_DOWN)
+
+
+def fn_atan2(x, y):
+    x, y = to_number(x), to_number(y)
+    if x == 0 and y == 0:
+        raise FormulaError("#DIV/0!")
+    return math.atan2(y, x)
+
+
+def checked_math(func, domain=None):
+    def wrapper(value):
+        value = to_number(value)
+        if domain is not None and not domain(value):
+            raise FormulaError("#NUM!")
+        try:
+            return number_result(func(value))
+        except (OverflowError, ValueError):
+            raise FormulaError("#NUM!")
+
+    return wrapper
+
+
+def fn_left(text, count=MISSING):
+    count = 1 if count is MISSING else to_int(count)
+    if count < 0:
+        raise FormulaError("#VALUE!")
+    return to_text(text)[:count]
+
+
+def fn_right(text, count=MISSING):
+    count = 1 if count is MISSING else to_int(count)
+    if count < 0:
+        raise FormulaError("#VALUE!")
+    text = to_text(text)
+    return text[len(text) - count :] if count else ""
+
+
+def fn_mid(text, start, count):
+    start, count = to_int(start), to_int(count)
+    if start < 1 or count < 0:
+        raise FormulaError("#VALUE!")
+    return to_text(text)[start - 1 : start - 1 + count]
+
+
+def fn_trim(text):
+    return re.sub(" +", " ", to_text(text).strip(" "))
+
+
+def fn_substitute(text, old, new, instance=MISSING):
+    text, old, new = to_text(text), to_text(old), to_text(new)
+    if not old:
+        return text
+    if instance is MISSING:
+        return text.replace(old, new)
+    instance = to_int(instance)
+    if instance < 1:
+        raise FormulaError("#VALUE!")
+    position = -1
+    for _ in range(instance):
+        position = text.find(old, position + 1)
+        if position == -1:
+            return text
+    return text[:position] + new + text[position + len(old) :]
+
+
+def fn_find(needle, haystack, start=MISSING, ignore_case=False):
+    needle, haystack = to_text(needle), to_text(haystack)
+    start = 1 if start is MISSING else to_int(start)
+    if start < 1 or start > len(haystack) + 1:
+        raise FormulaError("#VALUE!")
+    if ignore_case:
+        needle, haystack = needle.lower(), haystack.lower()
+    position = haystack.find(needle, start - 1)
+    if position == -1:
+        raise FormulaError("#VALUE!")
+    return position + 1
+
+
+def fn_search(needle, haystack, start=MISSING):
+    return fn_find(needle, haystack, start, ignore_case=True)
+
+
+def fn_concat(*args):
+    parts = []
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            parts.extend(to_text(value) for value in arg.values() if value is not None)
+        elif arg is not MISSING:
+            parts.append(to_text(arg))
+    return "".join(parts)
+
+
+def fn_value(text):
+    value = scalar(text)
+    if is_number(value):
+        return value
+    text = to_text(value).strip().replace(",", "")
+    try:
+        if text.endswith("%"):
+            return float(text[:-1]) / 100
+        return float(text)
+    except ValueError:
+        raise FormulaError("#VALUE!")
+
+
+TEXT_FORMAT_RE = re.compile(r"^(#,##)?0(\.(0+))?(%)?$")
+
+
+def fn_text(value, format_text):
+    # 숫자 서식 중 0, 0.00, #,##0.0, 0.0% 형태만 지원한다.
+    format_text = to_text(format_text)
+    if format_text == "@":
+        return to_text(value)
+    match = TEXT_FORMAT_RE.match(format_text)
+    if not match:
+        raise UnsupportedFormula(f'TEXT format "{format_text}"')
+    number = to_number(value)
+    grouping, _, decimals, percent = match.groups()
+    if percent:
+        number *= 100
+    digits = len(decimals) if decimals else 0
+    rounded = Decimal(f"{number:.15G}").quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP)
+    text = f"{rounded:,.{digits}f}" if grouping else f"{rounded:.{digits}f}"
+    return text + ("%" if percent else "")
+
+
+def fn_and(*args):
+    return all([to_bool(v) for v in flatten_logical(args)])
+
+
+def fn_or(*args):
+    return any([to_bool(v) for v in flatten_logical(args)])
+
+
+def flatten_logical(args):
+    for arg in args:
+        if isinstance(arg, RangeValue):
+            for value in arg.values():
+                if type(value) is FormulaError:
+                    raise value
+                if type(value) is bool or is_number(value):
+                    yield value
+        elif arg is not MISSING:
+            yield arg
+
+
+def fn_not(value):
+    return not to_bool(value)
+
+
+def fn_na():
+    raise FormulaError("#N/A")
+
+
+def fn_iserror(value):
+    return type(value) is FormulaError
+
+
+def fn_iserr(value):
+    return type(value) is FormulaError and value.code != "#N/A"
+
+
+def fn_isna(value):
+    return type(value) is FormulaError and value.code == "#N/A"
+
+
+def checked_scalar(value):
+    if isinstance(value, RangeValue):
+        try:
+            return value.scalar()
+        except FormulaError as error:
+            return error
+    return value
+
+
+def fn_isnumber(value):
+    return is_number(checked_scalar(value))
+
+
+def fn_istext(value):
+    return type(checked_scalar(value)) is str
+
+
+def fn_isnontext(value):
+    return type(checked_scalar(value)) is not str
+
+
+def fn_islogical(value):
+    return type(checked_scalar(value)) is bool
+
+
+def fn_isblank(value):
+    return checked_scalar(value) is None
+
+
+def fn_n(value):
+    value = checked_scalar(value)
+    if type(value) is FormulaError:
+        raise value
+    if is_number(value):
+        return value
+    if type(value) is bool:
+        return int(value)
+    return 0
+
+
+FUNCTIONS = {
+    "SUM": fn_sum,
+    "PRODUCT": fn_product,
+    "AVERAGE": fn_average,
+    "MAX": fn_max,
+    "MIN": fn_min,
+    "COUNT": fn_count,
+    "COUNTA": fn_counta,
+    "COUNTBLANK": fn_countblank,
+    "SUMPRODUCT": fn_sumproduct,
+    "SUMIF": fn_sumif,
+    "SUMIFS": fn_sumifs,
+    "COUNTIF": fn_countif,
+    "COUNTIFS": fn_countifs,
+    "AVERAGEIF": fn_averageif,
+    "MAXIFS": fn_maxifs,
+    "MINIFS": fn_minifs,
+    "VLOOKUP": fn_vlookup,
+    "HLOOKUP": fn_hlookup,
+    "MATCH": fn_match,
+    "INDEX": fn_index,
+    "ROWS": fn_rows,
+    "COLUMNS": fn_columns,
+    "ABS": lambda v: abs(to_number(v)),
+    "SIGN": lambda v: (to_number(v) > 0) - (to_number(v) < 0),
+    "INT": lambda v: math.floor(to_number(v)),
+    "TRUNC": fn_trunc,
+    "ROUND": lambda v, d=0: excel_round(v, d, ROUND_HALF_UP),
+    "ROUNDUP": lambda v, d=0: excel_round(v, d, ROUND_UP),
+    "ROUNDDOWN": lambda v, d=0: excel_round(v, d, ROUND_DOWN),
+    "CEILING": fn_ceiling,
+    "FLOOR": fn_floor,
+    "MOD": fn_mod,
+    "SQRT": fn_sqrt,
+    "POWER": fn_power,
+    "EXP": checked_math(math.exp),
+    "LN": fn_ln,
+    "LOG": fn_log,
+    "LOG10": lambda v: fn_log(v, 10),
+    "PI": lambda: math.pi,
+    "SIN": checked_math(math.sin),
+    "COS": checked_math(math.cos),
+    "TAN": checked_math(math.tan),
+    "ASIN": checked_math(math.asin, lambda v: -1 <= v <= 1),
+    "ACOS": checked_math(math.acos, lambda v: -1 <= v <= 1),
+    "ATAN": checked_math(math.atan),
+    "ATAN2": fn_atan2,
+    "RADIANS": lambda v: math.radians(to_number(v)),
+    "DEGREES": lambda v: math.degrees(to_number(v)),
+    "LEFT": fn_left,
+    "RIGHT": fn_right,
+    "MID": fn_mid,
+    "LEN": lambda v: len(to_text(v)),
+    "TRIM": fn_trim,
+    "UPPER": lambda v: to_text(v).upper(),
+    "LOWER": lambda v: to_text(v).lower(),
+    "REPT": lambda v, n: to_text(v) * max(to_int(n), 0),
+    "SUBSTITUTE": fn_substitute,
+    "FIND": fn_find,
+    "SEARCH": fn_search,
+    "CONCATENATE": fn_concat,
+    "CONCAT": fn_concat,
+    "VALUE": fn_value,
+    "TEXT": fn_text,
+    "AND": fn_and,
+    "OR": fn_or,
+    "NOT": fn_not,
+    "TRUE": lambda: True,
+    "FALSE": lambda: False,
+    "NA": fn_na,
+    "ISERROR": fn_iserror,
+    "ISERR": fn_iserr,
+    "ISNA": fn_isna,
+    "ISNUMBER": fn_isnumber,
+    "ISTEXT": fn_istext,
+    "ISNONTEXT": fn_isnontext,
+    "ISLOGICAL": fn_islogical,
+    "ISBLANK": fn_isblank,
+    "N": fn_n,
+}
+
+ALL_ARGS = lambda index: True  # noqa: E731
+# 인수 위치 중 참조를 범위 그대로 받는 자리. 나머지 자리의 참조는 셀 값 하나로 읽는다.
+RANGE_ARGS = {
+    "SUM": ALL_ARGS,
+    "PRODUCT": ALL_ARGS,
+    "AVERAGE": ALL_ARGS,
+    "MAX": ALL_ARGS,
+    "MIN": ALL_ARGS,
+    "COUNT": ALL_ARGS,
+    "COUNTA": ALL_ARGS,
+    "COUNTBLANK": ALL_ARGS,
+    "SUMPRODUCT": ALL_ARGS,
+    "CONCAT": ALL_ARGS,
+    "AND": ALL_ARGS,
+    "OR": ALL_ARGS,
+    "SUMIF": lambda index: index in (0, 2),
+    "AVERAGEIF": lambda index: index in (0, 2),
+    "COUNTIF": lambda index: index == 0,
+    "SUMIFS": lambda index: index == 0 or index % 2 == 1,
+    "MAXIFS": lambda index: index == 0 or index % 2 == 1,
+    "MINIFS": lambda index: index == 0 or index % 2 == 1,
+    "COUNTIFS": lambda index: index % 2 == 0,
+    "VLOOKUP": lambda index: index == 1,
+    "HLOOKUP": lambda index: index == 1,
+    "MATCH": lambda index: index == 1,
+    "INDEX": lambda index: index == 0,
+    "ROWS": ALL_ARGS,
+    "COLUMNS": ALL_ARGS,
+    "ISNUMBER": ALL_ARGS,
+    "ISTEXT": ALL_ARGS,
+    "ISNONTEXT": ALL_ARGS,
+    "ISLOGICAL": ALL_ARGS,
+    "ISBLANK": ALL_ARGS,
+    "N": ALL_ARGS,
+}
+# 인수의 오류를 예외 대신 값으로 받는 함수
+CAPTURE_ERRORS = {"ISERROR", "ISERR", "ISNA", "ISNUMBER", "ISTEXT", "ISNONTEXT", "ISLOGICAL", "ISBLANK"}
+# 값이 바뀌는 함수나 참조를 계산으로 만드는 함수는 의존 관계를 미리 알 수 없다.
+VOLATILE = {"INDIRECT", "OFFSET", "NOW", "TODAY", "RAND", "RANDBETWEEN", "CELL", "INFO"}
+
+
+# ---------------------------------------------------------------- 수식 해석
+
+BINARY_PRECEDENCE = {
+    "=": 1,
+    "<>": 1,
+    "<": 1,
+    ">": 1,
+    "<=": 1,
+    ">=": 1,
+    "&": 2,
+    "+": 3,
+    "-": 3,
+    "*": 4,
+    "/": 4,
+    "^": 5,
+}
+PREFIX_PRECEDENCE = 6
+SHEET_REF_RE = re.compile(r"^(?:'((?:[^']|'')+)'|([^'!]+))!(.+)$")
+
+
+class FormulaParser:
+    # openpyxl 의 Tokenizer 토큰으로 수식 트리를 만든다.
+    # 노드: ("num", v) ("str", s) ("bool", b) ("err", code) ("ref", sheet, r1, c1, r2, c2)
+    #       ("neg", x) ("pct", x) ("bin", op, a, b) ("call", name, args) ("missing",)
+    # ref 의 마지막 값은 (r1, c1, r2, c2) 가 상대 참조인지 나타낸다 (shift_node 참조).
+    def __init__(self, formula, sheet_name, resolve_sheet, resolve_name):
+        try:
+            tokens = Tokenizer(formula).items
+        except Exception as e:
+            raise UnsupportedFormula(f"cannot tokenize {formula!r}: {e}")
+        self.tokens = [t for t in tokens if t.type != Token.WSPACE]
+        self.position = 0
+        self.formula = formula
+        self.sheet_name = sheet_name
+        self.resolve_sheet = resolve_sheet
+        self.resolve_name = resolve_name
+
+    def parse(self):
+        node = self.expression(0)
+        if self.position != len(self.tokens):
+            raise UnsupportedFormula(f"unexpected token in {self.formula!r}")
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def next(self):
+        token = self.peek()
+        if token is None:
+            raise UnsupportedFormula(f"unexpected end of {self.formula!r}")
+        self.position += 1
+        return token
+
+    def expression(self, min_precedence):
+        left = self.prefix()
+        while True:
+            token = self.peek()
+            if token is None:
+                return left
+            if token.type == Token.OP_POST:
+                self.position += 1
+                left = ("pct", left)
+                continue
+            if token.type != Token.OP_IN:
+                return left
+            if token.value not in BINARY_PRECEDENCE:
+                raise UnsupportedFormula(f"operator {token.value!r}")
+            precedence = BINARY_PRECEDENCE[token.value]
+            if precedence < min_precedence:
+                return left
+            self.position += 1
+            right = self.expression(precedence + 1)
+            left = ("bin", token.value, left, right)
+
+    def prefix(self):
+        token = self.next()
+        if token.type == Token.OP_PRE:
+            operand = self.expression(PREFIX_PRECEDENCE)
+            return ("neg", operand) if token.value == "-" else operand
+        if token.type == Token.OPERAND:
+            return self.operand(token)
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self.expression(0)
+            closing = self.next()
+            if closing.type != Token.PAREN:
+                raise UnsupportedFormula(f"unbalanced parenthesis in {self.formula!r}")
+            return node
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self.call(token)
+        raise UnsupportedFormula(f"token {token.value!r} in {self.formula!r}")
+
+    def call(self, token):
+        name = token.value[:-1].upper()
+        for prefix in ("_XLFN.", "_XLWS."):
+            if name.startswith(prefix):
+                name = name[len(prefix) :]
+        args = []
+        if self.peek() is not None and self.peek().type == Token.FUNC and self.peek().subtype == Token.CLOSE:
+            self.position += 1
+            return ("call", name, args)
+        while True:
+            following = self.peek()
+            if following is not None and (
+                (following.type == Token.SEP and following.subtype == Token.ARG)
+                or (following.type == Token.FUNC and following.subtype == Token.CLOSE)
+            ):
+                args.append(("missing",))
+            else:
+                args.append(self.expression(0))
+            separator = self.next()
+            if separator.type == Token.FUNC and separator.subtype == Token.CLOSE:
+                return ("call", name, args)
+            if not (separator.type == Token.SEP and separator.subtype == Token.ARG):
+                raise UnsupportedFormula(f"unexpected {separator.value!r} in {self.formula!r}")
+
+    def operand(self, token):
+        value = token.value
+        if token.subtype == Token.NUMBER:
+            number = float(value)
+            return ("num", int(number) if number.is_integer() and "." not in value and "E" not in value.upper() else number)
+        if token.subtype == Token.TEXT:
+            return ("str", value[1:-1].replace('""', '"'))
+        if token.subtype == Token.LOGICAL:
+            return ("bool", value.upper() == "TRUE")
+        if token.subtype == Token.ERROR:
+            return ("err", value)
+        return self.reference(value)
+
+    def reference(self, text):
+        sheet_name = self.sheet_name
+        ref = text
+        match = SHEET_REF_RE.match(text)
+        if match:
+            quoted, plain, ref = match.groups()
+            sheet_name = quoted.replace("''", "'") if quoted else plain
+            if sheet_name.startswith("[") or ":" in sheet_name:
+                raise UnsupportedFormula(f"external or 3D reference {text!r}")
+            sheet_name = self.resolve_sheet(sheet_name)
+        try:
+            min_col, min_row, max_col, max_row = range_boundaries(ref.replace("$", ""))
+        except (ValueError, TypeError):
+            if match:
+                raise UnsupportedFormula(f"reference {text!r}")
+            return self.resolve_name(text, self.sheet_name)
+        parts = ref.split(":")
+        first, last = relative_parts(parts[0]), relative_parts(parts[-1])
+        return (
+            "ref",
+            sheet_name,
+            min_row or 1,
+            min_col or 1,
+            max_row or MAX_ROW,
+            max_col or MAX_COLUMN,
+            (first[0], first[1], last[0], last[1]),
+        )
+
+
+CELL_PART_RE = re.compile(r"^(\$?)[A-Za-z]{1,3}(\$?)\d+$")
+QUOTED_RE = re.compile(r"(\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*')")
+CELL_REF_RE = re.compile(r"(?<![A-Za-z0-9_.])(\$?)([A-Za-z]{1,3})(\$?)(\d+)(?![A-Za-z0-9_(])")
+
+
+def relative_parts(part):
+    # 셀 주소 한 부분(A1, $A1 ...)의 (행, 열)이 상대 참조인지. 열 전체/행 전체 참조는 옮기지 않는다.
+    match = CELL_PART_RE.match(part)
+    if not match:
+        return False, False
+    column_absolute, row_absolute = match.groups()
+    return not row_absolute, not column_absolute
+
+
+def formula_shape(text, row, column):
+    # 채우기로 복사된 수식은 상대 참조를 (행, 열) 차이로 바꾸면 같은 글자가 된다.
+    # 문자열과 따옴표로 감싼 시트 이름 안은 건드리지 않는다.
+    def relative(match):
+        column_absolute, letters, row_absolute, digits = match.groups()
+        try:
+            ref_column = column_index_from_string(letters.upper())
+        except ValueError:
+            return match.group(0)
+        column_part = f"${ref_column}" if column_absolute else f"C[{ref_column - column}]"
+        row_part = f"${digits}" if row_absolute else f"R[{int(digits) - row}]"
+        return f"<{column_part},{row_part}>"
+
+    parts = QUOTED_RE.split(text)
+    for index in range(0, len(parts), 2):
+        parts[index] = CELL_REF_RE.sub(relative, parts[index])
+    return "".join(parts)
+
+
+def shift_node(node, rows, columns):
+    kind = node[0]
+    if kind == "ref":
+        _, sheet_name, r1, c1, r2, c2, relative = node
+        return (
+            "ref",
+            sheet_name,
+            r1 + rows if relative[0] else r1,
+            c1 + columns if relative[1] else c1,
+            r2 + rows if relative[2] else r2,
+            c2 + columns if relative[3] else c2,
+            relative,
+        )
+    if kind in ("neg", "pct"):
+        return (kind, shift_node(node[1], rows, columns))
+    if kind == "bin":
+        return ("bin", node[1], shift_node(node[2], rows, columns), shift_node(node[3], rows, columns))
+    if kind == "call":
+        return ("call", node[1], [shift_node(arg, rows, columns) for arg in node[2]])
+    return node
+
+
+# ---------------------------------------------------------------- 엔진
+
+
+def constant_value(cell):
+    if cell is None:
+        return None
+    value = cell._value
+    if cell.data_type == "e":
+        return FormulaError(value)
+    if hasattr(value, "year"):
+        return to_excel(value)
+    return value
+
+
+def same_value(old, new):
+    if type(old) is not type(new):
+        return False
+    if type(new) is FormulaError:
+        return old.code == new.code
+    return old == new
+
+
+def export_value(value):
+    # Excel 이 저장한 값을 openpyxl(data_only=True)로 읽은 것과 같은 모양으로 바꾼다.
+    # 오류는 "#N/A" 같은 글자, 빈 글자는 None, 정수인 실수는 int 로 읽힌다.
+    if type(value) is FormulaError:
+        return value.code
+    if value == "" and type(value) is str:
+        return None
+    if type(value) is float and value.is_integer() and abs(value) < 1e15:
+        return int(value)
+    return value
+
+
+class FormulaEngine:
+    # 템플릿 수식을 한 번 컴파일해 두고, 입력 시트가 바뀐 셀에 닿는 수식만 다시 계산한다.
+    # targets 는 {시트 이름: 열 번호 목록(None 이면 모든 열)} 으로, 그 셀이 의존하는 수식만 컴파일한다.
+    def __init__(self, workbook, targets):
+        self.targets = targets
+        self.workbook = None
+        self.sheet_names = {name.lower(): name for name in workbook.sheetnames}
+        self.formula_text = {}
+        self.functions = {}
+        self.cell_deps = {}
+        self.range_deps = {}
+        self.ranges = []
+        self.range_ids = {}
+        self.values = {}
+        self.range_cache = {}
+        self.snapshot = {}
+        self.extents = {}
+        self.last_recalculated = 0
+        self.compile(workbook)
+
+    # ---- 컴파일
+
+    def resolve_sheet(self, name):
+        resolved = self.sheet_names.get(name.lower())
+        if resolved is None:
+            raise UnsupportedFormula(f"unknown sheet {name!r}")
+        return resolved
+
+    def resolve_name(self, name, sheet_name):
+        sheet = self.compiling_workbook[sheet_name]
+        defined = sheet.defined_names.get(name) or self.compiling_workbook.defined_names.get(name)
+        if defined is None:
+            raise UnsupportedFormula(f"unknown name {name!r}")
+        destinations = list(defined.destinations)
+        if len(destinations) != 1:
+            raise UnsupportedFormula(f"name {name!r} is not a single range")
+        target_sheet, ref = destinations[0]
+        min_col, min_row, max_col, max_row = range_boundaries(ref.replace("$", ""))
+        return (
+            "ref",
+            self.resolve_sheet(target_sheet),
+            min_row or 1,
+            min_col or 1,
+            max_row or MAX_ROW,
+            max_col or MAX_COLUMN,
+            (False, False, False, False),
+        )
+
+    def formula_cells(self, workbook, sheet_name):
+        sheet = workbook[sheet_name]
+        for key, cell in sheet._cells.items():
+            if cell.data_type == "f":
+                if not isinstance(cell._value, str):
+                    raise UnsupportedFormula(f"array or table formula at {sheet_name}!{cell.coordinate}")
+                yield key, cell._value
+
+    def compile(self, workbook):
+        self.compiling_workbook = workbook
+        all_formulas = {}
+        for sheet_name in workbook.sheetnames:
+            for (row, column), text in self.formula_cells(workbook, sheet_name):
+                all_formulas[(sheet_name, row, column)] = text
+        self.all_formulas = all_formulas
+        self.formula_counts = defaultdict(int)
+        for sheet_name, _, _ in all_formulas:
+            self.formula_counts[sheet_name] += 1
+        by_sheet_column = defaultdict(list)
+        for sheet_name, row, column in all_formulas:
+            by_sheet_column[(sheet_name, column)].append(row)
+        for rows in by_sheet_column.values():
+            rows.sort()
+        self.formula_rows = by_sheet_column
+
+        pending = deque()
+        for sheet_name, columns in self.targets.items():
+            sheet_name = self.resolve_sheet(sheet_name)
+            for key in all_formulas:
+                if key[0] == sheet_name and (columns is None or key[2] in columns):
+                    pending.append(key)
+
+        self.range_members = []
+        shapes = {}
+        while pending:
+            key = pending.popleft()
+            if key in self.functions:
+                continue
+            text = all_formulas[key]
+            sheet_name, row, column = key
+            shape = (sheet_name, formula_shape(text, row, column))
+            parsed = shapes.get(shape)
+            if parsed is None:
+                node = FormulaParser(text, sheet_name, self.resolve_sheet, self.resolve_name).parse()
+                shapes[shape] = (node, row, column)
+            else:
+                base, base_row, base_column = parsed
+                node = shift_node(base, row - base_row, column - base_column)
+            cells, ranges = set(), set()
+            self.functions[key] = self.compile_node(node, key, cells, ranges, range_context=False)
+            self.formula_text[key] = text
+            self.cell_deps[key] = cells
+            self.range_deps[key] = ranges
+            for dep in cells:
+                if dep in all_formulas and dep not in self.functions:
+                    pending.append(dep)
+            for range_id in ranges:
+                for member in self.range_members[range_id]:
+                    if member not in self.functions:
+                        pending.append(member)
+
+        self.compiling_workbook = None
+        self.build_graph()
+
+    def range_id(self, sheet_name, r1, c1, r2, c2):
+        key = (sheet_name, r1, c1, r2, c2)
+        range_id = self.range_ids.get(key)
+        if range_id is None:
+            range_id = self.range_ids[key] = len(self.ranges)
+            self.ranges.append(key)
+            members = []
+            for column in range(c1, min(c2, MAX_COLUMN) + 1):
+                rows = self.formula_rows.get((sheet_name, column))
+                if not rows:
+                    continue
+                start = bisect_right(rows, r1 - 1)
+                end = bisect_right(rows, r2)
+                members.extend((sheet_name, row, column) for row in rows[start:end])
+            self.range_members.append(members)
+        return range_id
+
+    def compile_node(self, node, key, cells, ranges, range_context):
+        kind = node[0]
+        if kind in ("num", "str", "bool"):
+            value = node[1]
+            return lambda: value
+        if kind == "err":
+            error = FormulaError(node[1])
+
+            def raise_error():
+                raise error
+
+            return raise_error
+        if kind == "missing":
+            return lambda: MISSING
+        if kind == "ref":
+            return self.compile_reference(node, key, cells, ranges, range_context)
+        if kind == "neg":
+            operand = self.compile_node(node[1], key, cells, ranges, False)
+            return lambda: -to_number(operand())
+        if kind == "pct":
+            operand = self.compile_node(node[1], key, cells, ranges, False)
+            return lambda: to_number(operand()) / 100
+        if kind == "bin":
+            return self.compile_binary(node, key, cells, ranges)
+        if kind == "call":
+            return self.compile_call(node, key, cells, ranges)
+        raise UnsupportedFormula(f"node {kind}")
+
+    def compile_reference(self, node, key, cells, ranges, range_context):
+        _, sheet_name, r1, c1, r2, c2, _ = node
+        if range_context:
+            range_id = self.range_id(sheet_name, r1, c1, r2, c2)
+            ranges.add(range_id)
+            return lambda: self.range_value(range_id)
+        if (r1, c1) != (r2, c2):
+            # 암시적 교차: 한 열(행) 범위는 수식과 같은 행(열)의 셀 하나로 읽는다.
+            _, row, column = key
+            if c1 == c2 and r1 <= row <= r2:
+                r1 = r2 = row
+            elif r1 == r2 and c1 <= column <= c2:
+                c1 = c2 = column
+            else:
+
+                def implicit_error():
+                    raise FormulaError("#VALUE!")
+
+                return implicit_error
+        target = (sheet_name, r1, c1)
+        cells.add(target)
+        if target in self.all_formulas:
+            values = self.values
+
+            def read_formula():
+                value = values[target]
+                if type(value) is FormulaError:
+                    raise value
+                return value
+
+            return read_formula
+        return lambda: self.read_constant(target)
+
+    def compile_binary(self, node, key, cells, ranges):
+        _, op, left_node, right_node = node
+        left = self.compile_node(left_node, key, cells, ranges, False)
+        right = self.compile_node(right_node, key, cells, ranges, False)
+        if op == "&":
+            return lambda: to_text(left()) + to_text(right())
+        if op in CRITERIA_OPS:
+            test = CRITERIA_OPS[op]
+            return lambda: test(compare(left(), right()), 0)
+        if op == "+":
+            return lambda: number_result(to_number(left()) + to_number(right()))
+        if op == "-":
+            return lambda: number_result(to_number(left()) - to_number(right()))
+        if op == "*":
+            return lambda: number_result(to_number(left()) * to_number(right()))
+        if op == "/":
+
+            def divide():
+                numerator = to_number(left())
+                denominator = to_number(right())
+                if denominator == 0:
+                    raise FormulaError("#DIV/0!")
+                return number_result(numerator / denominator)
+
+            return divide
+        if op == "^":
+            return lambda: power(to_number(left()), to_number(right()))
+        raise UnsupportedFormula(f"operator {op!r}")
+
+    def compile_call(self, node, key, cells, ranges):
+        _, name, arg_nodes = node
+        if name in VOLATILE:
+            raise UnsupportedFormula(f"function {name} has dynamic dependencies")
+        if name in ("ROW", "COLUMN"):
+            if arg_nodes and arg_nodes[0][0] != "ref":
+                raise UnsupportedFormula(f"{name} of a computed reference")
+            ref = arg_nodes[0] if arg_nodes else ("ref", key[0], key[1], key[2], key[1], key[2], None)
+            value = ref[2] if name == "ROW" else ref[3]
+            return lambda: value
+
+        range_args = RANGE_ARGS.get(name, lambda index: False)
+        args = [
+            self.compile_node(arg, key, cells, ranges, range_args(index) and arg[0] == "ref")
+            for index, arg in enumerate(arg_nodes)
+        ]
+
+        if name == "IF":
+            if not 1 <= len(args) <= 3:
+                raise UnsupportedFormula("IF arguments")
+            condition = args[0]
+            when_true = args[1] if len(args) > 1 else (lambda: 0)
+            when_false = args[2] if len(args) > 2 else (lambda: False)
+
+            def if_():
+                branch = when_true if to_bool(condition()) else when_false
+                value = branch()
+                return 0 if value is MISSING else value
+
+            return if_
+        if name in ("IFERROR", "IFNA"):
+            if len(args) != 2:
+                raise UnsupportedFormula(f"{name} arguments")
+            value_of, fallback = args
+            only_na = name == "IFNA"
+
+            def if_error():
+                try:
+                    value = value_of()
+                    if isinstance(value, RangeValue):
+                        value = value.scalar()
+                    return value
+                except FormulaError as error:
+                    if only_na and error.code != "#N/A":
+                        raise
+                    value = fallback()
+                    return "" if value is MISSING else value
+
+            return if_error
+        if name == "CHOOSE":
+            index_of, options = args[0], args[1:]
+
+            def choose():
+                index = to_int(index_of())
+                if not 1 <= index <= len(options):
+                    raise FormulaError("#VALUE!")
+                return options[index - 1]()
+
+            return choose
+
+        func = FUNCTIONS.get(name)
+        if func is None:
+            raise UnsupportedFormula(f"function {name}")
+        if name in CAPTURE_ERRORS:
+
+            def capture(arg):
+                def wrapped():
+                    try:
+                        return arg()
+                    except FormulaError as error:
+                        return error
+
+                return wrapped
+
+            args = [capture(arg) for arg in args]
+
+        def call():
+            return func(*[arg() for arg in args])
+
+        return call
+
+    def build_graph(self):
+        # 수식 -> 수식 간선(직접 참조 + 범위 안의 수식)으로 계산 순서를 정하고, 입력 셀 -> 수식 역방향 색인을 만든다.
+        self.dependents = defaultdict(set)
+        self.range_dependents = defaultdict(set)
+        self.member_of = defaultdict(set)
+        self.cell_ranges = defaultdict(set)
+        self.large_ranges = []
+        for key in self.functions:
+            for dep in self.cell_deps[key]:
+                self.dependents[dep].add(key)
+            for range_id in self.range_deps[key]:
+                self.range_dependents[range_id].add(key)
+        for range_id, (sheet_name, r1, c1, r2, c2) in enumerate(self.ranges):
+            for member in self.range_members[range_id]:
+                self.member_of[member].add(range_id)
+            if (r2 - r1 + 1) * (c2 - c1 + 1) <= SMALL_RANGE_CELLS:
+                for row in range(r1, r2 + 1):
+                    for column in range(c1, c2 + 1):
+                        self.cell_ranges[(sheet_name, row, column)].add(range_id)
+            else:
+                self.large_ranges.append(range_id)
+
+        indegree = {key: 0 for key in self.functions}
+        edges = defaultdict(set)
+        for key in self.functions:
+            sources = {dep for dep in self.cell_deps[key] if dep in self.functions}
+            for range_id in self.range_deps[key]:
+                sources.update(self.range_members[range_id])
+            for source in sources:
+                if source == key:
+                    raise UnsupportedFormula(f"circular reference at {key[0]}!{key[2]},{key[1]}")
+                edges[source].add(key)
+                indegree[key] += 1
+        queue = deque(key for key, degree in indegree.items() if degree == 0)
+        order = []
+        while queue:
+            key = queue.popleft()
+            order.append(key)
+            for target in edges[key]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    queue.append(target)
+        if len(order) != len(self.functions):
+            raise UnsupportedFormula("circular reference")
+        self.order = order
+        self.input_sheets = {sheet_name for sheet_name, _, _ in self.dependents} | {
+            sheet_name for sheet_name, _, _, _, _ in self.ranges
+        }
+
+    # ---- 계산
+
+    def read_constant(self, key):
+        sheet_name, row, column = key
+        value = constant_value(self.workbook[sheet_name]._cells.get((row, column)))
+        if type(value) is FormulaError:
+            raise value
+        return value
+
+    def range_value(self, range_id):
+        cached = self.range_cache.get(range_id)
+        if cached is not None:
+            return cached
+        sheet_name, r1, c1, r2, c2 = self.ranges[range_id]
+        last_row, last_column = self.extents[sheet_name]
+        # 열 전체(A:A) 같은 큰 범위는 값이 있는 곳까지만 읽는다.
+        r2, c2 = min(r2, max(last_row, r1)), min(c2, max(last_column, c1))
+        sheet_cells = self.workbook[sheet_name]._cells
+        values = self.values
+        rows = []
+        for row in range(r1, r2 + 1):
+            row_values = []
+            for column in range(c1, c2 + 1):
+                key = (sheet_name, row, column)
+                if key in values:
+                    row_values.append(values[key])
+                else:
+                    row_values.append(constant_value(sheet_cells.get((row, column))))
+            rows.append(row_values)
+        cached = self.range_cache[range_id] = RangeValue(rows, c2 - c1 + 1)
+        return cached
+
+    def take_snapshot(self, workbook):
+        snapshot = {}
+        for sheet_name in self.input_sheets:
+            sheet = workbook[sheet_name]
+            snapshot[sheet_name] = {
+                key: constant_value(cell)
+                for key, cell in sheet._cells.items()
+                if cell.data_type != "f" and cell._value is not None
+            }
+        return snapshot
+
+    def same_formulas(self, workbook):
+        # 입력을 쓰면서 템플릿 수식을 덮었거나 수식이 늘었으면 그래프를 다시 만들어야 한다.
+        if workbook.sheetnames != list(self.sheet_names.values()):
+            return False
+        for sheet_name in workbook.sheetnames:
+            count = sum(1 for cell in workbook[sheet_name]._cells.values() if cell.data_type == "f")
+            if count != self.formula_counts.get(sheet_name, 0):
+                return False
+        for (sheet_name, row, column), text in self.formula_text.items():
+            cell = workbook[sheet_name]._cells.get((row, column))
+            if cell is None or cell.data_type != "f" or cell._value != text:
+                return False
+        return True
+
+    def changed_cells(self, snapshot):
+        changed = []
+        for sheet_name, cells in snapshot.items():
+            previous = self.snapshot.get(sheet_name, {})
+            for key, value in cells.items():
+                old = previous.get(key)
+                if type(old) is not type(value) or old != value:
+                    changed.append((sheet_name,) + key)
+            for key in previous.keys() - cells.keys():
+                changed.append((sheet_name,) + key)
+        return changed
+
+    def changed_inputs(self, changed):
+        # 바뀐 입력 셀을 직접 읽는 수식과, 바뀐 셀을 포함하는 범위를 찾는다.
+        seeds = set()
+        ranges = set()
+        for key in changed:
+            seeds.update(self.dependents.get(key, ()))
+            ranges.update(self.cell_ranges.get(key, ()))
+        by_sheet = defaultdict(list)
+        for sheet_name, row, column in changed:
+            by_sheet[sheet_name].append((row, column))
+        for sheet_name, positions in by_sheet.items():
+            positions = np.array(positions, dtype=np.int64)
+            rows, columns = positions[:, 0], positions[:, 1]
+            for range_id in self.large_ranges:
+                range_sheet, r1, c1, r2, c2 = self.ranges[range_id]
+                if range_sheet == sheet_name and np.any(
+                    (rows >= r1) & (rows <= r2) & (columns >= c1) & (columns <= c2)
+                ):
+                    ranges.add(range_id)
+        return seeds, ranges
+
+    def update(self, workbook):
+        # 새 입력이 들어간 workbook 으로 다시 계산한다. 다시 계산한 수식 개수를 돌려준다.
+        # 계산 순서대로 지나가며 읽는 셀이나 범위 값이 실제로 바뀐 수식만 계산하고,
+        # 결과가 그대로인 수식에서는 더 퍼뜨리지 않는다.
+        if not self.same_formulas(workbook):
+            raise UnsupportedFormula("template formulas changed")
+        snapshot = self.take_snapshot(workbook)
+        first_run = self.workbook is None
+        if first_run:
+            seeds, changed_ranges = set(self.functions), set(range(len(self.ranges)))
+        else:
+            seeds, changed_ranges = self.changed_inputs(self.changed_cells(snapshot))
+        self.workbook = workbook
+        self.snapshot = snapshot
+        self.extents = {name: data_extent(workbook[name]) for name in self.input_sheets}
+        for range_id in changed_ranges:
+            self.range_cache.pop(range_id, None)
+
+        values = self.values
+        changed_keys = set()
+        recalculated = 0
+        for key in self.order:
+            if not (
+                key in seeds
+                or not changed_keys.isdisjoint(self.cell_deps[key])
+                or not changed_ranges.isdisjoint(self.range_deps[key])
+            ):
+                continue
+            value = self.evaluate(key)
+            recalculated += 1
+            if first_run or not same_value(values.get(key, MISSING), value):
+                changed_keys.add(key)
+                for range_id in self.member_of.get(key, ()):
+                    changed_ranges.add(range_id)
+                    self.range_cache.pop(range_id, None)
+            values[key] = value
+        self.last_recalculated = recalculated
+        return recalculated
+
+    def evaluate(self, key):
+        try:
+            value = self.functions[key]()
+            if isinstance(value, RangeValue):
+                value = value.scalar()
+            if value is None or value is MISSING:
+                value = 0
+        except FormulaError as error:
+            value = error
+        except (ZeroDivisionError, OverflowError):
+            value = FormulaError("#NUM!")
+        return value
+
+    def cell_value(self, sheet_name, row, column):
+        key = (sheet_name, row, column)
+        if key in self.values:
+            return export_value(self.values[key])
+        cell = self.workbook[sheet_name]._cells.get((row, column))
+        if cell is not None and cell.data_type == "f":
+            raise UnsupportedFormula(f"{sheet_name}!{cell.coordinate} was not compiled")
+        if cell is None:
+            return None
+        return cell._value
+
+    def sheet_rows(self, sheet_name, columns):
+        # openpyxl 로 Excel 이 저장한 파일을 data_only 로 다시 읽은 것과 같은 값을 행마다 돌려준다.
+        sheet_name = self.resolve_sheet(sheet_name)
+        sheet = self.workbook[sheet_name]
+        for row in range(1, sheet.max_row + 1):
+            yield [self.cell_value(sheet_name, row, column) for column in columns]
+
+
+def cached_value_matches(expected, actual):
+    # Excel 이 저장한 값(openpyxl data_only)과 export_value 결과를 비교한다. 숫자는 Excel 의 15자리 정밀도까지 같으면 같다.
+    if expected in (None, "") or actual is None:
+        # 빈 글자를 돌려주는 수식은 Excel 이 ""(또는 값 없음)로 저장한다.
+        return expected in (None, "") and actual is None
+    if isinstance(expected, bool) or isinstance(actual, bool):
+        return type(expected) is type(actual) and expected == actual
+    if isinstance(expected, (int, float)) and isinstance(actual, (int, float)):
+        return math.isclose(expected, actual, rel_tol=1e-12, abs_tol=1e-12)
+    if hasattr(expected, "year"):
+        expected = to_excel(expected)
+        return isinstance(actual, (int, float)) and math.isclose(expected, actual, rel_tol=1e-12, abs_tol=1e-12)
+    return expected == actual
+
+
+def cached_mismatches(engine, cached_workbook):
+    # 엔진이 계산한 모든 수식 셀을 Excel 이 저장해 둔 값(data_only=True 로 연 통합 문서)과 비교한다.
+    # 다른 셀의 (시트, 행, 열, Excel 값, 엔진 값) 목록을 돌려준다. 저장된 값이 없는 셀도 다르다고 본다.
+    mismatches = []
+    for (sheet_name, row, column), value in sorted(engine.values.items()):
+        cell = cached_workbook[sheet_name]._cells.get((row, column))
+        expected = cell.value if cell is not None else None
+        actual = export_value(value)
+        if not cached_value_matches(expected, actual):
+            mismatches.append((sheet_name, row, column, expected, actual))
+    return mismatches
@@ -1,15 +1,27 @@
 import sys
 import os
-import time
 import win32clipboard
 import win32com.client as win32
 import argparse
-from PIL import Image
-from io import BytesIO
-import base64
 import win32gui
 import traceback
 
+from clipboard_watcher import ClipboardWatcher
+from hwp_placeholders import PlaceholderEngine, load_contents
+from image_cache import DibCache
+from emf_converter import create_emf_converter
+from hwp_service import default_outputs, submit_job
+from export_queue import create_export_queue
+from replacement_manifest import ManifestError, load_manifest
+
+# 그림은 한글을 띄우기 전에 main 에서 미리 DIB 로 만들어 두고, 붙여넣을 때는 바이트만 넘긴다.
+IMAGES = DibCache()
+# EMF 는 내용 해시로 캐시된 PNG 로 바꾼다 (solar_pipeline 이 미리 바꿔 둔 것도 그대로 쓴다).
+EMF = create_emf_converter()
+# 그림은 기본으로 InsertPicture 에 파일 경로를 넘긴다 (DIB 변환, 클립보드 없음). 안 되면 클립보드로 붙여넣는다.
+# HWP_IMAGE_MODE=clipboard 면 예전처럼 모두 클립보드로 넣는다.
+IMAGE_MODE = os.getenv("HWP_IMAGE_MODE", "file")
+
 def set_clipboard_text(data):
     try:
         win32clipboard.OpenClipboard()
@@ -21,16 +33,7 @@ def set_clipboard_text(data):
 
 def set_clipboard_image(image_data):
     try:
-        if isinstance(image_data, str) and image_data.startswith("data:image"):
-            base64_data = image_data.split(",")[1]
-            image_data = base64.b64decode(base64_data)
-            image = Image.open(BytesIO(image_data))
-        else:
-            image = Image.open(image_data)
-
-        output = BytesIO()
-        image.convert("RGB").save(output, "BMP")
-        data = output.getvalue()[14:]
+        data = IMAGES.get(image_data)
         win32clipboard.OpenClipboard()
         win32clipboard.EmptyClipboard()
         win32clipboard.SetClipboardData(win32clipboard.CF_DIB, data)
@@ -41,11 +44,8 @@ def set_clipboard_image(image_data):
 
 def convert_emf_to_png(emf_path):
     try:
-        # EMF 파일을 PNG로 변환
-        image = Image.open(emf_path)
-        png_path = emf_path.replace('.emf', '.png')
-        image.save(png_path)
-        return png_path
+        # EMF 파일을 PNG로 변환 (캐시에 있으면 변환하지 않는다)
+        return EMF.convert(emf_path)
     except Exception as e:
         print(f"Error converting EMF to PNG: {e}")
         return None
@@ -59,112 +59,44 @@ def set_clipboard_emf(file_path):
     except Exception as e:
         print(f"Error setting EMF to clipboard: {e}")
 
-def read_file_content(file_path):
-    file_path = file_path.strip('"')
-    print(f"Attempting to read file: {file_path}")
-
-    if not os.path.exists(file_path):
-        print(f"File does not exist: {file_path}")
-        return None, None
-
-    _, ext = os.path.splitext(file_path)
-    print(f"File extension: {ext}")
-
-    if ext.lower() == ".txt":
-        try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                content = file.read().strip()
-                if "년월" in file_path:
-                    content = content.replace("년 ", ".").replace("월", "")
-                print(f"Successfully read text file with UTF-8 encoding. Content: {content}")
-                return content, "text"
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, "r", encoding="euc-kr") as file:
-                    content = file.read().strip()
-                    if "년월" in file_path:
-                        content = content.replace("년 ", ".").replace("월", "")
-                    print(f"Successfully read text file with EUC-KR encoding. Content: {content}")
-                    return content, "text"
-            except Exception as e:
-                print(f"Failed to read text file with both UTF-8 and EUC-KR encodings: {str(e)}")
-                return None, None
-    elif ext.lower() in [".png", ".jpg", ".jpeg", ".bmp", ".gif"]:
-        if file_path.startswith("data:image"):
-            print("Detected base64 encoded image")
-            return file_path, "base64_image"
-        else:
-            print(f"Detected image file: {file_path}")
-            return file_path, "image"
-    elif ext.lower() == ".emf":
-        print(f"Detected EMF file: {file_path}")
-        return file_path, "emf"
-    else:
-        print(f"Unsupported file type: {ext}")
-        return None, None
-
-def paste_clipboard_content(hwp):
-    try:
-        time.sleep(1)
-        hwp.HAction.GetDefault("Paste", hwp.HParameterSet.HSelectionOpt.HSet)
-        hwp.HAction.Execute("Paste", hwp.HParameterSet.HSelectionOpt.HSet)
-        print("Content pasted from clipboard.")
-    except Exception as e:
-        print(f"Error during paste: {e}")
-
-def replace_text_with_clipboard(hwp, search_text, replacement_type):
+class HangleClipboard:
+    # 내용을 클립보드에 넣고, 시퀀스 번호와 형식으로 준비된 것을 확인한 뒤에 붙여넣게 한다 (고정 sleep 없음).
+    FORMATS = {
+        "text": win32clipboard.CF_UNICODETEXT,
+        "image": win32clipboard.CF_DIB,
+        "base64_image": win32clipboard.CF_DIB,
+        "emf": win32clipboard.CF_DIB,
+    }
+
+    def __init__(self, timeout=5.0):
+        self.watcher = ClipboardWatcher(timeout=timeout, poll_interval=0.01)
+
+    def load(self, content, content_type):
+        self.watcher.arm()
+        if content_type == "text":
+            set_clipboard_text(content)
+        elif content_type in ["image", "base64_image"]:
+            set_clipboard_image(content)
+        elif content_type == "emf":
+            set_clipboard_emf(content)
+        if not self.watcher.wait_for_change():
+            print(f"Clipboard was not updated for {content_type} content")
+            return False
+        return bool(win32clipboard.IsClipboardFormatAvailable(self.FORMATS[content_type]))
+
+def save_as_hwp_and_pdf(hwp, original_path, outputs=None, exports=None):
+    # 출력 파일(기본: 원본_수정완료.hwp / .pdf)을 ExportQueue 로 넘긴다. 여기서는 문서를 임시 HWP 로
+    # 한 번만 저장하고, HWP/PDF 저장은 작업자 한글이 한다. 채운 한글은 바로 닫아도 된다.
     try:
-        occurrences = 0
-        while True:
-            hwp.MovePos(2)
-            hwp.HAction.GetDefault("RepeatFind", hwp.HParameterSet.HFindReplace.HSet)
-            findReplace = hwp.HParameterSet.HFindReplace
-            findReplace.ReplaceString = ""
-            findReplace.FindString = search_text
-            findReplace.IgnoreReplaceString = 0
-            findReplace.IgnoreFindString = 0
-            findReplace.Direction = 0
-            findReplace.WholeWordOnly = 0
-            findReplace.UseWildCards = 0
-            findReplace.SeveralWords = 0
-            findReplace.AllWordForms = 0
-            findReplace.MatchCase = 0
-            findReplace.ReplaceMode = 0
-            findReplace.ReplaceStyle = ""
-            findReplace.FindStyle = ""
-            findReplace.FindTextInPicture = 0
-            findReplace.FindRegExp = 0
-            findReplace.FindJaso = 0
-            findReplace.HanjaFromHangul = 0
-            findReplace.IgnoreMessage = 1
-            findReplace.FindType = 1
-
-            result = hwp.HAction.Execute("RepeatFind", hwp.HParameterSet.HFindReplace.HSet)
-            if not result:
-                break
-            paste_clipboard_content(hwp)
-            occurrences += 1
-
-        return occurrences > 0
+        return exports.submit_document(hwp, outputs or default_outputs(original_path))
     except Exception as e:
-        print(f"Error: {e}")
-        return False
+        print(f"Error saving file: {e}")
+        return None
 
-def save_as_hwp_and_pdf(hwp, original_path):
+def wait_for_export(future):
     try:
-        directory, filename = os.path.split(original_path)
-        filename_without_ext, ext = os.path.splitext(filename)
-
-        new_filename = f"{filename_without_ext}_수정완료{ext}"
-        new_filepath = os.path.join(directory, new_filename)
-
-        hwp.SaveAs(new_filepath, "HWP", "")
-        print(f"HWP file saved: {new_filepath}")
-
-        pdf_filepath = f"{os.path.splitext(new_filepath)[0]}.pdf"
-        hwp.SaveAs(pdf_filepath, "PDF")
-        print(f"PDF file saved: {pdf_filepath}")
-
+        for output_path in future.result()["outputs"]:
+            print(f"File saved: {output_path}")
     except Exception as e:
         print(f"Error saving file: {e}")
 
@@ -180,21 +112,74 @@ def check_document_state(hwp):
 
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Replace text in a HWP file with clipboard content.")
-    parser.add_argument("file_path", help="Path to the HWP file")
-    parser.add_argument("replacements", nargs="+", help="Pairs of search text and replacement file path")
+    parser.add_argument("file_path", nargs="?", help="Path to the HWP file (default: the manifest's template)")
+    parser.add_argument("replacements", nargs="*", help="Pairs of search text and replacement file path")
+    parser.add_argument("--manifest", help="JSON or TOML file with the template, replacements and outputs")
 
     args = parser.parse_args()
+    if len(args.replacements) % 2:
+        parser.error("replacements must be pairs of search text and file path")
 
-    replacements = [(args.replacements[i], args.replacements[i + 1]) for i in range(0, len(args.replacements), 2)]
-    return args.file_path, replacements
+    file_path = args.file_path
+    replacements = []
+    outputs = []
+    if args.manifest:
+        try:
+            manifest = load_manifest(args.manifest)
+        except ManifestError as e:
+            parser.error(str(e))
+        file_path = file_path or manifest["template"]
+        replacements = manifest["replacements"]
+        outputs = manifest["outputs"]
+        if manifest["tables"]:
+            print(f"Skipping [tables] ({', '.join(manifest['tables'])}): they are filled from the pipeline's artifact store")
+    if not file_path:
+        parser.error("the HWP file is required (on the command line or as the manifest's template)")
+    replacements += [(args.replacements[i], args.replacements[i + 1]) for i in range(0, len(args.replacements), 2)]
+    if not replacements:
+        parser.error("no replacements given")
+    return file_path, replacements, outputs
+
+def submit_to_service(file_path, replacements, outputs):
+    job = {"template": file_path, "replacements": {}, "outputs": outputs}
+    for search_text, replacement_file_path in replacements:
+        job["replacements"].setdefault(search_text, replacement_file_path)
+    try:
+        result = submit_job(job)
+    except Exception as e:
+        print(f"Failed to reach HWP document service: {e}")
+        return
+    for search_text, count in result.get("counts", {}).items():
+        if count:
+            print(f"Replaced {count} instance(s) of '{search_text}'")
+        else:
+            print(f"Failed to replace '{search_text}'")
+    for timing in result.get("images", []):
+        print(f"Image {timing['source']}: {timing['mode']} {timing['seconds'] * 1000:.1f} ms")
+    for output_path in result["outputs"]:
+        print(f"File saved: {output_path}")
+    if not result["ok"]:
+        print(f"Error at {result['stage']}: {result['error']}")
+    print("Stage timings: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result["timings"].items()))
 
 def main():
-    file_path, replacements = parse_arguments()
+    file_path, replacements, outputs = parse_arguments()
     print(f"HWP file path: {file_path}")
     print("Replacements:")
     for search_text, replacement_file_path in replacements:
         print(f"  Search text: '{search_text}', Replacement file: '{replacement_file_path}'")
 
+    if os.getenv("HWP_SERVICE_ADDRESS"):
+        # 띄워 둔 문서 서비스(hwp_service.py)가 있으면 한글을 새로 띄우지 않고 작업만 보낸다.
+        submit_to_service(file_path, replacements, outputs)
+        return
+
+    # 모든 자리표시자의 내용을 먼저 동시에 읽고 그림은 풀에서 미리 준비한 뒤, 문서를 한 번 훑으면서 채운다.
+    # 파일로 넣을 때는 DIB 를 미리 만들지 않는다 (클립보드로 넘어가는 그림만 그때 만든다).
+    contents, sources = load_contents(replacements, EMF, IMAGES if IMAGE_MODE == "clipboard" else None)
+
+    exports = create_export_queue()
+    export = None
     try:
         hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
         hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
@@ -203,23 +188,16 @@ def main():
 
         check_document_state(hwp)
 
-        for search_text, replacement_file_path in replacements:
-            content, content_type = read_file_content(replacement_file_path)
-            if content is not None:
-                if content_type == "text":
-                    set_clipboard_text(content)
-                elif content_type in ["image", "base64_image"]:
-                    set_clipboard_image(content)
-                elif content_type == "emf":
-                    set_clipboard_emf(content)
-                if replace_text_with_clipboard(hwp, search_text.strip('"'), content_type):
-                    print(f"Replaced all instances of '{search_text}' with content from {replacement_file_path}")
-                else:
-                    print(f"Failed to replace '{search_text}'")
+        engine = PlaceholderEngine(hwp, HangleClipboard(), picture_mode=IMAGE_MODE)
+        counts = engine.fill(contents)
+        for search_text, count in counts.items():
+            if count:
+                print(f"Replaced {count} instance(s) of '{search_text}' with content from {sources[search_text]}")
             else:
-                print(f"Failed to read content from {replacement_file_path}")
+                print(f"Failed to replace '{search_text}'")
+        engine.report_images()
 
-        save_as_hwp_and_pdf(hwp, file_path)
+        export = save_as_hwp_and_pdf(hwp, file_path, outputs, exports)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -230,6 +208,11 @@ def main():
         if "hwp" in locals():
             hwp.Quit()
         print("HWP application closed.")
+        # 채운 한글을 닫는 동안 작업자 한글이 저장한다. 끝날 때까지 기다린 뒤 작업자도 닫는다.
+        if export is not None:
+            wait_for_export(export)
+            exports.report()
+        exports.close()
 
 if __name__ == "__main__":
     main()
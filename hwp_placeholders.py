@@ -0,0 +1,306 @@
+import os
+import re
+import time
+import codecs
+from concurrent.futures import ThreadPoolExecutor
+
+# RepeatFind 설정. 문서마다 한 번만 넣고, 이후에는 FindString 만 바꾼다.
+FIND_OPTIONS = {
+    "ReplaceString": "",
+    "IgnoreReplaceString": 0,
+    "IgnoreFindString": 0,
+    "Direction": 0,
+    "WholeWordOnly": 0,
+    "UseWildCards": 0,
+    "SeveralWords": 0,
+    "AllWordForms": 0,
+    "MatchCase": 0,
+    "ReplaceMode": 0,
+    "ReplaceStyle": "",
+    "FindStyle": "",
+    "FindTextInPicture": 0,
+    "FindRegExp": 0,
+    "FindJaso": 0,
+    "HanjaFromHangul": 0,
+    "IgnoreMessage": 1,
+    "FindType": 1,
+}
+# GetFieldList / PutFieldText 에서 필드 이름과 값을 구분하는 글자
+FIELD_SEPARATOR = "\x02"
+# GetFieldList(1, 0) 은 같은 이름의 필드를 "이름{{0}}", "이름{{1}}" 처럼 번호를 붙여 준다.
+FIELD_INDEX = re.compile(r"\{\{\d+\}\}$")
+# 그림 넣는 방식: "file" 은 InsertPicture 로 파일을 바로 넣고 (안 되면 클립보드로),
+# "clipboard" 는 DIB 를 클립보드에 넣어 붙여넣는다.
+PICTURE_MODES = ("file", "clipboard")
+# InsertPicture 의 sizeoption: 0 = 그림 원래 크기, 1 = Width/Height(mm) 로 지정
+PICTURE_REAL_SIZE = 0
+PICTURE_GIVEN_SIZE = 1
+# 그림 파일로 넣을 수 있는 내용 종류 (base64 그림은 파일이 없어 클립보드로 넣는다)
+PICTURE_FILE_TYPES = ("image", "emf")
+# 내용 파일을 동시에 읽는 스레드 수 (네트워크 드라이브의 지연을 겹친다)
+READ_WORKERS = 16
+
+
+def field_name(placeholder):
+    # "{{날짜}}", "<날짜>", "[날짜]" 자리표시자는 누름틀 필드 "날짜" 와 같은 것으로 본다.
+    return placeholder.strip("{}<>[] ")
+
+
+class PlaceholderEngine:
+    # 문서의 모든 자리표시자를 한 번의 순회로 채운다.
+    # 1) 문서 글자를 한 번 읽어 자리표시자가 나오는 순서(계획)를 만들고
+    # 2) 커서를 문서 처음에 한 번만 두고, 계획 순서대로 앞으로만 찾아 채운다.
+    # 글자는 클립보드를 거치지 않는다: 누름틀 필드는 PutFieldText 한 번으로, 본문 자리표시자는 InsertText 로 쓴다.
+    # 클립보드는 그림에만 쓰고, 내용이 바뀔 때만 다시 채우며 붙여넣기 전에 준비됐는지 clipboard.load() 로 확인한다.
+    # picture_mode="file" 이면 그림도 클립보드 없이 InsertPicture 로 파일 경로를 넘기고, 실패할 때만 붙여넣는다.
+    # picture_size 는 (가로, 세로) mm, None 이면 그림 원래 크기. 그림마다 걸린 시간은 image_timings 에 남는다.
+    def __init__(self, hwp, clipboard=None, picture_mode="clipboard", picture_size=None, embed=True):
+        if picture_mode not in PICTURE_MODES:
+            raise ValueError(f"Unknown picture mode: {picture_mode}")
+        self.hwp = hwp
+        self.clipboard = clipboard
+        self.picture_mode = picture_mode
+        self.picture_size = picture_size
+        self.embed = embed
+        self.image_timings = []
+        self.action = None
+        self.find_replace = None
+        self.find_set = None
+        self.paste_set = None
+        self.insert_text_set = None
+        self.insert_set = None
+        self.current_find = None
+        self.loaded = None
+
+    def prepare(self):
+        # COM 객체 경로(hwp.HAction, hwp.HParameterSet...)는 한 번만 따라가고 기억한다.
+        self.action = self.hwp.HAction
+        parameters = self.hwp.HParameterSet
+        self.find_replace = parameters.HFindReplace
+        self.find_set = self.find_replace.HSet
+        self.paste_set = parameters.HSelectionOpt.HSet
+        self.action.GetDefault("RepeatFind", self.find_set)
+        for name, value in FIND_OPTIONS.items():
+            setattr(self.find_replace, name, value)
+        self.action.GetDefault("Paste", self.paste_set)
+        self.insert_text_set = parameters.HInsertText
+        self.insert_set = self.insert_text_set.HSet
+        self.action.GetDefault("InsertText", self.insert_set)
+        self.current_find = None
+
+    def fill_fields(self, values):
+        # values: {자리표시자: 글자}. 이름이 같은 누름틀 필드를 모두 PutFieldText 한 번으로 채우고
+        # 자리표시자별로 채운 필드 개수를 돌려준다.
+        field_list = self.hwp.GetFieldList(1, 0) or ""
+        instances = {}
+        for name in filter(None, field_list.split(FIELD_SEPARATOR)):
+            name = FIELD_INDEX.sub("", name)
+            instances[name] = instances.get(name, 0) + 1
+        matched = [placeholder for placeholder in values if field_name(placeholder) in instances]
+        if matched:
+            self.hwp.PutFieldText(
+                FIELD_SEPARATOR.join(field_name(placeholder) for placeholder in matched),
+                FIELD_SEPARATOR.join(values[placeholder] for placeholder in matched),
+            )
+        return {placeholder: instances[field_name(placeholder)] for placeholder in matched}
+
+    def plan(self, placeholders):
+        # 문서 글자에서 자리표시자가 나오는 순서. 긴 이름을 먼저 맞춰 앞부분이 같은 이름을 구분한다.
+        names = sorted(placeholders, key=len, reverse=True)
+        if not names:
+            return []
+        pattern = re.compile("|".join(re.escape(name) for name in names))
+        text = self.hwp.GetTextFile("UNICODE", "") or ""
+        return [match.group(0) for match in pattern.finditer(text)]
+
+    def find_next(self, placeholder):
+        # 커서 위치부터 앞으로 찾는다. 찾으면 그 글자가 선택된다.
+        if self.current_find != placeholder:
+            self.find_replace.FindString = placeholder
+            self.current_find = placeholder
+        return bool(self.action.Execute("RepeatFind", self.find_set))
+
+    def insert_text(self, text):
+        # 찾기로 선택된 자리표시자를 글자로 바꾼다. 빈 글자는 자리표시자만 지운다.
+        if not text:
+            return bool(self.action.Run("Delete"))
+        self.insert_text_set.Text = text
+        return bool(self.action.Execute("InsertText", self.insert_set))
+
+    def paste(self, content):
+        if self.clipboard is None:
+            print(f"No clipboard to paste {content[1]} content")
+            return False
+        if self.loaded != content:
+            if not self.clipboard.load(*content):
+                return False
+            self.loaded = content
+        self.action.Execute("Paste", self.paste_set)
+        return True
+
+    def insert_picture(self, path):
+        # 선택된 자리표시자를 지우고 그 자리에 그림 파일을 넣는다. 실패하면 False (자리표시자는 지운 채)
+        width, height = self.picture_size or (0, 0)
+        size_option = PICTURE_GIVEN_SIZE if self.picture_size else PICTURE_REAL_SIZE
+        self.action.Run("Delete")
+        try:
+            # 한글의 작업 폴더는 이 프로세스와 다를 수 있으므로 절대 경로를 넘긴다.
+            control = self.hwp.InsertPicture(os.path.abspath(path), self.embed, size_option, False, False, 0, width, height)
+        except Exception as e:
+            print(f"InsertPicture failed for {path}: {e}")
+            return False
+        return control is not None
+
+    def write_picture(self, content):
+        started = time.perf_counter()
+        mode = "clipboard"
+        if self.picture_mode == "file" and content[1] in PICTURE_FILE_TYPES:
+            if self.insert_picture(content[0]):
+                mode = "file"
+            else:
+                mode = "clipboard (fallback)"
+        written = mode == "file" or self.paste(content)
+        self.image_timings.append({"source": content[0], "mode": mode, "seconds": time.perf_counter() - started, "ok": bool(written)})
+        return written
+
+    def write(self, content):
+        if content[1] == "text":
+            return self.insert_text(content[0])
+        return self.write_picture(content)
+
+    def report_images(self):
+        for timing in self.image_timings:
+            status = "" if timing["ok"] else " FAILED"
+            print(f"Image {timing['source']}: {timing['mode']} {timing['seconds'] * 1000:.1f} ms{status}")
+        for mode in dict.fromkeys(timing["mode"] for timing in self.image_timings):
+            seconds = [timing["seconds"] for timing in self.image_timings if timing["mode"] == mode]
+            print(f"Images by {mode}: {len(seconds)}, mean {sum(seconds) / len(seconds) * 1000:.1f} ms, max {max(seconds) * 1000:.1f} ms")
+
+    def fill(self, replacements):
+        # replacements: {자리표시자: (내용, 종류)}. 자리표시자별로 채운 개수(필드 + 본문)를 돌려준다.
+        counts = dict.fromkeys(replacements, 0)
+        if not replacements:
+            return counts
+        self.prepare()
+        self.loaded = None
+        self.image_timings = []
+        texts = {p: content for p, (content, content_type) in replacements.items() if content_type == "text"}
+        if texts:
+            counts.update(self.fill_fields(texts))
+        plan = self.plan(replacements)
+        self.hwp.MovePos(2)
+        missed = []
+        for placeholder in plan:
+            if not self.find_next(placeholder):
+                missed.append(placeholder)
+                continue
+            if self.write(replacements[placeholder]):
+                counts[placeholder] += 1
+
+        if missed:
+            # 글자 순서와 찾기 순서가 다른 곳(글상자 등)에 남은 것만 처음부터 한 번 더 찾는다.
+            for placeholder in dict.fromkeys(missed):
+                self.hwp.MovePos(2)
+                while self.find_next(placeholder):
+                    if not self.write(replacements[placeholder]):
+                        break
+                    counts[placeholder] += 1
+        return counts
+
+
+def decode_text(data):
+    # 바이트를 한 번만 읽고 인코딩을 고른다: BOM 이 있으면 그대로, 없으면 UTF-8,
+    # UTF-8 이 아니면 CP949 (메모장 "ANSI" 저장, EUC-KR 을 포함한다).
+    if data.startswith(codecs.BOM_UTF8):
+        return data[len(codecs.BOM_UTF8):].decode("utf-8"), "UTF-8"
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16"), "UTF-16"
+    try:
+        return data.decode("utf-8"), "UTF-8"
+    except UnicodeDecodeError:
+        return data.decode("cp949"), "CP949"
+
+
+def normalise_text(content, file_path):
+    # "년월" 파일은 "2024년 05월" -> "2024.05" 로 쓴다.
+    if "년월" in file_path:
+        content = content.replace("년 ", ".").replace("월", "")
+    return content
+
+
+def text_content(content, file_path):
+    # 텍스트 모드로 읽던 것과 같게 줄바꿈은 \n 으로 맞춘다.
+    content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return normalise_text(content.strip(), file_path)
+
+
+def read_content(file_path, store=None):
+    # store(ArtifactStore)에 같은 파일 이름의 글자가 있으면 (마이다스에서 복사해 온 표 등) 디스크를 읽지 않는다.
+    name = os.path.basename(file_path.strip('"'))
+    if store is not None and name.lower().endswith(".txt") and store.kind(name) == "text":
+        content = store.get(name, stage="hwp")
+        print(f"Read text from artifact store: {name}")
+        return text_content(content, file_path), "text"
+    return read_file_content(file_path)
+
+
+def read_file_content(file_path):
+    file_path = file_path.strip('"')
+
+    if not os.path.exists(file_path):
+        print(f"File does not exist: {file_path}")
+        return None, None
+
+    _, ext = os.path.splitext(file_path)
+
+    if ext.lower() == ".txt":
+        try:
+            with open(file_path, "rb") as file:
+                content, encoding = decode_text(file.read())
+        except Exception as e:
+            print(f"Failed to read text file {file_path}: {str(e)}")
+            return None, None
+        print(f"Read text file with {encoding} encoding: {file_path}")
+        return text_content(content, file_path), "text"
+    elif ext.lower() in [".png", ".jpg", ".jpeg", ".bmp", ".gif"]:
+        if file_path.startswith("data:image"):
+            print("Detected base64 encoded image")
+            return file_path, "base64_image"
+        else:
+            print(f"Detected image file: {file_path}")
+            return file_path, "image"
+    elif ext.lower() == ".emf":
+        print(f"Detected EMF file: {file_path}")
+        return file_path, "emf"
+    else:
+        print(f"Unsupported file type: {ext}")
+        return None, None
+
+
+def load_contents(replacements, emf=None, images=None, store=None):
+    # (자리표시자, 파일) 목록 -> ({자리표시자: (내용, 종류)}, {자리표시자: 파일}).
+    # 한글을 다루기 전에 모든 파일을 스레드 풀에서 동시에 (파일마다 한 번) 읽고,
+    # EMF 는 PNG 로 바꾸고 그림은 DIB 로 미리 만들어 둔다. 채우는 동안에는 디스크를 기다리지 않는다.
+    # store 를 주면 그 안에 있는 글자는 파일 대신 쓴다 (read_content).
+    replacements = [(search_text.strip('"'), file_path) for search_text, file_path in replacements]
+    paths = list(dict.fromkeys(file_path for _, file_path in replacements))
+    if paths:
+        with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(paths))) as pool:
+            loaded = dict(zip(paths, pool.map(lambda path: read_content(path, store), paths)))
+    contents = {}
+    sources = {}
+    for search_text, replacement_file_path in replacements:
+        content, content_type = loaded[replacement_file_path]
+        if content is None:
+            print(f"Failed to read content from {replacement_file_path}")
+            continue
+        contents.setdefault(search_text, (content, content_type))
+        sources.setdefault(search_text, replacement_file_path)
+    if emf:
+        converted = emf.convert_all([content for content, content_type in contents.values() if content_type == "emf"])
+        for search_text, (content, content_type) in contents.items():
+            if content_type == "emf" and converted.get(content):
+                contents[search_text] = (converted[content], "image")
+    if images:
+        images.prefetch((content, None) for content, content_type in contents.values() if content_type in ["image", "base64_image"])
+    return contents, sources
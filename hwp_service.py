@@ -0,0 +1,355 @@
+import os
+import sys
+import time
+import queue
+import secrets
+import argparse
+import functools
+import threading
+import traceback
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from export_queue import create_export_queue
+from hwp_placeholders import PlaceholderEngine, load_contents
+from hwp_tables import TableFiller
+
+DEFAULT_ADDRESS = "127.0.0.1:6150"
+# 연결 인증 키. 작업은 pickle 로 오가므로 키를 아는 프로세스는 한글 사용자 권한으로 코드를 실행할 수 있다.
+# 그래서 정해진 기본 키는 없고, HWP_SERVICE_KEY 가 없으면 처음 serve 할 때 사용자 폴더에 임의의 키를 만든다.
+DEFAULT_KEY_FILE = os.path.join(os.path.expanduser("~"), ".hwp_service_key")
+# 출력 파일 확장자 -> SaveAs 형식
+SAVE_FORMATS = {".hwp": "HWP", ".hwpx": "HWPX", ".pdf": "PDF"}
+SHUTDOWN = {"command": "shutdown"}
+
+
+def parse_address(text):
+    # "127.0.0.1:6150" -> ("127.0.0.1", 6150)
+    host, port = text.rsplit(":", 1)
+    return host, int(port)
+
+
+def service_address():
+    return parse_address(os.getenv("HWP_SERVICE_ADDRESS", DEFAULT_ADDRESS))
+
+
+class ServiceKeyError(Exception):
+    pass
+
+
+def service_key_file():
+    return os.getenv("HWP_SERVICE_KEY_FILE", DEFAULT_KEY_FILE)
+
+
+def create_key_file(path):
+    # 설치(사용자)마다 한 번 만든다. O_EXCL 로 이미 있는 파일은 덮지 않고, 권한은 사용자만 읽게 둔다.
+    # (윈도우에서는 사용자 프로필 폴더의 기본 권한이 같은 역할을 한다.)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(secrets.token_hex(32))
+    print(f"Created HWP service key: {path}")
+
+
+def service_authkey(create=False):
+    # HWP_SERVICE_KEY, 없으면 키 파일. serve 는 create=True 로 키 파일이 없을 때 만든다.
+    key = os.getenv("HWP_SERVICE_KEY")
+    if key:
+        return key.encode("utf-8")
+    path = service_key_file()
+    if create:
+        create_key_file(path)
+    try:
+        if os.name == "posix" and os.stat(path).st_mode & 0o077:
+            raise ServiceKeyError(f"HWP service key file {path} is readable by other users; run chmod 600 on it")
+        with open(path, "r", encoding="utf-8") as f:
+            key = f.read().strip()
+    except FileNotFoundError:
+        raise ServiceKeyError(f"HWP service key not found ({path}); start the service first or set HWP_SERVICE_KEY") from None
+    if not key:
+        raise ServiceKeyError(f"HWP service key file {path} is empty")
+    return key.encode("utf-8")
+
+
+def default_outputs(template_path):
+    # hangle.save_as_hwp_and_pdf 와 같은 이름: 원본_수정완료.hwp / .pdf
+    stem, ext = os.path.splitext(template_path)
+    return [f"{stem}_수정완료{ext}", f"{stem}_수정완료.pdf"]
+
+
+def dispatch_hwp():
+    import win32com.client as win32
+    hwp = win32.gencache.EnsureDispatch("HWPFrame.HwpObject")
+    hwp.RegisterModule("FilePathCheckDLL", "FilePathCheckerModule")
+    return hwp
+
+
+def hangle_clipboard(hwp):
+    from hangle import HangleClipboard
+    return HangleClipboard()
+
+
+class HwpDocumentService:
+    # 한글 인스턴스 하나를 띄워 둔 채로 작업(템플릿, 자리표시자 -> 파일, 출력 파일)을 차례로 처리한다.
+    # 작업이 한글 쪽에서 실패하면 인스턴스를 닫고 다음 작업에서 새로 띄운다.
+    # max_jobs 를 주면 그만큼 처리한 뒤에도 새로 띄운다 (오래 띄운 한글의 메모리 증가 대비).
+    # exports(ExportQueue)를 주면 출력 저장을 넘기고 바로 다음 작업을 받는다. 결과의 "export" 가 그 Future 다.
+    # picture_mode 는 PlaceholderEngine 과 같다 ("file" 이면 그림을 InsertPicture 로, 안 되면 클립보드로).
+    # store(ArtifactStore)를 주면 같은 프로세스의 앞 단계가 넣어 둔 글자를 파일 대신 쓰고,
+    # 작업의 "tables" ({자리표시자: 저장소 이름})에 적힌 행 목록을 그 자리표시자 칸부터 표로 채운다.
+    def __init__(self, dispatch=dispatch_hwp, clipboard=hangle_clipboard, emf=None, images=None, max_jobs=None, exports=None, picture_mode="clipboard", store=None):
+        self.dispatch = dispatch
+        self.clipboard = clipboard
+        self.emf = emf
+        self.images = images
+        self.max_jobs = max_jobs
+        self.exports = exports
+        self.picture_mode = picture_mode
+        self.store = store
+        self.hwp = None
+        self.instance = 0
+        self.instance_jobs = 0
+        self.jobs = 0
+
+    def start(self):
+        started = time.perf_counter()
+        self.hwp = self.dispatch()
+        self.instance += 1
+        self.instance_jobs = 0
+        print(f"HWP instance {self.instance} started ({time.perf_counter() - started:.2f}s)")
+
+    def recycle(self, reason):
+        print(f"Recycling HWP instance {self.instance}: {reason}")
+        self.quit()
+
+    def quit(self):
+        if self.hwp is None:
+            return
+        try:
+            self.hwp.Quit()
+        except Exception as e:
+            print(f"Failed to quit HWP instance {self.instance}: {e}")
+        finally:
+            self.hwp = None
+
+    def stop(self):
+        # 넘긴 내보내기를 모두 끝낸 뒤 한글을 닫는다.
+        if self.exports is not None:
+            self.exports.close()
+        self.quit()
+
+    def run_job(self, job):
+        # 단계별 시간(초)과 결과를 돌려준다. 오류는 예외로 던지지 않고 결과에 담는다.
+        self.jobs += 1
+        job_id = job.get("id", self.jobs)
+        template = os.path.abspath(job["template"])
+        replacements = job.get("replacements", {})
+        tables = job.get("tables", {})
+        outputs = [os.path.abspath(path) for path in job.get("outputs") or default_outputs(template)]
+        timings = {}
+        result = {"id": job_id, "ok": False, "error": None, "stage": None, "timings": timings, "outputs": []}
+        stage = "read"
+        touched = False
+        started = time.perf_counter()
+        try:
+            for output_path in outputs:
+                if os.path.splitext(output_path)[1].lower() not in SAVE_FORMATS:
+                    raise ValueError(f"Unsupported output format: {output_path}")
+            if not os.path.exists(template):
+                raise FileNotFoundError(f"Template not found: {template}")
+            stage_started = time.perf_counter()
+            images = self.images if self.picture_mode == "clipboard" else None
+            contents, sources = load_contents(replacements.items(), self.emf, images, self.store)
+            result["missing"] = [path for text, path in replacements.items() if text.strip('"') not in sources]
+            table_rows = {}
+            for anchor, name in tables.items():
+                rows = self.store.get(name, stage="hwp") if self.store is not None else None
+                if rows is None:
+                    result["missing"].append(name)
+                else:
+                    table_rows[anchor] = rows
+            timings["read"] = time.perf_counter() - stage_started
+
+            stage = "open"
+            touched = True
+            if self.hwp is None:
+                stage_started = time.perf_counter()
+                self.start()
+                timings["start"] = time.perf_counter() - stage_started
+            result["instance"] = self.instance
+            stage_started = time.perf_counter()
+            self.hwp.Open(template)
+            timings["open"] = time.perf_counter() - stage_started
+
+            stage = "fill"
+            stage_started = time.perf_counter()
+            engine = PlaceholderEngine(self.hwp, self.clipboard(self.hwp), picture_mode=self.picture_mode)
+            result["counts"] = engine.fill(contents)
+            for anchor, rows in table_rows.items():
+                result["counts"][anchor] = TableFiller(self.hwp).fill(anchor, rows)
+            result["images"] = engine.image_timings
+            timings["fill"] = time.perf_counter() - stage_started
+
+            stage = "save"
+            stage_started = time.perf_counter()
+            if self.exports is not None:
+                result["export"] = self.exports.submit_document(self.hwp, outputs)
+            else:
+                for output_path in outputs:
+                    self.hwp.SaveAs(output_path, SAVE_FORMATS[os.path.splitext(output_path)[1].lower()], "")
+                    result["outputs"].append(output_path)
+            timings["save"] = time.perf_counter() - stage_started
+
+            stage = "close"
+            stage_started = time.perf_counter()
+            # 저장한 문서를 버리고 빈 문서로 돌아간다 (1: 저장하지 않고 닫기).
+            self.hwp.Clear(1)
+            timings["close"] = time.perf_counter() - stage_started
+            result["ok"] = True
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+            result["stage"] = stage
+            print(f"Job {job_id} failed at {stage}: {result['error']}")
+            # 한글에서 난 오류는 인스턴스 상태를 믿을 수 없으므로 닫고 다음 작업에서 새로 띄운다.
+            if touched and self.hwp is not None:
+                self.recycle(result["error"])
+        timings["total"] = time.perf_counter() - started
+
+        if self.hwp is not None:
+            self.instance_jobs += 1
+            if self.max_jobs and self.instance_jobs >= self.max_jobs:
+                self.recycle(f"{self.instance_jobs} jobs processed")
+        status = "done" if result["ok"] else "FAILED"
+        print(f"Job {job_id} {status}: " + ", ".join(f"{name} {seconds:.2f}s" for name, seconds in timings.items()))
+        return result
+
+
+def create_document_service(max_jobs=None, store=None):
+    # 실제 한글과 hangle.py 의 클립보드, EMF 변환기, 그림 캐시를 쓰는 서비스.
+    # HWP_EXPORT_WORKERS 가 있으면 HWP/PDF 저장을 그 수만큼의 한글에서 백그라운드로 한다.
+    from hangle import EMF, IMAGE_MODE, IMAGES
+    if max_jobs is None and os.getenv("HWP_SERVICE_MAX_JOBS"):
+        max_jobs = int(os.getenv("HWP_SERVICE_MAX_JOBS"))
+    exports = create_export_queue() if os.getenv("HWP_EXPORT_WORKERS") else None
+    return HwpDocumentService(emf=EMF, images=IMAGES, max_jobs=max_jobs, exports=exports, picture_mode=IMAGE_MODE, store=store)
+
+
+def send_result(connection, result):
+    try:
+        connection.send(result)
+    except OSError as e:
+        print(f"Client went away before job {result['id']} result was sent: {e}")
+
+
+def finish_export(connection, result, future):
+    # 내보내기 작업자 스레드에서 불린다. 출력이 다 만들어진 뒤에 클라이언트에 결과를 보낸다.
+    try:
+        export = future.result()
+        result["outputs"] = export["outputs"]
+        result["timings"]["export_wait"] = export["waited"]
+        result["timings"]["export"] = export["elapsed"]
+    except Exception as e:
+        result["ok"] = False
+        result["stage"] = "export"
+        result["error"] = str(e)
+    send_result(connection, result)
+
+
+def accept_clients(listener, jobs):
+    # 연결마다 스레드 하나가 작업을 받아 큐에 넣는다. 한글은 serve 를 실행한 스레드 하나에서만 다룬다.
+    while True:
+        try:
+            connection = listener.accept()
+        except AuthenticationError as e:
+            print(f"Rejected connection: {e}")
+            continue
+        except OSError:
+            return
+        threading.Thread(target=receive_jobs, args=(connection, jobs), daemon=True).start()
+
+
+def receive_jobs(connection, jobs):
+    while True:
+        try:
+            job = connection.recv()
+        except (EOFError, OSError):
+            connection.close()
+            return
+        jobs.put((job, connection, time.perf_counter()))
+
+
+def serve(address=None, authkey=None, service=None, ready=None):
+    # 로컬 주소에서 작업을 받아 차례로 처리한다. SHUTDOWN 을 받으면 한글을 닫고 끝낸다.
+    if service is None:
+        service = create_document_service()
+    address = address or service_address()
+    listener = Listener(address, authkey=authkey or service_authkey(create=True))
+    jobs = queue.Queue()
+    threading.Thread(target=accept_clients, args=(listener, jobs), daemon=True).start()
+    print(f"HWP document service listening on {address[0]}:{address[1]}")
+    if ready is not None:
+        ready.set()
+    try:
+        while True:
+            job, connection, received = jobs.get()
+            if job == SHUTDOWN:
+                connection.send({"ok": True})
+                break
+            waited = time.perf_counter() - received
+            try:
+                result = service.run_job(job)
+            except Exception as e:
+                # 작업 형식 오류 등. 서비스는 계속 돈다.
+                traceback.print_exc()
+                result = {"id": job.get("id") if isinstance(job, dict) else None, "ok": False, "stage": "job", "error": f"{type(e).__name__}: {e}", "timings": {}, "outputs": []}
+            result["timings"]["queued"] = waited
+            export = result.pop("export", None)
+            if export is None:
+                send_result(connection, result)
+            else:
+                export.add_done_callback(functools.partial(finish_export, connection, result))
+    finally:
+        service.stop()
+        listener.close()
+        print("HWP document service stopped.")
+
+
+def submit_job(job, address=None, authkey=None):
+    # 작업 하나를 서비스에 보내고 결과를 기다린다.
+    with Client(address or service_address(), authkey=authkey or service_authkey()) as connection:
+        connection.send(job)
+        return connection.recv()
+
+
+def stop_service(address=None, authkey=None):
+    return submit_job(SHUTDOWN, address, authkey)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Keep one HWP instance running and fill templates sent by hangle.py and other clients.")
+    parser.add_argument("command", choices=["serve", "stop"], nargs="?", default="serve")
+    parser.add_argument("--address", type=parse_address, help=f"host:port (default: HWP_SERVICE_ADDRESS or {DEFAULT_ADDRESS})")
+    parser.add_argument("--max-jobs", type=int, help="Restart HWP after this many jobs")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        authkey = service_authkey(create=args.command == "serve")
+    except ServiceKeyError as e:
+        print(e)
+        return 1
+    if args.command == "stop":
+        stop_service(args.address, authkey)
+        print("Stop request sent.")
+        return 0
+    serve(args.address, authkey, service=create_document_service(args.max_jobs))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import re
+import math
+import logging
+
+from hwp_placeholders import PlaceholderEngine
+
+logger = logging.getLogger(__name__)
+
+# KeyIndicator() 의 마지막 값에 들어 있는 셀 주소: "(B3): 문자 입력"
+CELL_ADDRESS = re.compile(r"\(([A-Z]+)(\d+)\)")
+# TableInsertRowColumn 의 Side: 3 = 현재 행 아래
+INSERT_BELOW = 3
+
+
+def cell_position(indicator):
+    # "(B3): ..." -> (2, 1). 표 안이 아니면 None
+    match = CELL_ADDRESS.search(indicator or "")
+    if not match:
+        return None
+    letters, number = match.groups()
+    column = 0
+    for letter in letters:
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return int(number) - 1, column - 1
+
+
+def cell_text(value):
+    # 빈 값(None, NaN)은 빈 셀로 둔다.
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    return str(value)
+
+
+def table_rows(data, header=False):
+    # pandas DataFrame 또는 행 목록 -> 셀 글자의 행 목록
+    rows = []
+    if hasattr(data, "itertuples"):
+        if header:
+            rows.append([cell_text(name) for name in data.columns])
+        rows.extend([cell_text(value) for value in row] for row in data.itertuples(index=False, name=None))
+    else:
+        rows.extend([cell_text(value) for value in row] for row in data)
+    return rows
+
+
+class TableFiller:
+    # anchor 자리표시자가 있는 셀부터 오른쪽·아래로 표를 채운다.
+    # 1) anchor 를 찾아 표 크기(행/열 수)를 한 번 읽고, 채울 원래 셀들은 셀 블록 하나로 한 번에 지운다
+    #    (InsertText 는 셀 글자에 덧붙이기 때문).
+    # 2) 모자란 행은 TableInsertRowColumn 한 번으로 늘린다. 넣은 행의 셀은 목록 번호가 행 순서로
+    #    이어지지 않으므로 번호를 계산하지 않고, 행을 넣은 뒤 채울 영역을 한 번 지나며 셀마다 GetPos 로 읽어 둔다.
+    # 3) 값이 있는 셀만 읽어 둔 목록 번호로 SetPos 해서 InsertText 로 쓴다.
+    # 셀 이동은 행 끝에서 다음 행 첫 셀로 가므로 표(적어도 anchor 행부터)에 병합된 셀이 없어야 한다.
+    def __init__(self, hwp):
+        self.hwp = hwp
+        self.engine = PlaceholderEngine(hwp)
+
+    def insert_rows(self, count):
+        insert_line = self.hwp.HParameterSet.HTableInsertLine
+        self.engine.action.GetDefault("TableInsertRowColumn", insert_line.HSet)
+        insert_line.Side = INSERT_BELOW
+        insert_line.Count = count
+        self.engine.action.Execute("TableInsertRowColumn", insert_line.HSet)
+
+    def clear_block(self, row_count, to_last_row):
+        # 현재 셀부터 오른쪽 끝, row_count 행 아래까지를 셀 블록으로 잡아 한 번에 지운다.
+        action = self.engine.action
+        action.Run("TableCellBlock")
+        action.Run("TableCellBlockExtend")
+        action.Run("TableRowEnd")
+        if to_last_row:
+            action.Run("TableColEnd")
+        else:
+            for _ in range(row_count - 1):
+                action.Run("TableLowerCell")
+        action.Run("Delete")
+        action.Run("Cancel")
+
+    def read_lists(self, list_id, steps):
+        # list_id 셀에서 TableRightCell 로 steps 칸 가며 지나는 셀의 목록 번호 (처음 셀 포함)
+        self.hwp.SetPos(list_id, 0, 0)
+        lists = [list_id]
+        for _ in range(steps):
+            self.engine.action.Run("TableRightCell")
+            lists.append(self.hwp.GetPos()[0])
+        return lists
+
+    def fill(self, anchor, data, header=False):
+        # 쓴 셀 수를 돌려준다. anchor 가 없거나 표 안이 아니면 None
+        rows = table_rows(data, header)
+        engine = self.engine
+        engine.prepare()
+        self.hwp.MovePos(2)
+        if not engine.find_next(anchor):
+            print(f"Table anchor not found: '{anchor}'")
+            return None
+        position = cell_position(self.hwp.KeyIndicator()[-1])
+        if position is None:
+            print(f"Table anchor is not inside a table: '{anchor}'")
+            return None
+        row, column = position
+        start_list = self.hwp.GetPos()[0]
+        properties = self.hwp.ParentCtrl.Properties
+        row_count = properties.Item("RowCount")
+        column_count = properties.Item("ColCount")
+        width = column_count - column
+        if any(len(values) > width for values in rows):
+            print(f"Table at '{anchor}' has {width} column(s) from the anchor; extra values are not written")
+        if not rows:
+            # 채울 행이 없으면 자리표시자만 지운다.
+            engine.insert_text("")
+            return 0
+
+        # anchor 셀부터 (offset 0) 행 순서로 센 셀 번호. 값이 있는 마지막 셀까지만 간다.
+        existing = min(len(rows), row_count - row)
+        missing = len(rows) - existing
+        filled = [
+            row_offset * column_count + column_offset
+            for row_offset, values in enumerate(rows)
+            for column_offset, text in enumerate(values[:width])
+            if text
+        ]
+        self.clear_block(existing, missing > 0)
+
+        # 원래 있던 행에서 읽고, 행을 넣어야 하면 마지막 행 끝 셀에서 넣은 뒤 이어서 읽는다.
+        last = max(filled, default=0)
+        if missing > 0:
+            existing_end = existing * column_count - column - 1
+            lists = self.read_lists(start_list, existing_end)
+            self.insert_rows(missing)
+            logger.debug("Added %d row(s) to the table at '%s'", missing, anchor)
+            if last > existing_end:
+                lists += self.read_lists(lists[-1], last - existing_end)[1:]
+        else:
+            lists = self.read_lists(start_list, last)
+
+        for offset in filled:
+            row_offset, column_offset = divmod(offset, column_count)
+            self.hwp.SetPos(lists[offset], 0, 0)
+            engine.insert_text(rows[row_offset][column_offset])
+        logger.debug("Filled %d cell(s) in %d row(s) at '%s'", len(filled), len(rows), anchor)
+        return len(filled)
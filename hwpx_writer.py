@@ -0,0 +1,409 @@
+import io
+import os
+import re
+import csv
+import sys
+import copy
+import shutil
+import zipfile
+import argparse
+import itertools
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+from PIL import Image
+
+from emf_converter import EMF_EXTENSIONS, create_emf_converter
+from hwp_placeholders import load_contents
+
+# 한글 프로그램 없이 HWPX(zip + OWPML XML) 양식에서 바로 문서를 만든다.
+# 양식은 한 번만 읽어 두고, 문서마다 XML 트리를 복사해 자리표시자/그림/표 행을 채운 뒤
+# 바뀌지 않은 부분은 원본 zip 에서 그대로 흘려 보내며 새 zip 에 쓴다.
+HP = "http://www.hancom.co.kr/hwpml/2011/paragraph"
+HC = "http://www.hancom.co.kr/hwpml/2011/core"
+OPF = "http://www.idpf.org/2007/opf/"
+CONTENT_PART = "Contents/content.hpf"
+SECTION_PART = re.compile(r"Contents/section\d+\.xml$")
+BINDATA_DIR = "BinData"
+COPY_CHUNK = 1024 * 1024
+# 96 DPI 화면 픽셀 하나 = 75 HWPUNIT (1 HWPUNIT = 1/7200 inch)
+HWPUNIT_PER_PIXEL = 75
+# 새 그림 개체 id. 양식에 이미 있는 개체 id 와 겹치지 않게 큰 수부터 쓴다.
+PICTURE_ID_BASE = 1 << 30
+MEDIA_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpg",
+    ".jpeg": "image/jpg",
+    ".bmp": "image/bmp",
+    ".gif": "image/gif",
+}
+TABLE_EXTENSIONS = (".csv",)
+
+
+def tag(namespace, name):
+    return f"{{{namespace}}}{name}"
+
+
+T = tag(HP, "t")
+RUN = tag(HP, "run")
+PARAGRAPH = tag(HP, "p")
+TABLE = tag(HP, "tbl")
+ROW = tag(HP, "tr")
+CELL = tag(HP, "tc")
+
+
+def parse_part(data):
+    # 양식의 접두어(hp, hc, hs ...)를 그대로 쓰도록 먼저 등록하고 트리를 만든다.
+    for _, (prefix, uri) in ET.iterparse(io.BytesIO(data), events=("start-ns",)):
+        if prefix:
+            ET.register_namespace(prefix, uri)
+    return ET.fromstring(data)
+
+
+def placeholder_pattern(names):
+    names = sorted(names, key=len, reverse=True)
+    return re.compile("|".join(re.escape(name) for name in names)) if names else None
+
+
+def merge_split_placeholders(root, pattern):
+    # 한글은 글자 모양이 바뀌는 곳마다 run 을 나누므로 자리표시자가 여러 <hp:t> 에 걸칠 수 있다.
+    # 문단의 글자를 이어 붙였을 때만 보이는 자리표시자가 있으면 그 문단의 글자를 첫 <hp:t> 로 모은다.
+    for paragraph in root.iter(PARAGRAPH):
+        nodes = [node for run in paragraph.findall(RUN) for node in run.findall(T)]
+        if len(nodes) < 2 or any(len(node) for node in nodes):
+            continue
+        texts = [node.text or "" for node in nodes]
+        joined = "".join(texts)
+        if len(pattern.findall(joined)) > sum(len(pattern.findall(text)) for text in texts):
+            nodes[0].text = joined
+            for node in nodes[1:]:
+                node.text = ""
+
+
+def replace_texts(root, values, pattern, counts):
+    def substitute(match):
+        counts[match.group(0)] += 1
+        return values[match.group(0)]
+
+    for node in root.iter(T):
+        if node.text:
+            node.text = pattern.sub(substitute, node.text)
+        for child in node:
+            if child.tail:
+                child.tail = pattern.sub(substitute, child.tail)
+
+
+def cell_text(cell):
+    return "".join(node.text or "" for node in cell.iter(T))
+
+
+def set_cell_text(cell, value):
+    nodes = list(cell.iter(T))
+    if not nodes:
+        run = next(cell.iter(RUN), None)
+        if run is None:
+            return
+        nodes = [ET.SubElement(run, T)]
+    for node in nodes:
+        for child in list(node):
+            node.remove(child)
+        node.text = ""
+    nodes[0].text = value
+
+
+def fill_table(table, template_row, rows):
+    # 자리표시자가 있는 행을 본보기로 데이터 행마다 복사하고, 아래 행의 rowAddr 와 표의 rowCnt 를 맞춘다.
+    row_elements = table.findall(ROW)
+    position = row_elements.index(template_row)
+    index = list(table).index(template_row)
+    first_cell = template_row.find(CELL)
+    address = first_cell.find(tag(HP, "cellAddr"))
+    row_address = int(address.get("rowAddr", position))
+    size = first_cell.find(tag(HP, "cellSz"))
+    row_height = int(size.get("height", 0)) if size is not None else 0
+
+    new_rows = []
+    for offset, values in enumerate(rows):
+        new_row = copy.deepcopy(template_row)
+        for column, cell in enumerate(new_row.findall(CELL)):
+            value = values[column] if column < len(values) else ""
+            set_cell_text(cell, "" if value is None else str(value))
+            cell.find(tag(HP, "cellAddr")).set("rowAddr", str(row_address + offset))
+        new_rows.append(new_row)
+
+    table.remove(template_row)
+    for offset, new_row in enumerate(new_rows):
+        table.insert(index + offset, new_row)
+    added = len(rows) - 1
+    for row in row_elements[position + 1:]:
+        for cell in row.findall(CELL):
+            cell_address = cell.find(tag(HP, "cellAddr"))
+            cell_address.set("rowAddr", str(int(cell_address.get("rowAddr")) + added))
+    table.set("rowCnt", str(int(table.get("rowCnt", len(row_elements))) + added))
+    table_size = table.find(tag(HP, "sz"))
+    if table_size is not None and row_height:
+        table_size.set("height", str(max(int(table_size.get("height", 0)) + added * row_height, 0)))
+
+
+def fill_tables(root, tables, counts):
+    # tables: {자리표시자: 행 목록}. 자리표시자가 든 칸의 행이 본보기 행이 된다.
+    for table in list(root.iter(TABLE)):
+        for row in table.findall(ROW):
+            text = "".join(cell_text(cell) for cell in row.findall(CELL))
+            anchor = next((name for name in tables if name in text), None)
+            if anchor is not None:
+                fill_table(table, row, tables[anchor])
+                counts[anchor] += len(tables[anchor])
+                break
+
+
+def picture_element(item_id, width, height, instance):
+    # 글자처럼 취급하는(treatAsChar) 그림 개체
+    def child(parent, namespace, name, **attributes):
+        return ET.SubElement(parent, tag(namespace, name), {key: str(value) for key, value in attributes.items()})
+
+    picture = ET.Element(tag(HP, "pic"), {
+        "id": str(instance), "zOrder": "0", "numberingType": "PICTURE", "textWrap": "TOP_AND_BOTTOM",
+        "textFlow": "BOTH_SIDES", "lock": "0", "dropcapstyle": "None", "href": "", "groupLevel": "0",
+        "instid": str(instance), "reverse": "0",
+    })
+    child(picture, HP, "offset", x=0, y=0)
+    child(picture, HP, "orgSz", width=width, height=height)
+    child(picture, HP, "curSz", width=width, height=height)
+    child(picture, HP, "flip", horizontal=0, vertical=0)
+    child(picture, HP, "rotationInfo", angle=0, centerX=width // 2, centerY=height // 2, rotateimage=1)
+    rendering = child(picture, HP, "renderingInfo")
+    for name in ("transMatrix", "scaMatrix", "rotMatrix"):
+        child(rendering, HC, name, e1=1, e2=0, e3=0, e4=0, e5=1, e6=0)
+    rectangle = child(picture, HP, "imgRect")
+    for index, (x, y) in enumerate(((0, 0), (width, 0), (width, height), (0, height))):
+        child(rectangle, HC, f"pt{index}", x=x, y=y)
+    child(picture, HP, "imgClip", left=0, right=width, top=0, bottom=height)
+    child(picture, HP, "inMargin", left=0, right=0, top=0, bottom=0)
+    child(picture, HP, "imgDim", dimwidth=width, dimheight=height)
+    child(picture, HC, "img", binaryItemIDRef=item_id, bright=0, contrast=0, effect="REAL_PIC", alpha=0)
+    child(picture, HP, "effects")
+    child(picture, HP, "sz", width=width, widthRelTo="ABSOLUTE", height=height, heightRelTo="ABSOLUTE", protect=0)
+    child(picture, HP, "pos", treatAsChar=1, affectLSpacing=0, flowWithText=1, allowOverlap=0,
+          holdAnchorAndSO=0, vertRelTo="PARA", horzRelTo="COLUMN", vertAlign="TOP", horzAlign="LEFT",
+          vertOffset=0, horzOffset=0)
+    child(picture, HP, "outMargin", left=0, right=0, top=0, bottom=0)
+    return picture
+
+
+def insert_pictures(root, pictures, pattern, counts, instances):
+    # pictures: {자리표시자: (항목 id, 너비, 높이)}. 자리표시자를 나눠 그 자리에 그림 개체를 넣는다.
+    for run in list(root.iter(RUN)):
+        for node in list(run.findall(T)):
+            if len(node) or not node.text or not pattern.search(node.text):
+                continue
+            position = list(run).index(node)
+            pieces = []
+            start = 0
+            for match in pattern.finditer(node.text):
+                pieces.append(node.text[start:match.start()])
+                item_id, width, height = pictures[match.group(0)]
+                pieces.append(picture_element(item_id, width, height, next(instances)))
+                counts[match.group(0)] += 1
+                start = match.end()
+            pieces.append(node.text[start:])
+            run.remove(node)
+            for offset, piece in enumerate(piece for piece in pieces if not isinstance(piece, str) or piece):
+                if isinstance(piece, str):
+                    text = ET.Element(T)
+                    text.text = piece
+                    piece = text
+                run.insert(position + offset, piece)
+
+
+def image_size(path, size=None):
+    # size 는 HWPyControl.insert_image 처럼 픽셀 (너비, 높이). 없으면 그림 원래 크기.
+    if size is None:
+        with Image.open(path) as image:
+            size = image.size
+    return size[0] * HWPUNIT_PER_PIXEL, size[1] * HWPUNIT_PER_PIXEL
+
+
+def convert_metafiles(images, emf):
+    # {자리표시자: 경로 또는 (경로, 크기)} 에서 EMF/WMF 경로를 변환된 PNG 경로로 바꾼다.
+    # PIL 은 Windows 에서만 메타파일을 그릴 수 있으므로 다른 환경에서는 변환이 실패한다.
+    def split(value):
+        return value if isinstance(value, tuple) else (value, None)
+
+    metafiles = [path for path, _ in map(split, images.values()) if path.lower().endswith(EMF_EXTENSIONS)]
+    if not metafiles:
+        return images
+    if emf is None:
+        raise ValueError(f"EMF/WMF images need an EMF converter (emf_converter.create_emf_converter()): {', '.join(metafiles)}")
+    converted = emf.convert_all(list(dict.fromkeys(metafiles)))
+    failed = [path for path in dict.fromkeys(metafiles) if not converted.get(path)]
+    if failed:
+        raise ValueError(f"Cannot convert EMF/WMF to PNG (PIL draws metafiles only on Windows): {', '.join(failed)}")
+    result = {}
+    for name, value in images.items():
+        path, size = split(value)
+        path = converted.get(path, path)
+        result[name] = (path, size) if size else path
+    return result
+
+
+class HwpxTemplate:
+    def __init__(self, path):
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            self.infos = archive.infolist()
+            names = [info.filename for info in self.infos]
+            if CONTENT_PART not in names:
+                raise ValueError(f"Not an HWPX document (no {CONTENT_PART}): {path}")
+            self.content = parse_part(archive.read(CONTENT_PART))
+            self.sections = {name: parse_part(archive.read(name)) for name in names if SECTION_PART.match(name)}
+        self.manifest = self.content.find(tag(OPF, "manifest"))
+        self.item_ids = {item.get("id") for item in self.manifest.iter(tag(OPF, "item"))}
+
+    def render(self, output_path, texts=None, images=None, tables=None, emf=None):
+        # texts: {자리표시자: 글자}, images: {자리표시자: 경로 또는 (경로, (너비, 높이))},
+        # tables: {자리표시자: 행 목록}. 자리표시자별로 채운 개수(표는 넣은 행 수)를 돌려준다.
+        # EMF/WMF 그림은 emf(EmfConverter)로 PNG 로 바꿔 넣는다. 바꿀 수 없으면 아무것도 쓰기 전에 ValueError.
+        texts = {name: "" if value is None else str(value) for name, value in (texts or {}).items()}
+        images = convert_metafiles(images or {}, emf)
+        tables = tables or {}
+        counts = Counter()
+        sections = {name: copy.deepcopy(root) for name, root in self.sections.items()}
+        content = copy.deepcopy(self.content)
+        manifest = content.find(tag(OPF, "manifest"))
+        embedded = self.embed_images(images, manifest)
+
+        text_pattern = placeholder_pattern(texts)
+        image_pattern = placeholder_pattern(images)
+        all_pattern = placeholder_pattern(list(texts) + list(images) + list(tables))
+        instances = itertools.count(PICTURE_ID_BASE)
+        for root in sections.values():
+            if all_pattern:
+                merge_split_placeholders(root, all_pattern)
+            if tables:
+                fill_tables(root, tables, counts)
+            if text_pattern:
+                replace_texts(root, texts, text_pattern, counts)
+            if image_pattern:
+                insert_pictures(root, {name: embedded[name][:3] for name in images}, image_pattern, counts, instances)
+
+        self.write(output_path, sections, content, embedded)
+        return {name: counts[name] for name in list(texts) + list(images) + list(tables)}
+
+    def embed_images(self, images, manifest):
+        # 같은 파일은 한 번만 BinData 에 넣는다. {자리표시자: (항목 id, 너비, 높이, zip 경로, 원본 경로, 형식)}
+        embedded = {}
+        by_path = {}
+        number = len(self.item_ids)
+        for name, value in images.items():
+            path, size = value if isinstance(value, tuple) else (value, None)
+            path = os.path.abspath(path)
+            if path not in by_path:
+                number += 1
+                while f"image{number}" in self.item_ids:
+                    number += 1
+                extension = os.path.splitext(path)[1].lower()
+                media_type = MEDIA_TYPES.get(extension)
+                # 한글이 읽지 못하는 형식(EMF 등)은 PNG 로 바꿔 넣는다.
+                part_extension = extension if media_type else ".png"
+                item_id = f"image{number}"
+                part = f"{BINDATA_DIR}/{item_id}{part_extension}"
+                ET.SubElement(manifest, tag(OPF, "item"), {
+                    "id": item_id, "href": part, "media-type": media_type or "image/png", "isEmbeded": "1",
+                })
+                by_path[path] = (item_id, part, media_type is not None)
+            item_id, part, native = by_path[path]
+            width, height = image_size(path, size)
+            embedded[name] = (item_id, width, height, part, path, native)
+        return embedded
+
+    def write(self, output_path, sections, content, embedded):
+        # mimetype 은 원본처럼 맨 앞에 압축 없이 두고, 나머지는 원본 압축 방식 그대로 흘려 쓴다.
+        with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in self.infos:
+                name = info.filename
+                target_info = zipfile.ZipInfo(name, date_time=info.date_time)
+                target_info.compress_type = info.compress_type
+                target_info.external_attr = info.external_attr
+                if name in sections or name == CONTENT_PART:
+                    root = sections.get(name, content)
+                    with target.open(target_info, "w") as part:
+                        ET.ElementTree(root).write(part, encoding="UTF-8", xml_declaration=True)
+                else:
+                    with source.open(info) as original, target.open(target_info, "w") as part:
+                        shutil.copyfileobj(original, part, COPY_CHUNK)
+
+            written = set()
+            for _, _, _, part, path, native in embedded.values():
+                if part in written:
+                    continue
+                written.add(part)
+                with target.open(zipfile.ZipInfo(part, date_time=self.infos[0].date_time), "w") as data:
+                    if native:
+                        with open(path, "rb") as image_file:
+                            shutil.copyfileobj(image_file, data, COPY_CHUNK)
+                    else:
+                        with Image.open(path) as image:
+                            image.save(data, "PNG")
+
+
+def read_rows(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        return [row for row in csv.reader(file)]
+
+
+def read_replacements(pairs):
+    # hangle.py 와 같은 (자리표시자, 파일) 쌍. .csv 는 표 행이고, 나머지는 COM 경로와 같은
+    # hwp_placeholders.load_contents 로 읽는다 (글자 인코딩, "년월" 바꾸기가 같다).
+    texts, images, tables = {}, {}, {}
+    others = []
+    for search_text, file_path in pairs:
+        search_text, file_path = search_text.strip('"'), file_path.strip('"')
+        if os.path.splitext(file_path)[1].lower() not in TABLE_EXTENSIONS:
+            others.append((search_text, file_path))
+        elif not os.path.exists(file_path):
+            print(f"File does not exist: {file_path}")
+        else:
+            tables[search_text] = read_rows(file_path)
+    contents, _ = load_contents(others)
+    for search_text, (content, content_type) in contents.items():
+        if content_type == "text":
+            texts[search_text] = content
+        elif content_type in ("image", "emf"):
+            images[search_text] = content
+        else:
+            print(f"Unsupported content for HWPX: {content_type} ({search_text})")
+    return texts, images, tables
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Fill an HWPX template without the HWP application.")
+    parser.add_argument("template", help="HWPX template (default.hwp saved as .hwpx)")
+    parser.add_argument("output", help="Output .hwpx path")
+    parser.add_argument("replacements", nargs="*", help="Pairs of placeholder and file path")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if len(args.replacements) % 2:
+        print("Replacements must be given as placeholder/file pairs.")
+        return 1
+    pairs = list(zip(args.replacements[::2], args.replacements[1::2]))
+    texts, images, tables = read_replacements(pairs)
+    try:
+        counts = HwpxTemplate(args.template).render(args.output, texts, images, tables, emf=create_emf_converter())
+    except ValueError as e:
+        print(e)
+        return 1
+    for name, count in counts.items():
+        if count:
+            print(f"Replaced {count} instance(s) of '{name}'")
+        else:
+            print(f"Failed to replace '{name}'")
+    print(f"HWPX file saved successfully: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
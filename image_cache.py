@@ -0,0 +1,121 @@
+import io
+import os
+import base64
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+# BMP 파일 헤더(BITMAPFILEHEADER) 길이. 클립보드 CF_DIB 는 그 뒤의 BITMAPINFOHEADER + 픽셀이다.
+BMP_FILE_HEADER = 14
+DIB_EXTENSION = ".dib"
+
+
+def encode_dib(source, size=None):
+    # 기존 _copy_image_to_clipboard / set_clipboard_image 와 같은 바이트: LANCZOS 축소, RGB, BMP 헤더 제외
+    if isinstance(source, str) and source.startswith("data:image"):
+        source = io.BytesIO(base64.b64decode(source.split(",")[1]))
+    with Image.open(source) as image:
+        if size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        output = io.BytesIO()
+        image.convert("RGB").save(output, "BMP")
+    return output.getbuffer()[BMP_FILE_HEADER:].tobytes()
+
+
+def encode_request(request):
+    # 프로세스 풀에서 실행된다. 한 그림의 오류가 나머지 준비를 멈추지 않게 오류를 결과로 돌려준다.
+    source, size = request
+    try:
+        return encode_dib(source, size), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class DibCache:
+    # 붙여넣을 준비가 끝난 DIB 바이트를 (경로, 수정 시각, 파일 크기, 목표 크기)로 보관한다.
+    # 보고서의 그림은 prefetch() 로 한글을 띄우기 전에 프로세스 풀에서 한꺼번에 만들어 두고,
+    # 삽입할 때는 get() 으로 만들어진 바이트만 꺼낸다. cache_dir 을 주면 다음 실행에서도 다시 쓴다.
+    def __init__(self, cache_dir=None, workers=None):
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.payloads = {}
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, source, size=None):
+        size = tuple(size) if size else None
+        if isinstance(source, str) and source.startswith("data:image"):
+            return ("data", hashlib.sha1(source.encode("utf-8")).hexdigest(), 0, 0, size)
+        path = os.path.abspath(source)
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size, size)
+
+    def _disk_path(self, key):
+        name = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, name + DIB_EXTENSION)
+
+    def _load(self, key):
+        if key in self.payloads:
+            return self.payloads[key]
+        if self.cache_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    payload = f.read()
+            except OSError:
+                return None
+            self.payloads[key] = payload
+            return payload
+        return None
+
+    def _store(self, key, payload):
+        self.payloads[key] = payload
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+    def prefetch(self, requests):
+        # requests: (경로, 목표 크기) 목록. 없는 것만 풀에서 만들고 실패한 (경로, 오류) 목록을 돌려준다.
+        pending = {}
+        for source, size in requests:
+            try:
+                key = self.key(source, size)
+            except OSError as e:
+                print(f"Image not found: {source} ({e})")
+                continue
+            if key not in pending and self._load(key) is None:
+                pending[key] = (source, tuple(size) if size else None)
+        if not pending:
+            return []
+
+        jobs = list(pending.values())
+        workers = min(self.workers or os.cpu_count() or 1, len(jobs))
+        if workers == 1:
+            results = [encode_request(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(encode_request, jobs))
+
+        failed = []
+        for key, job, (payload, error) in zip(pending, jobs, results):
+            if error is None:
+                self._store(key, payload)
+            else:
+                print(f"Failed to prepare image {job[0]}: {error}")
+                failed.append((job[0], error))
+        return failed
+
+    def get(self, source, size=None):
+        key = self.key(source, size)
+        payload = self._load(key)
+        if payload is not None:
+            self.hits += 1
+            return payload
+        self.misses += 1
+        payload = encode_dib(source, tuple(size) if size else None)
+        self._store(key, payload)
+        return payload
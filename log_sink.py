@@ -0,0 +1,108 @@
+import os
+import logging
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+
+
+class LogSink:
+    # sys.stdout/sys.stderr 대체용. 쓰기는 링 버퍼에 모으고 Tk 타이머에서 위젯으로 한 번에 옮긴다.
+    def __init__(
+        self,
+        text_widget,
+        flush_interval=100,
+        max_lines=2000,
+        buffer_size=10000,
+        log_path=None,
+        max_bytes=5 * 1024**2,
+        backup_count=5,
+    ):
+        self.output = text_widget
+        self.flush_interval = flush_interval
+        self.max_lines = max_lines
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.partial = ""
+        self.widget_lines = 0
+        self.file_logger = self.create_file_logger(
+            log_path or os.path.join(LOG_DIR, "app.log"), max_bytes, backup_count
+        )
+        self._timer = self.output.after(self.flush_interval, self._on_timer)
+
+    def create_file_logger(self, log_path, max_bytes, backup_count):
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        logger = logging.getLogger(f"log_sink.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        logger.addHandler(handler)
+        return logger
+
+    def write(self, string):
+        if not string:
+            return
+        with self.lock:
+            # print()는 본문과 줄바꿈을 나눠서 쓰므로 줄 단위로 모은다.
+            text = self.partial + string
+            lines = text.split("\n")
+            self.partial = lines.pop()
+            for line in lines:
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.dropped += 1
+                self.buffer.append(line)
+                self.file_logger.info(line)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        with self.lock:
+            lines = list(self.buffer)
+            self.buffer.clear()
+            dropped = self.dropped
+            self.dropped = 0
+        return lines, dropped
+
+    def flush_to_widget(self):
+        lines, dropped = self.drain()
+        if not lines:
+            return 0
+        if dropped:
+            lines.insert(0, f"... {dropped} line(s) skipped (see log file) ...")
+        # 위젯에는 최근 max_lines 줄만 남긴다.
+        lines = lines[-self.max_lines :]
+        self.output.insert("end", "\n".join(lines) + "\n")
+        self.widget_lines += len(lines)
+        excess = self.widget_lines - self.max_lines
+        if excess > 0:
+            self.output.delete("1.0", f"{excess + 1}.0")
+            self.widget_lines -= excess
+        self.output.see("end")
+        return len(lines)
+
+    def _on_timer(self):
+        try:
+            self.flush_to_widget()
+        finally:
+            self._timer = self.output.after(self.flush_interval, self._on_timer)
+
+    def close(self):
+        if self._timer is not None:
+            self.output.after_cancel(self._timer)
+            self._timer = None
+        with self.lock:
+            if self.partial:
+                self.buffer.append(self.partial)
+                self.file_logger.info(self.partial)
+                self.partial = ""
+        self.flush_to_widget()
+        for handler in list(self.file_logger.handlers):
+            handler.close()
+            self.file_logger.removeHandler(handler)
+
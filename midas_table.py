@@ -0,0 +1,254 @@
+import io
+import csv
+import codecs
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+ENCODINGS = ("utf-8", "euc-kr")
+SNIFF_BYTES = 64 * 1024
+# 스트리밍으로 읽을 때 한 번에 변환해서 쓰는 행 수
+CHUNK_ROWS = 10000
+
+
+def detect_encoding(data):
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        decoder.decode(data[:SNIFF_BYTES], final=len(data) <= SNIFF_BYTES)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "euc-kr"
+
+
+def decode_bytes(data, encoding=None):
+    encoding = encoding or detect_encoding(data)
+    try:
+        return data.decode(encoding), encoding
+    except UnicodeDecodeError:
+        for fallback in ENCODINGS:
+            if fallback != encoding:
+                try:
+                    return data.decode(fallback), fallback
+                except UnicodeDecodeError:
+                    continue
+        raise
+
+
+def split_text_lines(text):
+    # 텍스트 모드 readlines() 와 같은 기준(\n, \r\n, \r)으로만 줄을 나눈다.
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+    return lines
+
+
+def to_numbers(values):
+    # float() 과 같은 기준, 같은 값으로 숫자를 변환한다.
+    # 숫자 열은 numpy 가 한 번에 변환하고(float() 와 같은 C 변환), 글자가 섞인 열은
+    # 서로 다른 값마다 한 번씩만 float() 을 시도한다 (하중조합, 단면 이름 등은 종류가 적다).
+    values = np.asarray(values, dtype=object)
+    try:
+        return values.astype(float), np.ones(len(values), dtype=bool)
+    except ValueError:
+        pass
+
+    codes, uniques = pd.factorize(values)
+    unique_numbers = np.full(len(uniques), np.nan)
+    unique_numeric = np.zeros(len(uniques), dtype=bool)
+    for index, value in enumerate(uniques.tolist()):
+        try:
+            unique_numbers[index] = float(value)
+            unique_numeric[index] = True
+        except ValueError:
+            pass
+    return unique_numbers[codes], unique_numeric[codes]
+
+
+def clean_numbers(numbers, numeric):
+    # ExcelProcessor.clean_decimal 과 같은 값: 정수면 int, 아니면 소수 넷째 자리까지의 float
+    result = np.empty(len(numbers), dtype=object)
+    finite = numeric & np.isfinite(numbers)
+    result[numeric & ~finite] = numbers[numeric & ~finite]
+
+    integral = finite & (numbers == np.floor(numbers))
+    small = integral & (np.abs(numbers) < 2.0**62)
+    result[small] = numbers[small].astype(np.int64).tolist()
+    for index in np.flatnonzero(integral & ~small):
+        result[index] = int(numbers[index])
+
+    fraction = np.flatnonzero(finite & ~integral)
+    values = numbers[fraction]
+    result[fraction] = np.round(values, 4).tolist()
+    # 반올림 경계(...5)에 걸리거나 아주 큰 값은 문자열 포맷으로 정확히 계산한다.
+    scaled = np.abs(values) * 1e4
+    tolerance = 1e-6 + scaled * 1e-14
+    edge = (np.abs(scaled - np.floor(scaled) - 0.5) < tolerance) | (scaled >= 2.0**52)
+    for index, value in zip(fraction[edge], values[edge]):
+        result[index] = float(f"{value:.4f}")
+    return result
+
+
+class MidasColumn:
+    def __init__(self, values):
+        self.values = values
+        self.numbers, self.numeric = to_numbers(values)
+        self._cleaned = None
+
+    @property
+    def nbytes(self):
+        # 대략의 메모리 크기: 값마다 포인터와 str 머리(약 56바이트) + 글자 수, 그리고 숫자 배열
+        return sum(map(len, self.values.tolist())) + len(self.values) * 56 + self.numbers.nbytes + self.numeric.nbytes
+
+    @property
+    def kind(self):
+        filled = self.values != ""
+        if filled.any() and self.numeric[filled].all():
+            return "number"
+        return "text"
+
+    def cleaned(self):
+        if self._cleaned is None:
+            cleaned = clean_numbers(self.numbers, self.numeric)
+            text = ~self.numeric
+            cleaned[text] = self.values[text]
+            self._cleaned = cleaned
+        return self._cleaned
+
+
+class MidasTable:
+    # 탭으로 구분된 마이다스 표를 열 단위 배열로 보관한다.
+    # row_lengths 는 원본 각 행의 필드 수로, 짧은 행의 빈 칸과 실제 빈 값을 구분한다.
+    def __init__(self, header, columns, row_lengths, encoding=None):
+        self.header = header
+        self.columns = columns
+        self.row_lengths = row_lengths
+        self.encoding = encoding
+
+    @property
+    def names(self):
+        return self.header[-1] if self.header else []
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def __len__(self):
+        return len(self.row_lengths)
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns) + self.row_lengths.nbytes
+
+    def column(self, key):
+        if isinstance(key, str):
+            key = self.names.index(key)
+        return self.columns[key]
+
+    def rows(self):
+        # 각 행을 ExcelProcessor.clean_decimal 을 거친 값과 같은 파이썬 값 목록으로 돌려준다.
+        cleaned = [column.cleaned().tolist() for column in self.columns]
+        width = self.width
+        for row, length in zip(zip(*cleaned), self.row_lengths.tolist()):
+            yield list(row) if length == width else list(row[:length])
+
+    def duplicate_column(self, index):
+        # 기존 modify_data2 처럼 index 열(Pu)을 바로 뒤에 한 번 더 넣은 표를 돌려준다.
+        # 그 열까지 값이 있는 행만 길어지고, 짧은 행은 그대로 둔다.
+        if index >= self.width:
+            return self
+        column = self.columns[index]
+        grows = self.row_lengths > index
+        # 빈 줄은 기존 코드에서 다시 strip() 되어 한 칸으로 남는다.
+        grows &= ~((self.row_lengths == 1) & (column.values == ""))
+        header = [names[: index + 1] + names[index:] if len(names) > index else names for names in self.header]
+        columns = self.columns[: index + 1] + self.columns[index:]
+        return MidasTable(header, columns, self.row_lengths + grows, self.encoding)
+
+    def text_rows(self):
+        values = [column.values.tolist() for column in self.columns]
+        width = self.width
+        for row, length in zip(zip(*values), self.row_lengths.tolist()):
+            yield list(row) if length == width else list(row[:length])
+
+
+def split_lines(lines, strip=True):
+    # 기존 코드의 line.strip().split("\t") 과 같은 결과를 열 배열로 만든다.
+    if strip:
+        lines = [line.strip() for line in lines]
+    else:
+        lines = [line.rstrip("\r\n") for line in lines]
+    if not lines:
+        return [], np.zeros(0, dtype=np.int64)
+
+    row_lengths = np.fromiter((line.count("\t") + 1 for line in lines), dtype=np.int64, count=len(lines))
+    width = int(row_lengths.max())
+    frame = pd.read_csv(
+        io.StringIO("\n".join(lines)),
+        sep="\t",
+        header=None,
+        names=range(width),
+        dtype=str,
+        na_filter=False,
+        skip_blank_lines=False,
+        quoting=csv.QUOTE_NONE,
+        engine="c",
+    )
+    columns = [frame[col].to_numpy(dtype=object) for col in range(width)]
+    missing = len(lines) - len(frame)
+    if missing:
+        # 끝의 빈 줄은 read_csv 가 행으로 만들지 않으므로 빈 값으로 채운다.
+        padding = np.full(missing, "", dtype=object)
+        columns = [np.concatenate([values, padding]) for values in columns]
+    return columns, row_lengths
+
+
+def parse_lines(lines, header_rows=1, strip=True, encoding=None):
+    lines = list(lines)
+    header = [line.strip().split("\t") for line in lines[:header_rows]]
+    columns, row_lengths = split_lines(lines[header_rows:], strip=strip)
+    return MidasTable(header, [MidasColumn(values) for values in columns], row_lengths, encoding)
+
+
+def iter_line_tables(lines, chunk_rows=CHUNK_ROWS, strip=True):
+    # 줄 iterator 를 chunk_rows 행씩 MidasTable 로 바꿔 돌려준다 (header 없음).
+    # 전체 줄 목록을 만들지 않으므로 입력 크기와 관계없이 한 조각 분량의 메모리만 쓴다.
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_rows))
+        if not chunk:
+            break
+        yield parse_lines(chunk, header_rows=0, strip=strip)
+
+
+def parse_text(text, header_rows=1, strip=True):
+    return parse_lines(split_text_lines(text), header_rows=header_rows, strip=strip)
+
+
+def parse_file(path, header_rows=1, strip=True, encoding=None):
+    with open(path, "rb") as f:
+        data = f.read()
+    text, encoding = decode_bytes(data, encoding)
+    return parse_lines(split_text_lines(text), header_rows=header_rows, strip=strip, encoding=encoding)
+
+
+def iter_file_chunks(path, chunk_rows=CHUNK_ROWS, header_rows=1, strip=True, encoding=None):
+    # 큰 파일을 chunk_rows 행씩 읽어 MidasTable 로 돌려준다. 모든 조각이 같은 header 를 공유한다.
+    with open(path, "rb") as f:
+        if encoding is None:
+            encoding = detect_encoding(f.read(SNIFF_BYTES))
+            f.seek(0)
+        header = None
+        while True:
+            raw_lines = list(islice(f, chunk_rows))
+            if not raw_lines:
+                break
+            text, used = decode_bytes(b"".join(raw_lines), encoding)
+            lines = split_text_lines(text)
+            if header is None:
+                header = [line.strip().split("\t") for line in lines[:header_rows]]
+                lines = lines[header_rows:]
+            columns, row_lengths = split_lines(lines, strip=strip)
+            if len(row_lengths):
+                yield MidasTable(header, [MidasColumn(values) for values in columns], row_lengths, used)
@@ -0,0 +1,198 @@
+import os
+import subprocess
+import time
+import win32gui
+import win32con
+import win32process
+
+from process_map import build_process_map, find_pids_by_filepath
+
+
+class MidasWindowManager:
+    def __init__(self):
+        self.original_position = None
+        self.original_size = None
+        self.midas_hwnd = None
+        self.midas_pid = None
+        self.midas_file = None
+
+    def is_midas_gen_open(self, file_path):
+        return self.resolve_midas_hwnd(file_path) is not None
+
+    def resolve_midas_hwnd(self, file_path, refresh=False):
+        # 이미 찾은 창이 살아 있으면 IsWindow와 pid 확인만으로 재사용한다.
+        if not refresh and self._is_resolved_hwnd_valid(file_path):
+            return self.midas_hwnd
+
+        hwnds = self._get_hwnds_by_filepath(file_path)
+        if not hwnds:
+            return None
+        self.midas_hwnd = hwnds[0]
+        _, self.midas_pid = win32process.GetWindowThreadProcessId(self.midas_hwnd)
+        self.midas_file = file_path.lower()
+        return self.midas_hwnd
+
+    def _is_resolved_hwnd_valid(self, file_path):
+        if not self.midas_hwnd or self.midas_file != file_path.lower():
+            return False
+        if not win32gui.IsWindow(self.midas_hwnd):
+            return False
+        _, pid = win32process.GetWindowThreadProcessId(self.midas_hwnd)
+        return pid == self.midas_pid
+
+    def _get_hwnds_by_filepath(self, file_path):
+        pids = find_pids_by_filepath(build_process_map(), file_path)
+        if not pids:
+            return []
+
+        hwnds = []
+
+        def callback(hwnd, hwnds):
+            if win32gui.IsWindowVisible(hwnd) and win32gui.IsWindowEnabled(hwnd):
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                if pid in pids:
+                    hwnds.append(hwnd)
+            return True
+
+        win32gui.EnumWindows(callback, hwnds)
+        return hwnds
+
+    def open_midas_gen_file(self, file_path):
+        midas_gen_executable = "C:\\Program Files\\MIDAS\\MODS\\Midas Gen\\MidasGen.exe"
+        if not os.path.exists(midas_gen_executable):
+            print("Midas Gen executable not found.")
+            return False
+
+        if self.is_midas_gen_open(file_path):
+            print("Midas Gen is already open.")
+            return True
+
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = win32con.SW_HIDE
+        subprocess.Popen([midas_gen_executable, file_path], startupinfo=startupinfo)
+
+        while not self.is_midas_gen_open(file_path):
+            print("Waiting for Midas Gen to open...")
+            time.sleep(5)
+
+        print("Midas Gen opened successfully.")
+        time.sleep(15)
+        return True
+
+    def save_original_position_and_size(self, solar_file):
+        # self.midas_hwnd 다시 갖고오기 (시작 화면 창 대신 메인 창을 잡기 위해)
+        self.resolve_midas_hwnd(solar_file, refresh=True)
+        
+        if self.midas_hwnd:
+            rect = win32gui.GetWindowRect(self.midas_hwnd)
+            self.original_position = (rect[0], rect[1])
+            self.original_size = (rect[2] - rect[0], rect[3] - rect[1])
+
+            print(f"Original position: {self.original_position}")
+
+    def set_ui_position_and_size(self, hwnd, ini_file):
+        try:
+            window_title = win32gui.GetWindowText(hwnd)
+            exe_path = os.path.join(
+                os.path.dirname(__file__), "WindowLayoutManager.exe"
+            )
+            ini_file = os.path.join(os.path.dirname(__file__), ini_file)
+
+            success, _ = self.run_window_layout_manager(
+                exe_path, window_title, ini_file
+            )
+            if success:
+                print("Window layout restoration process completed successfully.")
+            else:
+                print("Window layout restoration failed or timed out.")
+        except Exception as e:
+            print(f"Failed to set UI position and size: {e}")
+
+    def run_window_layout_manager(self, exe_path, window_title, ini_file, timeout=300):
+        command = [exe_path, window_title, ini_file]
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                errors="replace",
+            )
+
+            start_time = time.time()
+            output_lines = []
+            while True:
+                output = process.stdout.readline()
+                if output == "" and process.poll() is not None:
+                    break
+                if output:
+                    output_lines.append(output.strip())
+                    print(output_lines[-1])
+
+                if time.time() - start_time > timeout:
+                    print(f"Timeout after {timeout} seconds. Terminating process.")
+                    process.terminate()
+                    return False, output_lines
+
+            if process.poll() == 0:
+                print("Process completed successfully.")
+                return True, output_lines
+            else:
+                print(f"Error occurred: {process.stderr.read()}")
+                return False, output_lines
+        except Exception as e:
+            print(f"Subprocess failed: {e}")
+            return False, []
+
+    def restore_original_position_and_size(self):
+        if self.midas_hwnd and self.original_position and self.original_size:
+            try:
+                top_hwnd = self.get_top_level_parent(self.midas_hwnd)
+                if self.original_position == "maximized":
+                    win32gui.ShowWindow(top_hwnd, win32con.SW_MAXIMIZE)
+                else:
+                    self.set_window_position_and_size(
+                        top_hwnd,
+                        self.original_position[0],
+                        self.original_position[1],
+                        self.original_size[0],
+                        self.original_size[1],
+                    )
+            except win32gui.error as e:
+                pass
+
+    def minimize_window(self):
+        if self.midas_hwnd:
+            win32gui.ShowWindow(self.midas_hwnd, win32con.SW_MINIMIZE)
+
+    def restore_window(self):
+        if self.midas_hwnd:
+            win32gui.ShowWindow(self.midas_hwnd, win32con.SW_RESTORE)
+
+    def set_window_position_and_size(self, hwnd, x, y, width, height):
+        win32gui.SetWindowPos(
+            hwnd,
+            win32con.HWND_TOP,
+            x,
+            y,
+            width,
+            height,
+            win32con.SWP_SHOWWINDOW,
+        )
+
+    def close_midas_gen(self):
+        if self.midas_hwnd:
+            win32gui.PostMessage(self.midas_hwnd, win32con.WM_CLOSE, 0, 0)
+            self.midas_hwnd = None
+            self.midas_pid = None
+            self.midas_file = None
+
+    def get_top_level_parent(self, hwnd):
+        parent = hwnd
+        while True:
+            new_parent = win32gui.GetParent(parent)
+            if new_parent == 0:
+                return parent
+            parent = new_parent
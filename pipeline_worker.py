@@ -0,0 +1,92 @@
+import time
+import queue
+import threading
+import traceback
+
+
+class PipelineCancelled(Exception):
+    pass
+
+
+class RunControl:
+    # 작업 스레드가 단계 사이마다 확인하는 취소/일시정지 상태
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def checkpoint(self):
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise PipelineCancelled()
+
+
+class PipelineWorker(threading.Thread):
+    # tasks: (이름, 호출 가능 객체) 목록. 진행 상황은 events 큐로 전달되고 GUI가 폴링한다.
+    def __init__(self, tasks, pipeline=None):
+        super().__init__(daemon=True)
+        self.tasks = list(tasks)
+        self.pipeline = pipeline
+        self.control = RunControl()
+        self.events = queue.Queue()
+
+    def emit(self, kind, **data):
+        data["time"] = time.time()
+        self.events.put((kind, data))
+
+    def run(self):
+        if self.pipeline is not None:
+            self.pipeline.control = self.control
+            self.pipeline.on_event = self.emit
+        started = time.time()
+        status = "done"
+        try:
+            for name, func in self.tasks:
+                self.control.checkpoint()
+                task_started = time.time()
+                self.emit("task_started", name=name)
+                try:
+                    func()
+                except PipelineCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Error in {name}: {str(e)}")
+                    print(traceback.format_exc())
+                    self.emit("task_failed", name=name, error=str(e))
+                    continue
+                self.emit("task_finished", name=name, elapsed=time.time() - task_started)
+        except PipelineCancelled:
+            status = "cancelled"
+            print("작업이 취소되었습니다.")
+        finally:
+            if self.pipeline is not None:
+                self.pipeline.control = None
+                self.pipeline.on_event = None
+            self.emit(status, elapsed=time.time() - started)
+
+    def drain(self, limit=200):
+        events = []
+        try:
+            while len(events) < limit:
+                events.append(self.events.get_nowait())
+        except queue.Empty:
+            pass
+        return events
@@ -0,0 +1,33 @@
+import psutil
+
+MIDAS_EXECUTABLES = ("midasgen.exe",)
+
+
+def build_process_map(candidate_names=MIDAS_EXECUTABLES, processes=None):
+    # 한 번의 순회로 pid -> (exe, cmdline) 맵을 만든다.
+    # 이름으로 먼저 거르고 후보 프로세스만 cmdline을 읽는다 (cmdline 조회가 가장 비싸다).
+    candidate_names = {name.lower() for name in candidate_names}
+    if processes is None:
+        processes = psutil.process_iter(["pid", "name"])
+
+    process_map = {}
+    for process in processes:
+        name = (process.info.get("name") or "").lower()
+        if name not in candidate_names:
+            continue
+        try:
+            cmdline = [arg.lower() for arg in process.cmdline()]
+            exe = process.exe()
+        except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+            continue
+        process_map[process.info["pid"]] = (exe, cmdline)
+    return process_map
+
+
+def find_pids_by_filepath(process_map, file_path):
+    file_path = file_path.lower()
+    return {
+        pid
+        for pid, (_, cmdline) in process_map.items()
+        if any(file_path in arg for arg in cmdline)
+    }
@@ -1,39 +1,108 @@
+import os
+import re
 import sys
+import time
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import pyperclip
 
+from summary_extractor import read_columns, write_summary
+
+SHEET_NAME = "Purlin _ Girth"
+# Design+ 시트는 제목 한 줄과 부제목 두 줄 뒤(4행)부터 부재가 한 줄씩 나온다.
+FIRST_DATA_ROW = 4
+# 필요한 열만 읽는다 (1부터 센 열 번호): Span = O, Deflection = BB, Ratio = BC
+SPAN_COLUMN = 15
+DEFLECTION_COLUMN = 54
+RATIO_COLUMN = 55
+OUTPUT_COLUMNS = ["Deflection", "Calculated Span/300", "Ratio"]
+EXPORT_EXTENSIONS = (".xlsx", ".xlsm", ".xls")
+DECIMAL_PATTERN = re.compile(r"(\d+\.\d+)")
+INTEGER, FLOAT, OTHER = 0, 1, 2
+
+
+def read_export(file_path):
+    # Span, Deflection, Ratio 세 열의 값 목록. xlsx 는 read_only 로 열어 세 열만 꺼내고,
+    # 예전 형식(.xls)은 pandas 로 세 열만 읽는다.
+    columns = (SPAN_COLUMN, DEFLECTION_COLUMN, RATIO_COLUMN)
+    if zipfile.is_zipfile(file_path):
+        rows = read_columns(file_path, SHEET_NAME, columns, min_row=FIRST_DATA_ROW)
+        # pandas.read_excel 처럼 정수인 float 은 int 로 읽는다 (3.0 -> 3).
+        rows = [[int(v) if type(v) is float and v.is_integer() else v for v in row] for row in rows]
+    else:
+        df = pd.read_excel(
+            file_path,
+            sheet_name=SHEET_NAME,
+            header=None,
+            skiprows=FIRST_DATA_ROW - 1,
+            usecols=[column - 1 for column in columns],
+        )
+        rows = df.astype(object).where(df.notna(), None).values.tolist()
+    if not rows:
+        return [[] for _ in columns]
+    return [list(values) for values in zip(*rows)]
+
+
+def extract_decimals(values):
+    # 각 값을 str() 한 글자에서 처음 나오는 "숫자.숫자" 를 float 로 꺼낸다. 없으면 NaN.
+    # (기존 .astype(str).str.extract(r"(\d+\.\d+)") 와 같은 값)
+    # 숫자 셀은 numpy 로 한 번에 계산한다: int 는 소수점이 없어 NaN 이고, 지수 표기가 아닌
+    # 범위(1e-4 <= |x| < 1e16)의 float 은 부호를 뺀 값 그대로다. 나머지는 서로 다른 값마다 정규식을 한 번만 쓴다.
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    values = array
+    result = np.full(len(values), np.nan)
+    kinds = np.fromiter(
+        (INTEGER if type(v) is int else FLOAT if type(v) is float else OTHER for v in values),
+        dtype=np.int8,
+        count=len(values),
+    )
+
+    float_index = np.flatnonzero(kinds == FLOAT)
+    magnitude = np.abs(values[float_index].astype(float))
+    with np.errstate(invalid="ignore"):
+        plain = (magnitude >= 1e-4) & (magnitude < 1e16)
+    result[float_index[plain]] = magnitude[plain]
+
+    rest = np.concatenate([np.flatnonzero(kinds == OTHER), float_index[~plain]])
+    if len(rest):
+        codes, uniques = pd.factorize(values[rest])
+        unique_numbers = np.full(len(uniques) + 1, np.nan)
+        for index, value in enumerate(uniques.tolist()):
+            match = DECIMAL_PATTERN.search(str(value))
+            if match:
+                unique_numbers[index] = float(match.group(1))
+        # factorize 는 None/NaN 을 -1 로 주므로 마지막 칸(NaN)을 가리킨다.
+        result[rest] = unique_numbers[codes]
+    return result
+
+
+def to_floats(values):
+    # 숫자가 아닌 Span(글자)은 NaN 이 되어 그 부재만 빠진다.
+    return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+def extract_file(file_path):
+    # 처짐, Span/300, 비율을 담은 DataFrame (세 값이 모두 있는 부재만)
+    spans, deflections, ratios = read_export(file_path)
+    df = pd.DataFrame(
+        {
+            "Deflection": extract_decimals(deflections),
+            "Calculated Span/300": np.round(to_floats(spans) * 1000 / 300, 2),
+            "Ratio": extract_decimals(ratios),
+        },
+        columns=OUTPUT_COLUMNS,
+    )
+    return df.dropna()
+
+
 def extract_purlin_girth_data(file_path):
     try:
-        # Read the Excel file
-        df = pd.read_excel(file_path, sheet_name="Purlin _ Girth")
-
-        # Remove the first two rows and reset index
-        df = df.iloc[2:].reset_index(drop=True)
-
-        # Set column names
-        df.columns = [
-            "CHK", "CHK.1", "Apply Member To", "Material", "Member Type", "Section",
-            "Unnamed: 6", "Unnamed: 7", "Unnamed: 8", "Unnamed: 9", "Unnamed: 10",
-            "Unnamed: 11", "Unnamed: 12", "Unnamed: 13", "Span", "Unnamed: 15",
-            "Unnamed: 16", "Unbraced Length", "Unnamed: 18", "Factor", "Unnamed: 20",
-            "Design Load", "Unnamed: 22", "Unnamed: 23", "Unnamed: 24", "Unnamed: 25",
-            "Unnamed: 26", "Unnamed: 27", "Unnamed: 28", "Unnamed: 29", "Unnamed: 30",
-            "Unnamed: 31", "Unnamed: 32", "Unnamed: 33", "Unnamed: 34", "Unnamed: 35",
-            "Defl. Criteria", "Width-Thick Ratio", "Unnamed: 38", "Unnamed: 39",
-            "Moment Strength", "Unnamed: 41", "Unnamed: 42", "Unnamed: 43", "Unnamed: 44",
-            "Unnamed: 45", "Unnamed: 46", "Shear Strength", "Unnamed: 48", "Unnamed: 49",
-            "Unnamed: 50", "Unnamed: 51", "Unnamed: 52", "Deflection", "Unnamed: 54"
-        ]
-
-        # Extract and convert Deflection and Ratio
-        df["Deflection"] = df["Deflection"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
-        df["Ratio"] = df["Unnamed: 54"].astype(str).str.extract(r"(\d+\.\d+)").astype(float)
-
-        # Calculate Span/300
-        df["Calculated Span/300"] = (df["Span"] * 1000 / 300).round(2)
-
-        # Select required columns and remove rows with NaN values
-        output_df = df[["Deflection", "Calculated Span/300", "Ratio"]].dropna()
+        output_df = extract_file(file_path)
 
         # Convert to list and then to string
         result = output_df.to_string(index=False, header=False)
@@ -48,9 +117,79 @@ def extract_purlin_girth_data(file_path):
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python program_name.py <excel_file_path>")
+
+def collect_exports(paths):
+    files = []
+    for path in paths:
+        path = path.strip('"')
+        if os.path.isdir(path):
+            for file_name in sorted(os.listdir(path)):
+                if file_name.lower().endswith(EXPORT_EXTENSIONS) and not file_name.startswith("~$"):
+                    files.append(os.path.join(path, file_name))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"File not found: {path}")
+    return list(dict.fromkeys(os.path.abspath(f) for f in files))
+
+
+def extract_file_result(file_path):
+    # 프로세스 풀에서 실행된다. 한 파일의 오류가 전체 작업을 멈추지 않게 오류를 결과로 돌려준다.
+    try:
+        return file_path, extract_file(file_path), None
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}"
+
+
+def extract_batch(paths, output_path, workers=None):
+    # 여러 Design+ 결과 파일을 프로세스 풀에서 읽어 파일 이름 열을 붙인 하나의 엑셀로 쓴다.
+    files = collect_exports(paths)
+    if not files:
+        print("No Design+ export files found.")
+        return []
+
+    started = time.time()
+    if len(files) == 1 or workers == 1:
+        results = [extract_file_result(path) for path in files]
     else:
-        file_path = sys.argv[1]
-        extract_purlin_girth_data(file_path)
\ No newline at end of file
+        workers = min(workers or os.cpu_count() or 1, len(files))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(extract_file_result, files))
+
+    rows = [["File"] + OUTPUT_COLUMNS]
+    for path, df, error in results:
+        if error is None:
+            name = os.path.basename(path)
+            rows.extend([name] + values for values in df.values.tolist())
+    write_summary(output_path, rows, title=SHEET_NAME)
+
+    failed = [(path, error) for path, _, error in results if error is not None]
+    print(
+        f"Extracted {len(rows) - 1} member(s) from {len(results) - len(failed)} file(s) "
+        f"in {time.time() - started:.1f}s -> {output_path}"
+    )
+    for path, error in failed:
+        print(f"  FAILED {path}: {error}")
+    return results
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Extract purlin/girth deflection results from Design+ exports.")
+    parser.add_argument("paths", nargs="+", help="Design+ Excel files or folders containing them")
+    parser.add_argument("--output", help="Write one consolidated Excel file instead of copying to the clipboard")
+    parser.add_argument("--workers", type=int, help="Worker processes for batch mode (default: CPU count)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    if args.output is None and len(args.paths) == 1 and os.path.isfile(args.paths[0].strip('"')):
+        extract_purlin_girth_data(args.paths[0].strip('"'))
+        return 0
+    output_path = args.output or os.path.join(os.getcwd(), "purlin_girth_result.xlsx")
+    results = extract_batch(args.paths, output_path, args.workers)
+    return 1 if not results or any(error for _, _, error in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
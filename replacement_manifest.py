@@ -0,0 +1,69 @@
+import os
+import json
+
+try:
+    import tomllib
+except ImportError:
+    # Python 3.10 이하에서는 JSON 매니페스트만 읽는다.
+    tomllib = None
+
+
+class ManifestError(Exception):
+    pass
+
+
+def resolve(path, base_dir):
+    # 매니페스트 안의 상대 경로는 매니페스트 파일이 있는 폴더 기준이다.
+    if path.startswith("data:") or os.path.isabs(path):
+        return path
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def parse_replacements(entries):
+    # {"{{날짜}}": "날짜.txt"}, [["{{날짜}}", "날짜.txt"]], [{"placeholder": "{{날짜}}", "file": "날짜.txt"}]
+    if isinstance(entries, dict):
+        return list(entries.items())
+    replacements = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            replacements.append((entry["placeholder"], entry["file"]))
+        else:
+            search_text, file_path = entry
+            replacements.append((search_text, file_path))
+    return replacements
+
+
+def load_manifest(path):
+    # hangle.py / hwp_service 의 작업 파일 (JSON 또는 TOML):
+    #   template = "보고서.hwp"                 (없으면 명령줄의 HWP 파일)
+    #   outputs = ["보고서_완료.hwp", "보고서_완료.pdf"]   (없으면 원본_수정완료.hwp/.pdf)
+    #   [replacements]
+    #   "{{날짜}}" = "날짜.txt"
+    #   [tables]                                (같은 프로세스의 ArtifactStore 에 있는 행 목록, 예: SolarPipeline.build_report)
+    #   "{{종합}}" = "summary_table"
+    # -> {"template": 경로 또는 None, "replacements": [(자리표시자, 파일)], "outputs": [경로], "tables": {자리표시자: 이름}}
+    base_dir = os.path.dirname(os.path.abspath(path))
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        if ext == ".toml":
+            if tomllib is None:
+                raise ManifestError("TOML manifests need Python 3.11 or newer")
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, "r", encoding="utf-8-sig") as f:
+                data = json.load(f)
+        replacements = parse_replacements(data.get("replacements", {}))
+        tables = dict(data.get("tables", {}))
+    except ManifestError:
+        raise
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        raise ManifestError(f"Invalid manifest {path}: {type(e).__name__}: {e}") from e
+
+    template = data.get("template")
+    return {
+        "template": resolve(template, base_dir) if template else None,
+        "replacements": [(search_text, resolve(file_path, base_dir)) for search_text, file_path in replacements],
+        "outputs": [resolve(output_path, base_dir) for output_path in data.get("outputs", [])],
+        "tables": tables,
+    }
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import hashlib
+
+JOURNAL_FILE = "run_journal.json"
+JOURNAL_VERSION = 2
+
+
+def file_checksum(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunJournal:
+    # 단계별 완료 기록을 temp 디렉토리에 남겨 중단된 실행을 이어서 진행할 수 있도록 한다.
+    def __init__(self, temp_dir, model_path):
+        self.temp_dir = temp_dir
+        self.model_path = os.path.abspath(model_path)
+        self.journal_path = os.path.join(temp_dir, JOURNAL_FILE)
+        self.model_checksum = (
+            file_checksum(self.model_path) if os.path.exists(self.model_path) else None
+        )
+        self.steps = {}
+
+    def load(self):
+        # 기록이 없거나 모델 파일이 바뀌었으면 False (처음부터 다시 실행해야 함)
+        if not os.path.exists(self.journal_path):
+            return False
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Failed to read run journal: {e}")
+            return False
+
+        if data.get("version") != JOURNAL_VERSION:
+            return False
+        if data.get("model_path") != self.model_path:
+            print("Run journal belongs to a different model file.")
+            return False
+        if self.model_checksum is None or data.get("model_checksum") != self.model_checksum:
+            print("Model file changed since the last run. Outputs are stale.")
+            return False
+
+        self.steps = data.get("steps", {})
+        return True
+
+    def reset(self):
+        self.steps = {}
+        self.save()
+
+    def save(self):
+        os.makedirs(self.temp_dir, exist_ok=True)
+        data = {
+            "version": JOURNAL_VERSION,
+            "model_path": self.model_path,
+            "model_checksum": self.model_checksum,
+            "steps": self.steps,
+        }
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.journal_path)
+
+    def record_step(self, name, output_paths, elapsed=None):
+        # output_paths 는 단계가 만들어야 하는 파일 전부. 없는 파일은 None 으로 남아 단계가 완료로 보이지 않는다.
+        outputs = {}
+        for path in output_paths:
+            if not os.path.exists(path):
+                outputs[os.path.basename(path)] = None
+                continue
+            stat = os.stat(path)
+            outputs[os.path.basename(path)] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "sha256": file_checksum(path),
+            }
+        self.steps[name] = {
+            "completed_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "elapsed": elapsed,
+            "outputs": outputs,
+        }
+        self.save()
+
+    def is_step_valid(self, name):
+        entry = self.steps.get(name)
+        if entry is None:
+            return False
+        for file_name, meta in entry["outputs"].items():
+            if meta is None:
+                return False
+            path = os.path.join(self.temp_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            if stat.st_size != meta["size"]:
+                return False
+            # 수정 시간이 같으면 내용도 같다고 보고 해시 계산을 생략한다.
+            if stat.st_mtime_ns != meta["mtime_ns"] and file_checksum(path) != meta["sha256"]:
+                return False
+        return True
+
+    def first_incomplete(self, step_names):
+        for index, name in enumerate(step_names):
+            if not self.is_step_valid(name):
+                return index
+        return len(step_names)
+
+    def invalidate_from(self, step_names, index):
+        # 재개 지점 이후 단계는 다시 실행되므로 기록을 지운다.
+        removed = False
+        for name in step_names[index:]:
+            if self.steps.pop(name, None) is not None:
+                removed = True
+        if removed:
+            self.save()
@@ -0,0 +1,36 @@
+def data_extent(sheet):
+    # 값이 있는 셀의 마지막 (행, 열)을 셀 저장소를 한 번 훑어 구한다. 값이 없으면 (0, 0).
+    # sheet.max_row / max_column 과 달리 서식만 있는 빈 셀은 세지 않고, 조회하면서 셀을 만들지도 않는다.
+    last_row = 0
+    last_column = 0
+    for (row, column), cell in sheet._cells.items():
+        if cell._value is None:
+            continue
+        if row > last_row:
+            last_row = row
+        if column > last_column:
+            last_column = column
+    return last_row, last_column
+
+
+def last_data_row(sheet):
+    return data_extent(sheet)[0]
+
+
+class SheetExtent:
+    # 시트에서 값이 있는 범위를 기억한다. 처음 한 번만 훑고, 이후에는 쓴 범위로 늘린다.
+    # 값을 지우는 쓰기(None)는 추적하지 않으므로 그런 경우에는 refresh() 를 부른다.
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.refresh()
+
+    def refresh(self):
+        self.last_row, self.last_column = data_extent(self.sheet)
+
+    def include(self, last_row, last_column=0):
+        self.last_row = max(self.last_row, last_row)
+        self.last_column = max(self.last_column, last_column)
+
+    @property
+    def next_row(self):
+        return self.last_row + 1
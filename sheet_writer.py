@@ -0,0 +1,56 @@
+import numpy as np
+from openpyxl.cell.cell import Cell
+
+BLOCK_ROWS = 10000
+MAX_ROW = 1048576
+
+
+def bind_text(sheet, value):
+    probe = Cell(sheet)
+    probe.value = value
+    return probe._value, probe.data_type
+
+
+def write_table(sheet, table, start_row, start_col=1, block_rows=BLOCK_ROWS):
+    # MidasTable 을 start_row 부터 시트에 쓴다. sheet.cell(row, col, value=...) 와 같은 결과를 만든다.
+    # 열 단위로 이미 변환된 값을 행 블록마다 목록으로 꺼내 셀 저장소(_cells)에 바로 넣는다.
+    # 숫자는 openpyxl 이 파일을 읽을 때처럼 _value 에 바로 넣는다. 글자는 열마다 서로 다른 값을 한 번씩만
+    # value 로 넣어 openpyxl 의 형식 검사(허용되지 않는 문자, "=" 수식, 오류 값)를 거친 결과를 재사용한다.
+    # 템플릿에 이미 있는 셀은 서식을 지키기 위해 값만 바꾼다. 마지막으로 쓴 행 번호를 돌려준다.
+    total = len(table)
+    if not total:
+        return start_row - 1
+    last_row = start_row + total - 1
+    if start_row < 1 or start_col < 1 or last_row > MAX_ROW:
+        raise ValueError(f"Rows {start_row}-{last_row} do not fit in the sheet")
+
+    cells = sheet._cells
+    for block_start in range(0, total, block_rows):
+        block_end = min(block_start + block_rows, total)
+        lengths = table.row_lengths[block_start:block_end]
+        for col_offset, column in enumerate(table.columns):
+            present = np.flatnonzero(lengths > col_offset)
+            if not len(present):
+                continue
+            values = column.cleaned()[block_start:block_end][present].tolist()
+            numeric = column.numeric[block_start:block_end][present].tolist()
+            col_idx = start_col + col_offset
+            first_row = start_row + block_start
+            bound = {}
+            for offset, value, is_number in zip(present.tolist(), values, numeric):
+                row_idx = first_row + offset
+                cell = cells.get((row_idx, col_idx))
+                if cell is None:
+                    cell = Cell(sheet, row=row_idx, column=col_idx)
+                    cells[(row_idx, col_idx)] = cell
+                if is_number:
+                    cell._value = value
+                    cell.data_type = "n"
+                else:
+                    binding = bound.get(value)
+                    if binding is None:
+                        binding = bound[value] = bind_text(sheet, value)
+                    cell._value, cell.data_type = binding
+
+    sheet._current_row = max(sheet._current_row, last_row)
+    return last_row
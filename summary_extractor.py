@@ -0,0 +1,38 @@
+import openpyxl
+
+# 값이 없는 행이 이만큼 이어지면 데이터가 끝난 것으로 본다.
+# read_only 시트의 max_row 는 서식만 있는 행까지 세므로, 양식 아래의 빈 행을 끝까지 읽지 않기 위해서다.
+EMPTY_ROWS_TO_STOP = 200
+
+
+def read_columns(path, sheet_name, columns, min_row=1, empty_rows=EMPTY_ROWS_TO_STOP):
+    # data_only 로 읽은 시트에서 columns(1부터 시작하는 열 번호)만 꺼낸 행 목록을 돌려준다.
+    # read_only 로 열어 시트를 한 줄씩 흘려 읽고, 필요한 열 범위의 셀만 값으로 바꾼다.
+    # min_row 앞의 행과 값이 하나도 없는 행은 건너뛰고, 빈 행이 empty_rows 개 이어지면 멈춘다.
+    first, last = min(columns), max(columns)
+    offsets = [column - first for column in columns]
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = []
+        empty = 0
+        for row in wb[sheet_name].iter_rows(min_row=min_row, min_col=first, max_col=last, values_only=True):
+            values = [row[offset] if offset < len(row) else None for offset in offsets]
+            if any(value is not None for value in values):
+                rows.append(values)
+                empty = 0
+                continue
+            empty += 1
+            if empty >= empty_rows:
+                break
+        return rows
+    finally:
+        wb.close()
+
+
+def write_summary(path, rows, title="Sheet1"):
+    # DataFrame(rows).to_excel(path, index=False, header=False) 와 같은 내용을 pandas 없이 쓴다.
+    wb = openpyxl.Workbook(write_only=True)
+    sheet = wb.create_sheet(title)
+    for row in rows:
+        sheet.append(row)
+    wb.save(path)